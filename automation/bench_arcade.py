@@ -0,0 +1,144 @@
+"""Grid Dodge frame cost of micro-arcade: full redraw versus the diffing Term.
+
+Loads the app with runpy (its __main__ block does not run), sets up a
+--grid board on a --term sized fallback terminal writing to a byte sink
+and plays --frames seeded ticks with a hazard spawned on every tick.
+"old" is the render the app used before the frame layer, kept here as
+the reference: `clear` run as a subprocess, then every row rebuilt cell
+by cell with a scan of all hazards, then printed. "new" is
+GridDodge.render through Term's back buffer, sending only changed cells
+as ANSI. Each new frame is checked by replaying the sent bytes onto a
+screen model and comparing it with the old rows. A short autoplay run then
+checks the deadline scheduler: ticks, dropped ticks and getkey wakeups
+per tick, with no input.
+
+    python automation/bench_arcade.py [--frames 300] [--grid 100x40] [--term 120x50] [--tick-ms 50]
+"""
+import os, re, sys, time, runpy, random, pathlib, argparse, tempfile
+
+APPS_DIR = pathlib.Path("dist/apps")
+APP = "micro-arcade-single-file-python-micro-games-hub.py"
+
+class Sink:
+    """Stands in for sys.stdout: keeps the bytes written."""
+    def __init__(self):
+        self.buffer = self
+        self.data = bytearray()
+
+    def write(self, b):
+        self.data += b.encode() if isinstance(b, str) else b
+
+    def flush(self):
+        pass
+
+# ---------- the pre-frame-layer render ----------
+
+def old_render(gd, w, out):
+    os.system("clear >/dev/null")  # what Term.clear() ran on every frame
+    base_x = max(0, (w - gd.width) // 2)
+    lines = [f"Grid Dodge — Score: {gd.score}", "Move with ←/→ or a/d. Survive as long as you can. Esc to quit."]
+    printed = [(" " * 2) + lines[0], (" " * 2) + lines[1]]
+    rows = []
+    for y in range(gd.height):
+        line = ""
+        for x in range(gd.width):
+            ch = "."
+            for hx, hy in gd.hazards:
+                if hx == x and hy == y:
+                    ch = "*"
+                    break
+            if x == gd.player_x and y == gd.player_y:
+                ch = "@"
+            line += ch
+        rows.append(line)
+        printed.append((" " * base_x) + line)
+    out.write("\x1b[H\x1b[2J\x1b[3J" + "\n".join(printed) + "\n")
+    return rows
+
+def replay(screen, payload):
+    """Apply the cursor moves and text of an ANSI payload to `screen` (a list of char lists)."""
+    for move, text in re.findall(r"\x1b\[(\d+;\d+H|H\x1b\[2J)([^\x1b]*)", payload):
+        if move.startswith("H"):
+            for row in screen:
+                row[:] = " " * len(row)
+            continue
+        y, x = (int(v) - 1 for v in move[:-1].split(";"))
+        screen[y][x:x + len(text)] = text
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark micro-arcade Grid Dodge rendering.")
+    ap.add_argument("--frames", type=int, default=300, help="ticks to render (default: %(default)s)")
+    ap.add_argument("--grid", default="100x40", help="board WxH (default: %(default)s)")
+    ap.add_argument("--term", default="120x50", help="terminal WxH (default: %(default)s)")
+    ap.add_argument("--tick-ms", type=int, default=50, help="tick length of the scheduler run (default: %(default)s)")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    ns = runpy.run_path(str(pathlib.Path(args.apps).resolve() / APP), run_name="__bench__")
+    gw, gh = (int(v) for v in args.grid.split("x"))
+    tw, th = (int(v) for v in args.term.split("x"))
+    cfg = {"settings": {"grid_size": [gw, gh], "tick_ms": args.tick_ms, "difficulty": "hard"}}
+
+    def board(seed):
+        term = ns["Term"](use_curses=False)
+        term.width, term.height, term.out = tw, th, Sink()
+        random.seed(seed)
+        gd = ns["GridDodge"](term, cfg, autoplay=True)
+        gd.spawn_rate = 1.0
+        return term, gd
+
+    term, gd = board(1)
+    old_out, old_ms, old_rows = Sink(), [], []
+    for _ in range(args.frames):
+        gd.step()
+        gd.running = True
+        t0 = time.perf_counter()
+        old_rows.append(old_render(gd, tw, old_out))
+        old_ms.append((time.perf_counter() - t0) * 1000)
+
+    term, gd = board(1)
+    term.stats = ns["FrameStats"]()
+    screen = [[" "] * tw for _ in range(th)]
+    base_x = max(0, (tw - gd.width) // 2)
+    for i in range(args.frames):
+        gd.step()
+        gd.running = True
+        sent = len(term.out.data)
+        gd.render()
+        replay(screen, term.out.data[sent:].decode("utf-8"))
+        drawn = ["".join(screen[2 + y][base_x:base_x + gd.width]) for y in range(gd.height)]
+        if drawn != old_rows[i]:
+            raise SystemExit(f"frame {i}: screen differs from the old render")
+    new_ms = [t * 1000 for t in term.stats.times]
+    hazards = len(gd.hazards)
+
+    print(f"Grid {gw}x{gh} on {tw}x{th}, {args.frames} frames, ~{hazards} hazards on screen\n")
+    print(f"{'render':<8} {'p50':>9} {'p99':>9} {'bytes/frame':>12}")
+    p = lambda xs, q: sorted(xs)[min(len(xs) - 1, int(q * len(xs)))]
+    print(f"{'old':<8} {p(old_ms, .5):>7.2f}ms {p(old_ms, .99):>7.2f}ms {len(old_out.data) / args.frames:>12.0f}")
+    print(f"{'new':<8} {p(new_ms, .5):>7.2f}ms {p(new_ms, .99):>7.2f}ms {len(term.out.data) / args.frames:>12.0f}")
+
+    # deadline scheduler, no input: getkey just waits out its timeout
+    term, gd = board(2)
+    term.stats = ns["FrameStats"]()
+    wakeups = [0]
+    def getkey(timeout=None):
+        wakeups[0] += 1
+        time.sleep(max(0.0, timeout or 0) / 1000.0)
+        return None
+    term.getkey = getkey
+    gd.spawn_rate = 0.25
+    gd.tick_ms = args.tick_ms  # autoplay would run on AUTOPLAY_TICK_MS
+    with tempfile.TemporaryDirectory(prefix="bench-arcade-") as box:
+        os.environ["XDG_CONFIG_HOME"] = box  # run() records its score; keep it out of the real config
+        t0 = time.perf_counter()
+        gd.run()
+        secs = time.perf_counter() - t0
+    stats = term.stats
+    print(f"\nscheduler: {stats.ticks} ticks of {args.tick_ms}ms in {secs:.2f}s, "
+          f"{stats.dropped} dropped, {wakeups[0] / max(1, stats.ticks):.1f} getkey wakeups per tick")
+    print("every new frame matches the old render on screen")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
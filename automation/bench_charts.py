@@ -0,0 +1,90 @@
+"""Ingest and render latency of data-chart-generator at --points points.
+
+Writes a random-walk series with one spike as CSV and JSON to a throwaway
+directory. The app is loaded with runpy (its __main__ block does not run).
+The benchmark times the streaming ingest of each file, then line, bar,
+histogram and scatter renders: the first render, a redraw at the same size
+(cached summaries, reused frame buffer) and a resize. Each chart is checked
+to show the spike (the histogram, to have binned every value). The last
+column reports what the old fixed-stride truncation would have kept.
+
+    python automation/bench_charts.py [--points 1000000] [--width 120] [--height 30] [--repeat 3]
+"""
+import os, sys, time, json, runpy, random, pathlib, argparse, tempfile
+from benchutil import median_ms
+
+APPS_DIR = pathlib.Path("dist/apps")
+APP = "data-chart-generator.py"
+
+def write_fixtures(box: pathlib.Path, n: int):
+    rng = random.Random(11)
+    spike = n * 2 // 3 + 1  # off any stride the old truncation would have used
+    y, ys = 0.0, []
+    for i in range(n):
+        y += rng.uniform(-1, 1)
+        ys.append(round(y, 3))
+    ys[spike] = max(ys) + 100 * (max(ys) - min(ys) + 1)
+    with open(box / "series.csv", "w", encoding="utf-8") as f:
+        f.write("x,y\n")
+        f.writelines(f"{i},{v}\n" for i, v in enumerate(ys))
+    with open(box / "series.json", "w", encoding="utf-8") as f:
+        f.write("[" + ",".join(f"[{i},{v}]" for i, v in enumerate(ys)) + "]")
+    return spike
+
+def stride_keeps(n: int, spike: int, max_points: int) -> bool:
+    """Whether the old truncate_data(data, max_points) kept index `spike`."""
+    step = n // max_points if n > max_points else 1
+    return spike % step == 0 and spike // step < max_points
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark data-chart-generator ingest and rendering.")
+    ap.add_argument("--points", type=int, default=1_000_000, help="points in the series (default: %(default)s)")
+    ap.add_argument("--width", type=int, default=120, help="chart width (default: %(default)s)")
+    ap.add_argument("--height", type=int, default=30, help="chart height (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per measurement; the median is shown")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    ns = runpy.run_path(str(pathlib.Path(args.apps).resolve() / APP), run_name="__bench__")
+    w, h, n = args.width, args.height, args.points
+    print(f"{n} points, {w}x{h} chart, median of {args.repeat} runs\n")
+    with tempfile.TemporaryDirectory(prefix="bench-charts-") as box:
+        box = pathlib.Path(box)
+        spike = write_fixtures(box, n)
+        print(f"{'step':<22} {'time':>10}")
+        for name in ("series.csv", "series.json"):
+            size = os.path.getsize(box / name) / 1e6
+            ms = median_ms(lambda: ns["load_series"](str(box / name)), args.repeat)
+            print(f"{'ingest ' + name:<22} {ms:>8.1f}ms  ({size:.0f} MB file)")
+        series = ns["load_series"](str(box / "series.csv"))
+        if len(series) != n:
+            raise SystemExit(f"ingest lost points: {len(series)} of {n}")
+        held = (series.xs.buffer_info()[1] * series.xs.itemsize + series.ys.buffer_info()[1] * series.ys.itemsize) / 1e6
+        print(f"{'series in memory':<22} {held:>8.1f}MB")
+
+    print(f"\n{'chart':<14} {'first':>10} {'redraw':>10} {'resize':>10}  checked      old stride kept")
+    old_caps = {"line_chart": w // 4, "bar_chart": (w - 1) // 3, "histogram": w // 2, "scatter_plot": w * h // 4}
+    frame = ns["FrameBuffer"]()
+    for chart, cap in old_caps.items():
+        render = ns["render_chart"]
+        series._cache.clear()
+        t0 = time.perf_counter()
+        rows = render(chart, w, h, series, {}, frame)[0]
+        first = (time.perf_counter() - t0) * 1000
+        redraw = median_ms(lambda: render(chart, w, h, series, {}, frame), args.repeat)
+        resize = median_ms(lambda: (render(chart, w - 7, h - 3, series, {}, frame), series._cache.clear(),
+                                render(chart, w, h, series, {}, frame)), args.repeat) / 2
+        if chart == "histogram":  # one count in a 1M-count bin is below one row: check every value was binned
+            bins = w - 2
+            ok = sum(series.histogram(bins, max((series.y_max - series.y_min) / bins, 0.1))) == n
+            kept = f"{min(cap, n)} of {n} binned"
+        else:  # the spike is the one point on the top data row
+            ok = rows[1].strip("| ") != ""
+            kept = "yes" if stride_keeps(n, spike, cap) else "no"
+        if not ok:
+            raise SystemExit(f"{chart}: the spike is not drawn" if chart != "histogram" else "histogram lost values")
+        print(f"{chart:<14} {first:>8.1f}ms {redraw:>8.1f}ms {resize:>8.1f}ms  {'yes':<11}  {kept}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Palette contrast batch of color-contrast-checker-pro at --tokens colours.
+
+A seeded random palette is checked the way the old checker would have
+done it pair by pair: luminance recomputed through rgb_to_srgb and
+srgb_to_linear for every pair. That is timed against ContrastEngine,
+which builds the N x N matrix from cached LINEAR-table luminances and
+bisects the sorted luminances for the AA and AAA pass sets. The matrix and
+both pass sets must match the old per-pair results exactly. The nearest
+passing colour for every pair failing AA is timed too. A sample of those
+fixes is checked against a linear scan of colorsys lightness levels: each
+fix must reach 4.5:1 and be at most one lightness level further from the
+original (ramp colours are rounded to 8 bits). The app is loaded with
+runpy, so its __main__ block does not run.
+
+    python automation/bench_contrast.py [--tokens 500] [--sample 2000] [--repeat 3]
+"""
+import sys, runpy, random, pathlib, argparse, colorsys
+from benchutil import median_ms
+
+APPS_DIR = pathlib.Path("dist/apps")
+APP = "color-contrast-checker-pro.py"
+
+def old_luminance(r, g, b):
+    """relative_luminance as the checker computed it before the LINEAR table."""
+    lin = [c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4 for c in (r / 255.0, g / 255.0, b / 255.0)]
+    return 0.2126 * lin[0] + 0.7152 * lin[1] + 0.0722 * lin[2]
+
+def ratio_of(l1, l2):
+    return (max(l1, l2) + 0.05) / (min(l1, l2) + 0.05)
+
+def old_ratio(fg, bg):
+    return ratio_of(old_luminance(*fg), old_luminance(*bg))
+
+def old_batch(rgbs):
+    """Matrix plus AA and AAA pass sets, one pair at a time."""
+    matrix = [[old_ratio(fg, bg) for bg in rgbs] for fg in rgbs]
+    aa = [{j for j, r in enumerate(row) if r >= 4.5} for row in matrix]
+    aaa = [{j for j, r in enumerate(row) if r >= 7.0} for row in matrix]
+    return matrix, aa, aaa
+
+def scan_fix(fg, bg_lum, steps=256, target=4.5):
+    """(start, best): fg's lightness level and the smallest move of it reaching `target`, by linear scan."""
+    h, l, s = colorsys.rgb_to_hls(*(c / 255.0 for c in fg))
+    start = round(l * (steps - 1))
+    moves = [abs(k - start) for k in range(steps)
+             if ratio_of(old_luminance(*(round(c * 255) for c in colorsys.hls_to_rgb(h, k / (steps - 1), s))),
+                         bg_lum) >= target]
+    return start, min(moves, default=None)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark palette contrast batches.")
+    ap.add_argument("--tokens", type=int, default=500, help="colours in the palette (default: %(default)s)")
+    ap.add_argument("--sample", type=int, default=2000, help="fixes checked against a linear scan (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per measurement; the median is shown")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    ns = runpy.run_path(str(pathlib.Path(args.apps).resolve() / APP), run_name="__bench__")
+    Engine = ns["ContrastEngine"]
+    rng = random.Random(7)
+    colors = [(f"c{i}", (rng.randrange(256), rng.randrange(256), rng.randrange(256))) for i in range(args.tokens)]
+    rgbs = [rgb for _, rgb in colors]
+    n = len(colors)
+    print(f"{n} colours, {n * (n - 1):,} FG/BG pairs, median of {args.repeat} runs\n")
+
+    old_matrix, old_aa, old_aaa = old_batch(rgbs)
+    engine = Engine(colors)
+    if engine.matrix() != old_matrix:
+        raise SystemExit("matrix differs from per-pair contrast_ratio")
+    for i in range(n):
+        if set(engine.passing(i, 4.5)) != old_aa[i] or set(engine.passing(i, 7.0)) != old_aaa[i]:
+            raise SystemExit(f"pass sets of {colors[i][0]} differ")
+
+    def new_batch():
+        e = Engine(colors)
+        e.matrix()
+        return [e.passing(i, 4.5) for i in range(n)], [e.passing(i, 7.0) for i in range(n)]
+
+    def new_fixes():
+        e = Engine(colors)
+        return [(i, j, e.fix(i, j)) for i in range(n) for j in e.failing(i)]
+
+    fixes = new_fixes()
+    lums = engine.lums
+    for i, j, found in rng.sample(fixes, min(args.sample, len(fixes))):
+        start, best = scan_fix(rgbs[i], lums[j])
+        if found is None:
+            if best is not None:
+                raise SystemExit(f"{colors[i][0]} on {colors[j][0]}: engine found no fix, scan did")
+            continue
+        rgb, ratio = found
+        moved = abs(round(colorsys.rgb_to_hls(*(c / 255.0 for c in rgb))[1] * 255) - start)
+        if ratio < 4.5 or ratio_of(old_luminance(*rgb), lums[j]) < 4.5 or best is None or moved > best + 1:
+            raise SystemExit(f"{colors[i][0]} on {colors[j][0]}: fix {rgb} moved {moved}, scan {best}")
+
+    old = median_ms(lambda: old_batch(rgbs), args.repeat)
+    new = median_ms(new_batch, args.repeat)
+    fix_ms = median_ms(new_fixes, args.repeat)
+    print(f"{'step':<28} {'old':>10} {'new':>10} {'speedup':>8}")
+    print(f"{'matrix + AA/AAA sets':<28} {old:>8.1f}ms {new:>8.1f}ms {old / new:>7.1f}x")
+    print(f"{'fixes for failing pairs':<28} {'-':>10} {fix_ms:>8.1f}ms  ({len(fixes):,} pairs)")
+    print(f"\nmatrix and pass sets identical; {min(args.sample, len(fixes))} fixes checked against a lightness scan")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Study-session start, reviews and stats of the flashcard apps versus whole-deck JSON.
+
+Writes a --cards card deck in each app's format to a throwaway directory,
+loads the apps with runpy (their __main__ blocks do not run) and times what
+a session does: pick the cards to study, review --reviews of them, show the
+stats, add a card. "old" is the code those apps used before DueIndex, kept
+here as the reference: the deck JSON loaded, sorted or filtered, and saved
+whole. The new code keeps the deck in the index and writes the JSON only
+on sync, timed on its own after the reviews. The picks and the stats output
+of the new code are checked against the old.
+
+    python automation/bench_flashcards.py [--cards 100000] [--limit 20] [--reviews 20] [--repeat 3]
+"""
+import io, os, sys, time, runpy, random, pathlib, argparse, tempfile, contextlib
+from datetime import datetime, timedelta
+from benchutil import median_ms
+
+APPS_DIR = pathlib.Path("dist/apps")
+VOCAB = "vocabulary-flashcard-study-system.py"
+FORGE = "flashcard-forge-3.py"
+
+def printed(fn, *args):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        fn(*args)
+    return out.getvalue()
+
+# ---------- the pre-DueIndex implementations ----------
+
+def old_card_priority(ns, card, now):
+    """vocabulary-flashcard-study-system's card_priority, at a fixed `now`."""
+    due_at = ns["parse_iso"](card.get("due_at") or ns["now_iso"]()) or now
+    days_overdue = max((now - due_at).total_seconds() / 86400.0, 0)
+    return -days_overdue + (5 - (card.get("avg_confidence") or 0)) * 0.2
+
+def old_vocab_stats(ns, deck):
+    cards = deck["cards"]
+    mastered, confs, streak = 0, [], 0
+    for c in cards:
+        avg = c.get("avg_confidence")
+        if avg is not None:
+            confs.append(avg)
+        if avg is not None and avg >= 4.0 and c.get("review_count", 0) >= 3:
+            mastered += 1
+        due_at = ns["parse_iso"](c.get("due_at") or ns["now_iso"]())
+        if due_at and due_at <= datetime.utcnow() and (avg or 0) >= 3.5:
+            streak += 1
+    avg_conf = round(sum(confs) / len(confs), 2) if confs else None
+    print(f"Deck: {deck['name']}")
+    print(f"Total cards: {len(cards)}")
+    print(f"Cards mastered: {mastered}")
+    print(f"Average confidence: {avg_conf:.2f}" if avg_conf is not None else "Average confidence: N/A")
+    print(f"Review streak (high-confidence due cards): {streak}")
+    print(f"Time spent studying: {int(deck.get('total_time_seconds', 0))} seconds")
+    print(f"Review sessions: {deck.get('review_sessions', 0)}")
+    print(f"Last reviewed: {deck.get('last_reviewed_at') or 'never'}")
+
+def old_forge_stats(ns, cards):
+    now = datetime.utcnow()
+    due_today = due_week = 0
+    for c in cards:
+        nr = ns["parse_iso"](c.get("next_review")) or now
+        due_today += nr.date() <= now.date()
+        due_week += nr.date() <= (now + timedelta(days=7)).date()
+    eases = [float(c.get("ease", 2.5)) for c in cards]
+    print(f"Total cards: {len(cards)}")
+    print(f"Due today: {due_today}")
+    print(f"Due this week: {due_week}")
+    print(f"Average ease: {(sum(eases) / len(eases)) if eases else 0.0:.2f}")
+    print("Longest streak: N/A (streak tracking not implemented in this simple format)")
+
+# ---------- fixtures ----------
+
+def vocab_deck(n, rng):
+    now, cards = datetime.utcnow(), []
+    for i in range(n):
+        history = [{"timestamp": "2026-01-01T00:00:00Z", "confidence": rng.randint(1, 5)}
+                   for _ in range(rng.choice([0, 0, 1, 3, 5, 8]))]
+        due = now + timedelta(seconds=rng.randrange(-60 * 86400, 90 * 86400))
+        cards.append({"question": f"word {i}", "answer": f"meaning of word {i}", "created_at": "2026-01-01T00:00:00Z",
+                      "last_reviewed_at": None, "review_count": len(history), "confidence_history": history,
+                      "avg_confidence": round(sum(e["confidence"] for e in history) / len(history), 2) if history else None,
+                      "easiness": 2.5, "interval_days": rng.choice([1, 6, 15]), "repetitions": 1,
+                      "due_at": due.isoformat(timespec="seconds") + "Z"})
+    return {"name": "big", "created_at": "2026-01-01T00:00:00Z", "last_reviewed_at": None,
+            "total_time_seconds": 0, "review_sessions": 0, "cards": cards}
+
+def forge_cards(n, rng):
+    now = datetime.utcnow()
+    return [{"front": f"front {i}", "back": f"back {i}", "interval": rng.choice([1, 3, 8]),
+             "ease": round(rng.uniform(2.5, 5.0), 2),
+             "next_review": (now + timedelta(seconds=rng.randrange(-20 * 86400, 40 * 86400))).strftime("%Y-%m-%dT%H:%M:%S")}
+            for i in range(n)]
+
+def check(label, old, new):
+    if old != new:
+        raise SystemExit(f"MISMATCH in {label}:\n  old: {old}\n  new: {new}")
+
+# ---------- benchmarks ----------
+
+def bench_vocab(ns, box, n, limit, reviews, repeat, rng):
+    rows = []
+    config, args = {"study_dir": str(box)}, argparse.Namespace(deck="big")
+    path = ns["deck_path"](str(box), "big")
+    ns["save_deck"](path, vocab_deck(n, rng))
+
+    def first_open():
+        ns["drop_index"](str(box), "big")
+        ns["open_deck"](str(box), "big").close()
+    rows.append(("vocab", "index build (once)", None, median_ms(first_open, 1)))
+
+    deck = ns["load_deck"](path)
+    index = ns["open_deck"](str(box), "big")
+    now = datetime.utcnow()
+    for k in (1, limit, 1000, n):
+        # equal scores may come in either order, so compare the scores of the picks
+        old = sorted(old_card_priority(ns, c, now) for c in sorted(deck["cards"], key=lambda c: old_card_priority(ns, c, now))[:k])
+        new = sorted(old_card_priority(ns, index.card(pos), now) for pos in ns["choose_cards_for_study"](index, k))
+        if len(old) != len(new) or any(abs(a - b) > 1e-6 for a, b in zip(old, new)):
+            raise SystemExit(f"MISMATCH in the {k} cards picked for study")
+    check("stats", printed(old_vocab_stats, ns, deck), printed(ns["stats_cmd"], args, config, "none"))
+    index.close()
+
+    def old_session(review):
+        def run():
+            d, now = ns["load_deck"](path), datetime.utcnow()
+            picks = sorted(d["cards"], key=lambda c: old_card_priority(ns, c, now))[:limit]
+            if review:
+                for card in picks[:reviews]:
+                    ns["sm2_update"](card, rng.randint(1, 5))
+                ns["save_deck"](path, d)
+        return run
+
+    def new_session(review):
+        def run():
+            ix = ns["open_deck"](str(box), "big")
+            picks = [(pos, ix.card(pos)) for pos in ns["choose_cards_for_study"](ix, limit)]
+            if review:
+                for pos, card in picks[:reviews]:
+                    ns["sm2_update"](card, rng.randint(1, 5))
+                    ix.put(pos, card)
+                header = ix.header
+                header["review_sessions"] += 1
+                ix.header = header
+            ix.close()
+        return run
+
+    rows.append(("vocab", f"session start ({limit})", median_ms(old_session(False), repeat), median_ms(new_session(False), repeat)))
+    old = median_ms(old_session(True), repeat)
+    # the old session rewrote the JSON, so the index rebuilds once here, outside the timings
+    ns["open_deck"](str(box), "big").close()
+    rows.append(("vocab", f"+ {reviews} reviews, save", old, median_ms(new_session(True), repeat)))
+
+    def sync():
+        ix = ns["open_deck"](str(box), "big")
+        ix.header = ix.header  # mark it ahead, as the reviews above do
+        ns["sync_deck"](str(box), "big", ix)
+        ix.close()
+    rows.append(("vocab", "sync-deck (JSON write)", None, median_ms(sync, repeat)))
+
+    def old_stats():
+        with contextlib.redirect_stdout(io.StringIO()):
+            old_vocab_stats(ns, ns["load_deck"](path))
+    rows.append(("vocab", "stats", median_ms(old_stats, repeat), median_ms(lambda: printed(ns["stats_cmd"], args, config, "none"), repeat)))
+
+    card_args = argparse.Namespace(deck="big", question="new word", answer="its meaning")
+
+    def old_add():
+        d = ns["load_deck"](path)
+        d["cards"].append({"question": "new word", "answer": "its meaning"})
+        ns["save_deck"](path, d)
+    old = median_ms(old_add, repeat)
+    ns["drop_index"](str(box), "big")  # the JSON was rewritten behind the index's back
+    ns["open_deck"](str(box), "big").close()
+    rows.append(("vocab", "add card", old, median_ms(lambda: printed(ns["add_card_cmd"], card_args, config, "none"), repeat)))
+    return rows
+
+def bench_forge(ns, box, n, limit, reviews, repeat, rng):
+    rows = []
+    here = os.getcwd()
+    os.chdir(box)
+    try:
+        ns["save_cards"](forge_cards(n, rng))
+        rows.append(("forge", "index build (once)", None, median_ms(lambda: ns["open_cards"]().close(), 1)))
+        check("stats", printed(old_forge_stats, ns, ns["load_cards"]()), printed(ns["stats_cards"], None))
+
+        def old_start():
+            cards = ns["load_cards"]()
+            now = datetime.utcnow()
+            due = [c for c in cards if (ns["parse_iso"](c.get("next_review")) or now) <= now]
+            random.shuffle(due)
+            return cards, due
+
+        def new_start():
+            index = ns["open_cards"]()
+            due = index.due_positions(time.time())
+            random.shuffle(due)
+            return index, due
+        cards, due = old_start()
+        index, due_pos = new_start()
+        check("due cards", sorted(c["front"] for c in due), sorted(index.card(p)["front"] for p in due_pos))
+        index.close()
+        rows.append(("forge", "session start", median_ms(old_start, repeat), median_ms(lambda: new_start()[0].close(), repeat)))
+
+        def review(card):
+            card["interval"] = max(1, int(round(card["interval"] * card["ease"])))
+            card["next_review"] = (datetime.utcnow() + timedelta(days=card["interval"])).strftime("%Y-%m-%dT%H:%M:%S")
+
+        def old_reviews():  # the old study loop saved the whole file after every review
+            cards, due = old_start()
+            for card in due[:reviews]:
+                review(card)
+                ns["save_cards"](cards)
+
+        def new_reviews():
+            index, due = new_start()
+            for pos in due[:reviews]:
+                card = index.card(pos)
+                review(card)
+                index.put(pos, card)
+            index.close()
+        old = median_ms(old_reviews, 1)  # one run: it rewrites the file once per review
+        ns["open_cards"]().close()  # rebuild after the rewrite, outside the timings
+        rows.append(("forge", f"+ {reviews} reviews", old, median_ms(new_reviews, repeat)))
+        rows.append(("forge", "sync (JSON write)", None, median_ms(lambda: printed(ns["sync_cards"], None), 1)))
+
+        def old_stats():
+            with contextlib.redirect_stdout(io.StringIO()):
+                old_forge_stats(ns, ns["load_cards"]())
+        rows.append(("forge", "stats", median_ms(old_stats, repeat), median_ms(lambda: printed(ns["stats_cards"], None), repeat)))
+    finally:
+        os.chdir(here)
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the flashcard apps' due queues against whole-deck JSON.")
+    ap.add_argument("--cards", type=int, default=100_000, help="cards per deck (default: %(default)s)")
+    ap.add_argument("--limit", type=int, default=20, help="cards per study session (default: %(default)s)")
+    ap.add_argument("--reviews", type=int, default=20, help="cards reviewed per session (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per measurement; the median is shown")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    apps = pathlib.Path(args.apps).resolve()
+    rng = random.Random(5)
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-flashcards-") as box:
+        vocab = runpy.run_path(str(apps / VOCAB), run_name="__bench__")
+        rows += bench_vocab(vocab, pathlib.Path(box), args.cards, args.limit, args.reviews, args.repeat, rng)
+        forge = runpy.run_path(str(apps / FORGE), run_name="__bench__")
+        rows += bench_forge(forge, pathlib.Path(box), args.cards, args.limit, args.reviews, args.repeat, rng)
+    print(f"{args.cards} cards per deck, median of {args.repeat} runs; picks and stats match the old code\n")
+    print(f"{'app':<6} {'operation':<24} {'old':>10} {'new':>10} {'speedup':>9}")
+    for app, op, old, new in rows:
+        if old is None:
+            print(f"{app:<6} {op:<24} {'':>10} {new:>8.1f}ms")
+        else:
+            print(f"{app:<6} {op:<24} {old:>8.1f}ms {new:>8.1f}ms {old / max(new, 1e-6):>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Streak/completion analytics of the habit apps versus their old full-history rescans.
+
+Builds --years of daily entries for --habits habits in memory, loads the apps
+with runpy (their __main__ blocks do not run) and times what each screen
+computes: the micro-habits dashboard (streaks plus 7- and 30-day completion),
+a check-in followed by the streak summary, and habit-tracker-pro's summary
+redraw. "old" is the code those apps used before HabitAnalytics, kept here as
+the reference; every result of the new code is checked against it.
+
+    python automation/bench_habits.py [--years 10] [--habits 50] [--repeat 5]
+"""
+import os, sys, runpy, random, pathlib, argparse, tempfile
+import datetime as dt
+from benchutil import median_ms
+
+APPS_DIR = pathlib.Path("dist/apps")
+TODAY = dt.date.today()
+
+# ---------- the pre-HabitAnalytics implementations ----------
+
+def old_compute_streaks(ns, data):
+    entries = sorted(data.entries, key=lambda e: e.date)
+    habit_ids = [h.id for h in data.habits]
+    best = {hid: 0 for hid in habit_ids}
+    current = {hid: 0 for hid in habit_ids}
+    for hid in habit_ids:
+        last_date = None
+        streak = 0
+        for e in entries:
+            results = {r.habit_id: r for r in e.habit_results}
+            if hid not in results:
+                best[hid] = max(best[hid], streak)
+                streak, last_date = 0, None
+                continue
+            met, _ = ns["habit_target_met"](next(h for h in data.habits if h.id == hid), results[hid].value)
+            if not met:
+                best[hid] = max(best[hid], streak)
+                streak, last_date = 0, None
+                continue
+            d = dt.date.fromisoformat(e.date)
+            if last_date is None or d == last_date + dt.timedelta(days=1):
+                streak += 1
+            else:
+                best[hid] = max(best[hid], streak)
+                streak = 1
+            last_date = d
+        best[hid] = max(best[hid], streak)
+        current[hid] = streak
+    return {hid: {"current": current[hid], "best": best[hid]} for hid in habit_ids}
+
+def old_completion_for_range(ns, data, start, end):
+    hmap = {h.id: h for h in data.habits}
+    day_map = {e.date: e for e in data.entries}
+    habit_ids = [h.id for h in data.habits if h.is_active]
+    total = {hid: 0 for hid in habit_ids}
+    met = {hid: 0 for hid in habit_ids}
+    cur = start
+    while cur <= end:
+        entry = day_map.get(cur.isoformat())
+        rmap = {r.habit_id: r for r in entry.habit_results} if entry else {}
+        for hid in habit_ids:
+            total[hid] += 1
+            r = rmap.get(hid)
+            if r and ns["habit_target_met"](hmap[hid], r.value)[0]:
+                met[hid] += 1
+        cur += dt.timedelta(days=1)
+    return {hid: met[hid] * 100.0 / total[hid] if total[hid] else 0.0 for hid in habit_ids}
+
+def old_pro_streaks(history, upto):
+    """habit-tracker-pro's calc_current_and_longest_streak (with its start date fixed)."""
+    completed = {dt.date.fromisoformat(k) for k, v in history.items() if v}
+    if not history:
+        return 0, 0
+    d, longest, run = min(dt.date.fromisoformat(k) for k in history), 0, 0
+    while d <= upto:
+        run = run + 1 if d in completed else 0
+        longest = max(longest, run)
+        d += dt.timedelta(days=1)
+    cur, d = 0, upto
+    while d in completed:
+        cur += 1
+        d -= dt.timedelta(days=1)
+    return cur, longest
+
+# ---------- fixtures ----------
+
+def make_data(ns, years, n_habits, rng):
+    types = ns["TARGET_TYPES"]
+    habits = []
+    for i in range(n_habits):
+        kind = types[i % len(types)]
+        habits.append(ns["Habit"](id=f"h{i}", name=f"Habit {i}", category="other", target_type=kind,
+                                  target_value=None if kind == "boolean" else float(rng.choice([1, 5, 20, 30])),
+                                  is_active=i % 7 != 6))
+    entries = []
+    for back in range(years * 365, 0, -1):  # up to yesterday, so the check-in adds today
+        if rng.random() < 0.05:
+            continue  # a day without a check-in
+        results = []
+        for h in habits:
+            if rng.random() < 0.1:
+                continue
+            if h.target_type == "boolean":
+                value = rng.random() < 0.8
+            else:
+                value = float(rng.choice([0, h.target_value / 2, h.target_value, h.target_value * 2]))
+            results.append(ns["DailyHabitResult"](habit_id=h.id, value=value))
+        entries.append(ns["DailyEntry"](date=(TODAY - dt.timedelta(days=back)).isoformat(), habit_results=results))
+    return ns["RootData"](profile=ns["UserProfile"](), habits=habits, entries=entries, state=ns["AppState"]())
+
+def check(label, old, new):
+    if old != new:
+        raise SystemExit(f"MISMATCH in {label}:\n  old: {old}\n  new: {new}")
+
+def bench(years, n_habits, repeat, apps_dir):
+    rng = random.Random(7)
+    rows = []
+    ns = runpy.run_path(str(apps_dir / "daily-micro-habits-coach-cli.py"), run_name="__bench__")
+    data = make_data(ns, years, n_habits, rng)
+
+    def build():
+        data.analytics = ns["HabitAnalytics"]()
+        data.analytics.last_day = dt.date.fromisoformat(data.entries[-1].date).toordinal()
+        return ns["compute_streaks"](data)
+    rows.append(("micro", "build (once)", None, median_ms(build, 1)))
+
+    check("streaks", old_compute_streaks(ns, data), ns["compute_streaks"](data))
+    for _ in range(200):
+        end = TODAY - dt.timedelta(days=rng.randrange(years * 365 + 30))
+        start = end - dt.timedelta(days=rng.randrange(-2, 400))
+        check(f"rates {start}..{end}", old_completion_for_range(ns, data, start, end),
+              ns["completion_for_range"](data, start, end))
+
+    def dashboard(streaks, rates):
+        def run():
+            streaks(data)
+            rates(data, TODAY - dt.timedelta(days=6), TODAY)
+            rates(data, TODAY - dt.timedelta(days=29), TODAY)
+        return run
+    rows.append(("micro", "dashboard", median_ms(dashboard(lambda d: old_compute_streaks(ns, d),
+                                                       lambda d, s, e: old_completion_for_range(ns, d, s, e)), repeat),
+                 median_ms(dashboard(ns["compute_streaks"], ns["completion_for_range"]), repeat)))
+
+    habit = data.habits[0]
+    entry = ns["get_or_create_entry"](data, TODAY.isoformat())
+    result = ns["DailyHabitResult"](habit_id=habit.id, value=False)
+    entry.habit_results.append(result)
+
+    def check_in(update):
+        def run():
+            result.value = not result.value
+            update()
+        return run
+    new_check_in = check_in(lambda: (data.analytics.set(habit.id, entry.date, ns["habit_status"](habit, result.value)),
+                                     ns["compute_streaks"](data)))
+    rows.append(("micro", "check-in", median_ms(check_in(lambda: old_compute_streaks(ns, data)), repeat),
+                 median_ms(new_check_in, repeat)))
+    check("streaks after check-in", old_compute_streaks(ns, data), ns["compute_streaks"](data))
+
+    with tempfile.TemporaryDirectory(prefix="bench-habits-") as box:
+        home = os.environ.get("HOME")
+        os.environ["HOME"] = box
+        try:
+            path = ns["get_data_path"]()
+            ns["save_data"](path, data)
+            since = (TODAY - dt.timedelta(days=1)).isoformat()
+
+            def today_startup():
+                loaded = ns["load_data"](path, since)
+                return ns["compute_streaks"](loaded)
+            rows.append(("micro", "--today startup", None, median_ms(today_startup, repeat)))
+            check("streaks after reload", old_compute_streaks(ns, data), today_startup())
+        finally:
+            if home is None:
+                os.environ.pop("HOME", None)
+            else:
+                os.environ["HOME"] = home
+
+    pro = runpy.run_path(str(apps_dir / "habit-tracker-pro.py"), run_name="__bench__")
+    analytics = pro["HabitAnalytics"]()
+    histories = [{e.date: bool(rng.random() < 0.8) for e in data.entries if rng.random() < 0.9}
+                 for _ in range(n_habits)]
+    for i, hist in enumerate(histories):
+        analytics.rebuild(i, {d: analytics.MET if v else analytics.MISSED for d, v in hist.items()})
+
+    def new_summary():
+        return [(analytics.streak(i, TODAY), analytics.best(i, until=TODAY)) for i in range(n_habits)]
+    check("pro summary", [old_pro_streaks(h, TODAY) for h in histories], new_summary())
+    rows.append(("pro", "summary redraw", median_ms(lambda: [old_pro_streaks(h, TODAY) for h in histories], repeat),
+                 median_ms(new_summary, repeat)))
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the habit apps' streak/completion analytics.")
+    ap.add_argument("--years", type=int, default=10, help="years of daily entries (default: %(default)s)")
+    ap.add_argument("--habits", type=int, default=50, help="habits tracked (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per measurement; the median is shown")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    rows = bench(args.years, args.habits, args.repeat, pathlib.Path(args.apps).resolve())
+    print(f"{args.years} years x {args.habits} habits, median of {args.repeat} runs; all results match the old code\n")
+    print(f"{'app':<6} {'operation':<16} {'old':>10} {'new':>10} {'speedup':>9}")
+    for app, op, old, new in rows:
+        if old is None:
+            print(f"{app:<6} {op:<16} {'':>10} {new:>8.1f}ms")
+        else:
+            print(f"{app:<6} {op:<16} {old:>8.1f}ms {new:>8.1f}ms {old / max(new, 1e-6):>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Topic searches of literature-gap-finder-2 against a local stub arXiv/Crossref server.
+
+Starts a threaded HTTP server on localhost that answers the arXiv Atom
+and Crossref /works queries with generated papers, after --latency
+seconds, with an ETag (and 304 for a matching If-None-Match). The app is
+loaded with runpy (its __main__ block does not run) with LITGAP_*_API
+pointing at the stub. --topics queries are searched four ways:
+  old          one query and one source at a time, regex parsing, no cache
+  cold cache   fetch_papers with --workers threads into an empty HttpCache
+  warm cache   the same again: fresh cache hits, memoised keywords
+  revalidate   TTL 0: every response revalidated, answered 304
+The papers and gaps of each query are checked against the old path.
+
+    python automation/bench_litgap.py [--topics 50] [--latency 0.3] [--workers 8]
+"""
+import os, re, sys, json, time, runpy, hashlib, pathlib, argparse, tempfile, threading
+import urllib.request
+from collections import Counter
+from urllib.parse import quote, urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+APPS_DIR = pathlib.Path("dist/apps")
+APP = "literature-gap-finder-2.py"
+WORDS = ("graph neural network federated privacy transformer vision language robotics policy gradient "
+         "energy fairness medical diagnosis climate sensor quantum compiler benchmark retrieval").split()
+
+def paper_text(query, source, i):
+    seed = int(hashlib.md5(f"{query}/{source}/{i}".encode()).hexdigest(), 16)
+    words = [WORDS[(seed >> (5 * k)) % len(WORDS)] for k in range(40)]
+    return f"{query.title()} {words[0]} {words[1]} study {i}", " ".join(words)
+
+def atom_feed(query, n):
+    entries = []
+    for i in range(n):
+        title, abstract = paper_text(query, "arxiv", i)
+        pid = hashlib.md5(f"{query}/{i}".encode()).hexdigest()[:8]
+        entries.append(f"<entry><id>http://arxiv.org/abs/{pid}v1</id><title>{title}</title>"
+                       f"<summary>{abstract}</summary></entry>")
+    return ('<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            + "".join(entries) + "</feed>").encode()
+
+def crossref_json(query, n):
+    items = []
+    for i in range(n):
+        title, abstract = paper_text(query, "crossref", i)
+        items.append({"title": [title], "abstract": abstract,
+                      "DOI": f"10.5555/{hashlib.md5(f'{query}/{i}'.encode()).hexdigest()[:8]}"})
+    return json.dumps({"status": "ok", "message": {"items": items}}).encode()
+
+class Stub(BaseHTTPRequestHandler):
+    latency = 0.3
+    hits = Counter()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if url.path == "/arxiv":
+            body = atom_feed(qs["search_query"][0].split(":", 1)[1], int(qs["max_results"][0]))
+        else:
+            body = crossref_json(qs["query"][0], int(qs["rows"][0]))
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.hits[304] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.hits[200] += 1
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# ---------- the pre-cache implementation ----------
+
+def old_fetch_arxiv(base, query, max_results=5):
+    url = f"{base}?search_query=all:{quote(query)}&start=0&max_results={max_results}&sortBy=relevance&sortOrder=descending"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        content = response.read().decode('utf-8')
+    papers = []
+    for entry in re.findall(r'<entry>(.*?)</entry>', content, re.DOTALL)[:max_results]:
+        title = re.search(r'<title>(.*?)</title>', entry)
+        summary = re.search(r'<summary>(.*?)</summary>', entry)
+        pid = re.search(r'<id>(.*?)</id>', entry)
+        if title and summary and pid:
+            papers.append({"title": title.group(1).strip(), "abstract": summary.group(1).strip(),
+                           "url": f"https://arxiv.org/abs/{pid.group(1).strip().split('/abs/')[-1]}"})
+    return papers
+
+def old_fetch_crossref(base, query, max_results=3):
+    with urllib.request.urlopen(f"{base}?query={quote(query)}&rows={max_results}", timeout=5) as response:
+        content = response.read().decode('utf-8')
+    items = re.findall(r'"title":\s*\[(.*?)\]', content)
+    abstracts = re.findall(r'"abstract":\s*"(.*?)"', content)
+    dois = re.findall(r'"DOI":\s*"(.*?)"', content)
+    return [{"title": t.strip('"').replace('\\"', '"'), "abstract": abstracts[i] if i < len(abstracts) else "No abstract available",
+             "url": f"https://doi.org/{dois[i]}" if i < len(dois) else ""} for i, t in enumerate(items[:max_results])]
+
+def old_search(ns, base, queries):
+    out = {}
+    for query in queries:
+        papers = old_fetch_arxiv(base + "/arxiv", query) + old_fetch_crossref(base + "/crossref", query)
+        out[query] = (papers, ns["identify_gaps"](papers))
+    return out
+
+def new_search(ns, queries, cache, workers):
+    results = ns["fetch_papers"](queries, cache, workers)
+    return {query: (papers, ns["identify_gaps"](papers, cache)) for query, papers in results.items()}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark literature-gap-finder-2 topic searches.")
+    ap.add_argument("--topics", type=int, default=50, help="queries to search (default: %(default)s)")
+    ap.add_argument("--latency", type=float, default=0.3, help="stub server delay per request in seconds (default: %(default)s)")
+    ap.add_argument("--workers", type=int, default=8, help="fetch threads (default: %(default)s)")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    Stub.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    os.environ["LITGAP_ARXIV_API"] = base + "/arxiv"
+    os.environ["LITGAP_CROSSREF_API"] = base + "/crossref"
+    ns = runpy.run_path(str(pathlib.Path(args.apps).resolve() / APP), run_name="__bench__")
+    queries = [f"topic {i} {WORDS[i % len(WORDS)]} {WORDS[(3 * i) % len(WORDS)]}" for i in range(args.topics)]
+    print(f"{len(queries)} topics x 2 sources, stub latency {args.latency * 1000:.0f}ms, {args.workers} workers\n")
+
+    def timed(fn):
+        t0 = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - t0
+
+    def same(a, b):
+        strip = lambda papers: [{k: p[k] for k in ("title", "abstract", "url")} for p in papers]
+        return all(strip(a[q][0]) == strip(b[q][0]) and a[q][1] == b[q][1] for q in queries)
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-litgap-") as box:
+        old, old_s = timed(lambda: old_search(ns, base, queries))
+        rows.append(("old (sequential)", old_s, dict(Stub.hits)))
+        cache = ns["HttpCache"](os.path.join(box, "cache.sqlite"))
+        for label in ("cold cache", "warm cache"):
+            Stub.hits.clear()
+            if label == "cold cache":
+                ns["KEYWORD_MEMO"].clear()
+            new, new_s = timed(lambda: new_search(ns, queries, cache, args.workers))
+            if not same(old, new):
+                raise SystemExit(f"{label}: papers or gaps differ from the old path")
+            rows.append((label, new_s, dict(Stub.hits)))
+        Stub.hits.clear()
+        cache.ttl = 0
+        cache.db.execute("UPDATE responses SET expires = 0")
+        new, new_s = timed(lambda: new_search(ns, queries, cache, args.workers))
+        if not same(old, new) or Stub.hits[200]:
+            raise SystemExit("revalidate: expected only 304s and unchanged results")
+        rows.append(("revalidate (304)", new_s, dict(Stub.hits)))
+        cache.close()
+    server.shutdown()
+
+    print(f"{'run':<20} {'time':>9} {'speedup':>8}  requests")
+    for label, secs, hits in rows:
+        served = ", ".join(f"{n} x {code}" for code, n in sorted(hits.items())) or "none"
+        print(f"{label:<20} {secs:>8.2f}s {rows[0][1] / secs:>7.1f}x  {served}")
+    print("\npapers and gaps of every topic identical to the old path")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Add/list latency of the sqlite-backed CLI apps versus their old whole-file JSON storage.
+
+Each app gets a throwaway HOME/CWD holding a legacy JSON data file with
+--entries records. The app is loaded with runpy (its __main__ block does not
+run), the one-time JSON import is timed, then each command's data path is timed:
+load only what the command reads, change it, save. "json" is what every
+command used to cost at minimum: json.load of the whole file, plus an indent=2
+rewrite for mutating commands.
+
+    python automation/bench_storage.py [--entries 100000] [--repeat 5] [--only eco]
+"""
+import os, sys, json, time, runpy, shutil, pathlib, argparse, tempfile
+import datetime as dt
+from benchutil import median_ms
+
+APPS_DIR = pathlib.Path("dist/apps")
+TODAY = dt.date.today()
+
+def _day(i: int) -> str:
+    return (TODAY - dt.timedelta(days=i)).isoformat()
+
+def _legacy_read(path: pathlib.Path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _legacy_write(path: pathlib.Path):
+    data = _legacy_read(path)
+    tmp = path.with_suffix(".bench-tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path.with_suffix(".bench-out"))  # leave the legacy file itself untouched
+
+# ---------- per-app fixtures: legacy file contents and the commands' data paths ----------
+
+def _eco(n):
+    entries = [{"id": i + 1, "timestamp": _day(i // 3) + "T12:00:00", "date": _day(i // 3), "category": "food",
+                "subcategory": "vegetarian", "amount": 2.0, "unit": "meals", "notes": f"entry {i}",
+                "co2e_estimate_kg": 4.0} for i in range(n)]
+    legacy = {"profiles": {"default": {"entries": entries, "goals": {"food": 40.0},
+                                       "metadata": {"next_id": n + 1, "created_at": "", "last_used": "",
+                                                    "units": "metric"}}},
+              "last_profile": "default"}
+
+    def add(ns):
+        data = ns["load_data"](entries=False)
+        _, profile = ns["get_profile"](data)
+        profile["entries"].append({"id": ns["next_entry_id"](profile), "timestamp": _day(0) + "T13:00:00",
+                                   "date": _day(0), "category": "transport", "subcategory": "bus",
+                                   "amount": 10.0, "unit": "km", "notes": "", "co2e_estimate_kg": 0.8})
+        ns["save_data"](data)
+
+    def list_week(ns):
+        data = ns["load_data"](since=TODAY - dt.timedelta(days=6))
+        ns["filter_entries"](data["profiles"]["default"]["entries"], days=7)
+
+    return "eco-footprint-tracker-cli.py", "eco_data.json", legacy, {"add": add, "list --days 7": list_week}
+
+def _study(n):
+    sessions = [{"id": i + 1, "date": _day(i // 4), "start_time": "09:00", "end_time": "10:00",
+                 "duration_minutes": 60, "subject": f"subject {i % 12}", "tags": ["exam"], "notes": "",
+                 "focus_rating": 3} for i in range(n)]
+    legacy = {"sessions": sessions, "config": {"time_format": "24h", "default_print_width": 80,
+                                               "default_daily_goal_minutes": 300}}
+
+    def add(ns):
+        data = ns["load_data"](sessions=False)
+        data["sessions"].append({"id": ns["next_session_id"](data), "date": _day(0), "start_time": "18:00",
+                                 "end_time": "19:00", "duration_minutes": 60, "subject": "bench", "tags": [],
+                                 "notes": "", "focus_rating": 4})
+        ns["save_data"](data)
+
+    def list_week(ns):
+        data = ns["load_data"](TODAY - dt.timedelta(days=6), TODAY)
+        ns["list_sessions_filtered"](data, TODAY - dt.timedelta(days=6), TODAY)
+
+    return "study-session-planner-cli.py", ".study_sessions.json", legacy, {"add": add, "list --from": list_week}
+
+def _habits(n):
+    habits = [{"id": "walk_20", "name": "Walk 20 minutes", "category": "movement",
+               "target_type": "duration_minutes", "target_value": 20.0, "is_active": True}]
+    entries = [{"date": _day(i), "habit_results": [{"habit_id": "walk_20", "value": 25, "note": None}],
+                "energy_level": 3, "mood": 4, "reflection": None} for i in range(n, 0, -1)]
+    legacy = {"profile": {}, "habits": habits, "entries": entries, "state": {}}
+
+    def check_in(ns):
+        path = ns["get_data_path"]()
+        data = ns["load_data"](path, _day(1))
+        entry = ns["get_or_create_entry"](data, _day(0))
+        entry.mood = (entry.mood or 0) % 5 + 1
+        ns["save_data"](path, data)
+
+    def dashboard(ns):
+        ns["load_data"](ns["get_data_path"](), _day(6))
+
+    return "daily-micro-habits-coach-cli.py", ".micro_habits.json", legacy, {"--today": check_in,
+                                                                             "7-day view": dashboard}
+
+def _deals(n):
+    legacy = [{"id": i + 1, "title": f"Deal {i}", "client": f"Client {i % 500}", "value": float(i % 9000),
+               "stage": "Lead", "owner": "sam", "created_at": _day(i // 20) + "T09:00:00",
+               "updated_at": _day(i // 20) + "T09:00:00", "next_action": None, "notes": ""} for i in range(n)]
+
+    def add(ns):
+        path = pathlib.Path("deals.json")
+        deals = ns["load_deals"](path, ids=[])
+        deals.append({"id": ns["next_id"](deals), "title": "bench", "client": "x", "value": 1.0, "stage": "Lead",
+                      "owner": "sam", "created_at": _day(0) + "T10:00:00", "updated_at": _day(0) + "T10:00:00",
+                      "next_action": None, "notes": ""})
+        ns["save_deals"](path, deals, False)
+
+    def move(ns):
+        path = pathlib.Path("deals.json")
+        deals = ns["load_deals"](path, ids=[n // 2])
+        deals[0]["stage"] = "Won" if deals[0]["stage"] != "Won" else "Lead"
+        ns["save_deals"](path, deals, False)
+
+    def list_all(ns):
+        ns["load_deals"](pathlib.Path("deals.json"))
+
+    def list_search(ns):
+        args = argparse.Namespace(search=f"client {n // 3 % 500}", stage="Lead", owner=None, min_value=None,
+                                  max_value=None, sort="value", reverse=False)
+        ns["filter_deals"](ns["find_deals"](pathlib.Path("deals.json"), args), args)
+
+    return "client-deal-pipeline-cli.py", "deals.json", legacy, {"add": add, "move": move, "list (all)": list_all,
+                                                                 "list --search": list_search}
+
+FIXTURES = {"eco": _eco, "study": _study, "habits": _habits, "deals": _deals}
+READ_ONLY = ("list", "7-day")
+
+def bench_app(key: str, n: int, repeat: int, apps_dir: pathlib.Path) -> list[tuple]:
+    app, legacy_name, legacy, ops = FIXTURES[key](n)
+    rows = []
+    cwd, home = os.getcwd(), os.environ.get("HOME")
+    with tempfile.TemporaryDirectory(prefix="bench-storage-") as box:
+        box = pathlib.Path(box)
+        shutil.copyfile(apps_dir / app, box / app)  # some apps keep their data next to __file__
+        legacy_path = box / legacy_name
+        legacy_path.write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+        os.environ["HOME"] = str(box)
+        os.chdir(box)
+        try:
+            ns = runpy.run_path(str(box / app), run_name="__bench__")
+            t0 = time.perf_counter()
+            ops[next(iter(ops))](ns)  # first command runs the one-time JSON import
+            rows.append((key, "migrate (once)", None, (time.perf_counter() - t0) * 1000))
+            for name, op in ops.items():
+                legacy_op = _legacy_read if name.startswith(READ_ONLY) else _legacy_write
+                rows.append((key, name, median_ms(lambda: legacy_op(legacy_path), repeat), median_ms(lambda: op(ns), repeat)))
+        finally:
+            os.chdir(cwd)
+            if home is None:
+                os.environ.pop("HOME", None)
+            else:
+                os.environ["HOME"] = home
+        rows.append((key, "file size (MB)", legacy_path.stat().st_size / 1e6,
+                     sum(p.stat().st_size for p in box.glob("*.sqlite3*")) / 1e6))
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the sqlite-backed app storage against whole-file JSON.")
+    ap.add_argument("--entries", type=int, default=100_000, help="records per app (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per measurement; the median is shown")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    ap.add_argument("--only", choices=sorted(FIXTURES), action="append", help="benchmark only this app (repeatable)")
+    args = ap.parse_args(argv)
+
+    apps_dir = pathlib.Path(args.apps).resolve()
+    print(f"{args.entries} records per app, median of {args.repeat} runs\n")
+    print(f"{'app':<8} {'operation':<16} {'json':>10} {'sqlite':>10} {'speedup':>9}")
+    for key in args.only or FIXTURES:
+        for app, op, old, new in bench_app(key, args.entries, args.repeat, apps_dir):
+            if op.startswith("file size"):
+                print(f"{app:<8} {op:<16} {old:>10.1f} {new:>10.1f}")
+            elif old is None:
+                print(f"{app:<8} {op:<16} {'':>10} {new:>8.1f}ms")
+            else:
+                print(f"{app:<8} {op:<16} {old:>8.1f}ms {new:>8.1f}ms {old / max(new, 1e-6):>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Helpers shared by the automation/bench_*.py scripts."""
+import time, statistics
+
+def median_ms(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(runs)
@@ -0,0 +1,212 @@
+"""Near-duplicate index over dist/prompts and dist/apps (MinHash + LSH).
+
+Signatures live in an append-only JSON-lines file, so a run only loads the
+index and hashes the new text; the tree is rescanned only by sync().
+"""
+import json, pathlib, re, hashlib, random, threading
+
+NUM_PERM = 120
+BANDS = 40             # 40 bands x 3 rows: pairs above ~0.35 almost always share a bucket
+ROWS = NUM_PERM // BANDS
+TITLE_WEIGHT = 16      # clones rarely share wording, but they do share a title
+_MERSENNE = (1 << 61) - 1
+_MASK32 = 0xFFFFFFFF
+
+_rng = random.Random(0x5EED)  # fixed: signatures must be comparable across runs
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_WORD = re.compile(r"[a-z_][a-z0-9_]{2,}")
+_SUFFIX = re.compile(r"-\d+$")
+_GENERATED_FOOTER = re.compile(r"(?m)^\(Generated: .*\)\s*$")
+_STAMP = re.compile(r"(?m)^(# Auto-generated via Perplexity on .*|<!-- Auto-generated via Perplexity on .* -->)$")
+# Words every spec / script shares; they only dilute the signal
+_STOP = frozenset("""
+the and for with from are this that use using via into per not all any each one only when
+single file python script app html css standard library stdlib json data user users
+def self return none true false import class print else elif while try except str int len
+""".split())
+
+def normalize(text: str) -> str:
+    """Drop the per-run stamps/footers so reruns of the same thing compare equal."""
+    return _STAMP.sub("", _GENERATED_FOOTER.sub("", text)).lower()
+
+def title_of(text: str, kind: str, path: pathlib.Path | None = None) -> str:
+    """Prompts: first line. Apps: file name without the unique_path() -N suffix."""
+    if kind == "app" and path is not None:
+        return _SUFFIX.sub("", pathlib.Path(path).stem).replace("-", " ")
+    for line in text.splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+def features(text: str, kind: str, title: str = "") -> set[int]:
+    """Content-word set plus TITLE_WEIGHT copies of each title word, hashed to ints."""
+    words = {w for w in _WORD.findall(normalize(text)) if w not in _STOP}
+    words.update(f"t{i}:{w}" for w in _WORD.findall(title.lower()) for i in range(TITLE_WEIGHT))
+    if not words:
+        words = {""}
+    return {int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "little") & _MERSENNE
+            for w in words}
+
+def signature(text: str, kind: str, title: str | None = None) -> list[int]:
+    hs = features(text, kind, title_of(text, kind) if title is None else title)
+    return [min((a * h + b) % _MERSENNE for h in hs) & _MASK32 for a, b in _PERMS]
+
+def similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    """Estimated Jaccard similarity of the two feature sets."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+def kind_for(path: pathlib.Path) -> str | None:
+    if path.parent.name == "prompts" and path.suffix == ".txt":
+        return "prompt"
+    if path.parent.name == "apps" and path.suffix in (".py", ".html"):
+        return "app"
+    return None
+
+class SimilarityIndex:
+    """MinHash signatures + LSH buckets, keyed by path relative to `root`."""
+
+    def __init__(self, index_path: pathlib.Path, root: pathlib.Path):
+        self.index_path = pathlib.Path(index_path)
+        self.root = pathlib.Path(root)
+        self.paths: list[str] = []
+        self.kinds: list[str] = []
+        self.sigs: list[list[int]] = []
+        self._by_path: dict[str, int] = {}
+        self._buckets: dict[tuple, list[int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def _load(self):
+        try:
+            f = open(self.index_path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    self._insert(rec["path"], rec["kind"], rec["sig"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn line from an interrupted append
+
+    def _insert(self, rel: str, kind: str, sig: list[int]):
+        if rel in self._by_path:  # re-indexed file: later line wins, old buckets point nowhere
+            self._forget(rel)
+        idx = len(self.paths)
+        self.paths.append(rel)
+        self.kinds.append(kind)
+        self.sigs.append(sig)
+        self._by_path[rel] = idx
+        for band in range(BANDS):
+            key = (kind, band, tuple(sig[band * ROWS:(band + 1) * ROWS]))
+            self._buckets.setdefault(key, []).append(idx)
+
+    def _forget(self, rel: str):
+        idx = self._by_path.pop(rel)
+        self.paths[idx] = None
+
+    def _rel(self, path: pathlib.Path) -> str:
+        path = pathlib.Path(path)
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def add(self, path: pathlib.Path, text: str, kind: str | None = None):
+        """Index one freshly written artifact (one appended line)."""
+        kind = kind or kind_for(pathlib.Path(path))
+        if kind is None:
+            return
+        rel = self._rel(path)
+        sig = signature(text, kind, title_of(text, kind, pathlib.Path(path)))
+        line = json.dumps({"path": rel, "kind": kind, "sig": sig}, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._insert(rel, kind, sig)
+
+    def candidates(self, sig: list[int], kind: str) -> set[int]:
+        """Live entries sharing at least one band with `sig`; call with the lock held."""
+        found = set()
+        for band in range(BANDS):
+            found.update(self._buckets.get((kind, band, tuple(sig[band * ROWS:(band + 1) * ROWS])), ()))
+        return {i for i in found if self.paths[i] is not None}
+
+    def nearest(self, text: str, kind: str, sig: list[int] | None = None) -> tuple[str | None, float]:
+        """Most similar indexed artifact of the same kind: (path, estimated Jaccard)."""
+        sig = sig or signature(text, kind)  # apps: pass signature(text, "app", slug) yourself
+        best, best_score = None, 0.0
+        with self._lock:  # add() may be growing the buckets from another worker
+            for i in self.candidates(sig, kind):
+                score = similarity(sig, self.sigs[i])
+                if score > best_score:
+                    best, best_score = self.paths[i], score
+        return best, best_score
+
+    def sync(self) -> int:
+        """Index artifacts on disk that the index has not seen yet; returns how many were added."""
+        added = 0
+        for sub in ("prompts", "apps"):
+            folder = self.root / sub
+            if not folder.is_dir():
+                continue
+            for path in sorted(folder.iterdir()):
+                kind = kind_for(path)
+                if kind and self._rel(path) not in self._by_path:
+                    self.add(path, path.read_text(encoding="utf-8", errors="replace"), kind)
+                    added += 1
+        return added
+
+    def clusters(self, threshold: float, kind: str | None = None) -> list[list[tuple[str, float]]]:
+        """Groups of near-duplicates (union-find over LSH candidate pairs), largest first.
+
+        Each member carries its similarity to the first (oldest indexed) member.
+        """
+        parent: dict[int, int] = {}
+
+        def find(i):
+            while parent.setdefault(i, i) != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        with self._lock:
+            buckets = [list(b) for b in self._buckets.values()]
+        for bucket in buckets:
+            live = [i for i in bucket if self.paths[i] is not None and (kind is None or self.kinds[i] == kind)]
+            for x in range(len(live)):
+                for y in range(x + 1, len(live)):
+                    a, b = live[x], live[y]
+                    if find(a) != find(b) and similarity(self.sigs[a], self.sigs[b]) >= threshold:
+                        parent[find(b)] = find(a)
+
+        groups: dict[int, list[int]] = {}
+        for i in list(parent):
+            groups.setdefault(find(i), []).append(i)
+        out = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            members.sort()
+            head = self.sigs[members[0]]
+            out.append([(self.paths[i], round(similarity(head, self.sigs[i]), 3)) for i in members])
+        out.sort(key=lambda c: (-len(c), c[0][0]))
+        return out
+
+def print_report(index: SimilarityIndex, threshold: float, kind: str | None = None, as_json: bool = False):
+    groups = index.clusters(threshold, kind)
+    if as_json:
+        print(json.dumps([[{"path": p, "similarity": s} for p, s in g] for g in groups], indent=2))
+        return
+    dupes = sum(len(g) - 1 for g in groups)
+    print(f"{len(index)} artifacts indexed; {len(groups)} clusters at >= {threshold:.2f} "
+          f"({dupes} redundant artifacts)")
+    for g in groups:
+        print(f"\n[{len(g)}] {g[0][0]}")
+        for path, score in g[1:]:
+            print(f"     {score:.2f}  {path}")
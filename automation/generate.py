@@ -1,8 +1,13 @@
 import os, json, pathlib, re, datetime, requests, sys, random, unicodedata, tempfile, ast, html
+import argparse, contextlib, hashlib, statistics, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-API_URL = "https://api.perplexity.ai/chat/completions"
+import dedupe
+import smoke
+
+API_URL = os.getenv("PPLX_API_URL", "https://api.perplexity.ai/chat/completions")  # override to point at a local stub
 MODEL = os.getenv("PPLX_MODEL", "sonar")
 TIMEOUT = int(os.getenv("PPLX_TIMEOUT", "300"))
 
@@ -12,16 +17,45 @@ PROMPTS_DIR = DIST / "prompts"
 APPS_DIR = DIST / "apps"
 LATEST_DIR = DIST / "latest"
 LOG_OUT = DIST / "log.txt"
-RUN_STATE_FILE = DIST / "run_state.json"  # <-- new: track per-day run quota
+JOURNAL_FILE = DIST / "journal.jsonl"  # structured per-stage records; also drives the daily quota
+RUN_STATE_FILE = DIST / "run_state.json"  # pre-journal quota state; folded into the journal once, then removed
+SIMILARITY_INDEX = DIST / "similarity_index.jsonl"  # MinHash signatures of every prompt/app
 
 # --- Tunables ---
 PROMPT_TEMPERATURE = 0.8
 BUILD_TEMPERATURE  = 0.3
 MAX_RESPONSE_CHARS = 800_000  # hard cap to avoid runaway responses
+STREAM = os.getenv("PPLX_STREAM", "0") == "1"  # --stream: SSE build/fix with early abort
+STREAM_FENCE_WINDOW = 512  # chars buffered before deciding whether the reply is fenced
+
+# Near-duplicate guard: re-roll a prompt whose estimated similarity to an existing one is this high
+# (0 = off; 0.35 catches clones with a reworded spec). Out of re-rolls, the least similar one is built.
+DEDUPE_THRESHOLD = float(os.getenv("PPLX_DEDUPE_THRESHOLD", "0"))
+DEDUPE_REROLLS = 2
+
+# Runtime gate: smoke-run Python builds in a sandbox after ast.parse() passes (see automation/smoke.py)
+SMOKE_GATE = os.getenv("PPLX_SMOKE_GATE", "0") == "1"
 
 # New: daily random run limit
 MAX_RUNS_PER_DAY = 5  # upper bound on builds per day
 
+# Run journal rotation: journal.jsonl -> journal.jsonl.1 ... .JOURNAL_KEEP
+JOURNAL_MAX_BYTES = 2 * 1024 * 1024
+JOURNAL_KEEP = 5
+
+# Concurrency / rate limiting (shared by every worker in --batch mode)
+MAX_INFLIGHT = int(os.getenv("PPLX_MAX_INFLIGHT", "4"))  # API requests allowed in flight at once
+RATE_LIMIT_RETRIES = 6       # 429 retries per request before giving up
+RATE_LIMIT_BASE_DELAY = 2.0  # seconds; doubled per consecutive 429 unless Retry-After says otherwise
+RATE_LIMIT_MAX_DELAY = 120.0
+
+# Response cache: content-addressed by (MODEL, messages, temperature); see --cache-mode
+CACHE_MODES = ("off", "read", "write", "replay")
+CACHE_MODE = os.getenv("PPLX_CACHE_MODE", "off")
+CACHE_DIR = pathlib.Path(os.getenv("PPLX_CACHE_DIR", ".cache/pplx"))
+CACHE_MAX_BYTES = int(float(os.getenv("PPLX_CACHE_MAX_MB", "256")) * 1024 * 1024)
+CACHE_TTL_DAYS = float(os.getenv("PPLX_CACHE_TTL_DAYS", "30"))  # 0 = never expire
+
 THEMES = [
     "personal productivity", "learning & study tools", "health & wellness",
     "small business utilities", "finance & budgeting", "data visualization",
@@ -70,6 +104,10 @@ Constraints:
 Example titles: "Smart To-Do", "Budget Buddy", "Focus Timer+" (do NOT reuse these).
 """
 
+USER_PROMPT_AVOID_TEMPLATE = """
+Already built (do NOT produce anything similar in purpose or title): {titles}
+"""
+
 SYSTEM_BUILD = """You are a strict code generator.
 Return EITHER:
 (A) ONLY a complete, valid single-file HTML document starting with <!DOCTYPE html>
@@ -94,20 +132,285 @@ Given BROKEN content and a TARGET_KIND ('html' or 'py'), return ONLY a fixed ver
 Do not explain anything. Output ONLY the corrected file content.
 """
 
-def _session_with_retries() -> requests.Session:
+def _session_with_retries(pool_size: int = 10) -> requests.Session:
     s = requests.Session()
     retry = Retry(
         total=5, connect=5, read=5,
         backoff_factor=1.5,
-        status_forcelist=(429, 500, 502, 503, 504),
+        # 429 is handled by RateGate so that every worker backs off together; urllib3 would
+        # otherwise retry a 429 carrying Retry-After on its own, inside one worker's slot
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=False,
         allowed_methods=("POST", "GET"),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session() -> requests.Session:
+    """One long-lived pooled session per process (keeps TLS connections warm)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = _session_with_retries(pool_size=max(10, MAX_INFLIGHT))
+        return _SESSION
+
+class RateGate:
+    """Caps API requests in flight and shares 429 backoff across all threads."""
+
+    def __init__(self, max_inflight: int):
+        self._slots = threading.BoundedSemaphore(max(1, max_inflight))
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self._strikes = 0
+
+    @contextlib.contextmanager
+    def slot(self):
+        with self._slots:
+            while True:
+                with self._lock:
+                    delay = self._resume_at - time.monotonic()
+                if delay <= 0:
+                    break
+                time.sleep(delay)
+            yield
+
+    def throttled(self, retry_after: float | None) -> float:
+        """Record a 429 and push the shared resume time out; returns the delay applied."""
+        with self._lock:
+            self._strikes += 1
+            if retry_after is None:
+                delay = min(RATE_LIMIT_MAX_DELAY, RATE_LIMIT_BASE_DELAY * 2 ** (self._strikes - 1))
+                delay += random.uniform(0, delay / 4)
+            else:
+                delay = min(RATE_LIMIT_MAX_DELAY, retry_after)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._strikes = 0
+
+_GATE = RateGate(MAX_INFLIGHT)
+
+def set_max_inflight(n: int):
+    global MAX_INFLIGHT, _GATE, _SESSION
+    MAX_INFLIGHT = max(1, n)
+    _GATE = RateGate(MAX_INFLIGHT)
+    with _SESSION_LOCK:
+        _SESSION = None  # re-created lazily with a pool large enough for the new limit
+
+def _retry_after_seconds(resp) -> float | None:
+    value = resp.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def set_dist_root(root: pathlib.Path):
+    """Redirect all outputs (e.g. for a dry run against a stub server)."""
+    global DIST, PROMPTS_DIR, APPS_DIR, LATEST_DIR, LOG_OUT, JOURNAL_FILE, _JOURNAL, SIMILARITY_INDEX, _INDEX
+    global RUN_STATE_FILE
+    DIST = pathlib.Path(root)
+    PROMPTS_DIR = DIST / "prompts"
+    APPS_DIR = DIST / "apps"
+    LATEST_DIR = DIST / "latest"
+    LOG_OUT = DIST / "log.txt"
+    JOURNAL_FILE = DIST / "journal.jsonl"
+    RUN_STATE_FILE = DIST / "run_state.json"
+    _JOURNAL = RunJournal(JOURNAL_FILE)
+    SIMILARITY_INDEX = DIST / "similarity_index.jsonl"
+    _INDEX = None
+
+class ResponseCache:
+    """On-disk response store, one JSON file per request hash.
+
+    Modes: off (bypass), read (serve hits, never store), write (serve hits,
+    store misses), replay (serve hits, fail on misses; no network at all).
+    File mtime is the last-use time: hits touch it, eviction drops the
+    least recently used entries once the store exceeds max_bytes.
+    """
+
+    def __init__(self, root: pathlib.Path, mode: str = "off", max_bytes: int = CACHE_MAX_BYTES,
+                 ttl_seconds: float = CACHE_TTL_DAYS * 86400):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"cache mode must be one of {', '.join(CACHE_MODES)}")
+        self.root = pathlib.Path(root)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = self.misses = self.stores = self.evictions = 0
+        self._size = None  # bytes on disk, computed on first store
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(messages, temperature) -> str:
+        blob = json.dumps({"model": MODEL, "temperature": float(temperature), "messages": messages},
+                          sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        if self.mode == "off":
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            content = entry["content"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        if self.ttl_seconds and time.time() - entry.get("created", 0) > self.ttl_seconds and self.mode != "replay":
+            with self._lock:
+                if self.mode == "write":  # read mode never deletes; the stale file stays for writers
+                    self._forget(path)
+                self.misses += 1
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: str):
+        if self.mode != "write":
+            return
+        entry = {"key": key, "model": MODEL, "created": time.time(), "content": content}
+        blob = json.dumps(entry, ensure_ascii=False)
+        path = self._path(key)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+            if path.exists():
+                self._size -= path.stat().st_size
+            write_text_atomic(path, blob)
+            self._size += len(blob.encode("utf-8"))
+            self.stores += 1
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _forget(self, path: pathlib.Path):
+        with contextlib.suppress(OSError):
+            size = path.stat().st_size
+            path.unlink()
+            self.evictions += 1
+            if self._size is not None:
+                self._size -= size
+
+    def _evict(self):
+        # Trim to 90% so a full cache does not rescan on every store
+        entries = sorted((p.stat().st_mtime, p) for p in self.root.glob("*/*.json"))
+        for _, path in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            self._forget(path)
+
+    def stats_line(self) -> str:
+        return (f"Cache mode={self.mode}  hits={self.hits}  misses={self.misses}  "
+                f"stores={self.stores}  evictions={self.evictions}")
+
+_CACHE = ResponseCache(CACHE_DIR, CACHE_MODE if CACHE_MODE in CACHE_MODES else "off")
+
+def _reverse_lines(path: pathlib.Path, block: int = 64 * 1024):
+    """Yield the lines of `path` last-first without reading the whole file."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if rest:
+            yield rest
+
+class RunJournal:
+    """Append-only JSON-lines journal with size-based rotation.
+
+    Each append is a single O_APPEND write followed by fsync, so a crash can
+    at worst leave one torn last line; readers skip lines that do not parse.
+    """
+
+    def __init__(self, path: pathlib.Path, max_bytes: int = JOURNAL_MAX_BYTES, keep: int = JOURNAL_KEEP):
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def append(self, **fields):
+        record = {"ts": datetime.datetime.utcnow().isoformat() + "Z", **fields}
+        data = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with contextlib.suppress(FileNotFoundError):
+                if self.path.stat().st_size + len(data) > self.max_bytes:
+                    self._rotate()
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size and os.pread(fd, 1, size - 1) != b"\n":
+                    data = b"\n" + data  # previous writer died mid-line; start a fresh one
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _rotate(self):
+        for i in range(self.keep - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _files_newest_first(self) -> list[pathlib.Path]:
+        return [self.path] + [self.path.with_name(f"{self.path.name}.{i}") for i in range(1, self.keep + 1)]
+
+    @staticmethod
+    def _parse(line: bytes) -> dict | None:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            return None
+        return rec if isinstance(rec, dict) else None
+
+    def records(self):
+        """Stream every record oldest-first, across rotated files."""
+        for path in reversed(self._files_newest_first()):
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    rec = self._parse(line)
+                    if rec is not None:
+                        yield rec
+
+    def tail(self):
+        """Stream records newest-first; stop iterating as soon as you have enough."""
+        for path in self._files_newest_first():
+            for line in _reverse_lines(path):
+                rec = self._parse(line)
+                if rec is not None:
+                    yield rec
+
 def write_text_atomic(path: pathlib.Path, content: str):
     path.parent.mkdir(parents=True, exist_ok=True)
     with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8", dir=str(path.parent)) as tf:
@@ -118,24 +421,87 @@ def write_text_atomic(path: pathlib.Path, content: str):
 def read_text_safe(path: pathlib.Path) -> str:
     return path.read_text(encoding="utf-8") if path.exists() else ""
 
+_LOG_LOCK = threading.Lock()
+_SAVE_LOCK = threading.Lock()  # unique_path() + write must not interleave between workers
+_DEDUPE_LOCK = threading.Lock()  # near-duplicate check + save + index of a prompt, so two workers can't both pass
+
+_JOURNAL = RunJournal(JOURNAL_FILE)
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+def get_index() -> dedupe.SimilarityIndex:
+    """Load the similarity index once; the very first load indexes the existing tree."""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            fresh = not SIMILARITY_INDEX.exists()
+            _INDEX = dedupe.SimilarityIndex(SIMILARITY_INDEX, DIST)
+            if fresh:
+                added = _INDEX.sync()
+                write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] Similarity index bootstrapped: {added} artifacts")
+        return _INDEX
+
+def find_near_duplicate(prompt_text: str) -> tuple[str | None, float]:
+    """(path, score) of the closest existing prompt if it is at or above DEDUPE_THRESHOLD."""
+    if DEDUPE_THRESHOLD <= 0:
+        return None, 0.0
+    match, score = get_index().nearest(prompt_text, "prompt")
+    return (match, score) if score >= DEDUPE_THRESHOLD else (None, score)
+
+def index_artifact(path: pathlib.Path, text: str, kind: str):
+    try:
+        get_index().add(path, text, kind)
+    except OSError as e:
+        write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] Similarity index update failed for {path.name}: {e}")
+
 def write_log(line: str):
-    DIST.mkdir(parents=True, exist_ok=True)
-    prev = read_text_safe(LOG_OUT)
-    write_text_atomic(LOG_OUT, prev + line + "\n")
+    with _LOG_LOCK:
+        DIST.mkdir(parents=True, exist_ok=True)
+        with open(LOG_OUT, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
 
 def pplx_chat(messages, api_key, temperature, timeout=TIMEOUT) -> str:
-    sess = _session_with_retries()
+    key = ResponseCache.key(messages, temperature)
+    cached = _CACHE.get(key)
+    if cached is not None:
+        return cached
+    if _CACHE.mode == "replay":
+        raise RuntimeError(f"Replay cache miss for request {key[:12]} (record it with --cache-mode=write)")
+    content = _pplx_request(messages, api_key, temperature, timeout)
+    _CACHE.put(key, content)
+    return content
+
+@contextlib.contextmanager
+def _post(payload: dict, api_key: str, timeout, stream: bool = False):
+    """POST to the API; the RateGate slot is held until the with-block exits, so a streamed body counts too."""
+    sess = get_session()
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    body = json.dumps(payload)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        with _GATE.slot():
+            resp = sess.post(API_URL, headers=headers, data=body, timeout=(15, timeout), stream=stream)
+            if resp.status_code == 429 and attempt < RATE_LIMIT_RETRIES:
+                resp.close()
+                _GATE.throttled(_retry_after_seconds(resp))
+                continue
+            if resp.status_code != 429:
+                _GATE.succeeded()
+            with resp:
+                try:
+                    resp.raise_for_status()
+                except requests.HTTPError as e:
+                    raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:600]}") from e
+                yield resp
+            return
+
+def _pplx_request(messages, api_key, temperature, timeout) -> str:
     payload = {"model": MODEL, "temperature": float(temperature), "messages": messages}
-    resp = sess.post(API_URL, headers=headers, data=json.dumps(payload), timeout=(15, timeout))
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:600]}") from e
-    try:
-        data = resp.json()
-    except Exception as e:
-        raise RuntimeError(f"Non-JSON response: {resp.text[:600]}") from e
+    with _post(payload, api_key, timeout) as resp:
+        try:
+            data = resp.json()
+        except Exception as e:
+            raise RuntimeError(f"Non-JSON response: {resp.text[:600]}") from e
     if "choices" not in data or not data["choices"]:
         raise RuntimeError(f"Malformed API reply (missing choices): {data}")
     content = data["choices"][0]["message"].get("content", "")
@@ -145,6 +511,137 @@ def pplx_chat(messages, api_key, temperature, timeout=TIMEOUT) -> str:
         content = content[:MAX_RESPONSE_CHARS]
     return content
 
+class StreamAbort(RuntimeError):
+    """A streamed reply was rejected before it finished downloading."""
+
+class StreamingExtractor:
+    """Incremental counterpart of extract_html_or_python for streamed replies.
+
+    Strips a ``` fence on the fly, decides html vs py from the first bytes,
+    spools the body to a temp file next to the destination and raises
+    StreamAbort (closing the request) once the reply runs past max_chars.
+    Anything else wrong with the body (external <script src>, wrong kind)
+    is left to validation and auto-fix, as on the non-streaming path.
+    """
+
+    _FENCE = re.compile(r"(?m)^[ \t]*(```)")
+
+    def __init__(self, spool_dir: pathlib.Path, max_chars: int = MAX_RESPONSE_CHARS):
+        self.max_chars = max_chars
+        self.kind = None
+        self.chars = 0
+        self._head = ""       # buffered until fence + kind are decided
+        self._fenced = False
+        self._done = False    # closing fence seen; ignore the rest
+        self._hold = ""       # last chars held back: may be the start of the closing fence
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        self._spool = tempfile.NamedTemporaryFile("w+", encoding="utf-8", dir=str(spool_dir),
+                                                  prefix=".stream-", suffix=".part")
+
+    def feed(self, chunk: str):
+        self.chars += len(chunk)
+        if self.chars > self.max_chars:
+            raise StreamAbort(f"Runaway response: more than {self.max_chars} chars.")
+        if self._done:
+            return
+        if self.kind is None:
+            self._head += chunk
+            if not self._decide(final=False):
+                return
+            chunk, self._head = self._head, ""
+        self._emit(chunk)
+
+    def _decide(self, final: bool) -> bool:
+        head = self._head
+        if not self._fenced:
+            m = self._FENCE.search(head, 0, STREAM_FENCE_WINDOW)
+            fence = m.start(1) if m else -1
+            if fence != -1:
+                eol = head.find("\n", fence)
+                if eol == -1 and not final:
+                    return False  # wait for the rest of the ```lang line
+                self._fenced = True
+                head = self._head = head[eol + 1:] if eol != -1 else ""
+            elif len(head) < STREAM_FENCE_WINDOW and not final:
+                return False
+        body = head.lstrip()
+        if not body and not final:
+            return False
+        lower = body[:STREAM_FENCE_WINDOW].lower()
+        self.kind = "html" if body.startswith("<") or "<!doctype html" in lower or "<html" in lower else "py"
+        return True
+
+    def _emit(self, chunk: str):
+        text = self._hold + chunk
+        if self._fenced:
+            end = text.find("\n```")
+            if end != -1:
+                text, self._done = text[:end], True
+                self._hold = ""
+            else:
+                text, self._hold = text[:-3], text[-3:]  # "\n``" may complete next chunk
+        self._spool.write(text)
+
+    def finish(self) -> tuple[str, str]:
+        if self.kind is None:
+            self._decide(final=True)
+            chunk, self._head = self._head, ""
+            self._emit(chunk)
+        if not self._done and self._hold:
+            self._spool.write(self._hold)
+        self._spool.seek(0)
+        content = self._spool.read().strip()
+        self.close()
+        if not content:
+            raise RuntimeError("Empty content from API.")
+        return content, self.kind
+
+    def close(self):
+        self._spool.close()  # deletes the spool file
+
+def pplx_chat_stream(messages, api_key, temperature, sink: StreamingExtractor, timeout=TIMEOUT):
+    """Stream a completion (SSE) into `sink`. Returns (content, kind, stats)."""
+    key = ResponseCache.key(messages, temperature)
+    try:
+        cached = _CACHE.get(key)
+        if cached is not None:
+            sink.feed(cached)
+            content, kind = sink.finish()
+            return content, kind, {"cached": True}
+        if _CACHE.mode == "replay":
+            raise RuntimeError(f"Replay cache miss for request {key[:12]} (record it with --cache-mode=write)")
+        payload = {"model": MODEL, "temperature": float(temperature), "messages": messages, "stream": True}
+        t0 = time.perf_counter()
+        ttft, received = None, 0
+        with _post(payload, api_key, timeout, stream=True) as resp:
+            for line in resp.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                received += len(data)
+                try:
+                    choice = (json.loads(data).get("choices") or [{}])[0]
+                except (ValueError, AttributeError):
+                    continue
+                piece = (choice.get("delta") or {}).get("content") or ""
+                if piece:
+                    if ttft is None:
+                        ttft = time.perf_counter() - t0
+                    sink.feed(piece)
+        content, kind = sink.finish()
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - t0
+    # Cache the extracted body: replaying it through either path yields the same content
+    _CACHE.put(key, content)
+    return content, kind, {
+        "ttft": round(ttft or elapsed, 3),
+        "bytes_received": received,
+        "bytes_per_s": round(received / elapsed) if elapsed > 0 else 0,
+    }
+
 def strip_code_fences(text: str) -> str:
     fence = re.search(r"```(?:\w+)?\s*(.*?)\s*```", text, re.DOTALL | re.IGNORECASE)
     return fence.group(1) if fence else text
@@ -167,7 +664,10 @@ def extract_html_or_python(raw: str) -> tuple[str, str]:
         return text, "html"
     return text, "py"
 
-def enforce_single_file_html(html_text: str) -> str:
+def _stamp_time(now: datetime.datetime | None) -> str:
+    return (now or datetime.datetime.utcnow()).isoformat() + "Z"
+
+def enforce_single_file_html(html_text: str, now: datetime.datetime | None = None) -> str:
     t = html_text
     if "<!doctype html>" not in t.lower():
         if "<html" not in t.lower():
@@ -181,7 +681,7 @@ def enforce_single_file_html(html_text: str) -> str:
     t = re.sub(r'<script[^>]+src=["\'][^"\']+["\'][^>]*>\s*</script>', "", t, flags=re.IGNORECASE)
     t = re.sub(r'<link[^>]+rel=["\']stylesheet["\'][^>]*>', "", t, flags=re.IGNORECASE)
     # Stamp (comment)
-    stamp = f"<!-- Auto-generated via Perplexity on {datetime.datetime.utcnow().isoformat()}Z -->"
+    stamp = f"<!-- Auto-generated via Perplexity on {_stamp_time(now)} -->"
     if stamp not in t:
         if "<head" in t.lower():
             t = re.sub(r"(?i)<head>", f"<head>\n{stamp}\n", t, count=1)
@@ -189,8 +689,8 @@ def enforce_single_file_html(html_text: str) -> str:
             t = stamp + "\n" + t
     return t
 
-def add_python_stamp(py_text: str) -> str:
-    stamp = f"# Auto-generated via Perplexity on {datetime.datetime.utcnow().isoformat()}Z"
+def add_python_stamp(py_text: str, now: datetime.datetime | None = None) -> str:
+    stamp = f"# Auto-generated via Perplexity on {_stamp_time(now)}"
     if not py_text.lstrip().startswith("# Auto-generated via Perplexity"):
         return stamp + "\n" + py_text
     return py_text
@@ -251,149 +751,261 @@ def save_latest(kind: str, content: str):
         h = LATEST_DIR / "app.html"
         if h.exists(): h.unlink()
 
-def build_once(prompt_text: str, api_key: str, temperature: float):
-    raw = pplx_chat(
-        messages=[{"role": "system", "content": SYSTEM_BUILD},
-                  {"role": "user", "content": prompt_text}],
-        api_key=api_key,
-        temperature=temperature,
-    )
-    content, kind = extract_html_or_python(raw)
+class StageTimer:
+    """Accumulates wall-clock seconds per pipeline stage.
+
+    With a journal attached, every stage also appends one record carrying
+    `context` (run id, slug, kind, fix attempts) plus whatever the stage
+    body put in the yielded dict (e.g. bytes, or status="invalid").
+    """
+
+    def __init__(self, journal: RunJournal | None = None, **context):
+        self.durations: dict[str, float] = {}
+        self.journal = journal
+        self.context = context
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        rec = {}
+        status = "ok"
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            self.durations[name] = self.durations.get(name, 0.0) + dt
+            if self.journal:
+                rec.setdefault("status", status)
+                self.journal.append(stage=name, duration=round(dt, 4), **{**self.context, **rec})
+
+def _stage(timer: StageTimer | None, name: str):
+    return timer.stage(name) if timer else contextlib.nullcontext({})
+
+def _postprocess(content: str, kind: str, now: datetime.datetime | None = None):
     if kind == "html":
-        content = enforce_single_file_html(content)
+        content = enforce_single_file_html(content, now)
         ok, err = validate_html(content)
     else:
-        content = add_python_stamp(content)
+        content = add_python_stamp(content, now)
         ok, err = validate_python(content)
+        if ok and SMOKE_GATE:
+            ok, err = smoke.gate(content)
+    return ok, err, content
+
+def _chat_for_build(messages, api_key, temperature, rec: dict, now):
+    """pplx_chat, or the streaming path when STREAM is on. Returns (text, kind or None)."""
+    if not STREAM:
+        raw = pplx_chat(messages=messages, api_key=api_key, temperature=temperature)
+        rec["bytes"] = len(raw.encode("utf-8"))
+        return raw, None
+    sink = StreamingExtractor(APPS_DIR)
+    content, kind, stats = pplx_chat_stream(messages, api_key, temperature, sink)
+    rec.update(stats, bytes=len(content.encode("utf-8")))
+    if not stats.get("cached"):
+        write_log(f"[{_stamp_time(now)}] Stream  kind={kind}  ttft={stats['ttft']:.2f}s  "
+                  f"bytes={stats['bytes_received']}  rate={stats['bytes_per_s'] / 1024:.1f}KiB/s")
+    return content, kind
+
+def build_once(prompt_text: str, api_key: str, temperature: float, timer: StageTimer | None = None,
+               now: datetime.datetime | None = None):
+    with _stage(timer, "build") as rec:
+        raw, kind = _chat_for_build(
+            [{"role": "system", "content": SYSTEM_BUILD},
+             {"role": "user", "content": prompt_text}],
+            api_key, temperature, rec, now,
+        )
+    with _stage(timer, "validate") as rec:
+        content = raw
+        if kind is None:
+            content, kind = extract_html_or_python(raw)
+        ok, err, content = _postprocess(content, kind, now)
+        rec.update(kind=kind, status="ok" if ok else "invalid")
     return ok, err, content, kind, raw
 
-def attempt_fix(broken: str, target_kind: str, api_key: str):
+def attempt_fix(broken: str, target_kind: str, api_key: str, timer: StageTimer | None = None,
+                now: datetime.datetime | None = None):
     """Ask model once to fix the broken content."""
-    fixed = pplx_chat(
-        messages=[
-            {"role": "system", "content": SYSTEM_FIX},
-            {"role": "user", "content": f"TARGET_KIND={target_kind}\n\nBROKEN:\n{broken}"}
-        ],
-        api_key=api_key,
-        temperature=0.1,
-    )
-    content, kind_detected = extract_html_or_python(fixed)
-    # Force expected kind when needed
-    if target_kind == "html":
-        content = enforce_single_file_html(content)
-        ok, err = validate_html(content)
-    else:
-        content = add_python_stamp(content)
-        ok, err = validate_python(content)
+    with _stage(timer, "fix") as rec:
+        fixed, kind_detected = _chat_for_build(
+            [
+                {"role": "system", "content": SYSTEM_FIX},
+                {"role": "user", "content": f"TARGET_KIND={target_kind}\n\nBROKEN:\n{broken}"}
+            ],
+            api_key, 0.1, rec, now,
+        )
+    with _stage(timer, "validate") as rec:
+        content = fixed
+        if kind_detected is None:
+            content, kind_detected = extract_html_or_python(fixed)
+        # Force expected kind when needed
+        ok, err, content = _postprocess(content, target_kind, now)
+        rec.update(kind=target_kind, status="ok" if ok else "invalid")
     return ok, err, content, target_kind
 
-# ---- New helpers for daily random run limit ----
+# ---- Daily random run limit (state lives in the journal tail) ----
 
-def load_run_state() -> dict:
-    if RUN_STATE_FILE.exists():
-        try:
-            return json.loads(RUN_STATE_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
+def quota_today(today_str: str) -> tuple[int | None, int]:
+    """(target, runs so far) for `today_str`, reading the journal backwards until yesterday."""
+    target, count = None, 0
+    for rec in _JOURNAL.tail():
+        if rec.get("ts", "")[:10] < today_str:
+            break
+        if rec.get("stage") != "quota" or rec.get("day") != today_str:
+            continue
+        if rec.get("status") == "run":
+            count = max(count, int(rec.get("count", 0)))
+        elif rec.get("status") == "plan":
+            target = int(rec.get("target", 0))
+            break
+    return target, count
 
-def save_run_state(state: dict):
-    RUN_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    RUN_STATE_FILE.write_text(json.dumps(state), encoding="utf-8")
+def migrate_run_state():
+    """Seed the journal from a pre-journal run_state.json ({date, count, target}), then retire the file."""
+    if not RUN_STATE_FILE.exists():
+        return
+    try:
+        state = json.loads(RUN_STATE_FILE.read_text(encoding="utf-8"))
+        day, target, count = str(state["date"]), int(state["target"]), int(state.get("count", 0))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] Ignoring unreadable {RUN_STATE_FILE.name}: {e}")
+    else:
+        _JOURNAL.append(stage="quota", status="plan", day=day, target=target, source=RUN_STATE_FILE.name)
+        if count:
+            _JOURNAL.append(stage="quota", status="run", day=day, target=target, count=count,
+                            source=RUN_STATE_FILE.name)
+        write_log(f"[{day}] Quota migrated from {RUN_STATE_FILE.name}: {count} of target {target}")
+    RUN_STATE_FILE.unlink()
 
 def should_run_today(now: datetime.datetime) -> bool:
     """Randomly allow up to MAX_RUNS_PER_DAY builds per calendar day."""
+    migrate_run_state()
     today_str = now.date().isoformat()
-    state = load_run_state()
-    if state.get("date") != today_str:
-        # New day: pick a fresh random target between 0 and MAX_RUNS_PER_DAY
+    target, count = quota_today(today_str)
+    if target is None:
+        # New day: pick a fresh random target between 1 and MAX_RUNS_PER_DAY
         target = random.randint(1, MAX_RUNS_PER_DAY)
-        state = {"date": today_str, "count": 0, "target": target}
-        save_run_state(state)
+        _JOURNAL.append(stage="quota", status="plan", day=today_str, target=target)
         write_log(f"[{today_str}] New day: target_runs={target}")
 
-    target = int(state.get("target", 0))
-    count = int(state.get("count", 0))
-
-    if target == 0:
-        write_log(f"[{today_str}] Skipping run: target_runs=0 for today.")
-        return False
-
     if count >= target:
-        write_log(f"[{today_str}] Skipping run: daily quota reached (count={count}, target={target}).")
+        # Journal only: hourly "skipping" lines used to swamp log.txt
+        _JOURNAL.append(stage="quota", status="skipped", day=today_str, target=target, count=count)
         return False
 
-    # We *will* run; increment the count and save
-    state["count"] = count + 1
-    save_run_state(state)
-    write_log(f"[{today_str}] Proceeding with run #{state['count']} of target {target}.")
+    # We *will* run; record the increment
+    _JOURNAL.append(stage="quota", status="run", day=today_str, target=target, count=count + 1)
+    write_log(f"[{today_str}] Proceeding with run #{count + 1} of target {target}.")
     return True
 
-def main():
-    api_key = os.getenv("PPLX_API_KEY")
-    if not api_key:
-        print("Missing PPLX_API_KEY secret", file=sys.stderr)
-        sys.exit(1)
+class PipelineError(RuntimeError):
+    """A pipeline stage failed; the reason has already been logged."""
 
-    now = datetime.datetime.utcnow()
-    utc_now = now.isoformat() + "Z"
+def run_pipeline(api_key: str, timer: StageTimer | None = None, rng: random.Random | None = None,
+                 now: datetime.datetime | None = None):
+    """Prompt -> build -> validate -> (fix) -> save. Returns (prompt_path, app_path).
 
-    # --- NEW: Decide if we should actually run this time (for random <=5/day behavior) ---
-    if not should_run_today(now):
-        # Exit cleanly without error so your scheduler doesn't complain.
-        print("Daily random quota reached or disabled for today; exiting without generating.")
-        return
+    Pinning `rng` and `now` makes every request (and so every cache key)
+    reproducible, which is what --cache-mode=replay relies on.
+    """
+    rng = rng or random
+    now = now or datetime.datetime.utcnow()
+    utc_now = now.isoformat() + "Z"
+    timer = timer or StageTimer()
+    started = time.perf_counter()
 
     # Randomization inputs for prompt diversity
-    seed = random.randint(10_000, 99_999)
-    theme = random.choice(THEMES)
-    extras = ", ".join(random.sample(FEATURE_EXTRAS, k=3))
+    seed = rng.randint(10_000, 99_999)
+    theme = rng.choice(THEMES)
+    extras = ", ".join(rng.sample(FEATURE_EXTRAS, k=3))
 
     # NEW: randomly choose whether we want an HTML app or Python script for this run
-    required_kind = random.choice(["html", "py"])
-
-    # ----- Stage 1: Generate the prompt -----
-    user_prompt_gen = USER_PROMPT_GEN_TEMPLATE.format(
-        utc=utc_now,
-        seed=seed,
-        theme=theme,
-        extras=extras,
-        kind=required_kind,
-    )
+    required_kind = rng.choice(["html", "py"])
+    if timer.journal is None:
+        timer.journal = _JOURNAL
+    timer.context.update(run=f"{now:%Y%m%dT%H%M%S}-{seed}", kind=required_kind, fix_attempts=0)
+
+    def finish(status: str, **extra):
+        timer.journal.append(stage="pipeline", status=status, duration=round(time.perf_counter() - started, 4),
+                             **timer.context, **extra)
 
+    # ----- Stage 1: Generate the prompt (re-rolled while it is a near-duplicate) -----
     try:
-        prompt_text = pplx_chat(
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT_GEN},
-                {"role": "user", "content": user_prompt_gen},
-            ],
-            api_key=api_key,
-            temperature=PROMPT_TEMPERATURE,
-        ).strip()
-        # Basic sanity: must be plain text, no code fences
-        prompt_text = strip_code_fences(prompt_text).strip()
-        if not prompt_text or "\n" not in prompt_text:
-            raise RuntimeError("Prompt looked empty or lacked a title + spec lines.")
-        title = first_line_title(prompt_text)
-        slug = slugify(title)
-        prompt_path = unique_path(PROMPTS_DIR / f"{slug}.txt")
-        write_text_atomic(prompt_path, prompt_text + f"\n\n(Generated: {utc_now}, seed={seed}, theme={theme}, extras={extras}, kind={required_kind})\n")
-        write_text_atomic(LATEST_DIR / "prompt.txt", prompt_text)
+        avoid, best = [], None
+        for attempt in range(DEDUPE_REROLLS + 1):
+            if attempt:
+                seed = rng.randint(10_000, 99_999)
+                theme = rng.choice(THEMES)
+                extras = ", ".join(rng.sample(FEATURE_EXTRAS, k=3))
+            user_prompt_gen = USER_PROMPT_GEN_TEMPLATE.format(
+                utc=utc_now,
+                seed=seed,
+                theme=theme,
+                extras=extras,
+                kind=required_kind,
+            )
+            if avoid:
+                user_prompt_gen += USER_PROMPT_AVOID_TEMPLATE.format(titles="; ".join(avoid))
+
+            with timer.stage("prompt") as rec:
+                prompt_text = pplx_chat(
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT_GEN},
+                        {"role": "user", "content": user_prompt_gen},
+                    ],
+                    api_key=api_key,
+                    temperature=PROMPT_TEMPERATURE,
+                ).strip()
+                rec["bytes"] = len(prompt_text.encode("utf-8"))
+            # Basic sanity: must be plain text, no code fences
+            prompt_text = strip_code_fences(prompt_text).strip()
+            if not prompt_text or "\n" not in prompt_text:
+                raise RuntimeError("Prompt looked empty or lacked a title + spec lines.")
+            title = first_line_title(prompt_text)
+
+            with _DEDUPE_LOCK:
+                with timer.stage("dedupe") as rec:
+                    match, score = find_near_duplicate(prompt_text)
+                    rec.update(score=round(score, 3), status="duplicate" if match else "ok")
+                    if match:
+                        rec["match"] = match
+                if best is None or score < best[0]:
+                    best = (score, match, prompt_text, title, seed, theme, extras)
+                if match and attempt < DEDUPE_REROLLS:
+                    write_log(f"[{utc_now}] Prompt near-duplicate  title='{title}'  match={match}  score={score:.2f}  re-rolling")
+                    avoid.append(title)
+                    continue
+                score, match, prompt_text, title, seed, theme, extras = best
+                if match:
+                    write_log(f"[{utc_now}] Prompt near-duplicate after {DEDUPE_REROLLS} re-rolls; building the least "
+                              f"similar one  title='{title}'  match={match}  score={score:.2f}")
+                slug = slugify(title)
+                timer.context["slug"] = slug
+                with timer.stage("save"), _SAVE_LOCK:
+                    prompt_path = unique_path(PROMPTS_DIR / f"{slug}.txt")
+                    write_text_atomic(prompt_path, prompt_text + f"\n\n(Generated: {utc_now}, seed={seed}, theme={theme}, extras={extras}, kind={required_kind})\n")
+                    write_text_atomic(LATEST_DIR / "prompt.txt", prompt_text)
+                index_artifact(prompt_path, prompt_text, "prompt")
+            break
         print(f"Wrote {prompt_path}")
         write_log(f"[{utc_now}] Prompt OK  seed={seed}  theme={theme}  extras={extras}  title='{title}'  slug={slug}  kind={required_kind}")
     except Exception as e:
         err = f"[{utc_now}] Prompt generation FAILED: {type(e).__name__}: {e}"
         print(err, file=sys.stderr)
         write_log(err)
-        sys.exit(1)
+        finish("error", error=f"{type(e).__name__}: {e}"[:300])
+        raise PipelineError(err) from e
 
     # ----- Stage 2: Build the app; validate; auto-fix once if needed -----
     try:
-        ok, err, content, kind, raw = build_once(prompt_text, api_key, BUILD_TEMPERATURE)
+        ok, err, content, kind, raw = build_once(prompt_text, api_key, BUILD_TEMPERATURE, timer, now)
         tried_fix = False
         if not ok:
             write_log(f"[{utc_now}] Build validation failed ({kind}): {err}. Attempting auto-fix.")
-            ok, err, content, kind = attempt_fix(raw, kind, api_key)
+            timer.context["fix_attempts"] += 1
+            ok, err, content, kind = attempt_fix(raw, kind, api_key, timer, now)
             tried_fix = True
 
         if not ok:
@@ -404,18 +1016,209 @@ def main():
             base = APPS_DIR / f"{slug}.html"
         else:
             base = APPS_DIR / f"{slug}.py"
-        app_path = unique_path(base)
-        write_text_atomic(app_path, content)
-        save_latest(kind, content)
+        timer.context["kind"] = kind
+        with timer.stage("save"), _SAVE_LOCK:
+            app_path = unique_path(base)
+            write_text_atomic(app_path, content)
+            save_latest(kind, content)
+        index_artifact(app_path, content, "app")
 
         print(f"Wrote {app_path}")
         write_log(f"[{utc_now}] Build OK  file={app_path.name}  kind={kind}  required_kind={required_kind}  {'(after auto-fix)' if tried_fix else ''}")
-        print(f"Done.\nSaved:\n  - {prompt_path}\n  - {app_path}\nLatest copies updated in {LATEST_DIR}")
     except Exception as e:
         err = f"[{utc_now}] Build FAILED: {type(e).__name__}: {e}"
         print(err, file=sys.stderr)
         write_log(err)
+        finish("error", error=f"{type(e).__name__}: {e}"[:300])
+        raise PipelineError(err) from e
+    finish("ok", file=app_path.name)
+    return prompt_path, app_path
+
+# ---- Batch mode: N pipelines at once over one shared session ----
+
+STAGES = ("prompt", "dedupe", "build", "validate", "fix", "save", "pipeline")
+
+def _percentile(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+def summarize_timings(timers: list[StageTimer]) -> dict:
+    """Per-stage count/mean/p50/p95/max in seconds across all pipelines."""
+    summary = {}
+    for name in STAGES:
+        vals = sorted(t.durations[name] for t in timers if name in t.durations)
+        if not vals:
+            continue
+        summary[name] = {
+            "count": len(vals),
+            "total": round(sum(vals), 3),
+            "mean": round(statistics.fmean(vals), 3),
+            "p50": round(_percentile(vals, 0.50), 3),
+            "p95": round(_percentile(vals, 0.95), 3),
+            "max": round(vals[-1], 3),
+        }
+    return summary
+
+def run_batch(api_key: str, count: int, workers: int, summary_path: str | None = None,
+              rng_seed: int | None = None, now: datetime.datetime | None = None) -> int:
+    """Run `count` pipelines on a thread pool; returns the number of failures."""
+    started = time.perf_counter()
+    write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] Batch start  builds={count}  workers={workers}  max_inflight={MAX_INFLIGHT}")
+    timers = [StageTimer() for _ in range(count)]
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline") as pool:
+        futures = [
+            pool.submit(run_pipeline, api_key, t,
+                        random.Random(f"{rng_seed}-{i}") if rng_seed is not None else None, now)
+            for i, t in enumerate(timers)
+        ]
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                failures += 1
+                if not isinstance(e, PipelineError):
+                    write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] Batch worker crashed: {type(e).__name__}: {e}")
+
+    wall = time.perf_counter() - started
+    summary = {
+        "builds": count, "ok": count - failures, "failed": failures,
+        "workers": workers, "max_inflight": MAX_INFLIGHT,
+        "wall_seconds": round(wall, 3),
+        "stages": summarize_timings(timers),
+    }
+    stamp = datetime.datetime.utcnow().isoformat() + "Z"
+    write_log(f"[{stamp}] Batch done  ok={summary['ok']}/{count}  wall={wall:.1f}s")
+    print(f"Batch: {summary['ok']}/{count} OK in {wall:.1f}s ({workers} workers, {MAX_INFLIGHT} in flight)")
+    print(f"  {'stage':<9}{'n':>4}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}")
+    for name, st in summary["stages"].items():
+        line = f"{name:<9}{st['count']:>4}{st['mean']:>9.2f}{st['p50']:>9.2f}{st['p95']:>9.2f}{st['max']:>9.2f}"
+        print("  " + line)
+        write_log(f"[{stamp}]   stage {line}")
+    if summary_path:
+        write_text_atomic(pathlib.Path(summary_path), json.dumps(summary, indent=2) + "\n")
+    return failures
+
+def journal_stats(days: float) -> dict:
+    """Success rate and p50/p95 latency per stage over the last `days`, streamed from the journal."""
+    cutoff = (datetime.datetime.utcnow() - datetime.timedelta(days=days)).isoformat()
+    per_stage: dict[str, dict] = {}
+    for rec in _JOURNAL.records():
+        if rec.get("ts", "") < cutoff or "duration" not in rec:
+            continue
+        st = per_stage.setdefault(rec.get("stage", "?"), {"n": 0, "ok": 0, "durations": []})
+        st["n"] += 1
+        st["ok"] += rec.get("status") == "ok"
+        st["durations"].append(float(rec["duration"]))
+    out = {}
+    for name, st in per_stage.items():
+        vals = sorted(st["durations"])
+        out[name] = {
+            "n": st["n"],
+            "success_rate": round(st["ok"] / st["n"], 4),
+            "p50": round(_percentile(vals, 0.50), 3),
+            "p95": round(_percentile(vals, 0.95), 3),
+        }
+    return out
+
+def print_journal_stats(days: float, as_json: bool = False):
+    stats = journal_stats(days)
+    if as_json:
+        print(json.dumps(stats, indent=2))
+        return
+    print(f"Last {days:g} day(s) from {JOURNAL_FILE}")
+    print(f"  {'stage':<10}{'n':>6}{'ok %':>8}{'p50 s':>9}{'p95 s':>9}")
+    for name in list(STAGES) + sorted(set(stats) - set(STAGES)):
+        if name in stats:
+            st = stats[name]
+            print(f"  {name:<10}{st['n']:>6}{st['success_rate'] * 100:>8.1f}{st['p50']:>9.2f}{st['p95']:>9.2f}")
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a prompt and a single-file app via Perplexity.")
+    ap.add_argument("--batch", type=int, default=0, metavar="N",
+                    help="build N apps concurrently (backfill; ignores the daily quota)")
+    ap.add_argument("--workers", type=int, default=4, metavar="K", help="pipelines run at once in --batch mode")
+    ap.add_argument("--max-inflight", type=int, default=None, metavar="M",
+                    help="API requests in flight across all workers (default: PPLX_MAX_INFLIGHT or --workers)")
+    ap.add_argument("--summary", metavar="PATH", help="write the batch timing summary as JSON")
+    ap.add_argument("--dist", metavar="DIR", help="output root instead of ./dist")
+    ap.add_argument("--cache-mode", choices=CACHE_MODES, default=_CACHE.mode,
+                    help="response cache: off, read, write (read-through) or replay (offline; misses fail)")
+    ap.add_argument("--cache-dir", metavar="DIR", default=str(CACHE_DIR), help="response cache location")
+    ap.add_argument("--stream", action="store_true", default=STREAM,
+                    help="stream build/fix replies (SSE) and abort early on clearly bad output")
+    ap.add_argument("--smoke-gate", action="store_true", default=SMOKE_GATE,
+                    help="also smoke-run Python builds in a sandbox; failures go to auto-fix")
+    ap.add_argument("--dedupe-threshold", type=float, default=DEDUPE_THRESHOLD, metavar="T",
+                    help="re-roll prompts at least this similar to an existing one (0 disables)")
+    ap.add_argument("--rng-seed", type=int, metavar="S", help="seed the theme/kind/seed choices (for replay)")
+    ap.add_argument("--now", type=datetime.datetime.fromisoformat, metavar="ISO",
+                    help="pin the run timestamp, e.g. 2026-01-01T00:00:00 (for replay)")
+    sub = ap.add_subparsers(dest="command", metavar="COMMAND")
+    js = sub.add_parser("journal-stats", help="success rate / p50 / p95 per stage from dist/journal.jsonl")
+    js.add_argument("--days", type=float, default=7.0, help="look-back window (default: 7)")
+    js.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    dr = sub.add_parser("dedupe-report", help="cluster near-duplicate prompts/apps in the catalogue")
+    dr.add_argument("--threshold", type=float, default=DEDUPE_THRESHOLD or 0.35,
+                    help="estimated Jaccard similarity to group at (default: %(default)s)")
+    dr.add_argument("--kind", choices=("prompt", "app"), help="only cluster prompts or only apps")
+    dr.add_argument("--json", action="store_true", help="print JSON instead of text")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    global _CACHE, STREAM, DEDUPE_THRESHOLD, SMOKE_GATE
+    args = parse_args(argv)
+    if args.dist:
+        set_dist_root(pathlib.Path(args.dist))
+    if args.command == "journal-stats":
+        print_journal_stats(args.days, args.json)
+        return
+    if args.command == "dedupe-report":
+        index = get_index()
+        index.sync()  # pick up artifacts added outside generate.py
+        dedupe.print_report(index, args.threshold, args.kind, args.json)
+        return
+    _CACHE = ResponseCache(pathlib.Path(args.cache_dir), args.cache_mode)
+    STREAM = args.stream
+    DEDUPE_THRESHOLD = args.dedupe_threshold
+    SMOKE_GATE = args.smoke_gate
+    replay = args.cache_mode == "replay"
+
+    api_key = os.getenv("PPLX_API_KEY")
+    if not api_key and not replay:
+        print("Missing PPLX_API_KEY secret", file=sys.stderr)
         sys.exit(1)
 
+    try:
+        if args.batch > 0:
+            workers = max(1, args.workers)
+            inflight = args.max_inflight or (int(os.environ["PPLX_MAX_INFLIGHT"]) if "PPLX_MAX_INFLIGHT" in os.environ else workers)
+            set_max_inflight(inflight)
+            failures = run_batch(api_key, args.batch, workers, args.summary, args.rng_seed, args.now)
+            sys.exit(1 if failures else 0)
+
+        now = args.now or datetime.datetime.utcnow()
+
+        # --- NEW: Decide if we should actually run this time (for random <=5/day behavior) ---
+        # Replays are offline re-runs of recorded builds and never count against the quota.
+        if not replay and not should_run_today(now):
+            # Exit cleanly without error so your scheduler doesn't complain.
+            print("Daily random quota reached or disabled for today; exiting without generating.")
+            return
+
+        rng = random.Random(args.rng_seed) if args.rng_seed is not None else None
+        try:
+            prompt_path, app_path = run_pipeline(api_key, rng=rng, now=args.now)
+        except PipelineError:
+            sys.exit(1)
+        print(f"Done.\nSaved:\n  - {prompt_path}\n  - {app_path}\nLatest copies updated in {LATEST_DIR}")
+    finally:
+        if _CACHE.mode != "off":
+            write_log(f"[{datetime.datetime.utcnow().isoformat()}Z] {_CACHE.stats_line()}")
+            _JOURNAL.append(stage="cache", status=_CACHE.mode, hits=_CACHE.hits, misses=_CACHE.misses,
+                            stores=_CACHE.stores, evictions=_CACHE.evictions)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+"""Canonical ChangeJournal, vendored into the apps by automation/vendor.py.
+
+Edit the class here, then run `python automation/vendor.py --write`.
+"""
+import hashlib
+import json
+import os
+
+
+class ChangeJournal:
+    """A JSON snapshot plus an append-only journal of the changes made since it was written.
+
+    append() costs O(size of the change); the snapshot is only rewritten by
+    compact(). The journal's first line names the snapshot it applies to (a
+    hash of its bytes), so a crash between writing a new snapshot and
+    removing the old journal cannot replay changes twice.
+    """
+
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.base = None
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def read_snapshot(self):
+        """Snapshot text, or None if there is none yet."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.base = self._digest(b"")
+            return None
+        self.base = self._digest(data)
+        return data.decode("utf-8", errors="replace")
+
+    def replay(self, apply):
+        """Re-apply journaled [key, before, after] changes on top of the snapshot just read."""
+        try:
+            f = open(self.journal_path, encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get("base") != self.base:
+                return 0  # written against an older snapshot that compact() already replaced
+            for line in f:
+                try:
+                    changes = json.loads(line)
+                except ValueError:
+                    break  # torn tail from an interrupted append
+                for key, before, after in changes:
+                    apply(key, before, after)
+                    applied += 1
+        return applied
+
+    def append(self, changes):
+        changes = [list(c) for c in changes]
+        if not changes:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            if f.tell() == 0:
+                f.write(json.dumps({"base": self.base}) + "\n")
+            f.write(json.dumps(changes, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def needs_compaction(self):
+        try:
+            journal = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        try:
+            snapshot = os.path.getsize(self.path)
+        except OSError:
+            snapshot = 0
+        return journal > max(self.COMPACT_MIN_BYTES, snapshot)
+
+    def compact(self, text):
+        """Write `text` as the new snapshot and start an empty journal."""
+        data = text.encode("utf-8")
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self.base = self._digest(data)
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
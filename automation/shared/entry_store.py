@@ -0,0 +1,150 @@
+"""Canonical EntryStore, vendored into the sqlite-backed CLI apps by automation/vendor.py.
+
+Edit the class here, then run `python automation/vendor.py --write`.
+"""
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class EntryStore:
+    """Records kept as rows of a sqlite3 database instead of one big JSON document.
+
+    Commands load only the date range they need, and save() writes only the
+    rows that were added, changed or removed since they were loaded, so adding
+    one entry costs the same with 10 or 100k entries on file. Writes go through
+    one WAL transaction per save: a crash leaves either the old or the new state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS records (scope TEXT NOT NULL, key TEXT NOT NULL, day TEXT NOT NULL,"
+            " body TEXT NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS records_by_day ON records (scope, day);"
+            "CREATE INDEX IF NOT EXISTS records_by_int_key ON records (scope, CAST(key AS INTEGER));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._loaded = {}  # scope -> {key: body as last read or written}
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True, ensure_ascii=False)),
+        )
+
+    def _track(self, scope, rows, replace=False):
+        if replace:
+            self._loaded[scope] = {}
+        seen = self._loaded.setdefault(scope, {})
+        rows = rows.fetchall()
+        seen.update(rows)
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for _, body in rows) + "]")
+
+    @staticmethod
+    def _range(columns, scope, since, until):
+        sql, params = f"SELECT {columns} FROM records WHERE scope = ?", [scope]
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(str(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(str(until))
+        return sql + " ORDER BY day, rowid", params
+
+    def load(self, scope, since=None, until=None):
+        """Records of `scope` whose day lies in [since, until]; either bound may be None.
+
+        The result (plus anything fetch()ed later) is what the next save() diffs against.
+        """
+        sql, params = self._range("key, body", scope, since, until)
+        return self._track(scope, self.db.execute(sql, params), replace=True)
+
+    def read(self, scope, since=None, until=None):
+        """load() for commands that never save: sqlite joins the bodies, so one row and one json.loads."""
+        sql, params = self._range("body", scope, since, until)
+        # the outer query has no ORDER BY or join, so sqlite keeps the subquery's order
+        row = self.db.execute(f"SELECT '[' || COALESCE(group_concat(body, ','), '') || ']' FROM ({sql})", params)
+        return json.loads(row.fetchone()[0])
+
+    def fetch(self, scope, key):
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ? AND key = ?", (scope, str(key)))
+        found = self._track(scope, rows)
+        return found[0] if found else None
+
+    def count(self, scope):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def max_key(self, scope):
+        row = self.db.execute("SELECT MAX(CAST(key AS INTEGER)) FROM records WHERE scope = ?", (scope,)).fetchone()
+        return row[0] or 0
+
+    def save(self, scope, records, key, day):
+        """Write records that are new or changed since load()/fetch(); delete loaded ones that are gone."""
+        seen = self._loaded.get(scope, {})
+        live, upserts = {}, []
+        for rec in records:
+            k = str(key(rec))
+            body = json.dumps(rec, sort_keys=True, ensure_ascii=False)
+            live[k] = body
+            if seen.get(k) != body:
+                upserts.append((scope, k, str(day(rec) or ""), body))
+        deletes = [(scope, k) for k in seen if k not in live]
+        self.db.executemany(
+            "INSERT INTO records (scope, key, day, body) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(scope, key) DO UPDATE SET day = excluded.day, body = excluded.body",
+            upserts,
+        )
+        self.db.executemany("DELETE FROM records WHERE scope = ? AND key = ?", deletes)
+        self._loaded[scope] = live
+        return len(upserts) + len(deletes)
+
+    def forget(self, scope):
+        """Nothing of `scope` was loaded: the next save() only adds or updates."""
+        self._loaded.pop(scope, None)
+
+    def drop(self, scope):
+        self.db.execute("DELETE FROM records WHERE scope = ?", (scope,))
+        self.forget(scope)
+
+    def migrate(self, legacy_path, importer):
+        """One-time import of the old JSON file, which is left in place as a backup."""
+        legacy_path = Path(legacy_path)
+        if self.get_meta("migrated_from") is not None:
+            return False
+        with self.transaction():
+            if self.get_meta("migrated_from") is not None:  # another process got there first
+                return False
+            if legacy_path.exists():
+                try:
+                    with legacy_path.open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except ValueError:
+                    print(f"Could not read {legacy_path}; starting with an empty store.", file=sys.stderr)
+                else:
+                    importer(self, raw)
+            self.set_meta("migrated_from", str(legacy_path))
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # fold the bulk import into the main file
+        self._loaded.clear()
+        return True
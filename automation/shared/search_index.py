@@ -0,0 +1,241 @@
+"""Canonical SearchIndex, vendored into the apps by automation/vendor.py.
+
+Edit the class here, then run `python automation/vendor.py --write`.
+"""
+import json
+import os
+import re
+from bisect import bisect_left, insort
+
+
+class SearchIndex:
+    """Inverted index from word tokens to the ids of the records containing them.
+
+    A query word matches every token it is a prefix of ("lea" finds
+    "learning", but "arn" does not), so results narrow as you type;
+    "field:word" also requires the match to be in that field.
+    Words are intersected smallest first, and a word whose prefix spans far
+    more ids than are still in the running is checked against those few
+    records instead. Exact values (a DOI, a hash, a tag) live in `keys` for
+    O(1) lookup. Several records may share an id. Results come back in the
+    order of the caller's list, which undo and inserts can rearrange.
+
+    save()/load() keep the postings next to the data file, stamped with the
+    snapshot they were built from, so startup does not re-tokenise; each
+    posting list is only decoded the first time a query touches it.
+    """
+
+    TOKEN = re.compile(r"\w+")
+    VERSION = 1
+
+    def __init__(self, fields, keys=None, key=lambda r: r["id"]):
+        self.fields = fields          # name -> fn(record) giving text or a list of strings
+        self.key_fields = keys or {}  # name -> fn(record) giving exact values
+        self.key = key
+        self.clear()
+
+    def clear(self):
+        self.records = {}   # id -> records with that id, in first-indexed order
+        self.pos = None     # id -> position in the caller's list; rebuilt after an add or remove
+        self.postings = {}  # token -> set of ids (fresh from load(): encoded positions in _ids)
+        self.vocab = []     # sorted tokens, for prefix ranges
+        self.keys = {name: {} for name in self.key_fields}  # name -> value -> set of ids
+        self._ids = []
+
+    def text(self, record, fields=None):
+        parts = []
+        for name in fields or self.fields:
+            value = self.fields[name](record)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(map(str, value))
+            parts.append(str(value or ""))
+        return " ".join(parts).lower()
+
+    def tokens(self, record, fields=None):
+        return set(self.TOKEN.findall(self.text(record, fields)))
+
+    def _ids_of(self, token):
+        ids = self.postings.get(token)
+        if isinstance(ids, str):
+            ids = self.postings[token] = {self._ids[int(i)] for i in ids.split()}
+        return ids
+
+    def _count(self, token):
+        ids = self.postings[token]
+        return ids.count(" ") + 1 if isinstance(ids, str) else len(ids)
+
+    def _add_record(self, rid, record):
+        recs = self.records.get(rid)
+        if recs is None:
+            recs = self.records[rid] = []
+        recs.append(record)
+        for name, get in self.key_fields.items():
+            for value in get(record):
+                if value:
+                    self.keys[name].setdefault(value, set()).add(rid)
+
+    def add(self, record):
+        rid = self.key(record)
+        self._add_record(rid, record)
+        for tok in self.tokens(record):
+            ids = self._ids_of(tok)
+            if ids is None:
+                ids = self.postings[tok] = set()
+                insort(self.vocab, tok)
+            ids.add(rid)
+
+    def remove(self, record, keep_slot=False):
+        rid = self.key(record)
+        recs = self.records.get(rid)
+        if not recs:
+            return
+        if record in recs:
+            recs.remove(record)
+            gone = self.tokens(record)
+        else:  # edited in place since it was indexed: the id is unique, drop what we have
+            gone = self.tokens(record).union(*(self.tokens(r) for r in recs))
+            recs.clear()
+        gone -= set().union(*(self.tokens(r) for r in recs))
+        for tok in gone:
+            ids = self._ids_of(tok)
+            if ids is None:
+                continue
+            ids.discard(rid)
+            if not ids:
+                del self.postings[tok]
+                del self.vocab[bisect_left(self.vocab, tok)]
+        for name, get in self.key_fields.items():
+            kept = {v for r in recs for v in get(r)}
+            for value in get(record):
+                ids = self.keys[name].get(value)
+                if ids is not None and value not in kept:
+                    ids.discard(rid)
+                    if not ids:
+                        del self.keys[name][value]
+        if not recs and not keep_slot:
+            del self.records[rid]
+
+    def change(self, old, new):
+        """Keep the index in step with one [before, after] change (None meaning absent)."""
+        if old is None or new is None or self.key(old) != self.key(new):
+            self.pos = None  # something was inserted or removed: list positions moved
+        if old is not None:
+            # an edit keeps the record's place in the result order
+            self.remove(old, keep_slot=new is not None and self.key(new) == self.key(old))
+        if new is not None:
+            self.add(new)
+
+    def build(self, records):
+        self.clear()
+        postings = self.postings
+        for record in records:
+            rid = self.key(record)
+            self._add_record(rid, record)
+            for tok in self.tokens(record):
+                ids = postings.get(tok)
+                if ids is None:
+                    postings[tok] = {rid}
+                else:
+                    ids.add(rid)
+        self.vocab = sorted(postings)  # one sort instead of an insort per new token
+
+    def _span(self, prefix):
+        return bisect_left(self.vocab, prefix), bisect_left(self.vocab, prefix + "\U0010ffff")
+
+    def lookup(self, name, value):
+        return self.keys[name].get(value, set())
+
+    def search(self, query, exact=()):
+        """Ids matching every word of `query` and every (name, value) in `exact`; None if there are none."""
+        clauses = []  # (estimated ids, field or None, prefix or None, ids or None)
+        for name, value in exact:
+            ids = self.lookup(name, value)
+            clauses.append((len(ids), None, None, ids))
+        for word in (query or "").lower().split():
+            field, sep, rest = word.partition(":")
+            field = field if sep and field in self.fields else None
+            for tok in self.TOKEN.findall(rest if field else word):
+                lo, hi = self._span(tok)
+                cost = sum(self._count(t) for t in self.vocab[lo:hi]) if hi - lo <= 256 else len(self.records)
+                clauses.append((cost, field, tok, None))
+        if not clauses:
+            return None
+        hits, check = None, []
+        for cost, field, prefix, ids in sorted(clauses, key=lambda c: c[0]):
+            if prefix is not None and (field or hits is not None and cost > 64 * len(hits)):
+                check.append((field, prefix))  # verified against the surviving records below
+                if hits is not None:
+                    continue
+            if ids is None:
+                lo, hi = self._span(prefix)
+                ids = set().union(*(self._ids_of(t) for t in self.vocab[lo:hi]))
+            hits = set(ids) if hits is None else hits & ids
+            if not hits:
+                return hits
+        for field, prefix in check:
+            fields = [field] if field else None
+            hits = {rid for rid in hits
+                    if any(t.startswith(prefix) for r in self.records[rid] for t in self.tokens(r, fields))}
+        return hits
+
+    def ordered(self, ids, items):
+        """`ids` in the order their records stand in `items`, the list this index was built from."""
+        if self.pos is None or len(self.pos) != len(self.records):
+            self.pos = {}
+            for i, record in enumerate(items):
+                self.pos.setdefault(self.key(record), i)
+        if len(ids) * 8 < len(self.pos):
+            return sorted(ids, key=self.pos.__getitem__)
+        return [rid for rid in self.pos if rid in ids]
+
+    def matching(self, query, items, exact=()):
+        """Records of `items` matching the query, in list order (all of them for an empty query)."""
+        hits = self.search(query, exact)
+        if hits is None:
+            return list(items)
+        return [r for rid in self.ordered(hits, items) for r in self.records[rid]]
+
+    def _schema(self):
+        return [self.VERSION, sorted(self.fields)]
+
+    def save(self, path, stamp):
+        ids = self._ids
+        if len(ids) > 2 * len(self.records) + 1024:  # mostly deleted ids: re-encode from scratch
+            for tok in self.vocab:
+                self._ids_of(tok)
+            ids = []
+        pos = {rid: i for i, rid in enumerate(ids)}
+        for rid in self.records:
+            if rid not in pos:
+                pos[rid] = len(ids)
+                ids.append(rid)
+        postings = {}
+        for tok in self.vocab:
+            p = self.postings[tok]
+            postings[tok] = p if isinstance(p, str) else " ".join([str(pos[rid]) for rid in p])
+        data = {"schema": self._schema(), "stamp": stamp, "ids": ids, "postings": postings}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._ids = ids
+
+    def load(self, path, stamp, records):
+        """Index `records` from the saved postings if they were built from snapshot `stamp`.
+
+        Returns False (leaving the index empty) if there is no usable saved index.
+        """
+        self.clear()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("stamp") != stamp or data.get("schema") != self._schema():
+            return False
+        for record in records:
+            self._add_record(self.key(record), record)
+        self._ids = data["ids"]
+        self.postings = data["postings"]
+        self.vocab = list(self.postings)
+        return True
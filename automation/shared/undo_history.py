@@ -0,0 +1,156 @@
+"""Canonical UndoHistory and list_applier, vendored into the apps by automation/vendor.py.
+
+Edit them here, then run `python automation/vendor.py --write`.
+"""
+import json
+import os
+import time
+from collections import deque
+
+
+class UndoHistory:
+    """Undo/redo as inverse deltas instead of whole-state snapshots.
+
+    A step holds only what one command changed: [key, before, after] triples,
+    None meaning "absent". undo() writes each `before` back and redo() each
+    `after` through an apply(key, old, new) callback, so both cost O(size of
+    the change). Steps are stored serialized; the oldest are dropped once the
+    stacks exceed `budget_bytes` (or `max_steps`). Steps sharing a `group`
+    recorded within `coalesce_s` seconds merge into one. With `path`, every
+    step/undo/redo is appended to a JSON-lines file and replayed on start.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024, max_steps=None, coalesce_s=2.0, path=None):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.path = path
+        self.undo_stack = deque()  # serialized steps, oldest first
+        self.redo_stack = []       # serialized steps, next to redo last
+        self.size = 0
+        self._log_bytes = 0
+        if path:
+            self._replay()
+
+    def record(self, label, changes, group=None):
+        """Push one step; returns False if nothing actually changed."""
+        changes = [[key, before, after] for key, before, after in changes if before != after]
+        if not changes:
+            return False
+        now = time.time()
+        top = json.loads(self.undo_stack[-1]) if group is not None and self.undo_stack and not self.redo_stack else None
+        if top is not None and top.get("group") == group and now - top["t"] <= self.coalesce_s:
+            latest = {json.dumps(c[0]): c for c in top["changes"]}
+            for key, before, after in changes:
+                prev = latest.get(json.dumps(key))
+                if prev is not None and prev[2] == before:
+                    prev[2] = after
+                else:
+                    top["changes"].append([key, before, after])
+                    latest[json.dumps(key)] = top["changes"][-1]
+            top["t"] = now
+            self.size -= len(self.undo_stack.pop())
+            self._push(top, "amend")
+        else:
+            self.size -= sum(len(s) for s in self.redo_stack)
+            self.redo_stack.clear()
+            self._push({"label": label, "group": group, "t": now, "changes": changes}, "do")
+        self._trim()
+        return True
+
+    def undo(self, apply):
+        """Revert the latest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        text = self.undo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in reversed(step["changes"]):
+            apply(key, after, before)
+        self.redo_stack.append(text)
+        self._log('{"undo":1}')
+        return step["label"]
+
+    def redo(self, apply):
+        if not self.redo_stack:
+            return None
+        text = self.redo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in step["changes"]:
+            apply(key, before, after)
+        self.undo_stack.append(text)
+        self._log('{"redo":1}')
+        return step["label"]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        if self.path:
+            self._compact()
+
+    def _push(self, step, event):
+        text = json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+        self.undo_stack.append(text)
+        self.size += len(text)
+        self._log('{"%s":%s}' % (event, text))
+
+    def _trim(self):
+        while self.undo_stack and (self.size > self.budget_bytes or
+                                   self.max_steps and len(self.undo_stack) > self.max_steps):
+            self.size -= len(self.undo_stack.popleft())
+
+    def _log(self, line):
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._log_bytes += len(line) + 1
+        if self._log_bytes > 4 * self.budget_bytes + 65536:
+            self._compact()
+
+    def _replay(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._log_bytes += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if "do" in event or "amend" in event:
+                    if "amend" in event and self.undo_stack:
+                        self.undo_stack.pop()
+                    else:
+                        self.redo_stack.clear()
+                    self.undo_stack.append(json.dumps(event.get("do") or event["amend"],
+                                                      ensure_ascii=False, separators=(",", ":")))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+        self.size = sum(map(len, self.undo_stack)) + sum(map(len, self.redo_stack))
+        self._trim()
+
+    def _compact(self):
+        # Chronological order is the undo stack, then the redo stack top-down; undo back to here
+        steps = list(self.undo_stack) + self.redo_stack[::-1]
+        lines = ['{"do":%s}\n' % s for s in steps] + ['{"undo":1}\n'] * len(self.redo_stack)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+        self._log_bytes = sum(map(len, lines))
+
+def list_applier(items):
+    """apply() for UndoHistory steps keyed by list position."""
+    def apply(index, old, new):
+        if old is None:
+            items.insert(index, new)
+        elif new is None:
+            del items[index]
+        else:
+            items[index] = new
+    return apply
@@ -0,0 +1,300 @@
+"""Sandboxed smoke-run + startup benchmark for the generated Python apps.
+
+Every dist/apps/*.py is copied into a throwaway HOME/CWD and exercised with
+stdin closed, a timeout and rlimits: a plain import (run_name != "__main__")
+plus whichever safe entry points the app declares: --help, and --demo or
+--report when argparse adds them as flags that take no value, and a
+top-level ensure_minimal_test_flow(). A probe fails on a traceback, a
+signal or a timeout; a clean nonzero exit (an app reporting "nothing to
+show yet" in an empty sandbox) does not. Results are cached by content
+hash, so unchanged apps are skipped, and compared against the previous
+report.
+
+    python automation/smoke.py [--workers 8] [--force] [--only 'habit-*']
+"""
+import os, sys, json, ast, time, pathlib, hashlib, argparse, tempfile, subprocess, threading, shutil, fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits / wait4, peak RSS is reported as 0
+    resource = None
+
+APPS_DIR = pathlib.Path("dist/apps")
+REPORT_PATH = pathlib.Path("dist/smoke/report.json")
+HARNESS_VERSION = 3  # bump to invalidate every cached result
+
+TIMEOUT = 10.0          # seconds per probe
+MEM_LIMIT_MB = 512      # RLIMIT_AS
+CPU_LIMIT_S = 20        # RLIMIT_CPU
+FILE_LIMIT_MB = 64      # RLIMIT_FSIZE
+OUTPUT_TAIL = 600       # chars of output kept for failed probes
+
+# Regression thresholds against the previous report
+SLOWER_RATIO, SLOWER_MIN_S = 1.5, 0.1
+HEAVIER_RATIO = 1.5
+
+FLAG_PROBES = ("--help", "--demo", "--report")
+FUNCTION_PROBES = ("ensure_minimal_test_flow",)
+# add_argument actions that take no value, so the flag can be run on its own
+_BARE_ACTIONS = ("store_true", "store_false", "store_const", "count", "help", "version")
+
+# Imports (or calls one function of) the app without running its __main__ block
+_WRAPPER = r"""
+import json, os, runpy, sys, time
+app, func = sys.argv[1], sys.argv[2]
+sys.argv = [app]
+t0 = time.perf_counter()
+ns = runpy.run_path(app, run_name="__smoke__")
+with open(os.environ["SMOKE_RESULT"], "w") as f:
+    json.dump({"import_s": time.perf_counter() - t0}, f)
+if func:
+    ns[func]()
+"""
+
+def content_hash(source: bytes) -> str:
+    h = hashlib.sha256(source)
+    h.update(f"|v{HARNESS_VERSION}|{sys.version_info[:2]}|{TIMEOUT}".encode())
+    return h.hexdigest()
+
+def _has_help(tree: ast.Module) -> bool:
+    """True if the app imports argparse and builds an ArgumentParser that keeps -h/--help."""
+    imported = any(isinstance(n, ast.Import) and any(a.name == "argparse" for a in n.names)
+                   or isinstance(n, ast.ImportFrom) and n.module == "argparse" for n in ast.walk(tree))
+    if not imported:
+        return False
+    for n in ast.walk(tree):
+        if not isinstance(n, ast.Call):
+            continue
+        name = n.func.attr if isinstance(n.func, ast.Attribute) else getattr(n.func, "id", None)
+        if name != "ArgumentParser":
+            continue
+        if not any(k.arg == "add_help" and isinstance(k.value, ast.Constant) and not k.value.value
+                   for k in n.keywords):
+            return True
+    return False
+
+def _bare_flags(tree: ast.Module) -> set[str]:
+    """Option strings of add_argument() calls whose action takes no value."""
+    flags = set()
+    for n in ast.walk(tree):
+        if not (isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute) and n.func.attr == "add_argument"):
+            continue
+        action = next((k.value for k in n.keywords if k.arg == "action"), None)
+        if not (isinstance(action, ast.Constant) and action.value in _BARE_ACTIONS):
+            continue
+        flags.update(a.value for a in n.args if isinstance(a, ast.Constant) and isinstance(a.value, str))
+    return flags
+
+def plan_probes(source: str) -> list[str]:
+    """import, then only the entry points this app actually declares."""
+    probes = ["import"]
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return probes
+    declared = _bare_flags(tree)
+    if _has_help(tree):
+        declared.add("--help")
+    probes += [f for f in FLAG_PROBES if f in declared]
+    names = {n.name for n in tree.body if isinstance(n, ast.FunctionDef)}
+    probes += [f for f in FUNCTION_PROBES if f in names]
+    return probes
+
+def _limits():
+    # Runs in the child between fork and exec
+    os.setsid()
+    if resource is None:
+        return
+    mb = 1024 * 1024
+    for res, value in ((resource.RLIMIT_AS, MEM_LIMIT_MB * mb), (resource.RLIMIT_CPU, CPU_LIMIT_S),
+                       (resource.RLIMIT_FSIZE, FILE_LIMIT_MB * mb), (resource.RLIMIT_CORE, 0)):
+        try:
+            resource.setrlimit(res, (value, value))
+        except (ValueError, OSError):
+            pass
+
+def _kill(proc: subprocess.Popen, fired: threading.Event):
+    fired.set()
+    try:
+        os.killpg(proc.pid, 9)
+    except OSError:
+        proc.kill()
+
+# Tracebacks that mean "needs a human at a terminal or screen" rather than "broken"
+_INTERACTIVE_SIGNS = ("EOFError", "setupterm", "nocbreak", "cbreak() returned ERR", "no $DISPLAY",
+                      "couldn't connect to display")
+# An uncaught exception; `python app.py` reports a SyntaxError without the traceback header
+_CRASH_SIGNS = ("Traceback (most recent call last)", "SyntaxError: ")
+PASSING = ("ok", "interactive", "nonzero")
+
+def _classify(code: int, timed_out: bool, output: str) -> str:
+    if timed_out:
+        return "timeout"
+    if code < 0:
+        return "error"  # killed by a signal (rlimit, segfault)
+    if any(sign in output for sign in _CRASH_SIGNS):
+        if any(sign in output for sign in _INTERACTIVE_SIGNS):
+            return "interactive"  # hit closed stdin / no terminal / no display: not a crash
+        return "error"
+    return "ok" if code == 0 else "nonzero"  # a clean exit code is the app's own answer
+
+def run_probe(app: pathlib.Path, probe: str, timeout: float = TIMEOUT) -> dict:
+    """Run one probe in a fresh sandbox; returns status, exit code, wall time, peak RSS, import time."""
+    with tempfile.TemporaryDirectory(prefix="smoke-") as box:
+        box = pathlib.Path(box)
+        target = box / app.name  # apps often write next to __file__; keep that inside the sandbox
+        shutil.copyfile(app, target)
+        result_file = box / ".smoke-result.json"
+        env = {
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": str(box), "USERPROFILE": str(box),
+            "APPDATA": str(box), "XDG_CONFIG_HOME": str(box / ".config"), "XDG_DATA_HOME": str(box / ".local"),
+            "TMPDIR": str(box), "TERM": "dumb", "LANG": "C.UTF-8", "PYTHONIOENCODING": "utf-8",
+            "PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0", "SMOKE_RESULT": str(result_file),
+        }
+        if probe.startswith("--"):
+            cmd = [sys.executable, target.name, probe]
+        else:
+            cmd = [sys.executable, "-c", _WRAPPER, target.name, "" if probe == "import" else probe]
+
+        log = box / ".smoke-output"
+        fired = threading.Event()
+        with open(log, "wb") as out:
+            t0 = time.perf_counter()
+            proc = subprocess.Popen(cmd, cwd=box, env=env, stdin=subprocess.DEVNULL, stdout=out,
+                                    stderr=subprocess.STDOUT,
+                                    preexec_fn=_limits if os.name == "posix" else None)
+            timer = threading.Timer(timeout, _kill, (proc, fired))
+            timer.start()
+            try:
+                if hasattr(os, "wait4"):
+                    _, status, usage = os.wait4(proc.pid, 0)
+                    proc.returncode = os.waitstatus_to_exitcode(status)
+                    peak_kb = usage.ru_maxrss
+                else:
+                    proc.wait()
+                    peak_kb = 0
+            finally:
+                timer.cancel()
+            wall = time.perf_counter() - t0
+
+        output = log.read_text(encoding="utf-8", errors="replace")
+        status = _classify(proc.returncode, fired.is_set(), output)
+        rec = {"status": status, "exit": proc.returncode, "wall_s": round(wall, 4), "peak_rss_kb": peak_kb}
+        try:
+            rec["import_s"] = round(json.loads(result_file.read_text())["import_s"], 4)
+        except (OSError, ValueError, KeyError):
+            pass
+        if status != "ok":
+            rec["output_tail"] = output[-OUTPUT_TAIL:]
+        return rec
+
+def smoke_app(app: pathlib.Path, timeout: float = TIMEOUT) -> dict:
+    source = app.read_bytes()
+    probes = plan_probes(source.decode("utf-8", errors="replace"))
+    results = {p: run_probe(app, p, timeout) for p in probes}
+    return {
+        "sha": content_hash(source),
+        "ok": all(r["status"] in PASSING for r in results.values()),
+        "probes": results,
+    }
+
+def gate(source: str, name: str = "app.py", timeout: float = TIMEOUT) -> tuple[bool, str]:
+    """Runtime check for generate.py: (ok, reason) after smoke-running `source`."""
+    with tempfile.TemporaryDirectory(prefix="smoke-gate-") as tmp:
+        path = pathlib.Path(tmp) / name
+        path.write_text(source, encoding="utf-8")
+        res = smoke_app(path, timeout)
+    bad = [f"{p}: {r['status']} (exit {r['exit']}) {r.get('output_tail', '').strip()[-300:]}"
+           for p, r in res["probes"].items() if r["status"] not in PASSING]
+    return (not bad, "Smoke run failed: " + " | ".join(bad) if bad else "")
+
+def load_report(path: pathlib.Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def compare(prev: dict, cur: dict) -> list[str]:
+    """Human-readable regressions of `cur` against `prev` (both report["apps"] dicts)."""
+    out = []
+    for name, entry in sorted(cur.items()):
+        old = prev.get(name)
+        if not old:
+            continue
+        for probe, r in entry["probes"].items():
+            o = old.get("probes", {}).get(probe)
+            if not o:
+                continue
+            if o["status"] in PASSING and r["status"] not in PASSING:
+                out.append(f"{name} {probe}: broke ({o['status']} -> {r['status']})")
+            if r["wall_s"] > o["wall_s"] * SLOWER_RATIO and r["wall_s"] - o["wall_s"] > SLOWER_MIN_S:
+                out.append(f"{name} {probe}: slower {o['wall_s']:.2f}s -> {r['wall_s']:.2f}s")
+            if o.get("peak_rss_kb") and r["peak_rss_kb"] > o["peak_rss_kb"] * HEAVIER_RATIO:
+                out.append(f"{name} {probe}: peak RSS {o['peak_rss_kb']} -> {r['peak_rss_kb']} KiB")
+    return out
+
+def run_all(apps_dir: pathlib.Path, report_path: pathlib.Path, workers: int, timeout: float,
+            force: bool = False, only: str | None = None) -> tuple[dict, list[str]]:
+    prev = load_report(report_path).get("apps", {})
+    apps = sorted(p for p in apps_dir.glob("*.py") if not only or fnmatch.fnmatch(p.name, only))
+    results, todo = {}, []
+    for app in apps:
+        old = prev.get(app.name)
+        if not force and old and old.get("sha") == content_hash(app.read_bytes()):
+            results[app.name] = old  # unchanged since the last run
+        else:
+            todo.append(app)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:  # each task drives its own child process
+        for app, res in zip(todo, pool.map(lambda a: smoke_app(a, timeout), todo)):
+            results[app.name] = res
+            print(f"{'ok  ' if res['ok'] else 'FAIL'} {app.name}", flush=True)
+
+    merged = dict(prev) if only else {}
+    merged.update(results)
+    report = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "harness_version": HARNESS_VERSION,
+        "ran": len(todo), "cached": len(apps) - len(todo),
+        "wall_s": round(time.perf_counter() - started, 3),
+        "apps": merged,
+    }
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    if report_path.exists():
+        os.replace(report_path, report_path.with_suffix(".prev.json"))
+    tmp = report_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, report_path)
+    return report, compare(prev, {k: results[k] for k in results if results[k] is not prev.get(k)})
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Smoke-run and time every generated Python app in a sandbox.")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of *.py apps (default: %(default)s)")
+    ap.add_argument("--report", default=str(REPORT_PATH), help="JSON report path (default: %(default)s)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    ap.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds per probe")
+    ap.add_argument("--force", action="store_true", help="ignore cached results")
+    ap.add_argument("--only", metavar="GLOB", help="only apps whose file name matches")
+    args = ap.parse_args(argv)
+
+    report, regressions = run_all(pathlib.Path(args.apps), pathlib.Path(args.report), args.workers,
+                                  args.timeout, args.force, args.only)
+    apps = report["apps"]
+    failed = sorted(n for n, e in apps.items() if not e["ok"])
+    print(f"\n{len(apps)} apps ({report['ran']} run, {report['cached']} cached) in {report['wall_s']:.1f}s; "
+          f"{len(failed)} failing")
+    for name in failed:
+        bad = [f"{p}={r['status']}" for p, r in apps[name]["probes"].items() if r["status"] not in PASSING]
+        print(f"  FAIL {name}: {', '.join(bad)}")
+    if regressions:
+        print("\nRegressions vs previous report:")
+        for line in regressions:
+            print("  " + line)
+    print(f"\nReport: {args.report}")
+    sys.exit(1 if any("broke" in r for r in regressions) else 0)
+
+if __name__ == "__main__":
+    main()
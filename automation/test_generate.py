@@ -0,0 +1,207 @@
+"""Tests for generate.py against a local stub of the chat-completions API.
+
+    python -m pytest -q automation
+"""
+import json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import generate
+
+class StubAPI(ThreadingHTTPServer):
+    """Chat-completions stub: reply(payload) -> text, sent as JSON or SSE chunks.
+
+    Records when each request arrived and the most requests it was serving at
+    once; a handler counts as busy until just before its last event is sent,
+    so a client that frees its slot before reading the body shows up here.
+    The first `throttle` requests get a 429 with Retry-After: `retry_after`.
+    """
+
+    daemon_threads = True
+    chunk_chars = 64
+    chunk_delay = 0.0
+    throttle = 0
+    retry_after = 0.5
+
+    def __init__(self, reply):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.reply = reply
+        self.requests = []
+        self.arrivals = []   # (monotonic time, status sent)
+        self.busy = self.max_busy = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> int:
+        with self._lock:
+            self.busy += 1
+            self.max_busy = max(self.max_busy, self.busy)
+            status = 429 if len(self.arrivals) < self.throttle else 200
+            self.arrivals.append((time.monotonic(), status))
+            return status
+
+    def leave(self):
+        with self._lock:
+            self.busy -= 1
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/chat/completions"
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.server.enter() == 429:
+            self.server.leave()
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.server.requests.append(payload)
+        text = self.server.reply(payload)
+        if not payload.get("stream"):
+            body = json.dumps({"choices": [{"message": {"content": text}}]}).encode()
+            time.sleep(self.server.chunk_delay)
+            self.server.leave()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        step = self.server.chunk_chars
+        for i in range(0, len(text), step):
+            event = {"choices": [{"delta": {"content": text[i:i + step]}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.chunk_delay)
+        self.server.leave()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    servers = []
+
+    def start(reply):
+        server = StubAPI(reply)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(generate, "API_URL", server.url)
+        return server
+
+    monkeypatch.setattr(generate, "_CACHE", generate.ResponseCache(tmp_path / "cache", "off"))
+    generate.set_dist_root(tmp_path / "dist")
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    generate.set_dist_root(generate.pathlib.Path("dist"))
+
+EXTERNAL_SCRIPT_HTML = """<!DOCTYPE html>
+<html><head><title>Tally</title>
+<script src="https://cdn.example.com/lib.js"></script>
+</head><body><main><h1>Tally</h1><button id="b">+1</button></main>
+<script>document.getElementById('b').onclick = () => {};</script>
+</body></html>"""
+
+def test_streamed_build_with_external_script_is_stripped_not_aborted(stub, monkeypatch):
+    server = stub(lambda payload: EXTERNAL_SCRIPT_HTML)
+    server.chunk_chars = 7  # split "<script src" across chunks
+    monkeypatch.setattr(generate, "STREAM", True)
+
+    ok, err, content, kind, raw = generate.build_once("Tally\n- count clicks", "key", 0.3)
+
+    assert ok, err
+    assert kind == "html"
+    assert "src=" not in content
+    assert "getElementById('b')" in content
+    assert len(server.requests) == 1 and server.requests[0]["stream"] is True
+
+def test_streamed_build_of_the_other_kind_still_finishes(stub, monkeypatch):
+    stub(lambda payload: "import sys\n\nprint('hello')\n")
+    monkeypatch.setattr(generate, "STREAM", True)
+
+    ok, err, content, kind, raw = generate.build_once("Tally\n- html please", "key", 0.3)
+
+    assert ok, err
+    assert kind == "py"
+
+def _batch_reply(payload):
+    system, user = (m["content"] for m in payload["messages"])
+    if system == generate.SYSTEM_PROMPT_GEN:
+        seed = user.split("- seed: ", 1)[1].split("\n", 1)[0]
+        return f"Stub App {seed}\n- shows the number {seed}\n- exits"
+    title = user.splitlines()[0]
+    return f"```python\nprint({title!r})\n# padding so the reply streams in several chunks\n```\n"
+
+def test_batch_caps_inflight_and_shares_429_backoff(stub, monkeypatch, tmp_path):
+    server = stub(_batch_reply)
+    server.chunk_chars = 16
+    server.chunk_delay = 0.02
+    server.throttle = 1
+    server.retry_after = 0.5
+    monkeypatch.setenv("PPLX_API_KEY", "key")
+    for name in ("_CACHE", "STREAM", "DEDUPE_THRESHOLD", "SMOKE_GATE", "MAX_INFLIGHT", "_GATE", "_SESSION"):
+        monkeypatch.setattr(generate, name, getattr(generate, name))  # main() rebinds these
+
+    with pytest.raises(SystemExit) as done:
+        generate.main(["--batch", "6", "--workers", "6", "--max-inflight", "2", "--stream",
+                       "--dist", str(tmp_path / "dist"), "--cache-mode", "off",
+                       "--cache-dir", str(tmp_path / "cache"), "--dedupe-threshold", "0", "--rng-seed", "1"])
+
+    assert done.value.code == 0
+    assert len(list((tmp_path / "dist" / "apps").glob("*.py"))) == 6
+    # 6 prompts + 6 streamed builds + the throttled request
+    assert len(server.arrivals) == 13
+    # Never more than --max-inflight bodies being served, streamed ones included
+    assert server.max_busy <= 2
+    # After the 429 every worker waits out Retry-After, not just the one that was throttled;
+    # a request already past the gate when the 429 landed may still arrive right after it
+    t429 = server.arrivals[0][0]
+    assert server.arrivals[0][1] == 429
+    quiet = [t - t429 for t, _ in server.arrivals[1:] if 0.1 < t - t429 < server.retry_after - 0.02]
+    assert quiet == []
+    assert max(t for t, _ in server.arrivals) - t429 >= server.retry_after
+
+def test_run_state_json_seeds_the_quota_once(stub):
+    now = generate.datetime.datetime.utcnow()
+    today = now.date().isoformat()
+    state = generate.RUN_STATE_FILE
+    state.parent.mkdir(parents=True)
+    state.write_text(json.dumps({"date": today, "count": 2, "target": 3}), encoding="utf-8")
+
+    assert generate.should_run_today(now)        # run 3 of 3, carried over from run_state.json
+    assert not state.exists()
+    assert not generate.should_run_today(now)
+    assert generate.quota_today(today) == (3, 3)
+
+def _same_idea_reply(payload):
+    system, user = (m["content"] for m in payload["messages"])
+    if system == generate.SYSTEM_PROMPT_GEN:
+        return "Pomodoro Focus Timer\n- 25 minute work blocks with short breaks\n- session history saved to JSON"
+    return "print('focus')\n"
+
+def test_duplicate_prompts_are_caught_across_workers_and_still_built(stub, monkeypatch, tmp_path):
+    stub(_same_idea_reply)
+    monkeypatch.setenv("PPLX_API_KEY", "key")
+    for name in ("_CACHE", "STREAM", "DEDUPE_THRESHOLD", "SMOKE_GATE", "MAX_INFLIGHT", "_GATE", "_SESSION"):
+        monkeypatch.setattr(generate, name, getattr(generate, name))
+
+    with pytest.raises(SystemExit) as done:
+        generate.main(["--batch", "2", "--workers", "2", "--dist", str(tmp_path / "dist"),
+                       "--cache-mode", "off", "--dedupe-threshold", "0.35", "--rng-seed", "1"])
+
+    assert done.value.code == 0
+    assert len(list((tmp_path / "dist" / "apps").glob("*.py"))) == 2
+    log = (tmp_path / "dist" / "log.txt").read_text(encoding="utf-8")
+    # check + save + index is atomic, so exactly one of the two workers saw the other's prompt
+    assert log.count("building the least similar one") == 1
+    assert log.count("re-rolling") == generate.DEDUPE_REROLLS
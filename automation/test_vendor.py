@@ -0,0 +1,21 @@
+"""The classes vendored into dist/apps must match automation/shared/ (see vendor.py)."""
+import pathlib
+
+import vendor
+
+APPS_DIR = pathlib.Path(__file__).resolve().parent.parent / "dist" / "apps"
+
+def test_vendored_classes_match_canonical():
+    assert vendor.sync(APPS_DIR) == []
+
+def test_write_replaces_a_drifted_copy(tmp_path):
+    app = "study-session-planner-cli.py"
+    source = (APPS_DIR / app).read_text(encoding="utf-8")
+    (tmp_path / app).write_text(source.replace("class EntryStore:", "class EntryStore:\n    stale = True", 1),
+                                encoding="utf-8")
+    for other in {a for _, apps in vendor.VENDORED.values() for a in apps} - {app}:
+        (tmp_path / other).write_text((APPS_DIR / other).read_text(encoding="utf-8"), encoding="utf-8")
+
+    assert vendor.sync(tmp_path) == [f"{app}: EntryStore differs from automation/shared/entry_store.py"]
+    vendor.sync(tmp_path, write=True)
+    assert (tmp_path / app).read_text(encoding="utf-8") == source
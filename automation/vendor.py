@@ -0,0 +1,90 @@
+"""Keep the classes and helpers shared between generated apps byte-identical.
+
+Every dist/apps file must run on its own (single file, standard library
+only), so a class several apps need is pasted into each of them. The
+canonical copy lives in automation/shared/; this script checks that every
+app listed in VENDORED carries exactly that definition, or rewrites the
+app's copy in place.
+
+    python automation/vendor.py            # check; exit 1 on drift
+    python automation/vendor.py --write    # copy the canonical definitions into the apps
+"""
+import ast, sys, pathlib, argparse
+
+SHARED_DIR = pathlib.Path(__file__).resolve().parent / "shared"
+APPS_DIR = pathlib.Path("dist/apps")
+
+_UNDO_APPS = (
+    "citation-miner-pro.py",
+    "client-deal-pipeline-cli.py",
+    "color-contrast-checker-pro.py",
+    "research-note-vault.py",
+)
+_JOURNAL_APPS = ("citation-miner-pro.py", "research-note-vault.py")
+
+# top-level class/function name -> (canonical module in automation/shared, apps that vendor it)
+VENDORED = {
+    "EntryStore": ("entry_store.py", (
+        "client-deal-pipeline-cli.py",
+        "daily-micro-habits-coach-cli.py",
+        "eco-footprint-tracker-cli.py",
+        "study-session-planner-cli.py",
+    )),
+    "UndoHistory": ("undo_history.py", _UNDO_APPS),
+    "list_applier": ("undo_history.py", _JOURNAL_APPS),
+    "ChangeJournal": ("change_journal.py", _JOURNAL_APPS),
+    "SearchIndex": ("search_index.py", _JOURNAL_APPS),
+}
+
+def definition_span(source: str, name: str) -> tuple[int, int] | None:
+    """(start, end) character offsets of the top-level class or def `name`, decorators included."""
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef)) and node.name == name:
+            first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            starts = [0]
+            for line in source.splitlines(True):
+                starts.append(starts[-1] + len(line))
+            return starts[first - 1], starts[node.end_lineno]
+    return None
+
+def canonical(name: str) -> str:
+    source = (SHARED_DIR / VENDORED[name][0]).read_text(encoding="utf-8")
+    start, end = definition_span(source, name)
+    return source[start:end]
+
+def sync(apps_dir: pathlib.Path, write: bool = False) -> list[str]:
+    """Apps whose copy differs from the canonical definition (rewritten when `write`), as messages."""
+    problems = []
+    for name, (_, apps) in VENDORED.items():
+        text = canonical(name)
+        for app in apps:
+            path = apps_dir / app
+            source = path.read_text(encoding="utf-8")
+            span = definition_span(source, name)
+            if span is None:
+                problems.append(f"{app}: no top-level {name}")
+                continue
+            start, end = span
+            if source[start:end] == text:
+                continue
+            if write:
+                path.write_text(source[:start] + text + source[end:], encoding="utf-8")
+                problems.append(f"{app}: {name} updated")
+            else:
+                problems.append(f"{app}: {name} differs from automation/shared/{VENDORED[name][0]}")
+    return problems
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check or rewrite the shared classes vendored into dist/apps.")
+    ap.add_argument("--write", action="store_true", help="copy the canonical definitions into the apps")
+    ap.add_argument("--apps", default=str(APPS_DIR), help="directory of apps (default: %(default)s)")
+    args = ap.parse_args(argv)
+    problems = sync(pathlib.Path(args.apps), args.write)
+    for line in problems:
+        print(line)
+    if not args.write and problems:
+        print("Run `python automation/vendor.py --write` to update the copies.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 # Auto-generated via Perplexity on 2026-02-18T05:37:55.499778Z
 import json
 import re
-import statistics
+import os
+import glob
+import time
 import pathlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import sys
 
 DB_PATH = pathlib.Path('results.json')
+CHUNK_SIZE = 1 << 20           # characters read per step when streaming a file
+SYLLABLE_CACHE_SIZE = 1 << 16  # distinct words whose syllable counts are memoised
+DEFAULT_PATTERNS = ('*.md', '*.txt', '*.rst')
 
 def load_history():
     if DB_PATH.exists():
@@ -24,6 +33,7 @@ def save_history(history):
     except Exception as e:
         print(f"Warning: Could not save history: {e}")
 
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
 def count_syllables(word):
     word = word.lower()
     syllable_count = len(re.findall(r'[aeiouy]+', word))
@@ -33,74 +43,181 @@ def count_syllables(word):
         syllable_count += 1
     return max(1, syllable_count)
 
+# One regex pass finds every run that matters: words, sentence punctuation, anything else but whitespace
+TOKEN_RE = re.compile(r'(\w+)|([.!?]+)|([^\w\s.!?]+)')
+TAIL_RE = re.compile(r'\w+\Z|[.!?]+\Z')  # a run at the end of a chunk may continue in the next one
+BE_WORDS = {'is', 'are', 'was', 'were', 'been', 'being'}
+GET_WORDS = {'get', 'gets', 'got', 'gotten'}
+GET_PARTICIPLES = {'called', 'done', 'named'}
+
+def _mean(total, n):
+    """statistics.mean of n ints summing to `total` (an int when it divides evenly, as there)."""
+    return total // n if total % n == 0 else total / n
+
+def _median(counts, n):
+    """statistics.median of the n values tallied in `counts` (value -> occurrences)."""
+    mid, seen, lower = (n - 1) // 2, 0, None
+    for value in sorted(counts):
+        seen += counts[value]
+        if lower is None and seen > mid:
+            lower = value
+            if n % 2:
+                return value
+        if seen > n // 2:
+            return (lower + value) / 2
+    return lower
+
+class TextStats:
+    """Words, sentences, syllables and passive-voice hits of a text fed in chunks, in one pass.
+
+    Counts match the old multi-pass analyze_text: sentences are the non-blank
+    runs between [.!?]+, passive hits are a "be" word followed by whitespace
+    and any word, or get/got/gotten + called/done/named. Word and sentence
+    lengths are tallied, not listed, so memory does not grow with the text.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.word_chars = 0
+        self.syllables = 0
+        self.sentences = 0
+        self.passive = 0
+        self.word_lengths = Counter()
+        self.sentence_lengths = Counter()
+        self._carry = ''             # a token that may continue in the next chunk
+        self._in_sentence = False    # the current sentence has non-blank text
+        self._sentence_words = 0
+        self._prev = None            # previous word, lowercased, while only whitespace follows it
+        self._prev_taken = False     # ...already matched as the word after a "be"
+
+    def feed(self, chunk):
+        text = self._carry + chunk
+        cut, pos = len(text), max(0, len(text) - 64)
+        tail = TAIL_RE.search(text, pos)
+        while tail and tail.start() == pos and pos:  # the run may start before the window
+            pos = max(0, pos - 4096)
+            tail = TAIL_RE.search(text, pos)
+        if tail:
+            cut = tail.start()
+        self._carry = text[cut:]
+        self._scan(text, cut)
+        return self
+
+    def _scan(self, text, end):
+        words, word_chars, syllables, passive = self.words, self.word_chars, self.syllables, self.passive
+        word_lengths, syllables_of = self.word_lengths, count_syllables
+        in_sentence, sentence_words = self._in_sentence, self._sentence_words
+        prev, prev_taken = self._prev, self._prev_taken
+        for m in TOKEN_RE.finditer(text, 0, end):
+            kind = m.lastindex
+            if kind == 1:
+                tok = m.group(1)
+                n = len(tok)
+                words += 1
+                word_chars += n
+                word_lengths[n] += 1
+                syllables += syllables_of(tok)
+                in_sentence = True
+                sentence_words += 1
+                low = tok.lower() if n <= 6 else ''
+                taken = False
+                # whitespace is not a token, so prev is set only if nothing but whitespace came between
+                if prev is not None:
+                    if prev in BE_WORDS and not prev_taken:
+                        passive += 1
+                        taken = True
+                    if prev in GET_WORDS and low in GET_PARTICIPLES:
+                        passive += 1
+                prev, prev_taken = low, taken
+            elif kind == 2:
+                if in_sentence:
+                    self.sentences += 1
+                    self.sentence_lengths[sentence_words] += 1
+                in_sentence, sentence_words, prev = False, 0, None
+            else:
+                in_sentence, prev = True, None
+        self.words, self.word_chars, self.syllables, self.passive = words, word_chars, syllables, passive
+        self._in_sentence, self._sentence_words = in_sentence, sentence_words
+        self._prev, self._prev_taken = prev, prev_taken
+
+    def _end_sentence(self):
+        if self._in_sentence:
+            self.sentences += 1
+            self.sentence_lengths[self._sentence_words] += 1
+        self._in_sentence = False
+        self._sentence_words = 0
+
+    def finish(self):
+        """Flush the last token and sentence; returns the metrics (None if there is no text to rate)."""
+        self._scan(self._carry, len(self._carry))
+        self._carry = ''
+        self._end_sentence()
+        return self.metrics()
+
+    def metrics(self):
+        num_words, num_sentences = self.words, self.sentences
+        if num_sentences == 0 or num_words == 0:
+            return None
+        avg_word_length = _mean(self.word_chars, num_words)
+        avg_sentence_length = _mean(num_words, num_sentences)
+        syllables_per_word = self.syllables / num_words
+        
+        # Flesch-Kincaid Grade Level
+        # 0.39 * (words/sentences) + 11.8 * (syllables/words) - 15.59
+        flesch_kincaid = 0.39 * (num_words / num_sentences) + 11.8 * syllables_per_word - 15.59
+        passive_percentage = self.passive / num_sentences * 100
+        
+        metrics = {
+            'avg_word_length': round(avg_word_length, 2),
+            'avg_sentence_length': round(avg_sentence_length, 2),
+            'flesch_kincaid_grade': round(flesch_kincaid, 2),
+            'passive_voice_pct': round(passive_percentage, 2),
+            'num_words': num_words,
+            'num_sentences': num_sentences,
+            'word_lengths': {'mean': round(avg_word_length, 2),
+                            'median': round(_median(self.word_lengths, num_words), 2)},
+            'sentence_lengths': {'mean': round(avg_sentence_length, 2),
+                               'median': round(_median(self.sentence_lengths, num_sentences), 2)}
+        }
+        
+        # Accessibility flags
+        issues = []
+        if metrics['flesch_kincaid_grade'] > 18:
+            issues.append("High grade level (>18)")
+        if metrics['avg_sentence_length'] > 20:
+            issues.append("Long sentences (>20 words)")
+        if metrics['passive_voice_pct'] > 30:
+            issues.append("High passive voice usage")
+        
+        metrics['accessibility_issues'] = issues
+        metrics['readability_rating'] = "Hard to read" if issues else "Accessible"
+        
+        return metrics
+
 def analyze_text(text):
     if not text.strip():
         return None
-    
-    # Clean text
-    text = re.sub(r'\s+', ' ', text.strip())
-    
-    # Sentences: .!? followed by space/capital
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    num_sentences = len(sentences)
-    
-    # Words
-    words = re.findall(r'\b\w+\b', text)
-    num_words = len(words)
-    
-    if num_sentences == 0 or num_words == 0:
-        return None
-    
-    # Word and sentence lengths
-    word_lengths = [len(w) for w in words]
-    avg_word_length = statistics.mean(word_lengths)
-    
-    sentence_lengths = [len(re.findall(r'\b\w+\b', s)) for s in sentences]
-    avg_sentence_length = statistics.mean(sentence_lengths)
-    
-    # Syllables for Flesch-Kincaid
-    total_syllables = sum(count_syllables(w) for w in words)
-    syllables_per_word = total_syllables / num_words
-    
-    # Flesch-Kincaid Grade Level
-    # 0.39 * (words/sentences) + 11.8 * (syllables/words) - 15.59
-    flesch_kincaid = 0.39 * (num_words / num_sentences) + 11.8 * syllables_per_word - 15.59
-    
-    # Passive voice (heuristic: forms of "be" + past participle)
-    passive_patterns = [
-        r'\b(is|are|was|were|been|being)\s+\w+(ed|ing)?\b',
-        r'\b(gets?|got|gotten)\s+(called|done|named)\b'
-    ]
-    passive_count = sum(len(re.findall(p, text, re.I)) for p in passive_patterns)
-    passive_percentage = (passive_count / num_sentences * 100) if num_sentences else 0
-    
-    metrics = {
-        'avg_word_length': round(avg_word_length, 2),
-        'avg_sentence_length': round(avg_sentence_length, 2),
-        'flesch_kincaid_grade': round(flesch_kincaid, 2),
-        'passive_voice_pct': round(passive_percentage, 2),
-        'num_words': num_words,
-        'num_sentences': num_sentences,
-        'word_lengths': {'mean': round(statistics.mean(word_lengths), 2),
-                        'median': round(statistics.median(word_lengths), 2)},
-        'sentence_lengths': {'mean': round(statistics.mean(sentence_lengths), 2),
-                           'median': round(statistics.median(sentence_lengths), 2)}
-    }
-    
-    # Accessibility flags
-    issues = []
-    if metrics['flesch_kincaid_grade'] > 18:
-        issues.append("High grade level (>18)")
-    if metrics['avg_sentence_length'] > 20:
-        issues.append("Long sentences (>20 words)")
-    if metrics['passive_voice_pct'] > 30:
-        issues.append("High passive voice usage")
-    
-    metrics['accessibility_issues'] = issues
-    metrics['readability_rating'] = "Hard to read" if issues else "Accessible"
-    
-    return metrics
+    return TextStats().feed(text).finish()
+
+def analyze_path(path):
+    """TextStats of a file, streamed in CHUNK_SIZE pieces (JSON is re-indented first, so it is read whole)."""
+    path = pathlib.Path(path)
+    stats = TextStats()
+    if path.suffix.lower() == '.json':
+        text = path.read_text(encoding='utf-8', errors='replace')
+        try:
+            text = json.dumps(json.loads(text), ensure_ascii=False, indent=2)
+        except ValueError:
+            pass  # Treat as plain text
+        stats.feed(text)
+        return stats
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            stats.feed(chunk)
+    return stats
 
 def analyze_file(filepath):
     try:
@@ -109,17 +226,7 @@ def analyze_file(filepath):
             print(f"❌ File not found: {filepath}")
             return None
         
-        text = path.read_text(encoding='utf-8', errors='replace')
-        
-        # Handle JSON files
-        if filepath.lower().endswith('.json'):
-            try:
-                data = json.loads(text)
-                text = json.dumps(data, ensure_ascii=False, indent=2)
-            except:
-                pass  # Treat as plain text
-        
-        metrics = analyze_text(text)
+        metrics = analyze_path(path).finish()
         if metrics:
             metrics['filename'] = path.name
             metrics['timestamp'] = datetime.now().isoformat()
@@ -172,7 +279,121 @@ def export_history(history, output_file):
     except Exception as e:
         print(f"❌ Export failed: {e}")
 
+def collect_files(paths, roots, patterns):
+    """Files named or matched by `paths` (files or glob patterns) plus those under each of `roots` matching `patterns`."""
+    found = []
+    for p in paths:
+        matches = glob.glob(p, recursive=True) if glob.has_magic(p) else [p]
+        found.extend(pathlib.Path(m) for m in matches)
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for name in sorted(filenames):
+                if any(pathlib.PurePath(name).match(pat) for pat in patterns):
+                    found.append(pathlib.Path(dirpath, name))
+    seen, files = set(), []
+    for path in found:
+        key = path.resolve()
+        if key not in seen and path.is_file():
+            seen.add(key)
+            files.append(path)
+    return files
+
+def batch_record(path):
+    """One JSONL record for `path`; runs in the pool's worker processes."""
+    record = {'path': str(path)}
+    try:
+        record['bytes'] = os.path.getsize(path)
+        stats = analyze_path(path)
+        metrics = stats.finish()
+    except (OSError, UnicodeError) as e:
+        record['error'] = str(e)
+        return record
+    record.update(metrics or {'error': 'no valid text'})
+    # raw totals, so the corpus summary is exact rather than an average of averages
+    record['totals'] = {'words': stats.words, 'sentences': stats.sentences,
+                        'syllables': stats.syllables, 'passive': stats.passive}
+    return record
+
+def run_batch(files, jobs, out):
+    """Analyze `files`, writing one JSON line per file to `out` in order; returns the corpus summary."""
+    start = time.perf_counter()
+    totals = Counter()
+    summary = {'files': 0, 'failed': 0, 'bytes': 0, 'files_with_issues': 0}
+    if jobs > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        records = pool.map(batch_record, files, chunksize=max(1, len(files) // (jobs * 16)))
+    else:
+        pool, records = None, map(batch_record, files)
+    try:
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            summary['files'] += 1
+            summary['bytes'] += record.get('bytes', 0)
+            if 'error' in record:
+                summary['failed'] += 1
+                continue
+            totals.update(record['totals'])
+            if record['accessibility_issues']:
+                summary['files_with_issues'] += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    summary.update(words=totals['words'], sentences=totals['sentences'])
+    if totals['words'] and totals['sentences']:
+        summary['flesch_kincaid_grade'] = round(0.39 * (totals['words'] / totals['sentences'])
+                                                + 11.8 * (totals['syllables'] / totals['words']) - 15.59, 2)
+        summary['avg_sentence_length'] = round(totals['words'] / totals['sentences'], 2)
+        summary['passive_voice_pct'] = round(totals['passive'] / totals['sentences'] * 100, 2)
+    summary.update(seconds=round(elapsed, 3), mb_per_s=round(summary['bytes'] / 1e6 / elapsed, 2),
+                   files_per_s=round(summary['files'] / elapsed, 1))
+    return summary
+
+def print_summary(summary, stream):
+    print(f"\n📚 Corpus: {summary['files']:,} files ({summary['failed']:,} failed), "
+          f"{summary['bytes'] / 1e6:.1f} MB, {summary['words']:,} words, {summary['sentences']:,} sentences", file=stream)
+    if 'flesch_kincaid_grade' in summary:
+        print(f"Flesch-Kincaid Grade: {summary['flesch_kincaid_grade']:.1f} | "
+              f"Avg sentence length: {summary['avg_sentence_length']:.1f} words | "
+              f"Passive voice: {summary['passive_voice_pct']:.1f}%", file=stream)
+    print(f"Files with accessibility issues: {summary['files_with_issues']:,}", file=stream)
+    print(f"⏱️  {summary['seconds']:.2f}s: {summary['mb_per_s']:.2f} MB/s, {summary['files_per_s']:.1f} files/s", file=stream)
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Accessibility text analyzer. With no arguments, runs the interactive menu.")
+    p.add_argument('paths', nargs='*', help="files or glob patterns (quote ** patterns) to analyze in batch")
+    p.add_argument('--recursive', '-r', metavar='DIR', action='append', default=[],
+                   help="analyze every file under DIR matching --glob (repeatable)")
+    p.add_argument('--glob', metavar='PATTERN', action='append',
+                   help=f"file name pattern for --recursive (repeatable; default: {' '.join(DEFAULT_PATTERNS)})")
+    p.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help="worker processes (default: %(default)s)")
+    p.add_argument('--jsonl', metavar='FILE', default='-', help="per-file results as JSON lines (default: stdout)")
+    p.add_argument('--summary', metavar='FILE', help="also write the corpus summary to FILE as JSON")
+    return p.parse_args(argv)
+
+def batch_main(args):
+    files = collect_files(args.paths, args.recursive, args.glob or DEFAULT_PATTERNS)
+    if not files:
+        print("❌ No files to analyze", file=sys.stderr)
+        return 1
+    out = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+    try:
+        summary = run_batch(files, max(1, args.jobs), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    # keep stdout pure JSONL when the records go there
+    print_summary(summary, sys.stderr if args.jsonl == '-' else sys.stdout)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
 def main():
+    args = parse_args()
+    if args.paths or args.recursive:
+        sys.exit(batch_main(args))
     history = load_history()
     
     while True:
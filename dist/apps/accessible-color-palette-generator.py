@@ -9,6 +9,8 @@ import urllib.parse
 import webbrowser
 import random
 import math
+import bisect
+import colorsys
 from pathlib import Path
 
 CONFIG_DIR = Path.home() / ".colorpalettes"
@@ -21,11 +23,15 @@ def hex_to_rgb(hex_str):
 def rgb_to_hex(rgb):
     return '#%02x%02x%02x' % rgb
 
+def srgb_to_linear(c):
+    c /= 255.0
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+# srgb_to_linear of every 8-bit channel value
+LINEAR = tuple(srgb_to_linear(c) for c in range(256))
+
 def rgb_to_luminance(r, g, b):
-    def srgb_to_linear(c):
-        c /= 255.0
-        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
-    return 0.2126 * srgb_to_linear(r) + 0.7152 * srgb_to_linear(g) + 0.0722 * srgb_to_linear(b)
+    return 0.2126 * LINEAR[r] + 0.7152 * LINEAR[g] + 0.0722 * LINEAR[b]
 
 def contrast_ratio(rgb1, rgb2):
     l1 = rgb_to_luminance(*rgb1)
@@ -86,6 +92,119 @@ def generate_palette(base_hex, scheme='random', num_colors=6):
         return colors
     return [base_rgb] * num_colors
 
+AA_RATIO, AAA_RATIO = 4.5, 7.0
+LIGHTNESS_STEPS = 256  # HSL lightness levels a fix is searched over
+
+
+class ContrastEngine:
+    """WCAG contrast of every pair in a palette, and the nearest passing colour for each failing pair.
+
+    Luminances come from the 256-entry LINEAR table and are computed once
+    per colour. A ratio is (max + 0.05) / (min + 0.05), so with luminances
+    sorted, the colours that pass against one colour at ratio t are a prefix
+    and a suffix of the sorted order, found by bisection. A fix keeps the
+    foreground's hue and saturation and moves its HSL lightness. Luminance
+    never decreases with lightness, so the closest passing level is found by
+    bisecting a per-colour ramp of LIGHTNESS_STEPS levels.
+    """
+
+    def __init__(self, colors):
+        """`colors` is a list of (name, (r, g, b)) with 0-255 channels."""
+        self.names = [name for name, _ in colors]
+        self.rgbs = [tuple(rgb) for _, rgb in colors]
+        self.lums = [0.2126 * LINEAR[r] + 0.7152 * LINEAR[g] + 0.0722 * LINEAR[b] for r, g, b in self.rgbs]
+        self.order = sorted(range(len(self.rgbs)), key=self.lums.__getitem__)
+        self.sorted_lums = [self.lums[i] for i in self.order]
+        self._ramps = {}
+
+    def __len__(self):
+        return len(self.rgbs)
+
+    @staticmethod
+    def ratio_of(lum1, lum2):
+        if lum1 < lum2:
+            lum1, lum2 = lum2, lum1
+        return (lum1 + 0.05) / (lum2 + 0.05)
+
+    def ratio(self, i, j):
+        return self.ratio_of(self.lums[i], self.lums[j])
+
+    def matrix(self):
+        """Ratios of every foreground (row) against every background (column)."""
+        shifted = [lum + 0.05 for lum in self.lums]
+        return [[a / b if a >= b else b / a for b in shifted] for a in shifted]
+
+    def _split(self, i, target):
+        """(a, b): sorted positions [0, a) and [b, n) pass against colour i at `target`, [a, b) fail."""
+        lum, lums, n = self.lums[i], self.sorted_lums, len(self.lums)
+        a = bisect.bisect_right(lums, (lum + 0.05) / target - 0.05)
+        b = bisect.bisect_left(lums, target * (lum + 0.05) - 0.05, a)
+        # the cut-offs are rounded; settle the colours right at them with the exact ratio
+        while a and self.ratio_of(lum, lums[a - 1]) < target:
+            a -= 1
+        while a < n and lums[a] <= lum and self.ratio_of(lum, lums[a]) >= target:
+            a += 1
+        b = max(a, b)
+        while b > a and self.ratio_of(lum, lums[b - 1]) >= target:
+            b -= 1
+        while b < n and self.ratio_of(lum, lums[b]) < target:
+            b += 1
+        return a, b
+
+    def passing(self, i, target=AA_RATIO):
+        """Indices of the colours that reach `target` against colour i, darkest first."""
+        a, b = self._split(i, target)
+        return self.order[:a] + self.order[b:]
+
+    def failing(self, i, target=AA_RATIO):
+        """Indices of the other colours that miss `target` against colour i, darkest first."""
+        a, b = self._split(i, target)
+        return [j for j in self.order[a:b] if j != i]
+
+    def pass_count(self, i, target=AA_RATIO):
+        a, b = self._split(i, target)
+        return a + len(self.lums) - b
+
+    def _ramp(self, rgb):
+        ramp = self._ramps.get(rgb)
+        if ramp is None:
+            h, l, s = colorsys.rgb_to_hls(*(c / 255.0 for c in rgb))
+            # at lightness 0.5 and full saturation each channel is its hue weight w; at lightness L
+            # it is lo + (hi - lo) * w with hi/lo as below, which is what colorsys.hls_to_rgb computes
+            wr, wg, wb = colorsys.hls_to_rgb(h, 0.5, 1.0)
+            rgbs, lums = [], []
+            for k in range(LIGHTNESS_STEPS):
+                L = k / (LIGHTNESS_STEPS - 1)
+                hi = L * (1.0 + s) if L <= 0.5 else L + s - L * s
+                lo = 2.0 * L - hi
+                span = (hi - lo) * 255
+                lo *= 255
+                r, g, b = round(lo + span * wr), round(lo + span * wg), round(lo + span * wb)
+                rgbs.append((r, g, b))
+                lums.append(0.2126 * LINEAR[r] + 0.7152 * LINEAR[g] + 0.0722 * LINEAR[b])
+            ramp = self._ramps[rgb] = (rgbs, lums, round(l * (LIGHTNESS_STEPS - 1)))
+        return ramp
+
+    def fix(self, i, j, target=AA_RATIO):
+        """Nearest colour to foreground i (same hue and saturation) reaching `target` on background j.
+
+        Returns (rgb, ratio), or None if no lightness of that hue gets there.
+        """
+        rgbs, lums, start = self._ramp(self.rgbs[i])
+        bg = self.lums[j] + 0.05
+        best = None
+        k = bisect.bisect_right(lums, bg / target - 0.05) - 1  # darker than the background
+        while k >= 0 and bg / (lums[k] + 0.05) < target:
+            k -= 1
+        if k >= 0:
+            best = (start - k, k, bg / (lums[k] + 0.05))
+        k = bisect.bisect_left(lums, target * bg - 0.05)  # lighter than the background
+        while k < LIGHTNESS_STEPS and (lums[k] + 0.05) / bg < target:
+            k += 1
+        if k < LIGHTNESS_STEPS and (best is None or abs(k - start) < abs(best[0])):
+            best = (k - start, k, (lums[k] + 0.05) / bg)
+        return None if best is None else (rgbs[best[1]], best[2])
+
 class ColorPaletteApp:
     def __init__(self, stdscr):
         self.stdscr = stdscr
@@ -96,6 +215,7 @@ class ColorPaletteApp:
         self.scheme = 'analogous'
         self.dragging = False
         self.drag_pos = 0
+        self.engine = None
         self.status = "Welcome to ColorPaletteApp - Arrow keys: navigate, Enter: select, Tab: mode, Esc: quit"
         self.load_palettes()
         
@@ -122,6 +242,12 @@ class ColorPaletteApp:
         except:
             pass
     
+    def contrast_engine(self):
+        """ContrastEngine for the current palette, rebuilt only when the palette changed."""
+        if self.engine is None or self.engine.rgbs != self.palette:
+            self.engine = ContrastEngine([(rgb_to_hex(c), c) for c in self.palette])
+        return self.engine
+
     def generate_share_url(self):
         data = {
             'p': [rgb_to_hex(c) for c in self.palette],
@@ -170,18 +296,26 @@ class ColorPaletteApp:
         self.stdscr.addstr(2, 2, "CONTRAST CHECKER - Test FG/BG pairs:", curses.A_BOLD)
         
         if len(self.palette) >= 2:
-            fg = self.palette[self.selected]
-            bg = self.palette[(self.selected + 1) % len(self.palette)]
-            ratio = contrast_ratio(fg, bg)
-            passes_aa = ratio >= 4.5
-            status = f"✓ PASS" if passes_aa else "✗ FAIL"
-            color_attr = curses.color_pair(1) if passes_aa else curses.color_pair(2)
-            
-            self.stdscr.addstr(4, 2, f"FG: {rgb_to_hex(fg)} on BG: {rgb_to_hex(bg)}", color_attr)
-            self.stdscr.addstr(5, 2, f"Ratio: {ratio:.2f}:1 {status}", color_attr)
+            engine = self.contrast_engine()
+            n = len(engine)
+            i = self.selected % n
+            self.stdscr.addstr(4, 2, f"FG: {rgb_to_hex(self.palette[i])} passes AA on {engine.pass_count(i)}/{n - 1}, "
+                                     f"AAA on {engine.pass_count(i, AAA_RATIO)}/{n - 1}  (f: apply worst fix)"[:w-3])
             
             # Preview
-            self.stdscr.addstr(7, 2, "AaBbCc123"[:w-5], curses.color_pair(11) | curses.A_BOLD)
+            self.stdscr.addstr(5, 2, "AaBbCc123"[:w-5], curses.color_pair(11) | curses.A_BOLD)
+            
+            for row, j in enumerate(k for k in range(n) if k != i):
+                if 7 + row >= h - 1: break
+                ratio = engine.ratio(i, j)
+                passes_aa = ratio >= AA_RATIO
+                status = "✓ AAA" if ratio >= AAA_RATIO else "✓ AA" if passes_aa else "✗ FAIL"
+                line = f"on BG {rgb_to_hex(self.palette[j])}: {ratio:5.2f}:1 {status}"
+                if not passes_aa:
+                    found = engine.fix(i, j)
+                    line += f"  -> FG {rgb_to_hex(found[0])} ({found[1]:.2f}:1)" if found else "  no fix for this hue"
+                color_attr = curses.color_pair(1) if passes_aa else curses.color_pair(2)
+                self.stdscr.addstr(7 + row, 2, line[:w-3], color_attr)
     
     def draw_palette(self):
         h, w = self.stdscr.getmaxyx()
@@ -254,6 +388,19 @@ class ColorPaletteApp:
             self.mode = 'palette'
         elif key in (curses.KEY_LEFT, ord('h')):
             self.selected = (self.selected - 1) % max(1, len(self.palette))
+        elif key in (curses.KEY_RIGHT, ord('l')):
+            self.selected = (self.selected + 1) % max(1, len(self.palette))
+        elif key == ord('f') and len(self.palette) >= 2:
+            # fix the selected colour against the background it contrasts least with
+            engine = self.contrast_engine()
+            i = self.selected % len(engine)
+            failing = engine.failing(i)
+            found = failing and engine.fix(i, min(failing, key=lambda j: engine.ratio(i, j)))
+            if found:
+                self.palette[i] = found[0]
+                self.status = f"Replaced {engine.names[i]} with {rgb_to_hex(found[0])}"
+            else:
+                self.status = "Nothing to fix" if not failing else "No lightness of this hue passes"
     
     def handle_palette(self, key):
         n = len(self.palette)
@@ -340,6 +487,21 @@ def main_cli(args):
             for i, c in enumerate(app.palette):
                 print(f"  {i}: {rgb_to_hex(c)}")
             print(f"Base: {app.base_hex}, Scheme: {app.scheme}")
+            if args.contrast:
+                print_contrast(app.palette, AAA_RATIO if args.level == 'AAA' else AA_RATIO)
+
+def print_contrast(palette, target=AA_RATIO):
+    engine = ContrastEngine([(rgb_to_hex(c), c) for c in palette])
+    print("Contrast (rows FG, columns BG):")
+    print(" " * 9 + "".join(f"{name:>8} " for name in engine.names))
+    for name, row in zip(engine.names, engine.matrix()):
+        print(f"  {name}" + "".join(f"{ratio:>8.2f}" + ("*" if ratio >= target else " ") for ratio in row))
+    print(f"  * reaches {target}:1")
+    for i, name in enumerate(engine.names):
+        for j in engine.failing(i, target):
+            found = engine.fix(i, j, target)
+            fix = f"{rgb_to_hex(found[0])} ({found[1]:.2f}:1)" if found else "no fix for this hue"
+            print(f"  {name} on {engine.names[j]}: {engine.ratio(i, j):.2f}:1, use {fix}")
 
 def test_cases():
     tests = [
@@ -363,6 +525,8 @@ if __name__ == "__main__":
     parser.add_argument('--scheme', choices=['random','analogous','complementary','triadic'], help='Color scheme')
     parser.add_argument('--share', action='store_true', help='Generate and open share URL')
     parser.add_argument('--test', action='store_true', help='Run test cases')
+    parser.add_argument('--contrast', action='store_true', help='Print the contrast matrix and fixes for failing pairs')
+    parser.add_argument('--level', choices=['AA', 'AAA'], default='AA', help='Level --contrast fixes must reach')
     
     args = parser.parse_args()
     
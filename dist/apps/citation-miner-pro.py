@@ -3,9 +3,11 @@
 """
 Citation Miner Pro - single-file terminal-based research citation manager
 - Python 3 standard library only.
-- Persist citations to "citations.json" in script directory.
-- Undo/Redo (20 steps).
+- Persist citations to "citations.json" in script directory; edits are appended
+  to "citations.json.journal" and folded into the JSON on quit.
+- Undo/Redo (20 steps, kept as per-edit deltas).
 - Keyboard shortcuts (Ctrl+Z / Ctrl+Y, arrow keys, Enter, Delete, n, s, e, o, q).
+- Search as you type: word-prefix index kept in "citations.index.json".
 - Export RIS and BibTeX.
 - Drag-and-drop PDF support (accepts file paths pasted/dragged into terminal input).
 - Share via short hash: prints "share: python app.py load:HASH..."
@@ -16,6 +18,7 @@ Notes:
 """
 
 import os
+import re
 import sys
 import json
 import shutil
@@ -23,12 +26,16 @@ import tempfile
 import webbrowser
 import hashlib
 import time
+from bisect import bisect_left, insort
 from collections import deque
 from urllib.parse import urlparse
 
 # Configuration
 MAX_HISTORY = 20
+HISTORY_BUDGET = 512 * 1024  # bytes of undo/redo deltas kept in memory
+COALESCE_S = 2.0  # repeated edits of one citation within this window undo as one step
 DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "citations.json")
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "citations.index.json")
 EXPORT_RIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "citations.ris")
 EXPORT_BIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "citations.bib")
 
@@ -41,10 +48,484 @@ YELLOW = CSI + "33m"
 CYAN = CSI + "36m"
 BOLD = CSI + "1m"
 
+# Undo/redo and persistence engines
+class UndoHistory:
+    """Undo/redo as inverse deltas instead of whole-state snapshots.
+
+    A step holds only what one command changed: [key, before, after] triples,
+    None meaning "absent". undo() writes each `before` back and redo() each
+    `after` through an apply(key, old, new) callback, so both cost O(size of
+    the change). Steps are stored serialized; the oldest are dropped once the
+    stacks exceed `budget_bytes` (or `max_steps`). Steps sharing a `group`
+    recorded within `coalesce_s` seconds merge into one. With `path`, every
+    step/undo/redo is appended to a JSON-lines file and replayed on start.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024, max_steps=None, coalesce_s=2.0, path=None):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.path = path
+        self.undo_stack = deque()  # serialized steps, oldest first
+        self.redo_stack = []       # serialized steps, next to redo last
+        self.size = 0
+        self._log_bytes = 0
+        if path:
+            self._replay()
+
+    def record(self, label, changes, group=None):
+        """Push one step; returns False if nothing actually changed."""
+        changes = [[key, before, after] for key, before, after in changes if before != after]
+        if not changes:
+            return False
+        now = time.time()
+        top = json.loads(self.undo_stack[-1]) if group is not None and self.undo_stack and not self.redo_stack else None
+        if top is not None and top.get("group") == group and now - top["t"] <= self.coalesce_s:
+            latest = {json.dumps(c[0]): c for c in top["changes"]}
+            for key, before, after in changes:
+                prev = latest.get(json.dumps(key))
+                if prev is not None and prev[2] == before:
+                    prev[2] = after
+                else:
+                    top["changes"].append([key, before, after])
+                    latest[json.dumps(key)] = top["changes"][-1]
+            top["t"] = now
+            self.size -= len(self.undo_stack.pop())
+            self._push(top, "amend")
+        else:
+            self.size -= sum(len(s) for s in self.redo_stack)
+            self.redo_stack.clear()
+            self._push({"label": label, "group": group, "t": now, "changes": changes}, "do")
+        self._trim()
+        return True
+
+    def undo(self, apply):
+        """Revert the latest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        text = self.undo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in reversed(step["changes"]):
+            apply(key, after, before)
+        self.redo_stack.append(text)
+        self._log('{"undo":1}')
+        return step["label"]
+
+    def redo(self, apply):
+        if not self.redo_stack:
+            return None
+        text = self.redo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in step["changes"]:
+            apply(key, before, after)
+        self.undo_stack.append(text)
+        self._log('{"redo":1}')
+        return step["label"]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        if self.path:
+            self._compact()
+
+    def _push(self, step, event):
+        text = json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+        self.undo_stack.append(text)
+        self.size += len(text)
+        self._log('{"%s":%s}' % (event, text))
+
+    def _trim(self):
+        while self.undo_stack and (self.size > self.budget_bytes or
+                                   self.max_steps and len(self.undo_stack) > self.max_steps):
+            self.size -= len(self.undo_stack.popleft())
+
+    def _log(self, line):
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._log_bytes += len(line) + 1
+        if self._log_bytes > 4 * self.budget_bytes + 65536:
+            self._compact()
+
+    def _replay(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._log_bytes += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if "do" in event or "amend" in event:
+                    if "amend" in event and self.undo_stack:
+                        self.undo_stack.pop()
+                    else:
+                        self.redo_stack.clear()
+                    self.undo_stack.append(json.dumps(event.get("do") or event["amend"],
+                                                      ensure_ascii=False, separators=(",", ":")))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+        self.size = sum(map(len, self.undo_stack)) + sum(map(len, self.redo_stack))
+        self._trim()
+
+    def _compact(self):
+        # Chronological order is the undo stack, then the redo stack top-down; undo back to here
+        steps = list(self.undo_stack) + self.redo_stack[::-1]
+        lines = ['{"do":%s}\n' % s for s in steps] + ['{"undo":1}\n'] * len(self.redo_stack)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+        self._log_bytes = sum(map(len, lines))
+
+def list_applier(items):
+    """apply() for UndoHistory steps keyed by list position."""
+    def apply(index, old, new):
+        if old is None:
+            items.insert(index, new)
+        elif new is None:
+            del items[index]
+        else:
+            items[index] = new
+    return apply
+
+class ChangeJournal:
+    """A JSON snapshot plus an append-only journal of the changes made since it was written.
+
+    append() costs O(size of the change); the snapshot is only rewritten by
+    compact(). The journal's first line names the snapshot it applies to (a
+    hash of its bytes), so a crash between writing a new snapshot and
+    removing the old journal cannot replay changes twice.
+    """
+
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.base = None
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def read_snapshot(self):
+        """Snapshot text, or None if there is none yet."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.base = self._digest(b"")
+            return None
+        self.base = self._digest(data)
+        return data.decode("utf-8", errors="replace")
+
+    def replay(self, apply):
+        """Re-apply journaled [key, before, after] changes on top of the snapshot just read."""
+        try:
+            f = open(self.journal_path, encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get("base") != self.base:
+                return 0  # written against an older snapshot that compact() already replaced
+            for line in f:
+                try:
+                    changes = json.loads(line)
+                except ValueError:
+                    break  # torn tail from an interrupted append
+                for key, before, after in changes:
+                    apply(key, before, after)
+                    applied += 1
+        return applied
+
+    def append(self, changes):
+        changes = [list(c) for c in changes]
+        if not changes:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            if f.tell() == 0:
+                f.write(json.dumps({"base": self.base}) + "\n")
+            f.write(json.dumps(changes, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def needs_compaction(self):
+        try:
+            journal = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        try:
+            snapshot = os.path.getsize(self.path)
+        except OSError:
+            snapshot = 0
+        return journal > max(self.COMPACT_MIN_BYTES, snapshot)
+
+    def compact(self, text):
+        """Write `text` as the new snapshot and start an empty journal."""
+        data = text.encode("utf-8")
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self.base = self._digest(data)
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+
+class SearchIndex:
+    """Inverted index from word tokens to the ids of the records containing them.
+
+    A query word matches every token it is a prefix of ("lea" finds
+    "learning", but "arn" does not), so results narrow as you type;
+    "field:word" also requires the match to be in that field.
+    Words are intersected smallest first, and a word whose prefix spans far
+    more ids than are still in the running is checked against those few
+    records instead. Exact values (a DOI, a hash, a tag) live in `keys` for
+    O(1) lookup. Several records may share an id. Results come back in the
+    order of the caller's list, which undo and inserts can rearrange.
+
+    save()/load() keep the postings next to the data file, stamped with the
+    snapshot they were built from, so startup does not re-tokenise; each
+    posting list is only decoded the first time a query touches it.
+    """
+
+    TOKEN = re.compile(r"\w+")
+    VERSION = 1
+
+    def __init__(self, fields, keys=None, key=lambda r: r["id"]):
+        self.fields = fields          # name -> fn(record) giving text or a list of strings
+        self.key_fields = keys or {}  # name -> fn(record) giving exact values
+        self.key = key
+        self.clear()
+
+    def clear(self):
+        self.records = {}   # id -> records with that id, in first-indexed order
+        self.pos = None     # id -> position in the caller's list; rebuilt after an add or remove
+        self.postings = {}  # token -> set of ids (fresh from load(): encoded positions in _ids)
+        self.vocab = []     # sorted tokens, for prefix ranges
+        self.keys = {name: {} for name in self.key_fields}  # name -> value -> set of ids
+        self._ids = []
+
+    def text(self, record, fields=None):
+        parts = []
+        for name in fields or self.fields:
+            value = self.fields[name](record)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(map(str, value))
+            parts.append(str(value or ""))
+        return " ".join(parts).lower()
+
+    def tokens(self, record, fields=None):
+        return set(self.TOKEN.findall(self.text(record, fields)))
+
+    def _ids_of(self, token):
+        ids = self.postings.get(token)
+        if isinstance(ids, str):
+            ids = self.postings[token] = {self._ids[int(i)] for i in ids.split()}
+        return ids
+
+    def _count(self, token):
+        ids = self.postings[token]
+        return ids.count(" ") + 1 if isinstance(ids, str) else len(ids)
+
+    def _add_record(self, rid, record):
+        recs = self.records.get(rid)
+        if recs is None:
+            recs = self.records[rid] = []
+        recs.append(record)
+        for name, get in self.key_fields.items():
+            for value in get(record):
+                if value:
+                    self.keys[name].setdefault(value, set()).add(rid)
+
+    def add(self, record):
+        rid = self.key(record)
+        self._add_record(rid, record)
+        for tok in self.tokens(record):
+            ids = self._ids_of(tok)
+            if ids is None:
+                ids = self.postings[tok] = set()
+                insort(self.vocab, tok)
+            ids.add(rid)
+
+    def remove(self, record, keep_slot=False):
+        rid = self.key(record)
+        recs = self.records.get(rid)
+        if not recs:
+            return
+        if record in recs:
+            recs.remove(record)
+            gone = self.tokens(record)
+        else:  # edited in place since it was indexed: the id is unique, drop what we have
+            gone = self.tokens(record).union(*(self.tokens(r) for r in recs))
+            recs.clear()
+        gone -= set().union(*(self.tokens(r) for r in recs))
+        for tok in gone:
+            ids = self._ids_of(tok)
+            if ids is None:
+                continue
+            ids.discard(rid)
+            if not ids:
+                del self.postings[tok]
+                del self.vocab[bisect_left(self.vocab, tok)]
+        for name, get in self.key_fields.items():
+            kept = {v for r in recs for v in get(r)}
+            for value in get(record):
+                ids = self.keys[name].get(value)
+                if ids is not None and value not in kept:
+                    ids.discard(rid)
+                    if not ids:
+                        del self.keys[name][value]
+        if not recs and not keep_slot:
+            del self.records[rid]
+
+    def change(self, old, new):
+        """Keep the index in step with one [before, after] change (None meaning absent)."""
+        if old is None or new is None or self.key(old) != self.key(new):
+            self.pos = None  # something was inserted or removed: list positions moved
+        if old is not None:
+            # an edit keeps the record's place in the result order
+            self.remove(old, keep_slot=new is not None and self.key(new) == self.key(old))
+        if new is not None:
+            self.add(new)
+
+    def build(self, records):
+        self.clear()
+        postings = self.postings
+        for record in records:
+            rid = self.key(record)
+            self._add_record(rid, record)
+            for tok in self.tokens(record):
+                ids = postings.get(tok)
+                if ids is None:
+                    postings[tok] = {rid}
+                else:
+                    ids.add(rid)
+        self.vocab = sorted(postings)  # one sort instead of an insort per new token
+
+    def _span(self, prefix):
+        return bisect_left(self.vocab, prefix), bisect_left(self.vocab, prefix + "\U0010ffff")
+
+    def lookup(self, name, value):
+        return self.keys[name].get(value, set())
+
+    def search(self, query, exact=()):
+        """Ids matching every word of `query` and every (name, value) in `exact`; None if there are none."""
+        clauses = []  # (estimated ids, field or None, prefix or None, ids or None)
+        for name, value in exact:
+            ids = self.lookup(name, value)
+            clauses.append((len(ids), None, None, ids))
+        for word in (query or "").lower().split():
+            field, sep, rest = word.partition(":")
+            field = field if sep and field in self.fields else None
+            for tok in self.TOKEN.findall(rest if field else word):
+                lo, hi = self._span(tok)
+                cost = sum(self._count(t) for t in self.vocab[lo:hi]) if hi - lo <= 256 else len(self.records)
+                clauses.append((cost, field, tok, None))
+        if not clauses:
+            return None
+        hits, check = None, []
+        for cost, field, prefix, ids in sorted(clauses, key=lambda c: c[0]):
+            if prefix is not None and (field or hits is not None and cost > 64 * len(hits)):
+                check.append((field, prefix))  # verified against the surviving records below
+                if hits is not None:
+                    continue
+            if ids is None:
+                lo, hi = self._span(prefix)
+                ids = set().union(*(self._ids_of(t) for t in self.vocab[lo:hi]))
+            hits = set(ids) if hits is None else hits & ids
+            if not hits:
+                return hits
+        for field, prefix in check:
+            fields = [field] if field else None
+            hits = {rid for rid in hits
+                    if any(t.startswith(prefix) for r in self.records[rid] for t in self.tokens(r, fields))}
+        return hits
+
+    def ordered(self, ids, items):
+        """`ids` in the order their records stand in `items`, the list this index was built from."""
+        if self.pos is None or len(self.pos) != len(self.records):
+            self.pos = {}
+            for i, record in enumerate(items):
+                self.pos.setdefault(self.key(record), i)
+        if len(ids) * 8 < len(self.pos):
+            return sorted(ids, key=self.pos.__getitem__)
+        return [rid for rid in self.pos if rid in ids]
+
+    def matching(self, query, items, exact=()):
+        """Records of `items` matching the query, in list order (all of them for an empty query)."""
+        hits = self.search(query, exact)
+        if hits is None:
+            return list(items)
+        return [r for rid in self.ordered(hits, items) for r in self.records[rid]]
+
+    def _schema(self):
+        return [self.VERSION, sorted(self.fields)]
+
+    def save(self, path, stamp):
+        ids = self._ids
+        if len(ids) > 2 * len(self.records) + 1024:  # mostly deleted ids: re-encode from scratch
+            for tok in self.vocab:
+                self._ids_of(tok)
+            ids = []
+        pos = {rid: i for i, rid in enumerate(ids)}
+        for rid in self.records:
+            if rid not in pos:
+                pos[rid] = len(ids)
+                ids.append(rid)
+        postings = {}
+        for tok in self.vocab:
+            p = self.postings[tok]
+            postings[tok] = p if isinstance(p, str) else " ".join([str(pos[rid]) for rid in p])
+        data = {"schema": self._schema(), "stamp": stamp, "ids": ids, "postings": postings}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._ids = ids
+
+    def load(self, path, stamp, records):
+        """Index `records` from the saved postings if they were built from snapshot `stamp`.
+
+        Returns False (leaving the index empty) if there is no usable saved index.
+        """
+        self.clear()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("stamp") != stamp or data.get("schema") != self._schema():
+            return False
+        for record in records:
+            self._add_record(self.key(record), record)
+        self._ids = data["ids"]
+        self.postings = data["postings"]
+        self.vocab = list(self.postings)
+        return True
+
 # In-memory structures
 citations = []  # list of dicts
-history_undo = deque(maxlen=MAX_HISTORY)
-history_redo = deque(maxlen=MAX_HISTORY)
+history = UndoHistory(budget_bytes=HISTORY_BUDGET, max_steps=MAX_HISTORY, coalesce_s=COALESCE_S)
+journal = ChangeJournal(DATA_FILE)
+search_index = SearchIndex(
+    {"title": lambda c: c.get("title", ""), "authors": lambda c: c.get("authors", []),
+     "year": lambda c: c.get("year", ""), "doi": lambda c: c.get("doi", ""), "notes": lambda c: c.get("notes", "")},
+    keys={"doi": lambda c: [(c.get("doi") or "").lower()], "id": lambda c: [(c.get("id") or "").upper()]},
+    key=lambda c: c.get("id"),
+)
 
 selected_index = 0
 filter_query = None
@@ -53,38 +534,61 @@ filter_query = None
 def colored(text, color):
     return f"{color}{text}{RESET}"
 
-def save_state(push_history=True):
-    global citations
-    if push_history:
-        # push copy to undo
-        history_undo.append(json.dumps(citations, ensure_ascii=False))
-        history_redo.clear()
+def save_state():
+    """Rewrite citations.json in full and start a fresh journal (on quit, or once the journal grows)."""
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(citations, f, ensure_ascii=False, indent=2)
+        journal.compact(json.dumps(citations, ensure_ascii=False, indent=2))
+        search_index.save(INDEX_FILE, journal.base)
     except Exception as e:
         print(colored(f"Error saving data: {e}", RED))
 
+def persist(changes):
+    """Save just these [index, before, after] changes."""
+    try:
+        journal.append(changes)
+    except Exception as e:
+        print(colored(f"Error saving data: {e}", RED))
+        return
+    if journal.needs_compaction():
+        save_state()
+
+def commit(label, changes, group=None):
+    """Record one edit for undo, index it and persist its delta."""
+    history.record(label, changes, group)
+    for _, old, new in changes:
+        search_index.change(old, new)
+    persist(changes)
+
+def _indexing(apply):
+    def fn(index, old, new):
+        apply(index, old, new)
+        search_index.change(old, new)
+    return fn
+
 def load_state_file(filename):
     global citations
+    text = None
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        text = journal.read_snapshot()
+        data = json.loads(text)
         if isinstance(data, list):
             citations = data
-            save_state(push_history=False)
+            if not search_index.load(INDEX_FILE, journal.base, citations):
+                search_index.build(citations)
+            journal.replay(_indexing(list_applier(citations)))
             return True
         else:
             print(colored("Data file malformed (expected list). Starting with empty DB.", YELLOW))
             citations = []
-            save_state(push_history=False)
+            save_state()
             return False
     except Exception as e:
         print(colored(f"Could not load {filename}: {e}. Attempting recovery.", YELLOW))
         # attempt recovery: try to locate last valid JSON fragment
         try:
-            with open(filename, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
+            if text is None:
+                with open(filename, "r", encoding="utf-8", errors="ignore") as f:
+                    text = f.read()
             # naive recovery: find first '[' and last ']' and parse
             start = text.find('[')
             end = text.rfind(']')
@@ -93,20 +597,21 @@ def load_state_file(filename):
                 data = json.loads(fragment)
                 if isinstance(data, list):
                     citations = data
-                    save_state(push_history=False)
+                    search_index.build(citations)
+                    save_state()
                     print(colored("Recovered partial data into new DB.", YELLOW))
                     return True
         except Exception:
             pass
         citations = []
-        save_state(push_history=False)
+        save_state()
         return False
 
 def load_data():
     if os.path.exists(DATA_FILE):
         load_state_file(DATA_FILE)
     else:
-        save_state(push_history=False)
+        save_state()
 
 def make_id_hash(item):
     core = (item.get("title","") + "|" + ",".join(item.get("authors",[])) + "|" + str(item.get("year","")) + "|" + item.get("doi","")).encode("utf-8")
@@ -115,7 +620,9 @@ def make_id_hash(item):
 def find_duplicates(doi):
     if not doi:
         return []
-    return [c for c in citations if c.get("doi") and c.get("doi").lower()==doi.lower()]
+    doi = doi.lower()
+    ids = search_index.lookup("doi", doi)
+    return [c for rid in ids for c in search_index.records[rid] if (c.get("doi") or "").lower() == doi]
 
 def parse_pdf_filename(path):
     # Attempt simple filename parsing: title_author_year.pdf or title - author (year).pdf
@@ -174,9 +681,9 @@ def add_citation_interactive(from_path=None, prefilled=None):
             print(colored(f"Warning: {len(dups)} existing citation(s) with same DOI.", YELLOW))
     item["id"] = make_id_hash(item)
     citations.append(item)
-    save_state(push_history=True)
+    commit("add", [(len(citations) - 1, None, item)])
     print(colored(f"Added citation: {title}", GREEN))
-    print(colored(f"share: python {os.path.basename(sys.argv)} load:{item['id']}", CYAN))
+    print(colored(f"share: python {os.path.basename(sys.argv[0])} load:{item['id']}", CYAN))
     return item
 
 def edit_citation(idx):
@@ -195,7 +702,7 @@ def edit_citation(idx):
     notes = input(f" Notes [{c.get('notes','')}]: ").strip() or c.get("notes","")
     new = {"id": c.get("id"), "title": title, "authors": authors, "year": year, "doi": doi, "pdf": pdf, "notes": notes}
     citations[idx] = new
-    save_state(push_history=True)
+    commit("edit", [(idx, c, new)], group=f"edit:{c.get('id')}")
     print(colored("Citation edited.", YELLOW))
 
 def remove_citation(idx):
@@ -204,7 +711,7 @@ def remove_citation(idx):
         print(colored("Invalid index.", RED))
         return
     item = citations.pop(idx)
-    save_state(push_history=True)
+    commit("delete", [(idx, item, None)])
     print(colored(f"Deleted: {item.get('title','(no title)')}", RED))
 
 def open_pdf(idx):
@@ -302,41 +809,40 @@ def list_citations(filtered=None, selected=0):
         print(f"{idx_mark} [{i}] {title} — {authors} {('('+str(year)+')') if year else ''} {('[DOI]' if doi else '')}")
 
 def filter_citations(query):
+    # Every word must start a word of title/authors/year/doi/notes; "author:smi" limits it to a field
     q = (query or "").lower().strip()
     if not q:
         return list(citations)
-    res = []
-    for c in citations:
-        text = " ".join([c.get("title",""), " ".join(c.get("authors",[])), str(c.get("year","")), c.get("doi",""), c.get("notes","")]).lower()
-        if q in text:
-            res.append(c)
-    return res
+    return search_index.matching(q.replace("author:", "authors:"), citations)
+
+def _applying(applied):
+    # apply() that also collects what it did, so undo/redo persist only their delta
+    apply = _indexing(list_applier(citations))
+    def fn(index, old, new):
+        apply(index, old, new)
+        applied.append([index, old, new])
+    return fn
 
 def undo():
-    global citations
-    if not history_undo:
+    applied = []
+    if history.undo(_applying(applied)) is None:
         print(colored("No undo history.", YELLOW))
         return
-    state = history_undo.pop()
-    history_redo.append(json.dumps(citations, ensure_ascii=False))
-    citations = json.loads(state)
-    save_state(push_history=False)
+    persist(applied)
     print(colored("Undo applied.", YELLOW))
 
 def redo():
-    global citations
-    if not history_redo:
+    applied = []
+    if history.redo(_applying(applied)) is None:
         print(colored("No redo history.", YELLOW))
         return
-    state = history_redo.pop()
-    history_undo.append(json.dumps(citations, ensure_ascii=False))
-    citations = json.loads(state)
-    save_state(push_history=False)
+    persist(applied)
     print(colored("Redo applied.", YELLOW))
 
 def handle_load_hash(hashid):
     # If hash provided, filter citations to those with that id, or if not present, create quick set
-    matches = [c for c in citations if c.get("id","").upper() == hashid.upper()]
+    ids = search_index.lookup("id", hashid.strip().upper())
+    matches = [c for rid in ids for c in search_index.records[rid]]
     if matches:
         print(colored(f"Loaded citation set with {len(matches)} item(s).", GREEN))
         return matches
@@ -385,7 +891,7 @@ def main_loop(preload_filtered=None):
         # interpret commands
         lower = cmd.lower()
         if lower == "q":
-            save_state(push_history=False)
+            save_state()
             print(colored("Quitting and saving.", CYAN))
             break
         elif lower == "n":
@@ -394,7 +900,7 @@ def main_loop(preload_filtered=None):
             selected_index = len(filtered)-1
             input(colored("Added. Press Enter.", GREEN))
         elif lower == "s":
-            q = input("Search query (author/title/year/keywords). Blank to clear: ").strip()
+            q = input("Search (each word matches the start of a word; author:smi for one field). Blank to clear: ").strip()
             filter_query = q or None
             filtered = list(citations) if not filter_query else filter_citations(filter_query)
             selected_index = 0 if filtered else -1
@@ -516,7 +1022,7 @@ def ensure_minimal_test_flow():
             sample = {"title":"Quantum Computing","authors":["A. Einstein"],"year":"2025","doi":"","pdf":"","notes":"Sample entry"}
             sample["id"] = make_id_hash(sample)
             citations.append(sample)
-            save_state(push_history=True)
+            commit("add", [(len(citations) - 1, None, sample)])
             print(colored("Sample citation added.", GREEN))
             time.sleep(0.8)
 
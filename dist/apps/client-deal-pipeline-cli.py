@@ -5,18 +5,22 @@ import configparser
 import csv
 import json
 import os
-import shutil
+import re
+import sqlite3
 import sys
-import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, date
 from pathlib import Path
 
 STAGES = ["Lead", "Qualified", "Proposal", "Negotiation", "Won", "Lost"]
 DATE_FMT = "%Y-%m-%d"
 DATETIME_FMT = "%Y-%m-%dT%H:%M:%S"
-DEFAULT_DATA_FILE = "deals.json"
+DEFAULT_DATA_FILE = "deals.json"  # legacy JSON; deals live in the .sqlite3 file next to it
 CONFIG_FILE = ".dealsrc"
 ENV_DATA_FILE = "DEALS_DATA_FILE"
+HISTORY_BUDGET = 256 * 1024  # bytes of undo/redo steps kept in the .undo.jsonl log
 
 
 def load_config():
@@ -63,48 +67,429 @@ def get_data_file(args, config):
     return Path(DEFAULT_DATA_FILE)
 
 
-def atomic_save(path, data):
-    tmp_fd, tmp_name = tempfile.mkstemp(prefix="deals_tmp_", dir=str(path.parent))
-    os.close(tmp_fd)
-    try:
-        with open(tmp_name, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, sort_keys=True)
-        shutil.move(tmp_name, path)
-    finally:
-        if os.path.exists(tmp_name):
-            try:
-                os.remove(tmp_name)
-            except OSError:
-                pass
-
-
-def load_deals(path):
-    if not path.exists():
-        return []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        backup = path.with_suffix(path.suffix + ".bak")
+class EntryStore:
+    """Records kept as rows of a sqlite3 database instead of one big JSON document.
+
+    Commands load only the date range they need, and save() writes only the
+    rows that were added, changed or removed since they were loaded, so adding
+    one entry costs the same with 10 or 100k entries on file. Writes go through
+    one WAL transaction per save: a crash leaves either the old or the new state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS records (scope TEXT NOT NULL, key TEXT NOT NULL, day TEXT NOT NULL,"
+            " body TEXT NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS records_by_day ON records (scope, day);"
+            "CREATE INDEX IF NOT EXISTS records_by_int_key ON records (scope, CAST(key AS INTEGER));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._loaded = {}  # scope -> {key: body as last read or written}
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
         try:
-            shutil.copy2(path, backup)
-        except OSError:
-            pass
-        print(f"Warning: Malformed JSON in {path}. Backed up to {backup}. Starting with empty list.", file=sys.stderr)
-        return []
-    except FileNotFoundError:
-        return []
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True, ensure_ascii=False)),
+        )
+
+    def _track(self, scope, rows, replace=False):
+        if replace:
+            self._loaded[scope] = {}
+        seen = self._loaded.setdefault(scope, {})
+        rows = rows.fetchall()
+        seen.update(rows)
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for _, body in rows) + "]")
+
+    @staticmethod
+    def _range(columns, scope, since, until):
+        sql, params = f"SELECT {columns} FROM records WHERE scope = ?", [scope]
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(str(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(str(until))
+        return sql + " ORDER BY day, rowid", params
+
+    def load(self, scope, since=None, until=None):
+        """Records of `scope` whose day lies in [since, until]; either bound may be None.
+
+        The result (plus anything fetch()ed later) is what the next save() diffs against.
+        """
+        sql, params = self._range("key, body", scope, since, until)
+        return self._track(scope, self.db.execute(sql, params), replace=True)
+
+    def read(self, scope, since=None, until=None):
+        """load() for commands that never save: sqlite joins the bodies, so one row and one json.loads."""
+        sql, params = self._range("body", scope, since, until)
+        # the outer query has no ORDER BY or join, so sqlite keeps the subquery's order
+        row = self.db.execute(f"SELECT '[' || COALESCE(group_concat(body, ','), '') || ']' FROM ({sql})", params)
+        return json.loads(row.fetchone()[0])
+
+    def fetch(self, scope, key):
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ? AND key = ?", (scope, str(key)))
+        found = self._track(scope, rows)
+        return found[0] if found else None
+
+    def count(self, scope):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def max_key(self, scope):
+        row = self.db.execute("SELECT MAX(CAST(key AS INTEGER)) FROM records WHERE scope = ?", (scope,)).fetchone()
+        return row[0] or 0
+
+    def save(self, scope, records, key, day):
+        """Write records that are new or changed since load()/fetch(); delete loaded ones that are gone."""
+        seen = self._loaded.get(scope, {})
+        live, upserts = {}, []
+        for rec in records:
+            k = str(key(rec))
+            body = json.dumps(rec, sort_keys=True, ensure_ascii=False)
+            live[k] = body
+            if seen.get(k) != body:
+                upserts.append((scope, k, str(day(rec) or ""), body))
+        deletes = [(scope, k) for k in seen if k not in live]
+        self.db.executemany(
+            "INSERT INTO records (scope, key, day, body) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(scope, key) DO UPDATE SET day = excluded.day, body = excluded.body",
+            upserts,
+        )
+        self.db.executemany("DELETE FROM records WHERE scope = ? AND key = ?", deletes)
+        self._loaded[scope] = live
+        return len(upserts) + len(deletes)
+
+    def forget(self, scope):
+        """Nothing of `scope` was loaded: the next save() only adds or updates."""
+        self._loaded.pop(scope, None)
+
+    def drop(self, scope):
+        self.db.execute("DELETE FROM records WHERE scope = ?", (scope,))
+        self.forget(scope)
+
+    def migrate(self, legacy_path, importer):
+        """One-time import of the old JSON file, which is left in place as a backup."""
+        legacy_path = Path(legacy_path)
+        if self.get_meta("migrated_from") is not None:
+            return False
+        with self.transaction():
+            if self.get_meta("migrated_from") is not None:  # another process got there first
+                return False
+            if legacy_path.exists():
+                try:
+                    with legacy_path.open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except ValueError:
+                    print(f"Could not read {legacy_path}; starting with an empty store.", file=sys.stderr)
+                else:
+                    importer(self, raw)
+            self.set_meta("migrated_from", str(legacy_path))
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # fold the bulk import into the main file
+        self._loaded.clear()
+        return True
+
+
+class UndoHistory:
+    """Undo/redo as inverse deltas instead of whole-state snapshots.
+
+    A step holds only what one command changed: [key, before, after] triples,
+    None meaning "absent". undo() writes each `before` back and redo() each
+    `after` through an apply(key, old, new) callback, so both cost O(size of
+    the change). Steps are stored serialized; the oldest are dropped once the
+    stacks exceed `budget_bytes` (or `max_steps`). Steps sharing a `group`
+    recorded within `coalesce_s` seconds merge into one. With `path`, every
+    step/undo/redo is appended to a JSON-lines file and replayed on start.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024, max_steps=None, coalesce_s=2.0, path=None):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.path = path
+        self.undo_stack = deque()  # serialized steps, oldest first
+        self.redo_stack = []       # serialized steps, next to redo last
+        self.size = 0
+        self._log_bytes = 0
+        if path:
+            self._replay()
+
+    def record(self, label, changes, group=None):
+        """Push one step; returns False if nothing actually changed."""
+        changes = [[key, before, after] for key, before, after in changes if before != after]
+        if not changes:
+            return False
+        now = time.time()
+        top = json.loads(self.undo_stack[-1]) if group is not None and self.undo_stack and not self.redo_stack else None
+        if top is not None and top.get("group") == group and now - top["t"] <= self.coalesce_s:
+            latest = {json.dumps(c[0]): c for c in top["changes"]}
+            for key, before, after in changes:
+                prev = latest.get(json.dumps(key))
+                if prev is not None and prev[2] == before:
+                    prev[2] = after
+                else:
+                    top["changes"].append([key, before, after])
+                    latest[json.dumps(key)] = top["changes"][-1]
+            top["t"] = now
+            self.size -= len(self.undo_stack.pop())
+            self._push(top, "amend")
+        else:
+            self.size -= sum(len(s) for s in self.redo_stack)
+            self.redo_stack.clear()
+            self._push({"label": label, "group": group, "t": now, "changes": changes}, "do")
+        self._trim()
+        return True
+
+    def undo(self, apply):
+        """Revert the latest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        text = self.undo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in reversed(step["changes"]):
+            apply(key, after, before)
+        self.redo_stack.append(text)
+        self._log('{"undo":1}')
+        return step["label"]
+
+    def redo(self, apply):
+        if not self.redo_stack:
+            return None
+        text = self.redo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in step["changes"]:
+            apply(key, before, after)
+        self.undo_stack.append(text)
+        self._log('{"redo":1}')
+        return step["label"]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        if self.path:
+            self._compact()
+
+    def _push(self, step, event):
+        text = json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+        self.undo_stack.append(text)
+        self.size += len(text)
+        self._log('{"%s":%s}' % (event, text))
+
+    def _trim(self):
+        while self.undo_stack and (self.size > self.budget_bytes or
+                                   self.max_steps and len(self.undo_stack) > self.max_steps):
+            self.size -= len(self.undo_stack.popleft())
+
+    def _log(self, line):
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._log_bytes += len(line) + 1
+        if self._log_bytes > 4 * self.budget_bytes + 65536:
+            self._compact()
+
+    def _replay(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._log_bytes += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if "do" in event or "amend" in event:
+                    if "amend" in event and self.undo_stack:
+                        self.undo_stack.pop()
+                    else:
+                        self.redo_stack.clear()
+                    self.undo_stack.append(json.dumps(event.get("do") or event["amend"],
+                                                      ensure_ascii=False, separators=(",", ":")))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+        self.size = sum(map(len, self.undo_stack)) + sum(map(len, self.redo_stack))
+        self._trim()
+
+    def _compact(self):
+        # Chronological order is the undo stack, then the redo stack top-down; undo back to here
+        steps = list(self.undo_stack) + self.redo_stack[::-1]
+        lines = ['{"do":%s}\n' % s for s in steps] + ['{"undo":1}\n'] * len(self.redo_stack)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+        self._log_bytes = sum(map(len, lines))
+
+
+class DealStore(EntryStore):
+    """EntryStore that also keeps a word index of the deals in a `terms` table.
+
+    Terms are the lowercased word tokens of title/client/notes plus exact
+    "=stage=..." and "=owner=..." values. save() re-indexes only the rows it
+    writes, so `list --search/--stage/--owner` reads matching keys from the
+    index (a search word matches tokens it is a prefix of) and fetches just
+    those rows instead of loading the whole pipeline.
+    """
+
+    TOKEN = re.compile(r"\w+")
+    TEXT_FIELDS = ("title", "client", "notes")
+    EXACT_FIELDS = ("stage", "owner")
+    TERMS_VERSION = 1
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS terms (scope TEXT NOT NULL, term TEXT NOT NULL, key TEXT NOT NULL,"
+            " PRIMARY KEY (scope, key, term)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS terms_by_term ON terms (scope, term, key);"
+        )
+
+    @classmethod
+    def words(cls, text):
+        return cls.TOKEN.findall(str(text or "").lower())
+
+    @classmethod
+    def terms(cls, deal):
+        out = set(cls.words(" ".join(str(deal.get(f) or "") for f in cls.TEXT_FIELDS)))
+        out.update(f"={f}={deal.get(f)}" for f in cls.EXACT_FIELDS if deal.get(f))
+        return out
+
+    def _index(self, scope, keyed):
+        self.db.executemany("DELETE FROM terms WHERE scope = ? AND key = ?", [(scope, k) for k, _ in keyed])
+        self.db.executemany("INSERT OR IGNORE INTO terms (scope, term, key) VALUES (?, ?, ?)",
+                            [(scope, t, k) for k, rec in keyed if rec is not None for t in self.terms(rec)])
+
+    def save(self, scope, records, key, day):
+        seen = dict(self._loaded.get(scope, {}))
+        written = super().save(scope, records, key, day)
+        if written:
+            live = self._loaded[scope]
+            keyed = [(str(key(r)), r) for r in records if seen.get(str(key(r))) != live[str(key(r))]]
+            self._index(scope, keyed + [(k, None) for k in seen if k not in live])
+        return written
+
+    def reindex(self, scope):
+        """Rebuild the terms of a store written before the index existed."""
+        self.db.execute("DELETE FROM terms WHERE scope = ?", (scope,))
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ?", (scope,)).fetchall()
+        self._index(scope, [(k, json.loads(body)) for k, body in rows])
+        self.set_meta(f"terms_version:{scope}", self.TERMS_VERSION)
+
+    def search(self, scope, words=(), exact=()):
+        """Records with a token starting with every word and every exact term, as load() would order them."""
+        clauses = [("term >= ? AND term < ?", (w, w + "\U0010ffff")) for w in words]
+        clauses += [("term = ?", (term,)) for term in exact]
+        # Drive from the most selective clause (counted up to a cap) and probe the rest per candidate
+        clauses.sort(key=lambda c: self.db.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM terms INDEXED BY terms_by_term WHERE scope = ? AND {c[0]} LIMIT 10000)",
+            (scope, *c[1]),
+        ).fetchone()[0])
+        (cond, params), rest = clauses[0], clauses[1:]
+        sql = (f"SELECT r.key, r.body FROM (SELECT DISTINCT key FROM terms INDEXED BY terms_by_term"
+               f" WHERE scope = ? AND {cond}) k"
+               " CROSS JOIN records r ON r.scope = ? AND r.key = k.key WHERE 1")
+        args = [scope, *params, scope]
+        for cond, params in rest:
+            sql += f" AND EXISTS (SELECT 1 FROM terms WHERE terms.scope = r.scope AND terms.key = r.key AND {cond})"
+            args += params
+        return self._track(scope, self.db.execute(sql + " ORDER BY r.day, r.rowid", args), replace=True)
+
+
+_store = None
+
+
+def store_path(path):
+    return Path(path).with_suffix(".sqlite3")
+
+
+def deal_day(deal):
+    return (deal.get("created_at") or "")[:10]
+
+
+def import_legacy(store, raw):
+    if isinstance(raw, list):
+        store.save("deals", raw, key=lambda d: d.get("id"), day=deal_day)
+        store.set_meta("terms_version:deals", DealStore.TERMS_VERSION)  # save() indexed them
+
+
+def open_store(path):
+    global _store
+    if _store is None or _store.path != store_path(path):
+        _store = DealStore(store_path(path))
+        _store.migrate(path, import_legacy)
+        if _store.get_meta("terms_version:deals") != DealStore.TERMS_VERSION:
+            with _store.transaction():
+                _store.reindex("deals")
+    return _store
+
+
+def load_deals(path, ids=None):
+    """All deals for read-only commands, or only those with the given ids (move/edit/delete touch one row)."""
+    store = open_store(path)
+    if ids is None:
+        return store.read("deals")  # list/stats/export never save, so nothing is tracked for a diff
+    store.forget("deals")
+    return [d for d in (store.fetch("deals", i) for i in ids) if d is not None]
+
+
+def find_deals(path, args):
+    """Deals that can pass list's --search/--stage/--owner, read through the terms index."""
+    words = DealStore.words(args.search)
+    exact = [f"={f}={getattr(args, f)}" for f in DealStore.EXACT_FIELDS if getattr(args, f)]
+    if not words and not exact:
+        return load_deals(path)
+    return open_store(path).search("deals", words, exact)
 
 
 def save_deals(path, deals, no_save):
     if no_save:
         return
-    path.parent.mkdir(parents=True, exist_ok=True)
-    atomic_save(path, deals)
+    store = open_store(path)
+    with store.transaction():
+        store.save("deals", deals, key=lambda d: d.get("id"), day=deal_day)
+
+
+def open_history(path, no_save=False):
+    history = UndoHistory(HISTORY_BUDGET, path=str(Path(path).with_suffix(".undo.jsonl")))
+    if no_save:
+        history.path = None  # look, but leave the log as it is
+    return history
+
+
+def deal_changes(before, after):
+    """[id, before, after] for every deal a command added, changed or removed."""
+    old = {d.get("id"): d for d in before}
+    new = {d.get("id"): d for d in after}
+    return [(i, old.get(i), new.get(i)) for i in sorted(old.keys() | new.keys(), key=str)]
 
 
 def next_id(deals):
-    return max((d.get("id", 0) for d in deals), default=0) + 1
+    known = _store.max_key("deals") if _store is not None else 0
+    return max(max((d.get("id", 0) for d in deals), default=0), known) + 1
 
 
 def truncate(text, width):
@@ -150,15 +535,7 @@ def filter_deals(deals, args):
         res = [d for d in res if isinstance(d.get("value"), (int, float)) and d.get("value", 0) >= args.min_value]
     if args.max_value is not None:
         res = [d for d in res if isinstance(d.get("value"), (int, float)) and d.get("value", 0) <= args.max_value]
-    if args.search:
-        q = args.search.lower()
-        res = [
-            d
-            for d in res
-            if q in str(d.get("title", "")).lower()
-            or q in str(d.get("client", "")).lower()
-            or q in str(d.get("notes", "")).lower()
-        ]
+    # --search is answered by find_deals() from the terms index before the deals are even read
     key = None
     if args.sort == "value":
         key = lambda d: d.get("value", 0.0)
@@ -410,24 +787,28 @@ def cmd_export(args, deals, config):
     return deals
 
 
-def cmd_undo(args, deals, history, redo_stack):
-    if not history:
-        print("Nothing to undo.")
-        return deals, history, redo_stack
-    prev_state, desc = history.pop()
-    redo_stack.append((json.loads(json.dumps(deals)), desc))
-    print("Undid last operation.")
-    return prev_state, history, redo_stack
+def _replay_step(args, data_file, step):
+    """Run history.undo/redo, then load and rewrite only the deals that step touched."""
+    targets = {}
+    label = step(lambda key, old, new: targets.__setitem__(key, new))
+    if label is None:
+        return None
+    deals = [d for d in load_deals(data_file, ids=list(targets)) if d.get("id") not in targets]
+    deals += [d for d in targets.values() if d is not None]
+    save_deals(data_file, deals, args.no_save)
+    return label
+
 
+def cmd_undo(args, data_file):
+    history = open_history(data_file, args.no_save)
+    label = _replay_step(args, data_file, history.undo)
+    print(f"Undid last {label}." if label else "Nothing to undo.")
 
-def cmd_redo(args, deals, history, redo_stack):
-    if not redo_stack:
-        print("Nothing to redo.")
-        return deals, history, redo_stack
-    next_state, desc = redo_stack.pop()
-    history.append((json.loads(json.dumps(deals)), desc))
-    print("Redid last operation.")
-    return next_state, history, redo_stack
+
+def cmd_redo(args, data_file):
+    history = open_history(data_file, args.no_save)
+    label = _replay_step(args, data_file, history.redo)
+    print(f"Redid {label}." if label else "Nothing to redo.")
 
 
 def main_usage(parser):
@@ -443,8 +824,8 @@ def main_usage(parser):
     print("  delete    Delete a deal")
     print("  stats     Show pipeline statistics")
     print("  export    Export deals as JSON or CSV")
-    print("  undo      Undo last change (current session)")
-    print("  redo      Redo last undone change (current session)")
+    print("  undo      Undo last change (kept across runs)")
+    print("  redo      Redo last undone change")
     print()
     print("Run 'python deals.py <command> --help' for details on a command.")
     parser.print_help()
@@ -452,7 +833,7 @@ def main_usage(parser):
 
 def build_parser(config):
     parser = argparse.ArgumentParser(add_help=True, description="Client Deal Pipeline CLI")
-    parser.add_argument("--data-file", help="Path to deals JSON file")
+    parser.add_argument("--data-file", help="Path to deals JSON file (kept in a .sqlite3 file next to it)")
     parser.add_argument("--compact", action="store_true", help="Use more compact tabular output")
     parser.add_argument("--plain", action="store_true", help="Disable any styling (placeholder)")
     parser.add_argument("--no-save", action="store_true", help="Do not write any changes to disk (in-memory only)")
@@ -473,7 +854,7 @@ def build_parser(config):
     p_list.add_argument("--owner", help="Filter by owner")
     p_list.add_argument("--min-value", type=float, help="Minimum deal value")
     p_list.add_argument("--max-value", type=float, help="Maximum deal value")
-    p_list.add_argument("--search", help="Search in title, client, notes")
+    p_list.add_argument("--search", help="Search words in title, client, notes (prefixes match)")
     p_list.add_argument(
         "--sort",
         choices=["value", "stage", "client", "owner", "next_action", "created_at"],
@@ -513,10 +894,10 @@ def build_parser(config):
     p_export.add_argument("--output", help="Output file path (default: stdout)")
     p_export.set_defaults(func="export")
 
-    p_undo = subparsers.add_parser("undo", help="Undo last change in current session")
+    p_undo = subparsers.add_parser("undo", help="Undo last change (kept across runs)")
     p_undo.set_defaults(func="undo")
 
-    p_redo = subparsers.add_parser("redo", help="Redo last undone change in current session")
+    p_redo = subparsers.add_parser("redo", help="Redo last undone change")
     p_redo.set_defaults(func="redo")
 
     return parser
@@ -530,14 +911,18 @@ def main():
         sys.exit(0)
     args = parser.parse_args()
     data_file = get_data_file(args, config)
-    deals = load_deals(data_file)
-    history = []
-    redo_stack = []
     command = getattr(args, "command", None)
-
-    if command in ("add", "move", "edit", "delete"):
-        history.append((json.loads(json.dumps(deals)), command))
-        redo_stack.clear()
+    if command in ("move", "edit", "delete"):
+        deals = load_deals(data_file, ids=[args.id])
+    elif command == "add":
+        deals = load_deals(data_file, ids=[])
+    elif command in ("undo", "redo"):
+        deals = []
+    elif command == "list":
+        deals = find_deals(data_file, args)
+    else:
+        deals = load_deals(data_file)
+    before = json.loads(json.dumps(deals)) if command in ("add", "move", "edit", "delete") else None
 
     if command == "add":
         deals, _ = cmd_add(args, deals, config)
@@ -559,14 +944,17 @@ def main():
     elif command == "export":
         cmd_export(args, deals, config)
     elif command == "undo":
-        deals, history, redo_stack = cmd_undo(args, deals, history, redo_stack)
-        save_deals(data_file, deals, args.no_save)
+        cmd_undo(args, data_file)
     elif command == "redo":
-        deals, history, redo_stack = cmd_redo(args, deals, history, redo_stack)
-        save_deals(data_file, deals, args.no_save)
+        cmd_redo(args, data_file)
     else:
         parser.print_help()
 
+    if before is not None and not args.no_save:
+        # Only the deals this command touched go into the step, not the whole pipeline
+        group = f"edit:{args.id}" if command == "edit" else None
+        open_history(data_file).record(command, deal_changes(before, deals), group)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,8 +5,12 @@ import os
 import json
 import argparse
 import re
+import csv
 import math
 import time
+import heapq
+import bisect
+import colorsys
 from urllib.parse import urlencode, parse_qs, urlparse
 from collections import deque
 
@@ -46,11 +50,15 @@ def srgb_to_linear(c):
     """Convert sRGB channel to linear light."""
     return c/12.92 if c <= 0.03928 else ((c + 0.055)/1.055)**2.4
 
+# srgb_to_linear of every 8-bit channel value
+LINEAR = tuple(srgb_to_linear(i / 255.0) for i in range(256))
+
 def relative_luminance(r, g, b):
-    """Calculate relative luminance per WCAG formula."""
-    srgb = rgb_to_srgb(r, g, b)
-    linear = [srgb_to_linear(c) for c in srgb]
-    return 0.2126*linear[0] + 0.7152*linear[1] + 0.0722*linear[2]
+    """Calculate relative luminance per WCAG formula (channels 0-255)."""
+    return 0.2126*LINEAR[r] + 0.7152*LINEAR[g] + 0.0722*LINEAR[b]
+
+def rgb_to_hex(rgb):
+    return "#%02x%02x%02x" % tuple(rgb)
 
 def contrast_ratio(lum1, lum2):
     """Calculate WCAG contrast ratio."""
@@ -69,15 +77,20 @@ def format_ratio(ratio):
     return f"{ratio:.1f}:1"
 
 def suggest_fix(fg_rgb, bg_rgb, ratio):
-    """Simple fix suggestions."""
-    fg_lum = relative_luminance(*fg_rgb)
-    bg_lum = relative_luminance(*bg_rgb)
-    
+    """Verdict for a pair; for a failing one, the nearest FG (else BG) colour that passes AA."""
     if ratio >= 7.0:
         return "Perfect"
     elif ratio >= 4.5:
         return "Good (AA)"
-    elif fg_lum > bg_lum:
+    engine = ContrastEngine([('fg', fg_rgb), ('bg', bg_rgb)])
+    for i, j, label in ((0, 1, 'FG'), (1, 0, 'BG')):
+        found = engine.fix(i, j)
+        if found:
+            rgb, fixed = found
+            verb = "Darken" if relative_luminance(*rgb) < engine.lums[i] else "Lighten"
+            return f"{verb} {label} to {rgb_to_hex(rgb)} ({format_ratio(fixed)})"
+    fg_lum, bg_lum = engine.lums
+    if fg_lum > bg_lum:
         return "Darken FG or lighten BG"
     else:
         return "Lighten FG or darken BG"
@@ -94,33 +107,345 @@ def create_share_url(fg_hex, bg_hex, ratio):
     """Create shareable URL."""
     return f"contrastchecker://fg={fg_hex}&bg={bg_hex}&ratio={ratio:.1f}"
 
+AA_RATIO, AAA_RATIO = 4.5, 7.0
+LIGHTNESS_STEPS = 256  # HSL lightness levels a fix is searched over
+
+
+class ContrastEngine:
+    """WCAG contrast of every pair in a palette, and the nearest passing colour for each failing pair.
+
+    Luminances come from the 256-entry LINEAR table and are computed once
+    per colour. A ratio is (max + 0.05) / (min + 0.05), so with luminances
+    sorted, the colours that pass against one colour at ratio t are a prefix
+    and a suffix of the sorted order, found by bisection. A fix keeps the
+    foreground's hue and saturation and moves its HSL lightness. Luminance
+    never decreases with lightness, so the closest passing level is found by
+    bisecting a per-colour ramp of LIGHTNESS_STEPS levels.
+    """
+
+    def __init__(self, colors):
+        """`colors` is a list of (name, (r, g, b)) with 0-255 channels."""
+        self.names = [name for name, _ in colors]
+        self.rgbs = [tuple(rgb) for _, rgb in colors]
+        self.lums = [0.2126 * LINEAR[r] + 0.7152 * LINEAR[g] + 0.0722 * LINEAR[b] for r, g, b in self.rgbs]
+        self.order = sorted(range(len(self.rgbs)), key=self.lums.__getitem__)
+        self.sorted_lums = [self.lums[i] for i in self.order]
+        self._ramps = {}
+
+    def __len__(self):
+        return len(self.rgbs)
+
+    @staticmethod
+    def ratio_of(lum1, lum2):
+        if lum1 < lum2:
+            lum1, lum2 = lum2, lum1
+        return (lum1 + 0.05) / (lum2 + 0.05)
+
+    def ratio(self, i, j):
+        return self.ratio_of(self.lums[i], self.lums[j])
+
+    def matrix(self):
+        """Ratios of every foreground (row) against every background (column)."""
+        shifted = [lum + 0.05 for lum in self.lums]
+        return [[a / b if a >= b else b / a for b in shifted] for a in shifted]
+
+    def _split(self, i, target):
+        """(a, b): sorted positions [0, a) and [b, n) pass against colour i at `target`, [a, b) fail."""
+        lum, lums, n = self.lums[i], self.sorted_lums, len(self.lums)
+        a = bisect.bisect_right(lums, (lum + 0.05) / target - 0.05)
+        b = bisect.bisect_left(lums, target * (lum + 0.05) - 0.05, a)
+        # the cut-offs are rounded; settle the colours right at them with the exact ratio
+        while a and self.ratio_of(lum, lums[a - 1]) < target:
+            a -= 1
+        while a < n and lums[a] <= lum and self.ratio_of(lum, lums[a]) >= target:
+            a += 1
+        b = max(a, b)
+        while b > a and self.ratio_of(lum, lums[b - 1]) >= target:
+            b -= 1
+        while b < n and self.ratio_of(lum, lums[b]) < target:
+            b += 1
+        return a, b
+
+    def passing(self, i, target=AA_RATIO):
+        """Indices of the colours that reach `target` against colour i, darkest first."""
+        a, b = self._split(i, target)
+        return self.order[:a] + self.order[b:]
+
+    def failing(self, i, target=AA_RATIO):
+        """Indices of the other colours that miss `target` against colour i, darkest first."""
+        a, b = self._split(i, target)
+        return [j for j in self.order[a:b] if j != i]
+
+    def pass_count(self, i, target=AA_RATIO):
+        a, b = self._split(i, target)
+        return a + len(self.lums) - b
+
+    def _ramp(self, rgb):
+        ramp = self._ramps.get(rgb)
+        if ramp is None:
+            h, l, s = colorsys.rgb_to_hls(*(c / 255.0 for c in rgb))
+            # at lightness 0.5 and full saturation each channel is its hue weight w; at lightness L
+            # it is lo + (hi - lo) * w with hi/lo as below, which is what colorsys.hls_to_rgb computes
+            wr, wg, wb = colorsys.hls_to_rgb(h, 0.5, 1.0)
+            rgbs, lums = [], []
+            for k in range(LIGHTNESS_STEPS):
+                L = k / (LIGHTNESS_STEPS - 1)
+                hi = L * (1.0 + s) if L <= 0.5 else L + s - L * s
+                lo = 2.0 * L - hi
+                span = (hi - lo) * 255
+                lo *= 255
+                r, g, b = round(lo + span * wr), round(lo + span * wg), round(lo + span * wb)
+                rgbs.append((r, g, b))
+                lums.append(0.2126 * LINEAR[r] + 0.7152 * LINEAR[g] + 0.0722 * LINEAR[b])
+            ramp = self._ramps[rgb] = (rgbs, lums, round(l * (LIGHTNESS_STEPS - 1)))
+        return ramp
+
+    def fix(self, i, j, target=AA_RATIO):
+        """Nearest colour to foreground i (same hue and saturation) reaching `target` on background j.
+
+        Returns (rgb, ratio), or None if no lightness of that hue gets there.
+        """
+        rgbs, lums, start = self._ramp(self.rgbs[i])
+        bg = self.lums[j] + 0.05
+        best = None
+        k = bisect.bisect_right(lums, bg / target - 0.05) - 1  # darker than the background
+        while k >= 0 and bg / (lums[k] + 0.05) < target:
+            k -= 1
+        if k >= 0:
+            best = (start - k, k, bg / (lums[k] + 0.05))
+        k = bisect.bisect_left(lums, target * bg - 0.05)  # lighter than the background
+        while k < LIGHTNESS_STEPS and (lums[k] + 0.05) / bg < target:
+            k += 1
+        if k < LIGHTNESS_STEPS and (best is None or abs(k - start) < abs(best[0])):
+            best = (k - start, k, (lums[k] + 0.05) / bg)
+        return None if best is None else (rgbs[best[1]], best[2])
+
+
+CSS_VAR_RE = re.compile(r'--([\w-]+)\s*:\s*(#[0-9a-fA-F]{3,6}\b|rgba?\([^)]*\))')
+RGB_FUNC_RE = re.compile(r'rgba?\(\s*(\d+)[\s,]+(\d+)[\s,]+(\d+)\s*(?:[,/][^)]*)?\)', re.I)
+
+def parse_color(value):
+    """hex_to_rgb, plus rgb()/rgba() notation (alpha is ignored)."""
+    m = RGB_FUNC_RE.fullmatch(str(value).strip())
+    if m:
+        return tuple(min(255, int(v)) for v in m.groups())
+    return hex_to_rgb(value)
+
+def _json_colors(node, prefix=''):
+    """(name, value) leaves of a JSON palette: {name: colour}, nested design tokens, or a list."""
+    if isinstance(node, dict):
+        for key in ('value', '$value', 'hex', 'color'):
+            if isinstance(node.get(key), str) and prefix:
+                yield prefix, node[key]
+                return
+        if isinstance(node.get('name'), str) and not prefix:
+            prefix = node['name']
+        for key, value in node.items():
+            if key != 'name':
+                yield from _json_colors(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(node, list):
+        for i, item in enumerate(node):
+            if isinstance(item, str):
+                yield item, item
+            else:
+                yield from _json_colors(item, f"{prefix}.{i}" if prefix else '')
+    elif isinstance(node, str) and prefix:
+        yield prefix, node
+
+def load_palette(path):
+    """(name, rgb) pairs from a JSON, CSS (custom properties) or CSV file; unparseable entries are skipped."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        found = _json_colors(json.loads(text))
+    elif ext in ('.css', '.scss', '.less') or CSS_VAR_RE.search(text):
+        found = ((m.group(1), m.group(2)) for m in CSS_VAR_RE.finditer(text))
+    else:
+        found = []
+        for row in csv.reader(text.splitlines()):
+            cells = [c.strip() for c in row if c.strip()]
+            # prefer a cell that looks like a colour over a name that happens to be hex ("bad", "cafe")
+            colour = next((c for c in cells if c.startswith('#') or c.lower().startswith('rgb')), None)
+            colour = colour or next((c for c in cells if parse_color(c)), None)
+            if colour:
+                found.append((next((c for c in cells if c != colour), colour), colour))
+    colors, seen = [], {}
+    for name, value in found:
+        rgb = parse_color(value)
+        if rgb is None:
+            continue
+        seen[name] = seen.get(name, 0) + 1
+        colors.append((name if seen[name] == 1 else f"{name}~{seen[name]}", rgb))
+    return colors
+
+
+UNDO_BUDGET = 64 * 1024  # bytes of undo/redo steps kept (and persisted)
+
+class UndoHistory:
+    """Undo/redo as inverse deltas instead of whole-state snapshots.
+
+    A step holds only what one command changed: [key, before, after] triples,
+    None meaning "absent". undo() writes each `before` back and redo() each
+    `after` through an apply(key, old, new) callback, so both cost O(size of
+    the change). Steps are stored serialized; the oldest are dropped once the
+    stacks exceed `budget_bytes` (or `max_steps`). Steps sharing a `group`
+    recorded within `coalesce_s` seconds merge into one. With `path`, every
+    step/undo/redo is appended to a JSON-lines file and replayed on start.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024, max_steps=None, coalesce_s=2.0, path=None):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.path = path
+        self.undo_stack = deque()  # serialized steps, oldest first
+        self.redo_stack = []       # serialized steps, next to redo last
+        self.size = 0
+        self._log_bytes = 0
+        if path:
+            self._replay()
+
+    def record(self, label, changes, group=None):
+        """Push one step; returns False if nothing actually changed."""
+        changes = [[key, before, after] for key, before, after in changes if before != after]
+        if not changes:
+            return False
+        now = time.time()
+        top = json.loads(self.undo_stack[-1]) if group is not None and self.undo_stack and not self.redo_stack else None
+        if top is not None and top.get("group") == group and now - top["t"] <= self.coalesce_s:
+            latest = {json.dumps(c[0]): c for c in top["changes"]}
+            for key, before, after in changes:
+                prev = latest.get(json.dumps(key))
+                if prev is not None and prev[2] == before:
+                    prev[2] = after
+                else:
+                    top["changes"].append([key, before, after])
+                    latest[json.dumps(key)] = top["changes"][-1]
+            top["t"] = now
+            self.size -= len(self.undo_stack.pop())
+            self._push(top, "amend")
+        else:
+            self.size -= sum(len(s) for s in self.redo_stack)
+            self.redo_stack.clear()
+            self._push({"label": label, "group": group, "t": now, "changes": changes}, "do")
+        self._trim()
+        return True
+
+    def undo(self, apply):
+        """Revert the latest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        text = self.undo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in reversed(step["changes"]):
+            apply(key, after, before)
+        self.redo_stack.append(text)
+        self._log('{"undo":1}')
+        return step["label"]
+
+    def redo(self, apply):
+        if not self.redo_stack:
+            return None
+        text = self.redo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in step["changes"]:
+            apply(key, before, after)
+        self.undo_stack.append(text)
+        self._log('{"redo":1}')
+        return step["label"]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        if self.path:
+            self._compact()
+
+    def _push(self, step, event):
+        text = json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+        self.undo_stack.append(text)
+        self.size += len(text)
+        self._log('{"%s":%s}' % (event, text))
+
+    def _trim(self):
+        while self.undo_stack and (self.size > self.budget_bytes or
+                                   self.max_steps and len(self.undo_stack) > self.max_steps):
+            self.size -= len(self.undo_stack.popleft())
+
+    def _log(self, line):
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._log_bytes += len(line) + 1
+        if self._log_bytes > 4 * self.budget_bytes + 65536:
+            self._compact()
+
+    def _replay(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._log_bytes += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if "do" in event or "amend" in event:
+                    if "amend" in event and self.undo_stack:
+                        self.undo_stack.pop()
+                    else:
+                        self.redo_stack.clear()
+                    self.undo_stack.append(json.dumps(event.get("do") or event["amend"],
+                                                      ensure_ascii=False, separators=(",", ":")))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+        self.size = sum(map(len, self.undo_stack)) + sum(map(len, self.redo_stack))
+        self._trim()
+
+    def _compact(self):
+        # Chronological order is the undo stack, then the redo stack top-down; undo back to here
+        steps = list(self.undo_stack) + self.redo_stack[::-1]
+        lines = ['{"do":%s}\n' % s for s in steps] + ['{"undo":1}\n'] * len(self.redo_stack)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+        self._log_bytes = sum(map(len, lines))
+
+
 class ContrastChecker:
     def __init__(self):
         self.history = deque(maxlen=20)
-        self.undo_stack = []
-        self.redo_stack = []
         self.history_file = 'contrast_history.json'
-        self.load_history()
+        fresh_log = not os.path.exists('contrast_history.undo.jsonl')
+        self.undo_log = UndoHistory(budget_bytes=UNDO_BUDGET, path='contrast_history.undo.jsonl')
+        self.load_history(convert_stacks=fresh_log)
     
-    def load_history(self):
+    def load_history(self, convert_stacks=False):
         """Load history from JSON."""
         try:
             if os.path.exists(self.history_file):
                 with open(self.history_file, 'r') as f:
                     data = json.load(f)
                     self.history = deque(data.get('history', []), maxlen=20)
-                    self.undo_stack = data.get('undo', [])
-                    self.redo_stack = data.get('redo', [])
+                    if convert_stacks:
+                        # Older versions kept whole undo/redo stacks in this file
+                        for entry in data.get('undo', []):
+                            self.undo_log.record('check', [('end', None, entry)])
         except:
             pass
     
     def save_history(self):
-        """Save history to JSON."""
+        """Save history to JSON (undo steps are appended to their own log as they happen)."""
         try:
             data = {
                 'history': list(self.history),
-                'undo': self.undo_stack,
-                'redo': self.redo_stack,
                 'timestamp': time.time()
             }
             with open(self.history_file, 'w') as f:
@@ -141,30 +466,45 @@ class ContrastChecker:
             'fix': fix,
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         }
-        self.undo_stack.append(entry)
-        self.redo_stack.clear()
+        changes = [('end', None, entry)]
+        if len(self.history) == self.history.maxlen:
+            changes.insert(0, ('start', self.history[0], None))  # the check that falls off the front
+        self.undo_log.record('check', changes)
         self.history.append(entry)
         self.save_history()
     
+    def _apply(self, key, old, new):
+        """Apply one undo step change: 'end' adds/removes the newest check, 'start' the oldest."""
+        if key == 'end':
+            if new is None:
+                if self.history:
+                    self.history.pop()
+            else:
+                self.history.append(new)
+        elif new is None:
+            if self.history:
+                self.history.popleft()
+        else:
+            self.history.appendleft(new)
+    
+    def _step(self, move):
+        touched = []
+        def apply(key, old, new):
+            self._apply(key, old, new)
+            if key == 'end':
+                touched.append(old if new is None else new)
+        if move(apply) is None:
+            return None
+        self.save_history()
+        return touched[0] if touched else None
+    
     def undo(self):
         """Undo last check."""
-        if self.undo_stack:
-            entry = self.undo_stack.pop()
-            self.redo_stack.append(entry)
-            self.history.pop()
-            self.save_history()
-            return entry
-        return None
+        return self._step(self.undo_log.undo)
     
     def redo(self):
         """Redo undone check."""
-        if self.redo_stack:
-            entry = self.redo_stack.pop()
-            self.undo_stack.append(entry)
-            self.history.append(entry)
-            self.save_history()
-            return entry
-        return None
+        return self._step(self.undo_log.redo)
 
 def print_status(msg, color=Colors.WHITE):
     """Print status message."""
@@ -193,15 +533,94 @@ def print_history_grid(checker):
         print_grid_row(entry['fg_hex'], entry['bg_hex'], entry['ratio'],
                       entry['aa'], entry['aaa'], entry['fix'])
 
+def print_matrix(engine, matrix):
+    """Print an N x N ratio grid (rows FG, columns BG)."""
+    names = [name[-7:] for name in engine.names]
+    print("  " + " " * 8 + "".join(f"{name:>8}" for name in names))
+    for name, row in zip(names, matrix):
+        cells = []
+        for ratio in row:
+            color = Colors.GREEN if ratio >= AAA_RATIO else Colors.YELLOW if ratio >= AA_RATIO else Colors.RED
+            cells.append(f"{color}{format_ratio(ratio):>8}{Colors.RESET}")
+        print(f"  {name:>8}" + "".join(cells))
+
+def run_palette(path, level='AA', report=None, show=20):
+    """Check every FG/BG pair of a palette file and find a fix for each pair failing `level`."""
+    try:
+        colors = load_palette(path)
+    except (OSError, ValueError) as e:
+        print_status(f"Cannot read palette {path}: {e}", Colors.RED)
+        return 1
+    if len(colors) < 2:
+        print_status(f"Need at least two colours in {path}, found {len(colors)}", Colors.RED)
+        return 1
+
+    start = time.perf_counter()
+    engine = ContrastEngine(colors)
+    n = len(engine)
+    target = AAA_RATIO if level == 'AAA' else AA_RATIO
+    matrix = engine.matrix()
+    aa = [engine.passing(i, AA_RATIO) for i in range(n)]
+    aaa = [engine.passing(i, AAA_RATIO) for i in range(n)]
+    fixes = [(i, j, engine.fix(i, j, target)) for i in range(n) for j in engine.failing(i, target)]
+    elapsed = time.perf_counter() - start
+
+    pairs = n * (n - 1)
+    aa_pairs, aaa_pairs = sum(map(len, aa)), sum(map(len, aaa))
+    unfixable = sum(1 for _, _, found in fixes if found is None)
+    print_status(f"{n} colours from {path}: {pairs:,} FG/BG pairs checked in {elapsed:.2f}s")
+    print_result(f"AA {aa_pairs:,} pairs ({aa_pairs / pairs:.0%}), AAA {aaa_pairs:,} ({aaa_pairs / pairs:.0%})",
+                 Colors.GREEN if aa_pairs == pairs else Colors.YELLOW)
+    if n <= 12:
+        print_matrix(engine, matrix)
+    if fixes:
+        print(f"\n{Colors.BOLD}{len(fixes):,} pairs below {level} "
+              f"({unfixable:,} with no fix keeping the FG hue), worst first:{Colors.RESET}")
+        print("  FG Color    | BG Color    | Ratio | AA  | AAA | Fix")
+        print("-" * 70)
+        for i, j, found in heapq.nsmallest(show, fixes, key=lambda fix: matrix[fix[0]][fix[1]]):
+            ratio = matrix[i][j]
+            fix = f"{rgb_to_hex(found[0])} ({format_ratio(found[1])})" if found else "no fix for this hue"
+            print_grid_row(rgb_to_hex(engine.rgbs[i]), rgb_to_hex(engine.rgbs[j]), ratio,
+                           ratio >= AA_RATIO, ratio >= AAA_RATIO, f"{engine.names[i]} on {engine.names[j]}: {fix}")
+
+    if report:
+        names = engine.names
+        data = {
+            'source': path,
+            'level': level,
+            'colors': [{'name': name, 'hex': rgb_to_hex(rgb)} for name, rgb in zip(names, engine.rgbs)],
+            'ratios': [[round(ratio, 2) for ratio in row] for row in matrix],
+            'aa': {names[i]: [names[j] for j in passing] for i, passing in enumerate(aa)},
+            'aaa': {names[i]: [names[j] for j in passing] for i, passing in enumerate(aaa)},
+            'fixes': [{'fg': names[i], 'bg': names[j], 'ratio': round(matrix[i][j], 2),
+                       'fix': rgb_to_hex(found[0]) if found else None,
+                       'fix_ratio': round(found[1], 2) if found else None} for i, j, found in fixes],
+        }
+        with open(report, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, separators=(',', ':')))  # dumps uses the C encoder, dump does not
+        print_status(f"Report written to {report}")
+    return 0
+
 def main():
-    checker = ContrastChecker()
     last_check = None
     
     parser = argparse.ArgumentParser()
     parser.add_argument('--test', action='store_true')
     parser.add_argument('--share', help='Load from share URL')
+    parser.add_argument('--palette', metavar='FILE',
+                        help='Check every pair of a palette (JSON, CSS custom properties or CSV)')
+    parser.add_argument('--level', choices=['AA', 'AAA'], default='AA', help='Level fixes must reach (default AA)')
+    parser.add_argument('--report', metavar='FILE', help='With --palette, write matrix, pass sets and fixes as JSON')
+    parser.add_argument('--show', type=int, default=20, metavar='N', help='With --palette, fixes to print (default 20)')
     args = parser.parse_args()
     
+    if args.palette:
+        sys.exit(run_palette(args.palette, args.level, args.report, args.show))
+    
+    checker = ContrastChecker()
+    
+    
     if args.test:
         test_cases = [
             ('#000000', '#ffffff', 21.0),
@@ -224,7 +643,7 @@ def main():
             do_check(checker, fg_rgb, bg_rgb, True)
     
     print(f"{Colors.BOLD}{Colors.CYAN}Color Contrast Checker Pro{Colors.RESET}")
-    print("Commands: c=check, s=share, h=history, u=undo, r=redo, l=load, n=new, q=quit")
+    print("Commands: c=check, p=palette, s=share, h=history, u=undo, r=redo, l=load, n=new, q=quit")
     
     while True:
         try:
@@ -236,6 +655,11 @@ def main():
                 fg_hex = input("Foreground hex (default #000000): ").strip() or '#000000'
                 bg_hex = input("Background hex (default #ffffff): ").strip() or '#ffffff'
                 do_check(checker, hex_to_rgb(fg_hex), hex_to_rgb(bg_hex))
+            elif cmd == 'p':
+                path = input("Palette file: ").strip()
+                if path:
+                    level = input("Level AA/AAA (default AA): ").strip().upper()
+                    run_palette(path, 'AAA' if level == 'AAA' else 'AA')
             elif cmd == 's' and last_check:
                 url = create_share_url(last_check['fg_hex'], last_check['bg_hex'], last_check['ratio'])
                 print_status(f"Share URL: {url}")
@@ -259,8 +683,7 @@ def main():
                     print_status("No checks to redo", Colors.YELLOW)
             elif cmd == 'n':
                 checker.history.clear()
-                checker.undo_stack.clear()
-                checker.redo_stack.clear()
+                checker.undo_log.clear()
                 checker.save_history()
                 print_status("New session - history cleared")
             elif cmd.startswith('contrastchecker://'):
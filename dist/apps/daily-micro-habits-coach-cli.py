@@ -5,15 +5,21 @@ import curses
 import datetime as dt
 import json
 import os
+import sqlite3
 import sys
 import textwrap
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict, field
+from itertools import accumulate
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple
 
 APP_NAME = "Daily Micro-Habits Coach"
-DATA_FILENAME = ".micro_habits.json"
+DATA_FILENAME = ".micro_habits.json"  # legacy JSON store, imported once into STORE_FILENAME
+STORE_FILENAME = ".micro_habits.sqlite3"
 VERSION = "1.0"
+ANALYTICS_VERSION = 1
 
 CATEGORIES = ["movement", "nutrition", "sleep", "mindfulness", "other"]
 TARGET_TYPES = ["boolean", "count", "duration_minutes"]
@@ -56,21 +62,232 @@ class UserProfile:
 class AppState:
     last_opened: Optional[str] = None
 
+class HabitAnalytics:
+    """Per-habit day statuses with run lengths and running met counts.
+
+    Each habit keeps one status byte per calendar day (MISSING, MISSED,
+    PARTIAL, MET), the length of the met run ending on each day, and a prefix
+    count of met days. set() only rewrites the days after the changed one up
+    to the end of its run, so a check-in for the latest day is O(1), and
+    streak(), best() and met_count() over any window are O(1) lookups. Each
+    habit remembers the target signature its statuses were computed with,
+    so an edited target can be detected and rebuilt.
+    """
+
+    MISSING, MISSED, PARTIAL, MET = 0, 1, 2, 3
+    _TO_TEXT = bytes.maketrans(bytes(range(4)), b"0123")
+    _FROM_TEXT = bytes.maketrans(b"0123", bytes(range(4)))
+
+    def __init__(self):
+        self.origin = None    # date ordinal of day index 0
+        self.size = 0         # days covered by every series
+        self.last_day = None  # ordinal of the latest day anything was recorded for
+        self.status = {}      # habit id -> bytearray of statuses
+        self.runs = {}        # habit id -> array of met-run lengths ending on each day
+        self.met = {}         # habit id -> prefix counts of met days (size + 1 entries)
+        self.sigs = {}        # habit id -> target signature the statuses were computed with
+        self._best = {}
+        self._stale = set()   # habits whose runs/met arrays need a recount
+
+    @staticmethod
+    def _ord(day):
+        if isinstance(day, str):
+            day = dt.date.fromisoformat(day)
+        return day if isinstance(day, int) else day.toordinal()
+
+    def _cover(self, lo, hi):
+        """Grow every series to span ordinals lo..hi."""
+        if self.origin is None:
+            self.origin = lo
+        if lo < self.origin:
+            pad = self.origin - lo
+            for hid in self.status:
+                self.status[hid][:0] = bytes(pad)
+                self._stale.add(hid)
+            self.origin, self.size = lo, self.size + pad
+        if hi - self.origin + 1 > self.size:
+            grow = hi - self.origin + 1 - self.size
+            for hid in self.status:
+                self.status[hid].extend(bytes(grow))
+                self.runs[hid].extend([0] * grow)
+                self.met[hid].extend([self.met[hid][-1]] * grow)
+            self.size += grow
+
+    def _series(self, hid):
+        if hid not in self.status:
+            self.status[hid] = bytearray(self.size)
+            self.runs[hid] = array("I", bytes(4 * self.size))
+            self.met[hid] = array("I", bytes(4 * (self.size + 1)))
+        return self.status[hid]
+
+    def _recount(self, hid):
+        status = self.status[hid]
+        runs = array("I", bytes(4 * len(status)))
+        run = 0
+        for i, s in enumerate(status):
+            run = run + 1 if s == self.MET else 0
+            runs[i] = run
+        self.runs[hid] = runs
+        self.met[hid] = array("I", accumulate((s == self.MET for s in status), initial=0))
+        self._best.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _ready(self, hid):
+        if hid in self._stale:
+            self._recount(hid)
+
+    def set(self, hid, day, status):
+        """Record one habit's status for one day; returns whether anything changed."""
+        d = self._ord(day)
+        self._cover(d, d)
+        series = self._series(hid)
+        i = d - self.origin
+        old = series[i]
+        if old == status:
+            return False
+        series[i] = status
+        if (old == self.MET) != (status == self.MET) and hid not in self._stale:
+            met, step = self.met[hid], 1 if status == self.MET else -1
+            for j in range(i + 1, len(met)):
+                met[j] += step
+            runs, prev = self.runs[hid], self.runs[hid][i - 1] if i else 0
+            for j in range(i, self.size):
+                run = prev + 1 if series[j] == self.MET else 0
+                if j > i and runs[j] == run:
+                    break  # the rest of the run is unaffected
+                runs[j] = prev = run
+            self._best.pop(hid, None)
+        return True
+
+    def record(self, day, statuses):
+        """Statuses of one day's entry ({habit id: status}); marks the day as recorded."""
+        d = self._ord(day)
+        for hid, status in statuses.items():
+            self.set(hid, d, status)
+        if self.last_day is None or d > self.last_day:
+            self.last_day = d
+
+    def rebuild(self, hid, days, sig=None):
+        """Replace a habit's statuses with `days` ({day: status}) in one pass."""
+        days = {self._ord(d): s for d, s in days.items()}
+        if days:
+            self._cover(min(days), max(days))
+        self._series(hid)
+        series = self.status[hid] = bytearray(self.size)
+        for d, s in days.items():
+            series[d - self.origin] = s
+        self._stale.add(hid)
+        self.sigs[hid] = sig
+
+    def drop(self, hid):
+        for table in (self.status, self.runs, self.met, self.sigs, self._best):
+            table.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _day_index(self, hid, day):
+        if hid not in self.status or self.origin is None or day is None:
+            return None
+        i = self._ord(day) - self.origin
+        return i if 0 <= i < self.size else None
+
+    def status_on(self, hid, day):
+        i = self._day_index(hid, day)
+        return self.MISSING if i is None else self.status[hid][i]
+
+    def streak(self, hid, day):
+        """Length of the met run ending on `day` (0 if it was not met)."""
+        i = self._day_index(hid, day)
+        if i is None:
+            return 0
+        self._ready(hid)
+        return self.runs[hid][i]
+
+    def best(self, hid, until=None):
+        """Longest met run, counting only days up to `until` if given."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        if until is not None:
+            i = self._ord(until) - self.origin
+            if i < 0:
+                return 0
+            if i < self.size - 1:
+                return max(self.runs[hid][:i + 1], default=0)
+        if hid not in self._best:
+            self._best[hid] = max(self.runs[hid], default=0)
+        return self._best[hid]
+
+    def met_count(self, hid, start, end):
+        """Met days in [start, end]."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        lo = max(self._ord(start) - self.origin, 0)
+        hi = min(self._ord(end) - self.origin, self.size - 1)
+        if hi < lo:
+            return 0
+        met = self.met[hid]
+        return met[hi + 1] - met[lo]
+
+    def rate(self, hid, start, end):
+        """Percentage of the days in [start, end] that were met."""
+        days = self._ord(end) - self._ord(start) + 1
+        return self.met_count(hid, start, end) * 100.0 / days if days > 0 else 0.0
+
+    def to_chunks(self):
+        """One {"habit", "year", "status"} record per habit and calendar year, statuses as "0123" text."""
+        chunks = []
+        if self.origin is None:
+            return chunks
+        first = dt.date.fromordinal(self.origin).year
+        last = dt.date.fromordinal(self.origin + max(self.size - 1, 0)).year
+        for hid, series in self.status.items():
+            for year in range(first, last + 1):
+                lo = dt.date(year, 1, 1).toordinal() - self.origin
+                hi = dt.date(year, 12, 31).toordinal() - self.origin + 1
+                part = bytes(max(0, -lo)) + bytes(series[max(lo, 0):max(hi, 0)])
+                part += bytes(hi - lo - len(part))
+                if part.strip(b"\0"):
+                    chunks.append({"habit": hid, "year": year, "status": part.translate(self._TO_TEXT).decode()})
+        return chunks
+
+    def from_chunks(self, chunks, sigs=None, last_day=None):
+        self.__init__()
+        chunks = list(chunks)
+        if chunks:
+            years = [c["year"] for c in chunks]
+            self._cover(dt.date(min(years), 1, 1).toordinal(), dt.date(max(years), 12, 31).toordinal())
+        for c in chunks:
+            series = self._series(c["habit"])
+            lo = dt.date(c["year"], 1, 1).toordinal() - self.origin
+            data = c["status"].encode().translate(self._FROM_TEXT)
+            series[lo:lo + len(data)] = data
+            self._stale.add(c["habit"])
+        self.sigs.update(sigs or {})
+        self.last_day = self._ord(last_day) if last_day else None
+
 @dataclass
 class RootData:
     profile: UserProfile
     habits: List[Habit]
     entries: List[DailyEntry]
     state: AppState
+    analytics: HabitAnalytics = field(default_factory=HabitAnalytics)
 
 # ---------- Data Layer ----------
 
-def get_data_path() -> Path:
+def get_legacy_path() -> Path:
     home = Path.home()
     if os.name == "nt":
         return home / "micro_habits.json"
     return home / DATA_FILENAME
 
+def get_data_path() -> Path:
+    home = Path.home()
+    if os.name == "nt":
+        return home / STORE_FILENAME.lstrip(".")
+    return home / STORE_FILENAME
+
 def default_data() -> RootData:
     profile = UserProfile()
     habits = [
@@ -101,49 +318,227 @@ def default_data() -> RootData:
     ]
     return RootData(profile=profile, habits=habits, entries=[], state=AppState())
 
-def load_data(path: Path) -> RootData:
-    if not path.exists():
-        return default_data()
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-    except Exception:
-        return default_data()
-    profile = UserProfile(**raw.get("profile", {}))
-    habits = [Habit(**h) for h in raw.get("habits", [])]
-    entries = []
-    for e in raw.get("entries", []):
-        results = [DailyHabitResult(**r) for r in e.get("habit_results", [])]
-        entries.append(
-            DailyEntry(
-                date=e.get("date"),
-                habit_results=results,
-                energy_level=e.get("energy_level"),
-                mood=e.get("mood"),
-                reflection=e.get("reflection"),
-            )
+class EntryStore:
+    """Records kept as rows of a sqlite3 database instead of one big JSON document.
+
+    Commands load only the date range they need, and save() writes only the
+    rows that were added, changed or removed since they were loaded, so adding
+    one entry costs the same with 10 or 100k entries on file. Writes go through
+    one WAL transaction per save: a crash leaves either the old or the new state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS records (scope TEXT NOT NULL, key TEXT NOT NULL, day TEXT NOT NULL,"
+            " body TEXT NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS records_by_day ON records (scope, day);"
+            "CREATE INDEX IF NOT EXISTS records_by_int_key ON records (scope, CAST(key AS INTEGER));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
         )
-    state = AppState(**raw.get("state", {}))
-    return RootData(profile=profile, habits=habits, entries=entries, state=state)
+        self._loaded = {}  # scope -> {key: body as last read or written}
 
-def save_data(path: Path, data: RootData) -> None:
-    serial = {
-        "profile": asdict(data.profile),
-        "habits": [asdict(h) for h in data.habits],
-        "entries": [
-            {
-                "date": e.date,
-                "habit_results": [asdict(r) for r in e.habit_results],
-                "energy_level": e.energy_level,
-                "mood": e.mood,
-                "reflection": e.reflection,
-            }
-            for e in data.entries
-        ],
-        "state": asdict(data.state),
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True, ensure_ascii=False)),
+        )
+
+    def _track(self, scope, rows, replace=False):
+        if replace:
+            self._loaded[scope] = {}
+        seen = self._loaded.setdefault(scope, {})
+        rows = rows.fetchall()
+        seen.update(rows)
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for _, body in rows) + "]")
+
+    @staticmethod
+    def _range(columns, scope, since, until):
+        sql, params = f"SELECT {columns} FROM records WHERE scope = ?", [scope]
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(str(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(str(until))
+        return sql + " ORDER BY day, rowid", params
+
+    def load(self, scope, since=None, until=None):
+        """Records of `scope` whose day lies in [since, until]; either bound may be None.
+
+        The result (plus anything fetch()ed later) is what the next save() diffs against.
+        """
+        sql, params = self._range("key, body", scope, since, until)
+        return self._track(scope, self.db.execute(sql, params), replace=True)
+
+    def read(self, scope, since=None, until=None):
+        """load() for commands that never save: sqlite joins the bodies, so one row and one json.loads."""
+        sql, params = self._range("body", scope, since, until)
+        # the outer query has no ORDER BY or join, so sqlite keeps the subquery's order
+        row = self.db.execute(f"SELECT '[' || COALESCE(group_concat(body, ','), '') || ']' FROM ({sql})", params)
+        return json.loads(row.fetchone()[0])
+
+    def fetch(self, scope, key):
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ? AND key = ?", (scope, str(key)))
+        found = self._track(scope, rows)
+        return found[0] if found else None
+
+    def count(self, scope):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def max_key(self, scope):
+        row = self.db.execute("SELECT MAX(CAST(key AS INTEGER)) FROM records WHERE scope = ?", (scope,)).fetchone()
+        return row[0] or 0
+
+    def save(self, scope, records, key, day):
+        """Write records that are new or changed since load()/fetch(); delete loaded ones that are gone."""
+        seen = self._loaded.get(scope, {})
+        live, upserts = {}, []
+        for rec in records:
+            k = str(key(rec))
+            body = json.dumps(rec, sort_keys=True, ensure_ascii=False)
+            live[k] = body
+            if seen.get(k) != body:
+                upserts.append((scope, k, str(day(rec) or ""), body))
+        deletes = [(scope, k) for k in seen if k not in live]
+        self.db.executemany(
+            "INSERT INTO records (scope, key, day, body) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(scope, key) DO UPDATE SET day = excluded.day, body = excluded.body",
+            upserts,
+        )
+        self.db.executemany("DELETE FROM records WHERE scope = ? AND key = ?", deletes)
+        self._loaded[scope] = live
+        return len(upserts) + len(deletes)
+
+    def forget(self, scope):
+        """Nothing of `scope` was loaded: the next save() only adds or updates."""
+        self._loaded.pop(scope, None)
+
+    def drop(self, scope):
+        self.db.execute("DELETE FROM records WHERE scope = ?", (scope,))
+        self.forget(scope)
+
+    def migrate(self, legacy_path, importer):
+        """One-time import of the old JSON file, which is left in place as a backup."""
+        legacy_path = Path(legacy_path)
+        if self.get_meta("migrated_from") is not None:
+            return False
+        with self.transaction():
+            if self.get_meta("migrated_from") is not None:  # another process got there first
+                return False
+            if legacy_path.exists():
+                try:
+                    with legacy_path.open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except ValueError:
+                    print(f"Could not read {legacy_path}; starting with an empty store.", file=sys.stderr)
+                else:
+                    importer(self, raw)
+            self.set_meta("migrated_from", str(legacy_path))
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # fold the bulk import into the main file
+        self._loaded.clear()
+        return True
+
+def entry_to_dict(e: DailyEntry) -> Dict[str, Any]:
+    return {
+        "date": e.date,
+        "habit_results": [asdict(r) for r in e.habit_results],
+        "energy_level": e.energy_level,
+        "mood": e.mood,
+        "reflection": e.reflection,
     }
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(serial, f, indent=2)
+
+def entry_from_dict(e: Dict[str, Any]) -> DailyEntry:
+    return DailyEntry(
+        date=e.get("date"),
+        habit_results=[DailyHabitResult(**r) for r in e.get("habit_results", [])],
+        energy_level=e.get("energy_level"),
+        mood=e.get("mood"),
+        reflection=e.get("reflection"),
+    )
+
+def import_legacy(store: EntryStore, raw: Dict[str, Any]) -> None:
+    store.save("entries", raw.get("entries", []), key=lambda e: e["date"], day=lambda e: e["date"])
+    for part in ("profile", "habits", "state"):
+        if part in raw:
+            store.set_meta(part, raw[part])
+
+_stores: Dict[Path, EntryStore] = {}
+
+def open_store(path: Path) -> EntryStore:
+    if path not in _stores:
+        store = EntryStore(path)
+        store.migrate(get_legacy_path(), import_legacy)
+        _stores[path] = store
+    return _stores[path]
+
+def load_analytics(store: EntryStore, habits: List[Habit]) -> HabitAnalytics:
+    """The saved streak/completion statuses; built from every entry the first time."""
+    analytics = HabitAnalytics()
+    chunks = store.load("analytics")
+    meta = store.get_meta("analytics")
+    if meta is not None and meta.get("version") == ANALYTICS_VERSION:
+        analytics.from_chunks(chunks, meta.get("sigs"), meta.get("last_day"))
+        return analytics
+    entries = [entry_from_dict(e) for e in store.load("entries")]
+    for h in habits:
+        rebuild_habit_analytics(analytics, h, entries)
+    if entries:
+        analytics.last_day = max(dt.date.fromisoformat(e.date).toordinal() for e in entries)
+    return analytics
+
+def load_data(path: Path, since: Optional[str] = None) -> RootData:
+    """Everything but the daily entries, plus the entries dated on or after `since` (all if None)."""
+    store = open_store(path)
+    if store.get_meta("habits") is None:
+        return default_data()
+    profile = UserProfile(**store.get_meta("profile", {}))
+    habits = [Habit(**h) for h in store.get_meta("habits", [])]
+    analytics = load_analytics(store, habits)  # before the entries: a first build reads all of them
+    entries = [entry_from_dict(e) for e in store.load("entries", since)]
+    state = AppState(**store.get_meta("state", {}))
+    return RootData(profile=profile, habits=habits, entries=entries, state=state, analytics=analytics)
+
+def save_data(path: Path, data: RootData) -> None:
+    store = open_store(path)
+    with store.transaction():
+        store.save(
+            "entries",
+            [entry_to_dict(e) for e in data.entries],
+            key=lambda e: e["date"],
+            day=lambda e: e["date"],
+        )
+        store.set_meta("profile", asdict(data.profile))
+        store.set_meta("habits", [asdict(h) for h in data.habits])
+        store.set_meta("state", asdict(data.state))
+        analytics = habit_analytics(data)
+        store.save(
+            "analytics",
+            analytics.to_chunks(),
+            key=lambda c: f"{c['habit']}:{c['year']}",
+            day=lambda c: f"{c['year']}-01-01",
+        )
+        last_day = dt.date.fromordinal(analytics.last_day).isoformat() if analytics.last_day else None
+        store.set_meta("analytics", {"version": ANALYTICS_VERSION, "last_day": last_day, "sigs": analytics.sigs})
 
 # ---------- Logic Layer ----------
 
@@ -178,6 +573,7 @@ def get_or_create_entry(data: RootData, date: str) -> DailyEntry:
     e = DailyEntry(date=date)
     data.entries.append(e)
     data.entries.sort(key=lambda x: x.date)
+    data.analytics.record(date, {})
     return e
 
 def get_habit_map(habits: List[Habit]) -> Dict[str, Habit]:
@@ -198,75 +594,47 @@ def habit_target_met(habit: Habit, value: Any) -> Tuple[bool, bool]:
         return (False, True)
     return (False, False)
 
+def habit_status(habit: Habit, value: Any) -> int:
+    met, partial = habit_target_met(habit, value)
+    return HabitAnalytics.MET if met else HabitAnalytics.PARTIAL if partial else HabitAnalytics.MISSED
+
+def habit_signature(habit: Habit) -> str:
+    return f"{habit.target_type}:{habit.target_value}"
+
+def rebuild_habit_analytics(analytics: HabitAnalytics, habit: Habit, entries: List[DailyEntry]) -> None:
+    days = {}
+    for e in entries:
+        for r in e.habit_results:
+            if r.habit_id == habit.id:
+                days[e.date] = habit_status(habit, r.value)
+    analytics.rebuild(habit.id, days, habit_signature(habit))
+
+def habit_analytics(data: RootData) -> HabitAnalytics:
+    """data.analytics, with habits added, removed or retargeted since it was last used brought up to date."""
+    analytics = data.analytics
+    live = {h.id for h in data.habits}
+    for hid in [hid for hid in analytics.status if hid not in live]:
+        analytics.drop(hid)
+    for h in data.habits:
+        if analytics.sigs.get(h.id) != habit_signature(h):
+            # edits only happen in full sessions, so data.entries is the whole history here
+            rebuild_habit_analytics(analytics, h, data.entries)
+    return analytics
+
 def compute_streaks(data: RootData) -> Dict[str, Dict[str, int]]:
-    entries = sorted(data.entries, key=lambda e: e.date)
-    habit_ids = [h.id for h in data.habits]
-    best = {hid: 0 for hid in habit_ids}
-    current = {hid: 0 for hid in habit_ids}
-    for hid in habit_ids:
-        last_date = None
-        streak = 0
-        for e in entries:
-            results = {r.habit_id: r for r in e.habit_results}
-            if hid not in results:
-                if streak > best[hid]:
-                    best[hid] = streak
-                streak = 0
-                last_date = None
-                continue
-            met, _ = habit_target_met(
-                next(h for h in data.habits if h.id == hid),
-                results[hid].value,
-            )
-            if not met:
-                if streak > best[hid]:
-                    best[hid] = streak
-                streak = 0
-                last_date = None
-                continue
-            d = dt.date.fromisoformat(e.date)
-            if last_date is None or d == last_date + dt.timedelta(days=1):
-                streak += 1
-            else:
-                if streak > best[hid]:
-                    best[hid] = streak
-                streak = 1
-            last_date = d
-        if streak > best[hid]:
-            best[hid] = streak
-        current[hid] = streak
-    return {hid: {"current": current[hid], "best": best[hid]} for hid in habit_ids}
+    """Current streak (the met run ending on the latest entry's day) and best streak per habit."""
+    analytics = habit_analytics(data)
+    return {
+        h.id: {"current": analytics.streak(h.id, analytics.last_day), "best": analytics.best(h.id)}
+        for h in data.habits
+    }
 
 def date_range(end_date: dt.date, days: int) -> List[str]:
     return [(end_date - dt.timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)]
 
 def completion_for_range(data: RootData, start: dt.date, end: dt.date) -> Dict[str, float]:
-    hmap = get_habit_map(data.habits)
-    day_map = get_entry_map(data.entries)
-    habit_ids = [h.id for h in data.habits if h.is_active]
-    total = {hid: 0 for hid in habit_ids}
-    met = {hid: 0 for hid in habit_ids}
-    cur = start
-    while cur <= end:
-        ds = cur.isoformat()
-        entry = day_map.get(ds)
-        rmap = {r.habit_id: r for r in entry.habit_results} if entry else {}
-        for hid in habit_ids:
-            total[hid] += 1
-            r = rmap.get(hid)
-            if not r:
-                continue
-            ok, _ = habit_target_met(hmap[hid], r.value)
-            if ok:
-                met[hid] += 1
-        cur += dt.timedelta(days=1)
-    rates = {}
-    for hid in habit_ids:
-        if total[hid] == 0:
-            rates[hid] = 0.0
-        else:
-            rates[hid] = met[hid] * 100.0 / total[hid]
-    return rates
+    analytics = habit_analytics(data)
+    return {h.id: analytics.rate(h.id, start, end) for h in data.habits if h.is_active}
 
 def weekly_summary_logic(data: RootData, week_end: dt.date) -> Dict[str, Any]:
     week_start = week_end - dt.timedelta(days=6)
@@ -279,6 +647,7 @@ def weekly_summary_logic(data: RootData, week_end: dt.date) -> Dict[str, Any]:
     top = sorted_habits[:2]
     hmap = get_habit_map(data.habits)
     day_map = get_entry_map(data.entries)
+    analytics = habit_analytics(data)
     total_mood_good = []
     total_mood_bad = []
     total_energy_good = []
@@ -294,15 +663,7 @@ def weekly_summary_logic(data: RootData, week_end: dt.date) -> Dict[str, Any]:
         if not active_day:
             cur += dt.timedelta(days=1)
             continue
-        rmap = {r.habit_id: r for r in entry.habit_results}
-        met_count = 0
-        for h in active_day:
-            r = rmap.get(h.id)
-            if not r:
-                continue
-            ok, _ = habit_target_met(h, r.value)
-            if ok:
-                met_count += 1
+        met_count = sum(analytics.status_on(h.id, ds) == analytics.MET for h in active_day)
         ratio = met_count / max(1, len(active_day))
         if entry.mood is not None:
             if ratio >= 0.7:
@@ -597,6 +958,7 @@ def today_checkin_screen(data: RootData, theme: Theme):
                 entries_map[h.id].value = val
             else:
                 entry.habit_results.append(DailyHabitResult(habit_id=h.id, value=val))
+            data.analytics.set(h.id, entry.date, habit_status(h, val))
         print()
         entry.energy_level = prompt_int("Energy level (1–5, Enter to skip): ", 1, 5, allow_empty=True)
         entry.mood = prompt_int("Mood (1–5, Enter to skip): ", 1, 5, allow_empty=True)
@@ -1023,6 +1385,7 @@ def settings_screen(data: RootData, theme: Theme, data_path: Path):
                 data.habits = new.habits
                 data.entries = new.entries
                 data.state = new.state
+                data.analytics = new.analytics
                 print("All data reset.")
                 pause()
         else:
@@ -1252,7 +1615,9 @@ def parse_args():
 def main():
     args = parse_args()
     data_path = get_data_path()
-    data = load_data(data_path)
+    # --today only needs today's entry (and yesterday's for the "same as yesterday" shortcut)
+    since = (dt.date.today() - dt.timedelta(days=1)).isoformat() if args.today else None
+    data = load_data(data_path, since)
     data.state.last_opened = today_str()
     theme_mode = select_theme(data.profile, args.theme)
     theme = Theme(theme_mode, args.no_color, data.profile.high_contrast)
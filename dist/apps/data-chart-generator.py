@@ -3,8 +3,14 @@
 import json
 import os
 import sys
+import csv
 import base64
 import shutil
+import argparse
+from array import array
+from collections import Counter
+from itertools import repeat
+from operator import add, mul, sub, truediv
 from typing import List, Tuple, Dict, Any
 import subprocess
 import shlex
@@ -79,122 +85,351 @@ def get_colors(dark_mode):
 def clear_screen():
     print('\033[2J\033[H', end='')
 
-def truncate_data(data: List[List[float]], max_points=50) -> List[List[float]]:
-    if len(data) > max_points:
-        step = len(data) // max_points
-        return [data[i] for i in range(0, len(data), step)][:max_points]
-    return data
-
-def normalize_data(data: List[List[float]], height: int) -> List[int]:
-    if not data:
-        return []
-    values = [p[1] for p in data]
-    min_val, max_val = min(values), max(values)
-    if max_val == min_val:
-        return [height // 2] * len(data)
-    range_val = max_val - min_val
-    return [(int((v - min_val) / range_val * (height - 1))) for v in values]
-
-def line_chart(width: int, height: int, data: List[List[float]], colors: Dict[str, str]):
-    data = truncate_data(data, width // 4)
-    y_vals = normalize_data(data, height - 2)
-    x_vals = [i * (width - 1) // max(len(data) - 1, 1) for i in range(len(data))]
-    
-    grid = [[' ' for _ in range(width)] for _ in range(height)]
-    
-    # Plot points and lines
-    for i in range(len(data) - 1):
-        x1, y1 = x_vals[i], height - 2 - y_vals[i]
-        x2, y2 = x_vals[i + 1], height - 2 - y_vals[i + 1]
-        
-        if x1 == x2:
-            for y in range(min(y1, y2), max(y1, y2) + 1):
-                grid[y][x1] = '*'
+class Series:
+    """x/y points in two array('d') columns (16 bytes a point) with running stats.
+
+    extend() folds each chunk's min/max/sum into the stats as it arrives, so
+    ingest is one pass and the stats never rescan the data. Per-size
+    summaries (column min/max, histogram bins, scatter cells) are computed
+    once and cached for redraws at the same size.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.xs = array('d')
+        self.ys = array('d')
+        self.x_min = self.x_max = self.y_min = self.y_max = None
+        self.y_sum = 0.0
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.ys)
+
+    @classmethod
+    def from_points(cls, points, name: str = "") -> "Series":
+        series = cls(name)
+        series.extend(array('d', (p[0] for p in points)), array('d', (p[1] for p in points)))
+        return series
+
+    def extend(self, xs: array, ys: array):
+        if not ys:
+            return
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        lo_x, hi_x, lo_y, hi_y = min(xs), max(xs), min(ys), max(ys)
+        if self.y_min is None:
+            self.x_min, self.x_max, self.y_min, self.y_max = lo_x, hi_x, lo_y, hi_y
         else:
+            self.x_min, self.x_max = min(self.x_min, lo_x), max(self.x_max, hi_x)
+            self.y_min, self.y_max = min(self.y_min, lo_y), max(self.y_max, hi_y)
+        self.y_sum += sum(ys)
+        self._cache.clear()
+
+    def columns(self, cols: int) -> List[Tuple[float, float, float, float]]:
+        """(min, max, first, last) of y for `cols` equal index ranges; len(self) must be >= cols."""
+        key = ('columns', cols)
+        if key not in self._cache:
+            ys, n = self.ys, len(self.ys)
+            out = []
+            for c in range(cols):
+                seg = ys[c * n // cols:(c + 1) * n // cols]
+                out.append((min(seg), max(seg), seg[0], seg[-1]))
+            self._cache[key] = out
+        return self._cache[key]
+
+    def lttb(self, buckets: int) -> List[float]:
+        """`buckets` y values picked by MinMaxLTTB: largest-triangle-three-buckets over each bucket's min and max.
+
+        The candidates come from C-level min()/max() over bucket slices, so the
+        per-point work stays out of Python; peaks and troughs survive, unlike
+        fixed-stride sampling.
+        """
+        key = ('lttb', buckets)
+        if key not in self._cache:
+            ys, n = self.ys, len(self.ys)
+            cands, means = [], []
+            for b in range(buckets):
+                lo, hi = b * n // buckets, (b + 1) * n // buckets
+                seg = ys[lo:hi]
+                pts = {lo + seg.index(min(seg)), lo + seg.index(max(seg))}
+                cands.append(sorted(pts))
+                means.append(((lo + hi - 1) / 2, sum(seg) / len(seg)))
+            picked = [cands[0][0]]  # keep the first point, as LTTB does
+            for b in range(1, buckets):
+                ax, ay = picked[-1], ys[picked[-1]]
+                cx, cy = means[b + 1] if b + 1 < buckets else (n - 1, ys[n - 1])
+                picked.append(max(cands[b], key=lambda i: abs((ax - cx) * (ys[i] - ay) - (ax - i) * (cy - ay))))
+            self._cache[key] = [ys[i] for i in picked]
+        return self._cache[key]
+
+    def histogram(self, bins: int, bin_size: float) -> List[int]:
+        key = ('hist', bins, bin_size)
+        if key not in self._cache:
+            # (v - min) / bin_size for every value, floored and counted without a Python-level loop
+            found = Counter(map(int, map(truediv, map(sub, self.ys, repeat(self.y_min)), repeat(bin_size))))
+            hist = [0] * bins
+            for idx, count in found.items():
+                hist[min(idx, bins - 1)] += count
+            self._cache[key] = hist
+        return self._cache[key]
+
+    def cells(self, cols: int, rows: int) -> set:
+        """Occupied (column * rows + row) cells when x is scaled to [0, cols) and y to [0, rows)."""
+        key = ('cells', cols, rows)
+        if key not in self._cache:
+            def scaled(values, lo, hi, levels):
+                if hi == lo:
+                    return repeat(levels // 2, len(values))
+                return map(int, map(mul, map(truediv, map(sub, values, repeat(lo)), repeat(hi - lo)), repeat(levels - 1)))
+            xs = scaled(self.xs, self.x_min, self.x_max, cols)
+            ys = scaled(self.ys, self.y_min, self.y_max, rows)
+            self._cache[key] = set(map(add, map(mul, xs, repeat(rows)), ys))
+        return self._cache[key]
+
+
+INGEST_CHUNK = 65536  # points parsed before they are folded into a Series
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+def read_csv_series(path: str) -> Series:
+    """Stream a CSV of x,y rows (or a single y column) into a Series; a header row and bad rows are skipped."""
+    series = Series(os.path.basename(path))
+    xs, ys = array('d'), array('d')
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2:
+                x, y = _number(row[0]), _number(row[1])
+            elif row:
+                x, y = float(len(series) + len(ys)), _number(row[0])
+            else:
+                continue
+            if x is None or y is None:
+                continue
+            xs.append(x)
+            ys.append(y)
+            if len(ys) >= INGEST_CHUNK:
+                series.extend(xs, ys)
+                xs, ys = array('d'), array('d')
+    series.extend(xs, ys)
+    return series
+
+def read_json_series(path: str) -> Series:
+    """Stream a JSON array of [x, y] pairs, {"x": .., "y": ..} objects or bare y values into a Series.
+
+    The array may be the whole document or the "data" member of an object
+    (the SAMPLE_DATASETS layout). Elements are decoded one at a time from a
+    rolling text buffer, so the file is never held in memory whole.
+    """
+    series = Series(os.path.basename(path))
+    decoder = json.JSONDecoder()
+    xs, ys = array('d'), array('d')
+    with open(path, encoding='utf-8') as f:
+        buf, pos, eof = f.read(INGEST_CHUNK), 0, False
+
+        def more():
+            nonlocal buf, pos, eof
+            chunk = f.read(INGEST_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            return not eof
+
+        head = buf.lstrip()
+        if head.startswith('{'):
+            while '"data"' not in buf and more():
+                pass
+            pos = buf.find('"data"')
+            if pos < 0:
+                return series
+            while buf.find('[', pos) < 0 and more():
+                pass
+            pos = buf.find('[', pos)
+        else:
+            pos = buf.find('[')
+        if pos < 0:
+            return series
+        pos += 1
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                if not more():
+                    break
+                continue
+            if buf[pos] == ']':
+                break
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                item = end = None
+            if end is None or end == len(buf) and not eof:
+                # the element may run past the buffer (a cut-off number even decodes short)
+                if more():
+                    continue
+                item, end = decoder.raw_decode(buf, pos)
+            pos = end
+            if isinstance(item, dict):
+                x, y = _number(item.get('x', len(series) + len(ys))), _number(item.get('y'))
+            elif isinstance(item, list) and len(item) >= 2:
+                x, y = _number(item[0]), _number(item[1])
+            else:
+                x, y = float(len(series) + len(ys)), _number(item)
+            if x is None or y is None:
+                continue
+            xs.append(x)
+            ys.append(y)
+            if len(ys) >= INGEST_CHUNK:
+                series.extend(xs, ys)
+                xs, ys = array('d'), array('d')
+    series.extend(xs, ys)
+    return series
+
+def load_series(path: str) -> Series:
+    return read_json_series(path) if path.lower().endswith('.json') else read_csv_series(path)
+
+def as_series(data) -> Series:
+    return data if isinstance(data, Series) else Series.from_points(data)
+
+
+class FrameBuffer:
+    """A width x height grid of glyph bytes, allocated once and reused between redraws.
+
+    Only a resize reallocates; clearing is one slice assignment and lines are
+    strided slice writes. Glyphs are single bytes; FULL is shown as '█'.
+    """
+
+    FULL = b'\x80'
+    GLYPHS = {0x80: '█'}
+
+    def __init__(self):
+        self.width = self.height = 0
+        self.cells = bytearray()
+        self._blank = b''
+
+    def reset(self, width: int, height: int) -> "FrameBuffer":
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self._blank = b' ' * (width * height)
+            self.cells = bytearray(self._blank)
+        else:
+            self.cells[:] = self._blank
+        return self
+
+    def put(self, x: int, y: int, glyph: bytes):
+        i = y * self.width + x
+        self.cells[i:i + 1] = glyph
+
+    def vline(self, x: int, y0: int, y1: int, glyph: bytes):
+        """Column x from row y0 to y1, inclusive."""
+        if y1 < y0:
+            y0, y1 = y1, y0
+        w = self.width
+        self.cells[y0 * w + x:y1 * w + x + 1:w] = glyph * (y1 - y0 + 1)
+
+    def hline(self, y: int, x0: int, x1: int, glyph: bytes):
+        """Row y from column x0 to x1, inclusive."""
+        if x1 >= x0:
+            self.cells[y * self.width + x0:y * self.width + x1 + 1] = glyph * (x1 - x0 + 1)
+
+    def axes(self):
+        self.vline(0, 0, self.height - 1, b'|')
+        self.hline(self.height - 2, 0, self.width - 1, b'-')
+        self.put(0, self.height - 2, b'+')
+
+    def rows(self) -> List[str]:
+        w = self.width
+        return [self.cells[i:i + w].decode('latin-1').translate(self.GLYPHS) for i in range(0, len(self.cells), w)]
+
+_frame = FrameBuffer()
+
+def normalize_values(values: List[float], height: int, lo: float, hi: float) -> List[int]:
+    """Levels 0..height-1 for values within [lo, hi] (all height // 2 if lo == hi)."""
+    if hi == lo:
+        return [height // 2] * len(values)
+    span = hi - lo
+    return [int((v - lo) / span * (height - 1)) for v in values]
+
+def line_chart(width: int, height: int, data, colors: Dict[str, str], frame: FrameBuffer = None):
+    series = as_series(data)
+    frame = (frame or FrameBuffer()).reset(width, height)
+    base = height - 2
+    n = len(series)
+    y_vals = []
+    if n <= width - 1:
+        # few enough points for one column each: plot them and join with straight segments
+        y_vals = normalize_values(series.ys, base, series.y_min, series.y_max)
+        x_vals = [i * (width - 1) // max(n - 1, 1) for i in range(n)]
+        for i in range(n - 1):
+            x1, y1 = x_vals[i], base - y_vals[i]
+            x2, y2 = x_vals[i + 1], base - y_vals[i + 1]
+            if x1 == x2:
+                frame.vline(x1, y1, y2, b'*')
+                continue
             slope = (y2 - y1) / (x2 - x1)
             for x in range(x1, x2 + 1):
-                y = int(y1 + slope * (x - x1))
-                grid[y][x] = '*'
-    
-    # Axes
-    for i in range(height):
-        grid[i][0] = '|'
-    for j in range(width):
-        grid[height - 2][j] = '-'
-    grid[height - 2][0] = '+'
-    
-    return grid, x_vals, y_vals
+                frame.put(x, int(y1 + slope * (x - x1)), b'*')
+        if n == 1:
+            frame.put(0, base - y_vals[0], b'*')
+    else:
+        # min/max per column: every spike shows, and each column joins the previous one's last value
+        x_vals = list(range(1, width))
+        lo, hi = series.y_min, series.y_max
+        level = (lambda v: base // 2) if hi == lo else (lambda v: int((v - lo) / (hi - lo) * (base - 1)))
+        prev = None
+        for x, (c_lo, c_hi, first, last) in zip(x_vals, series.columns(width - 1)):
+            if prev is not None:
+                c_lo, c_hi = min(c_lo, prev), max(c_hi, prev)
+            frame.vline(x, base - level(c_lo), base - level(c_hi), b'*')
+            y_vals.append(level(c_hi))
+            prev = last
+    frame.axes()
+    return frame, x_vals, y_vals
 
-def bar_chart(width: int, height: int, data: List[List[float]], colors: Dict[str, str]):
-    data = truncate_data(data, (width - 1) // 3)
-    y_vals = normalize_data(data, height - 2)
-    
-    grid = [[' ' for _ in range(width)] for _ in range(height)]
-    
-    bar_width = max(1, (width - 1) // len(data))
+def bar_chart(width: int, height: int, data, colors: Dict[str, str], frame: FrameBuffer = None):
+    series = as_series(data)
+    frame = (frame or FrameBuffer()).reset(width, height)
+    bars = max(1, (width - 1) // 3)
+    values = list(series.ys) if len(series) <= bars else series.lttb(bars)
+    y_vals = normalize_values(values, height - 2, min(values), max(values)) if values else []
+    bar_width = max(1, (width - 1) // max(len(values), 1))
     for i, y in enumerate(y_vals):
         x_start = 1 + i * bar_width
-        for h in range(height - 2 - y, height - 2):
-            for x in range(x_start, min(x_start + bar_width - 1, width)):
-                grid[h][x] = '#'
-    
-    # Axes
-    for i in range(height):
-        grid[i][0] = '|'
-    for j in range(width):
-        grid[height - 2][j] = '-'
-    grid[height - 2][0] = '+'
-    
-    return grid, None, y_vals
+        x_end = min(x_start + bar_width - 1, width) - 1
+        for row in range(height - 2 - y, height - 2):
+            frame.hline(row, x_start, x_end, b'#')
+    frame.axes()
+    return frame, None, y_vals
 
-def histogram(width: int, height: int, data: List[List[float]], colors: Dict[str, str]):
-    values = [p[1] for p in truncate_data(data, width // 2)]
-    if not values:
-        return [[' ' for _ in range(width)] for _ in range(height)], None, []
-    
+def histogram(width: int, height: int, data, colors: Dict[str, str], frame: FrameBuffer = None):
+    series = as_series(data)
+    frame = (frame or FrameBuffer()).reset(width, height)
+    if not len(series):
+        return frame, None, []
     bins = width - 2
-    bin_size = max((max(values) - min(values)) / bins, 0.1)
-    hist = [0] * bins
-    
-    for v in values:
-        bin_idx = min(int((v - min(values)) / bin_size), bins - 1)
-        hist[bin_idx] += 1
-    
-    y_vals = normalize_data([[i, h] for i, h in enumerate(hist)], height - 2)
-    
-    grid = [[' ' for _ in range(width)] for _ in range(height)]
+    hist = series.histogram(bins, max((series.y_max - series.y_min) / bins, 0.1))
+    y_vals = normalize_values(hist, height - 2, min(hist), max(hist))
     for i, y in enumerate(y_vals):
-        for h in range(height - 2 - y, height - 2):
-            grid[h][i + 1] = '█'
-    
-    # Axes
-    for i in range(height):
-        grid[i][0] = '|'
-    for j in range(width):
-        grid[height - 2][j] = '-'
-    grid[height - 2][0] = '+'
-    
-    return grid, None, y_vals
+        if y:
+            frame.vline(i + 1, height - 2 - y, height - 3, FrameBuffer.FULL)
+    frame.axes()
+    return frame, None, y_vals
 
-def scatter_plot(width: int, height: int, data: List[List[float]], colors: Dict[str, str]):
-    data = truncate_data(data, width * height // 4)
-    x_norm = normalize_data([[p[0], 0] for p in data], width - 1)
-    y_norm = normalize_data([[0, p[1]] for p in data], height - 2)
-    
-    grid = [[' ' for _ in range(width)] for _ in range(height)]
-    for i, (x, y) in enumerate(zip(x_norm, y_norm)):
-        grid[height - 2 - y][x] = '*'
-    
-    # Axes
-    for i in range(height):
-        grid[i][0] = '|'
-    for j in range(width):
-        grid[height - 2][j] = '-'
-    grid[height - 2][0] = '+'
-    
-    return grid, x_norm, y_norm
+def scatter_plot(width: int, height: int, data, colors: Dict[str, str], frame: FrameBuffer = None):
+    series = as_series(data)
+    frame = (frame or FrameBuffer()).reset(width, height)
+    if len(series):
+        rows = height - 2
+        # every point lands in its cell, instead of a stride sample of the points
+        for cell in series.cells(width - 1, rows):
+            x, y = divmod(cell, rows)
+            frame.put(x, height - 2 - y, b'*')
+    frame.axes()
+    return frame, None, None
 
-def render_chart(chart_type: str, width: int, height: int, data: List[List[float]], colors: Dict[str, str]):
+def render_chart(chart_type: str, width: int, height: int, data, colors: Dict[str, str], frame: FrameBuffer = None):
     renderers = {
         "line_chart": line_chart,
         "bar_chart": bar_chart,
@@ -202,20 +437,15 @@ def render_chart(chart_type: str, width: int, height: int, data: List[List[float
         "scatter_plot": scatter_plot
     }
     
-    grid, x_vals, y_vals = renderers[chart_type](width, height, data, colors)
-    
-    # Render with colors
-    output = []
-    for row in grid:
-        output.append(''.join(row))
-    
-    return output, x_vals, y_vals, data
+    data = as_series(data)
+    frame, x_vals, y_vals = renderers[chart_type](width, height, data, colors, frame or _frame)
+    return frame.rows(), x_vals, y_vals, data
 
-def get_stats(data: List[List[float]]) -> str:
-    if not data:
+def get_stats(data) -> str:
+    series = as_series(data)
+    if not len(series):
         return "No data"
-    values = [p[1] for p in data]
-    return f"Min: {min(values):.1f}, Max: {max(values):.1f}, Avg: {sum(values)/len(values):.1f}"
+    return f"Min: {series.y_min:.1f}, Max: {series.y_max:.1f}, Avg: {series.y_sum / len(series):.1f}"
 
 def generate_shareable_config(dataset_name: str, chart_type: str, width: int, height: int, dark_mode: bool) -> str:
     config = {
@@ -241,38 +471,52 @@ def print_help():
     print("↑↓ Arrow keys: Navigate datasets")
     print("1-4: Select chart type (1:Line, 2:Bar, 3:Hist, 4:Scatter)")
     print("c: Enter custom CSV data (x1,y1,x2,y2...)")
+    print("f: Load a CSV/JSON file (streamed; large files are downsampled)")
     print("d: Toggle dark/light mode")
     print("s: Save/Share config")
     print("h: Show this help")
     print("q: Quit")
     print("="*50 + "\n")
 
+def parse_args():
+    p = argparse.ArgumentParser(description="ASCII Data Chart Generator")
+    p.add_argument("file", nargs="?", help="CSV (x,y rows or one y column) or JSON series to chart; streamed, so millions of rows are fine")
+    return p.parse_args()
+
 def main():
+    args = parse_args()
     prefs = load_prefs()
     dark_mode = prefs.get("dark_mode", detect_dark_mode())
     colors = get_colors(dark_mode)
     
-    tw, th = get_terminal_size()
-    chart_width = max(40, tw - 4)
-    chart_height = max(15, th - 10)
-    
     # Current state
     current_dataset = "1"
     current_chart_type = "line_chart"
     custom_data = None
+    chart_names = {fn: label for label, fn in CHART_TYPES.values()}
+    if args.file:
+        custom_data = load_series(args.file)
+        current_dataset = "Custom"
     
     recent_datasets = prefs.get("recent", [])
     
     while True:
         clear_screen()
+        # re-read each frame so a resize takes effect; the frame buffer is only reallocated then
+        tw, th = get_terminal_size()
+        chart_width = max(40, tw - 4)
+        chart_height = max(15, th - 10)
+        if custom_data is not None:
+            dataset_name, data = custom_data.name or "Custom", custom_data
+        else:
+            dataset_name, data = SAMPLE_DATASETS[current_dataset]["name"], SAMPLE_DATASETS[current_dataset]["data"]
         
         # Header
         print(f"{colors['fg']}📊 ASCII Chart Generator{colors['reset']}")
-        print(f"Dataset: {SAMPLE_DATASETS[current_dataset]['name']} | Chart: {dict(CHART_TYPES)[current_chart_type]}{colors['reset']}")
+        print(f"Dataset: {dataset_name} ({len(data)} points) | Chart: {chart_names[current_chart_type]}{colors['reset']}")
         print(f"Size: {chart_width}x{chart_height} | Mode: {'🌙 Dark' if dark_mode else '☀️ Light'}{colors['reset']}")
         
         # Render chart
-        data = custom_data or SAMPLE_DATASETS[current_dataset]["data"]
         chart_output, _, _, full_data = render_chart(current_chart_type, chart_width, chart_height, data, colors)
         
         print("\n" + colors['bg'] + colors['fg'])
@@ -298,7 +542,7 @@ def main():
             key = sys.stdin.read(1)
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
         except:
-            key = input("\nPress key (↑↓1-4cdshq): ").lower()
+            key = input("\nPress key (↑↓1-4cfdshq): ").lower()
         
         if key == 'q':
             break
@@ -312,19 +556,19 @@ def main():
             colors = get_colors(dark_mode)
         elif key == 's':
             config = generate_shareable_config(
-                SAMPLE_DATASETS[current_dataset]["name"], 
+                dataset_name, 
                 current_chart_type, chart_width, chart_height, dark_mode
             )
             print(f"\n📤 Shareable config: {config}")
             print("Paste this anywhere to recreate!")
-            prefs["recent"].append(SAMPLE_DATASETS[current_dataset]["name"])
+            prefs["recent"].append(dataset_name)
             input("Press Enter...")
         elif key == 'c':
             csv_input = input("Enter CSV data (x1,y1,x2,y2...): ").strip()
             try:
                 points = [float(x.strip()) for x in csv_input.split(',')]
                 if len(points) % 2 == 0:
-                    custom_data = [[points[i], points[i+1]] for i in range(0, len(points), 2)]
+                    custom_data = Series.from_points([[points[i], points[i+1]] for i in range(0, len(points), 2)], "Custom")
                     current_dataset = "Custom"
                     prefs["recent"].append("Custom")
                 else:
@@ -332,13 +576,25 @@ def main():
             except:
                 print("Invalid numbers!")
             input("Press Enter...")
+        elif key == 'f':
+            path = input("CSV or JSON file: ").strip()
+            try:
+                custom_data = load_series(path)
+                current_dataset = "Custom"
+                prefs["recent"].append(custom_data.name)
+                print(f"Loaded {len(custom_data)} points.")
+            except (OSError, ValueError) as e:
+                print(f"Could not load {path}: {e}")
+            input("Press Enter...")
         elif key in CHART_TYPES:
             current_chart_type = CHART_TYPES[key][1]
         elif key == '\x1b[D' or key == '\x1b[A':  # Left/Up
-            idx = int(current_dataset) - 1
+            idx = int(current_dataset) - 1 if current_dataset in SAMPLE_DATASETS else 0
+            custom_data = None
             current_dataset = str((idx - 1) % len(SAMPLE_DATASETS) + 1)
         elif key == '\x1b[C' or key == '\x1b[B':  # Right/Down
-            idx = int(current_dataset) - 1
+            idx = int(current_dataset) - 1 if current_dataset in SAMPLE_DATASETS else -1
+            custom_data = None
             current_dataset = str((idx + 1) % len(SAMPLE_DATASETS) + 1)
     
     save_prefs(prefs)
@@ -3,8 +3,9 @@
 import sys
 import json
 import os
-import shutil
+import sqlite3
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, date, timedelta
 from collections import defaultdict, Counter
@@ -13,7 +14,8 @@ import textwrap
 import csv
 
 APP_NAME = "Eco Footprint Tracker"
-DATA_FILE = "eco_data.json"
+DATA_FILE = "eco_data.json"  # legacy JSON store, imported once into STORE_FILE
+STORE_FILE = "eco_data.sqlite3"
 DATE_FMT = "%Y-%m-%d"
 ISO_FMT = "%Y-%m-%dT%H:%M:%S"
 
@@ -70,31 +72,196 @@ def data_path():
     return Path(__file__).with_name(DATA_FILE)
 
 
-def load_data():
-    path = data_path()
-    if not path.exists():
-        return {"profiles": {}, "last_profile": None}
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        backup = path.with_suffix(path.suffix + ".bak")
-        try:
-            shutil.copy2(path, backup)
-        except Exception:
-            pass
-        return {"profiles": {}, "last_profile": None}
+class EntryStore:
+    """Records kept as rows of a sqlite3 database instead of one big JSON document.
+
+    Commands load only the date range they need, and save() writes only the
+    rows that were added, changed or removed since they were loaded, so adding
+    one entry costs the same with 10 or 100k entries on file. Writes go through
+    one WAL transaction per save: a crash leaves either the old or the new state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS records (scope TEXT NOT NULL, key TEXT NOT NULL, day TEXT NOT NULL,"
+            " body TEXT NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS records_by_day ON records (scope, day);"
+            "CREATE INDEX IF NOT EXISTS records_by_int_key ON records (scope, CAST(key AS INTEGER));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._loaded = {}  # scope -> {key: body as last read or written}
 
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True, ensure_ascii=False)),
+        )
 
-def atomic_write_json(path: Path, data):
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, sort_keys=True)
-    os.replace(tmp, path)
+    def _track(self, scope, rows, replace=False):
+        if replace:
+            self._loaded[scope] = {}
+        seen = self._loaded.setdefault(scope, {})
+        rows = rows.fetchall()
+        seen.update(rows)
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for _, body in rows) + "]")
+
+    @staticmethod
+    def _range(columns, scope, since, until):
+        sql, params = f"SELECT {columns} FROM records WHERE scope = ?", [scope]
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(str(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(str(until))
+        return sql + " ORDER BY day, rowid", params
+
+    def load(self, scope, since=None, until=None):
+        """Records of `scope` whose day lies in [since, until]; either bound may be None.
+
+        The result (plus anything fetch()ed later) is what the next save() diffs against.
+        """
+        sql, params = self._range("key, body", scope, since, until)
+        return self._track(scope, self.db.execute(sql, params), replace=True)
+
+    def read(self, scope, since=None, until=None):
+        """load() for commands that never save: sqlite joins the bodies, so one row and one json.loads."""
+        sql, params = self._range("body", scope, since, until)
+        # the outer query has no ORDER BY or join, so sqlite keeps the subquery's order
+        row = self.db.execute(f"SELECT '[' || COALESCE(group_concat(body, ','), '') || ']' FROM ({sql})", params)
+        return json.loads(row.fetchone()[0])
+
+    def fetch(self, scope, key):
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ? AND key = ?", (scope, str(key)))
+        found = self._track(scope, rows)
+        return found[0] if found else None
+
+    def count(self, scope):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def max_key(self, scope):
+        row = self.db.execute("SELECT MAX(CAST(key AS INTEGER)) FROM records WHERE scope = ?", (scope,)).fetchone()
+        return row[0] or 0
+
+    def save(self, scope, records, key, day):
+        """Write records that are new or changed since load()/fetch(); delete loaded ones that are gone."""
+        seen = self._loaded.get(scope, {})
+        live, upserts = {}, []
+        for rec in records:
+            k = str(key(rec))
+            body = json.dumps(rec, sort_keys=True, ensure_ascii=False)
+            live[k] = body
+            if seen.get(k) != body:
+                upserts.append((scope, k, str(day(rec) or ""), body))
+        deletes = [(scope, k) for k in seen if k not in live]
+        self.db.executemany(
+            "INSERT INTO records (scope, key, day, body) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(scope, key) DO UPDATE SET day = excluded.day, body = excluded.body",
+            upserts,
+        )
+        self.db.executemany("DELETE FROM records WHERE scope = ? AND key = ?", deletes)
+        self._loaded[scope] = live
+        return len(upserts) + len(deletes)
+
+    def forget(self, scope):
+        """Nothing of `scope` was loaded: the next save() only adds or updates."""
+        self._loaded.pop(scope, None)
+
+    def drop(self, scope):
+        self.db.execute("DELETE FROM records WHERE scope = ?", (scope,))
+        self.forget(scope)
+
+    def migrate(self, legacy_path, importer):
+        """One-time import of the old JSON file, which is left in place as a backup."""
+        legacy_path = Path(legacy_path)
+        if self.get_meta("migrated_from") is not None:
+            return False
+        with self.transaction():
+            if self.get_meta("migrated_from") is not None:  # another process got there first
+                return False
+            if legacy_path.exists():
+                try:
+                    with legacy_path.open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except ValueError:
+                    print(f"Could not read {legacy_path}; starting with an empty store.", file=sys.stderr)
+                else:
+                    importer(self, raw)
+            self.set_meta("migrated_from", str(legacy_path))
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # fold the bulk import into the main file
+        self._loaded.clear()
+        return True
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = EntryStore(Path(__file__).with_name(STORE_FILE))
+        _store.migrate(data_path(), import_legacy)
+    return _store
+
+
+def entry_day(entry):
+    return entry.get("date")
+
+
+def import_legacy(store, raw):
+    profiles = raw.get("profiles", {})
+    for name, profile in profiles.items():
+        store.save(name, profile.get("entries", []), key=lambda e: e["id"], day=entry_day)
+    store.set_meta("profiles", {n: {k: v for k, v in p.items() if k != "entries"} for n, p in profiles.items()})
+    store.set_meta("last_profile", raw.get("last_profile"))
+
+
+def load_data(since=None, until=None, entries=True):
+    """Profiles plus their entries dated within [since, until]; entries=False skips them."""
+    store = get_store()
+    profiles = {}
+    for name, profile in store.get_meta("profiles", {}).items():
+        if entries:
+            profile["entries"] = store.load(name, since, until)
+        else:
+            profile["entries"] = []
+            store.forget(name)
+        profiles[name] = profile
+    return {"profiles": profiles, "last_profile": store.get_meta("last_profile")}
 
 
 def save_data(data):
-    atomic_write_json(data_path(), data)
+    store = get_store()
+    with store.transaction():
+        for name in set(store.get_meta("profiles", {})) - set(data["profiles"]):
+            store.drop(name)
+        for name, profile in data["profiles"].items():
+            store.save(name, profile["entries"], key=lambda e: e["id"], day=entry_day)
+        store.set_meta(
+            "profiles",
+            {n: {k: v for k, v in p.items() if k != "entries"} for n, p in data["profiles"].items()},
+        )
+        store.set_meta("last_profile", data.get("last_profile"))
 
 
 def ensure_profile(data, name=None):
@@ -117,7 +284,7 @@ def ensure_profile(data, name=None):
         return default_name
     if name is None or name not in data["profiles"]:
         # pick arbitrary existing
-        name = sorted(data["profiles"].keys())
+        name = sorted(data["profiles"].keys())[0]
     data["last_profile"] = name
     data["profiles"][name]["metadata"]["last_used"] = datetime.now().strftime(ISO_FMT)
     save_data(data)
@@ -563,16 +730,22 @@ def profile_delete_cmd(data, args):
     print(f"Deleted profile '{name}'.")
 
 
-def find_entry_by_id(profile, eid):
+def find_entry_by_id(profile, eid, profile_name=None):
     for e in profile["entries"]:
         if str(e["id"]) == str(eid):
             return e
-    return None
+    if profile_name is None:
+        return None
+    # edit/delete do not load the profile's history; pull in just this entry
+    entry = get_store().fetch(profile_name, eid)
+    if entry is not None:
+        profile["entries"].append(entry)
+    return entry
 
 
 def edit_cmd(data, args, profile_name=None):
     profile_name, profile = get_profile(data, profile_name)
-    entry = find_entry_by_id(profile, args.id)
+    entry = find_entry_by_id(profile, args.id, profile_name)
     if not entry:
         print("No entry with that id.")
         return
@@ -615,7 +788,7 @@ def edit_cmd(data, args, profile_name=None):
 
 def delete_cmd(data, args, profile_name=None):
     profile_name, profile = get_profile(data, profile_name)
-    entry = find_entry_by_id(profile, args.id)
+    entry = find_entry_by_id(profile, args.id, profile_name)
     if not entry:
         print("No entry with that id.")
         return
@@ -805,6 +978,31 @@ def build_arg_parser():
     return p
 
 
+def entry_window(args):
+    """load_data() arguments covering only the entries a command reads."""
+    today = date.today()
+    command, sub = args.command, getattr(args, "subcommand", None)
+    if command in ("add", "edit", "delete", "help", None):
+        return {"entries": False}
+    if command == "goal" and sub != "show" or command == "profile" and sub in ("list", "create", "switch"):
+        return {"entries": False}
+    if command == "list" and args.days:
+        return {"since": today - timedelta(days=args.days - 1)}
+    if command == "summary":
+        if args.days:
+            return {"since": today - timedelta(days=args.days - 1)}
+        if args.week:
+            return {"since": today - timedelta(days=6)}
+        if args.month:
+            return {"since": today.replace(day=1)}
+    if command == "trend":
+        return {"since": last_full_weeks(4)[0]}
+    if command == "goal" and sub == "show":
+        last_week_end = start_of_week(today) - timedelta(days=1)
+        return {"since": start_of_week(last_week_end), "until": last_week_end}
+    return {}
+
+
 def handle_args(data, args):
     if args.command == "add":
         add_entry_interactive(data)
@@ -851,7 +1049,7 @@ def handle_args(data, args):
 
 
 def interactive_loop():
-    data = load_data()
+    data = load_data(entries=False)
     profile_name = ensure_profile(data)
     while True:
         os.system("")  # no-op, keeps compatibility
@@ -884,15 +1082,14 @@ def interactive_loop():
             print("Unknown command.")
             help_cmd()
             continue
-        data = load_data()
+        data = load_data(**entry_window(args))
         profile_name = ensure_profile(data)
         handle_args(data, args)
-        data = load_data()
+        data = load_data(entries=False)
         profile_name = ensure_profile(data)
 
 
 def main():
-    data = load_data()
     if len(sys.argv) == 1:
         interactive_loop()
         return
@@ -901,7 +1098,7 @@ def main():
     if not args.command:
         help_cmd()
         sys.exit(1)
-    handle_args(data, args)
+    handle_args(load_data(**entry_window(args)), args)
 
 
 if __name__ == "__main__":
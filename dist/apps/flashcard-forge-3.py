@@ -3,9 +3,10 @@
 """
 Flashcard Forge - single-file CLI spaced repetition flashcards
 Usage: python flashcard.py <command> [options]
-Commands: add, study, list, import, export, stats
+Commands: add, study, list, import, export, stats, sync
 Uses only Python standard library.
-Data file: flashcards.json (in current directory)
+Data file: flashcards.json (in current directory); cards are kept in
+flashcards.idx between commands and written back to it by `sync`
 """
 
 import json
@@ -13,11 +14,13 @@ import os
 import sys
 import argparse
 import random
-from datetime import datetime, timedelta
+import sqlite3
+from datetime import datetime, timedelta, timezone
 import time
 import signal
 
 DATA_FILE = "flashcards.json"
+INDEX_FILE = "flashcards.idx"  # due-time index of DATA_FILE, see DueIndex
 DATE_FMT = "%Y-%m-%dT%H:%M:%S"  # ISO without TZ for simplicity
 
 # ANSI colors
@@ -59,12 +62,18 @@ def load_cards():
         print("Error loading flashcards:", e, file=sys.stderr)
         return []
 
-def save_cards(cards):
+def write_cards(cards):
     try:
         with open(DATA_FILE, "w", encoding="utf-8") as f:
             json.dump(cards, f, ensure_ascii=False, indent=2)
     except Exception as e:
         print("Error saving flashcards:", e, file=sys.stderr)
+        return False
+    return True
+
+def save_cards(cards):
+    write_cards(cards)
+    drop_index()
 
 def iso_now():
     return datetime.utcnow().strftime(DATE_FMT)
@@ -79,6 +88,195 @@ def parse_iso(s):
         except Exception:
             return None
 
+def utc_epoch(dt):
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+class DueIndex:
+    """Cards of one deck in a sqlite3 file next to the deck's JSON, indexed by due time.
+
+    Each card is a row keyed by its position in the deck, holding its due
+    time in epoch seconds (None if unknown), a per-app weight and review
+    count, and the card itself. A review rewrites one row; the next N due
+    cards come off the due index and due counts are range counts, so
+    neither parses nor sorts the whole deck. The index is the deck of
+    record: once a row has changed it is "ahead" of the JSON file, which
+    is only written when asked for (a sync command writes the deck out
+    and calls saved()), so a command costs the rows it touches rather
+    than a rewrite of the whole deck.
+    """
+
+    def __init__(self, path, keys):
+        self.path = path
+        self.keys = keys  # card -> (due epoch or None, weight or None, review count)
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS cards (pos INTEGER PRIMARY KEY, due REAL, weight REAL,"
+            " reviews INTEGER NOT NULL, body TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS cards_by_due ON cards (due, pos);"
+            "CREATE INDEX IF NOT EXISTS cards_by_weight ON cards (COALESCE(weight, 0) DESC, pos);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+
+    def close(self):
+        self.db.close()
+
+    def _get(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+
+    @property
+    def sig(self):
+        """Size and mtime of the JSON file the index was built from."""
+        return self._get("sig")
+
+    @property
+    def ahead(self):
+        return self._get("ahead", False)
+
+    @property
+    def header(self):
+        """Deck fields other than the cards."""
+        return self._get("header", {})
+
+    @header.setter
+    def header(self, value):
+        self._set("header", value)
+        self._set("ahead", True)
+
+    def _row(self, card):
+        return (*self.keys(card), json.dumps(card, ensure_ascii=False))
+
+    def rebuild(self, cards, header, sig):
+        """Replace everything with `cards` as read from a JSON file with signature `sig`."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute("DELETE FROM cards")
+            self.db.executemany(
+                "INSERT INTO cards (pos, due, weight, reviews, body) VALUES (?, ?, ?, ?, ?)",
+                ((pos, *self._row(card)) for pos, card in enumerate(cards)),
+            )
+            self._set("header", header)
+            self._set("sig", sig)
+            self._set("ahead", False)
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def saved(self, sig):
+        """Record that the JSON file, now with signature `sig`, holds the current deck again."""
+        self._set("sig", sig)
+        self._set("ahead", False)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def card(self, pos):
+        row = self.db.execute("SELECT body FROM cards WHERE pos = ?", (pos,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cards(self, by_due=False):
+        """The whole deck, in order (or earliest due first, cards without a due time leading)."""
+        rows = self.db.execute("SELECT body FROM cards ORDER BY " + ("due, pos" if by_due else "pos")).fetchall()
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for body, in rows) + "]")
+
+    def put(self, pos, card):
+        self.db.execute(
+            "UPDATE cards SET due = ?, weight = ?, reviews = ?, body = ? WHERE pos = ?", (*self._row(card), pos)
+        )
+        self._set("ahead", True)
+
+    def append(self, card):
+        pos = self.db.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM cards").fetchone()[0]
+        self.db.execute("INSERT INTO cards (pos, due, weight, reviews, body) VALUES (?, ?, ?, ?, ?)",
+                        (pos, *self._row(card)))
+        self._set("ahead", True)
+        return pos
+
+    def remove(self, pos):
+        self.db.execute("DELETE FROM cards WHERE pos = ?", (pos,))
+        self._set("ahead", True)
+
+    def overdue(self, now):
+        """(pos, due, weight) of the cards due at or before `now`, earliest first."""
+        return self.db.execute(
+            "SELECT pos, due, weight FROM cards WHERE due <= ? ORDER BY due, pos", (now,)
+        )
+
+    def upcoming(self, now):
+        """(pos, due, weight) of the cards not due yet (or with no due time), heaviest first."""
+        return self.db.execute(
+            "SELECT pos, due, weight FROM cards WHERE due IS NULL OR due > ?"
+            " ORDER BY COALESCE(weight, 0) DESC, pos", (now,)
+        )
+
+    def due_positions(self, now):
+        return [pos for pos, in self.db.execute(
+            "SELECT pos FROM cards WHERE due IS NULL OR due <= ? ORDER BY pos", (now,))]
+
+    def count_due(self, before, min_weight=None):
+        """Cards due before `before` (or with no due time), optionally only those weighing at least `min_weight`."""
+        sql, params = "SELECT COUNT(*) FROM cards WHERE (due IS NULL OR due < ?)", [before]
+        if min_weight is not None:
+            sql += " AND COALESCE(weight, 0) >= ?"
+            params.append(min_weight)
+        return self.db.execute(sql, params).fetchone()[0]
+
+    def summary(self, min_weight=0, min_reviews=0):
+        """(cards, cards with a weight, mean weight or None, cards with weight >= min_weight and reviews >= min_reviews)."""
+        total, weighed, mean, strong = self.db.execute(
+            "SELECT COUNT(*), COUNT(weight), AVG(weight), SUM(weight >= ? AND reviews >= ?) FROM cards",
+            (min_weight, min_reviews),
+        ).fetchone()
+        return total, weighed, mean, strong or 0
+
+def card_keys(card):
+    nr = parse_iso(card.get("next_review"))
+    return (utc_epoch(nr) if nr else None), card.get("ease"), 0
+
+def drop_index():
+    """Forget the index, e.g. because DATA_FILE was rewritten."""
+    for path in (INDEX_FILE, INDEX_FILE + "-wal", INDEX_FILE + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def data_sig():
+    st = os.stat(DATA_FILE) if os.path.exists(DATA_FILE) else None
+    return [st.st_size, st.st_mtime_ns] if st else None
+
+def open_cards():
+    """The DueIndex of DATA_FILE, rebuilt with load_cards() if the file changed since it was indexed.
+
+    DATA_FILE is only written by `sync`, so editing it by hand replaces
+    reviews and added cards made since the last sync.
+    """
+    index = DueIndex(INDEX_FILE, card_keys)
+    sig = data_sig()
+    if index.sig != sig:
+        if index.ahead:
+            print(f"Warning: {DATA_FILE} was changed outside the app; changes since the last sync are dropped.",
+                  file=sys.stderr)
+        index.rebuild(load_cards(), {}, sig)
+    return index
+
+def sync_cards(args):
+    index = open_cards()
+    if not index.ahead:
+        print(f"{DATA_FILE} is up to date.")
+    elif write_cards(index.cards()):
+        index.saved(data_sig())
+        print(f"Wrote {len(index)} cards to {DATA_FILE}.")
+    index.close()
+
 def add_card_interactive(args):
     try:
         front = input("Front: ").strip()
@@ -93,21 +291,22 @@ def add_card_interactive(args):
             "interval": 1,
             "ease": 2.5
         }
-        cards = load_cards()
+        index = open_cards()
         # Do not auto-overwrite here; append
-        cards.append(card)
-        save_cards(cards)
+        index.append(card)
+        index.close()
         print("Card added.")
     except KeyboardInterrupt:
         print("\nInterrupted. Card not added.")
 
 def list_cards(args):
-    cards = load_cards()
-    if not cards:
+    index = open_cards()
+    # sorted by next_review (cards without one first)
+    cards_sorted = index.cards(by_due=True)
+    index.close()
+    if not cards_sorted:
         print("No cards. Try: python flashcard.py add")
         return
-    # sort by next_review
-    cards_sorted = sorted(cards, key=lambda c: parse_iso(c.get("next_review","")))
     for i, c in enumerate(cards_sorted, 1):
         nr = parse_iso(c.get("next_review")) or datetime.utcnow()
         due = nr.date().isoformat()
@@ -127,7 +326,9 @@ def import_cards(args):
         if not isinstance(data, list):
             print("Invalid import format: expected a list of cards.")
             return
-        cards = load_cards()
+        index = open_cards()
+        cards = index.cards()
+        index.close()
         by_front = {c['front']: c for c in cards}
         merged = []
         for imp in data:
@@ -150,7 +351,9 @@ def import_cards(args):
 
 def export_cards(args):
     path = args.file
-    cards = load_cards()
+    index = open_cards()
+    cards = index.cards()
+    index.close()
     try:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(cards, f, ensure_ascii=False, indent=2)
@@ -159,25 +362,16 @@ def export_cards(args):
         print("Error exporting:", e)
 
 def stats_cards(args):
-    cards = load_cards()
-    total = len(cards)
-    now = datetime.utcnow()
-    due_today = 0
-    due_week = 0
-    eases = []
+    index = open_cards()
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    # due on a day <= today / today + 7 means due before the midnight that ends it
+    due_today = index.count_due(utc_epoch(today + timedelta(days=1)))
+    due_week = index.count_due(utc_epoch(today + timedelta(days=8)))
+    total, _, avg_ease, _ = index.summary()
+    index.close()
     # For longest streak we need history — not stored. We'll approximate longest streak by counting consecutive days with reviews is unavailable.
     # Since spec asks for longest streak, but we don't store history, we will report "N/A" while being testable.
-    for c in cards:
-        nr = parse_iso(c.get("next_review")) or now
-        if nr.date() <= now.date():
-            due_today += 1
-        if nr.date() <= (now + timedelta(days=7)).date():
-            due_week += 1
-        try:
-            eases.append(float(c.get("ease", 2.5)))
-        except Exception:
-            pass
-    avg_ease = (sum(eases)/len(eases)) if eases else 0.0
+    avg_ease = avg_ease if total else 0.0
     print(f"Total cards: {total}")
     print(f"Due today: {due_today}")
     print(f"Due this week: {due_week}")
@@ -189,33 +383,31 @@ def clamp(v, a, b):
 
 def study_cards(args):
     limit = args.limit or 0
-    cards = load_cards()
-    now = datetime.utcnow()
-    due = [c for c in cards if (parse_iso(c.get("next_review")) or now) <= now]
+    index = open_cards()
+    due = index.due_positions(utc_epoch(datetime.utcnow()))
     if not due:
         print("No cards due. Try: python flashcard.py add")
+        index.close()
         return
     # optionally randomize order
     random.shuffle(due)
     reviewed = 0
-    deleted_indices = set()
-    # Map front->index in original list for updates
-    front_to_index = {c['front']: i for i, c in enumerate(cards)}
+    # reviews and deletions go to the index as they happen; DATA_FILE waits for `sync`
     def save_and_report():
-        save_cards(cards)
+        index.close()
     def signal_handler(signum, frame):
         print("\nInterrupted. Saving progress...")
         save_and_report()
         sys.exit(0)
     signal.signal(signal.SIGINT, signal_handler)
-    for card in due:
+    for pos in due:
         if limit and reviewed >= limit:
             break
+        card = index.card(pos)
+        if card is None:
+            continue
         front = card['front']
         back = card['back']
-        idx = front_to_index.get(front)
-        if idx is None:
-            continue
         print(BOLD + f"\nFront: {front}" + RESET)
         print(YELLOW + "(Press Enter to reveal; q=quit, s=skip, d=delete)" + RESET)
         try:
@@ -233,11 +425,8 @@ def study_cards(args):
         if ch == "d":
             # delete card
             try:
-                del cards[idx]
-                # rebuild front->index map
-                front_to_index = {c['front']: i for i, c in enumerate(cards)}
+                index.remove(pos)
                 print(RED + "Card deleted." + RESET)
-                save_and_report()
             except Exception as e:
                 print("Error deleting card:", e)
             continue
@@ -262,10 +451,8 @@ def study_cards(args):
                 break
             if q_raw == "d":
                 try:
-                    del cards[idx]
-                    front_to_index = {c['front']: i for i, c in enumerate(cards)}
+                    index.remove(pos)
                     print(RED + "Card deleted." + RESET)
-                    save_and_report()
                 except Exception as e:
                     print("Error deleting card:", e)
                 q = None
@@ -281,12 +468,7 @@ def study_cards(args):
         # apply SRS update if q is not None
         if q is None:
             continue
-        # locate card in current cards (it may have been shifted)
-        try:
-            cur_idx = next(i for i, cc in enumerate(cards) if cc['front'] == front)
-        except StopIteration:
-            continue
-        cur = cards[cur_idx]
+        cur = card
         prev_interval = int(cur.get("interval",1))
         prev_ease = float(cur.get("ease",2.5))
         # Spec: ease adjusted by quality (0-5 scale: 5=hard, 0=easy).
@@ -304,8 +486,9 @@ def study_cards(args):
         cur['ease'] = round(new_ease, 2)
         cur['next_review'] = next_review_dt.strftime(DATE_FMT)
         reviewed += 1
+        index.put(pos, cur)
         print(GREEN + f"Reviewed. New interval: {new_interval} day(s). Next: {cur['next_review']} Ease: {cur['ease']}" + RESET)
-        save_and_report()
+    save_and_report()
     print(f"\nSession complete. Reviewed: {reviewed}")
 
 def build_parser():
@@ -326,6 +509,8 @@ def build_parser():
     sub_study = sub.add_parser("study", help="Study due cards")
     sub_study.add_argument("--limit", type=int, help="Limit number of cards this session (default: unlimited)")
     sub_study.set_defaults(func=study_cards)
+    sub_sync = sub.add_parser("sync", help=f"Write reviews and added cards back to {DATA_FILE}")
+    sub_sync.set_defaults(func=sync_cards)
     return p
 
 def main():
@@ -4,14 +4,223 @@ import json
 import datetime
 import os
 import sys
+from array import array
+from itertools import accumulate
 from typing import List, Dict, Optional
 
 DATA_FILE = 'habits.json'
 BACKUP_FILE = 'habits_backup.json'
 
+class HabitAnalytics:
+    """Per-habit day statuses with run lengths and running met counts.
+
+    Each habit keeps one status byte per calendar day (MISSING, MISSED,
+    PARTIAL, MET), the length of the met run ending on each day, and a prefix
+    count of met days. set() only rewrites the days after the changed one up
+    to the end of its run, so a check-in for the latest day is O(1), and
+    streak(), best() and met_count() over any window are O(1) lookups. Each
+    habit remembers the target signature its statuses were computed with,
+    so an edited target can be detected and rebuilt.
+    """
+
+    MISSING, MISSED, PARTIAL, MET = 0, 1, 2, 3
+    _TO_TEXT = bytes.maketrans(bytes(range(4)), b"0123")
+    _FROM_TEXT = bytes.maketrans(b"0123", bytes(range(4)))
+
+    def __init__(self):
+        self.origin = None    # date ordinal of day index 0
+        self.size = 0         # days covered by every series
+        self.last_day = None  # ordinal of the latest day anything was recorded for
+        self.status = {}      # habit id -> bytearray of statuses
+        self.runs = {}        # habit id -> array of met-run lengths ending on each day
+        self.met = {}         # habit id -> prefix counts of met days (size + 1 entries)
+        self.sigs = {}        # habit id -> target signature the statuses were computed with
+        self._best = {}
+        self._stale = set()   # habits whose runs/met arrays need a recount
+
+    @staticmethod
+    def _ord(day):
+        if isinstance(day, str):
+            day = datetime.date.fromisoformat(day)
+        return day if isinstance(day, int) else day.toordinal()
+
+    def _cover(self, lo, hi):
+        """Grow every series to span ordinals lo..hi."""
+        if self.origin is None:
+            self.origin = lo
+        if lo < self.origin:
+            pad = self.origin - lo
+            for hid in self.status:
+                self.status[hid][:0] = bytes(pad)
+                self._stale.add(hid)
+            self.origin, self.size = lo, self.size + pad
+        if hi - self.origin + 1 > self.size:
+            grow = hi - self.origin + 1 - self.size
+            for hid in self.status:
+                self.status[hid].extend(bytes(grow))
+                self.runs[hid].extend([0] * grow)
+                self.met[hid].extend([self.met[hid][-1]] * grow)
+            self.size += grow
+
+    def _series(self, hid):
+        if hid not in self.status:
+            self.status[hid] = bytearray(self.size)
+            self.runs[hid] = array("I", bytes(4 * self.size))
+            self.met[hid] = array("I", bytes(4 * (self.size + 1)))
+        return self.status[hid]
+
+    def _recount(self, hid):
+        status = self.status[hid]
+        runs = array("I", bytes(4 * len(status)))
+        run = 0
+        for i, s in enumerate(status):
+            run = run + 1 if s == self.MET else 0
+            runs[i] = run
+        self.runs[hid] = runs
+        self.met[hid] = array("I", accumulate((s == self.MET for s in status), initial=0))
+        self._best.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _ready(self, hid):
+        if hid in self._stale:
+            self._recount(hid)
+
+    def set(self, hid, day, status):
+        """Record one habit's status for one day; returns whether anything changed."""
+        d = self._ord(day)
+        self._cover(d, d)
+        series = self._series(hid)
+        i = d - self.origin
+        old = series[i]
+        if old == status:
+            return False
+        series[i] = status
+        if (old == self.MET) != (status == self.MET) and hid not in self._stale:
+            met, step = self.met[hid], 1 if status == self.MET else -1
+            for j in range(i + 1, len(met)):
+                met[j] += step
+            runs, prev = self.runs[hid], self.runs[hid][i - 1] if i else 0
+            for j in range(i, self.size):
+                run = prev + 1 if series[j] == self.MET else 0
+                if j > i and runs[j] == run:
+                    break  # the rest of the run is unaffected
+                runs[j] = prev = run
+            self._best.pop(hid, None)
+        return True
+
+    def record(self, day, statuses):
+        """Statuses of one day's entry ({habit id: status}); marks the day as recorded."""
+        d = self._ord(day)
+        for hid, status in statuses.items():
+            self.set(hid, d, status)
+        if self.last_day is None or d > self.last_day:
+            self.last_day = d
+
+    def rebuild(self, hid, days, sig=None):
+        """Replace a habit's statuses with `days` ({day: status}) in one pass."""
+        days = {self._ord(d): s for d, s in days.items()}
+        if days:
+            self._cover(min(days), max(days))
+        self._series(hid)
+        series = self.status[hid] = bytearray(self.size)
+        for d, s in days.items():
+            series[d - self.origin] = s
+        self._stale.add(hid)
+        self.sigs[hid] = sig
+
+    def drop(self, hid):
+        for table in (self.status, self.runs, self.met, self.sigs, self._best):
+            table.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _day_index(self, hid, day):
+        if hid not in self.status or self.origin is None or day is None:
+            return None
+        i = self._ord(day) - self.origin
+        return i if 0 <= i < self.size else None
+
+    def status_on(self, hid, day):
+        i = self._day_index(hid, day)
+        return self.MISSING if i is None else self.status[hid][i]
+
+    def streak(self, hid, day):
+        """Length of the met run ending on `day` (0 if it was not met)."""
+        i = self._day_index(hid, day)
+        if i is None:
+            return 0
+        self._ready(hid)
+        return self.runs[hid][i]
+
+    def best(self, hid, until=None):
+        """Longest met run, counting only days up to `until` if given."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        if until is not None:
+            i = self._ord(until) - self.origin
+            if i < 0:
+                return 0
+            if i < self.size - 1:
+                return max(self.runs[hid][:i + 1], default=0)
+        if hid not in self._best:
+            self._best[hid] = max(self.runs[hid], default=0)
+        return self._best[hid]
+
+    def met_count(self, hid, start, end):
+        """Met days in [start, end]."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        lo = max(self._ord(start) - self.origin, 0)
+        hi = min(self._ord(end) - self.origin, self.size - 1)
+        if hi < lo:
+            return 0
+        met = self.met[hid]
+        return met[hi + 1] - met[lo]
+
+    def rate(self, hid, start, end):
+        """Percentage of the days in [start, end] that were met."""
+        days = self._ord(end) - self._ord(start) + 1
+        return self.met_count(hid, start, end) * 100.0 / days if days > 0 else 0.0
+
+    def to_chunks(self):
+        """One {"habit", "year", "status"} record per habit and calendar year, statuses as "0123" text."""
+        chunks = []
+        if self.origin is None:
+            return chunks
+        first = datetime.date.fromordinal(self.origin).year
+        last = datetime.date.fromordinal(self.origin + max(self.size - 1, 0)).year
+        for hid, series in self.status.items():
+            for year in range(first, last + 1):
+                lo = datetime.date(year, 1, 1).toordinal() - self.origin
+                hi = datetime.date(year, 12, 31).toordinal() - self.origin + 1
+                part = bytes(max(0, -lo)) + bytes(series[max(lo, 0):max(hi, 0)])
+                part += bytes(hi - lo - len(part))
+                if part.strip(b"\0"):
+                    chunks.append({"habit": hid, "year": year, "status": part.translate(self._TO_TEXT).decode()})
+        return chunks
+
+    def from_chunks(self, chunks, sigs=None, last_day=None):
+        self.__init__()
+        chunks = list(chunks)
+        if chunks:
+            years = [c["year"] for c in chunks]
+            self._cover(datetime.date(min(years), 1, 1).toordinal(), datetime.date(max(years), 12, 31).toordinal())
+        for c in chunks:
+            series = self._series(c["habit"])
+            lo = datetime.date(c["year"], 1, 1).toordinal() - self.origin
+            data = c["status"].encode().translate(self._FROM_TEXT)
+            series[lo:lo + len(data)] = data
+            self._stale.add(c["habit"])
+        self.sigs.update(sigs or {})
+        self.last_day = self._ord(last_day) if last_day else None
+
+
 class HabitTracker:
     def __init__(self):
         self.habits: List[Dict] = []
+        self.analytics = HabitAnalytics()
+        self.tracked: Dict[int, Dict] = {}  # id -> habit; holding it keeps the id from being reused
         self.load_data()
     
     def load_data(self):
@@ -20,6 +229,8 @@ class HabitTracker:
             if os.path.exists(DATA_FILE):
                 with open(DATA_FILE, 'r') as f:
                     self.habits = json.load(f)
+                for habit in self.habits:
+                    self.backfill_done(habit)
                 self.prune_zero_streak()
         except (json.JSONDecodeError, KeyError, TypeError):
             print("⚠️  Corrupt data detected. Starting fresh.")
@@ -41,6 +252,27 @@ class HabitTracker:
             if h.get('streak', 0) > 0 or self.is_recent(h, today)
         ]
     
+    @staticmethod
+    def backfill_done(habit: Dict):
+        """Habits saved before days were recorded: the current streak's days are the ones known done."""
+        if 'done' in habit:
+            return
+        try:
+            last = datetime.date.fromisoformat(habit['last_date'])
+        except (KeyError, TypeError, ValueError):
+            habit['done'] = []
+            return
+        habit['done'] = [(last - datetime.timedelta(days=i)).isoformat()
+                         for i in range(max(int(habit.get('streak', 0)), 1) - 1, -1, -1)]
+
+    def streak_key(self, habit: Dict) -> int:
+        """`habit`'s key in self.analytics, loading its done days the first time it is asked for."""
+        hid = id(habit)
+        if self.tracked.get(hid) is not habit:
+            self.tracked[hid] = habit
+            self.analytics.rebuild(hid, {d: HabitAnalytics.MET for d in habit.get('done', [])})
+        return hid
+
     def is_recent(self, habit: Dict, today: datetime.date) -> bool:
         """Check if habit was done within last 7 days."""
         try:
@@ -61,7 +293,8 @@ class HabitTracker:
         self.habits.append({
             "name": name,
             "streak": 0,
-            "last_date": ""
+            "last_date": "",
+            "done": []
         })
         self.save_data()
         print(f"✅ Added habit: {name}")
@@ -85,6 +318,8 @@ class HabitTracker:
             habit['streak'] = 1
         
         habit['last_date'] = today_str
+        habit.setdefault('done', []).append(today_str)
+        self.analytics.set(self.streak_key(habit), today_str, HabitAnalytics.MET)
         self.save_data()
         print(f"✅ {habit['name']} marked! Streak: {habit['streak']}")
     
@@ -133,9 +368,10 @@ class HabitTracker:
         for h in sorted_habits:
             streak = h.get('streak', 0)
             last_date = h.get('last_date', 'Never')
+            best = self.analytics.best(self.streak_key(h))
             color = "\033[92m" if streak > 0 else "\033[91m"  # Green for active, red for broken
             reset = "\033[0m"
-            print(f"{color}{h['name']:20} Streak: {streak:2d}  Last: {last_date:10}{reset}")
+            print(f"{color}{h['name']:20} Streak: {streak:2d}  Best: {best:2d}  Last: {last_date:10}{reset}")
         print("-" * 60)
     
     def export_backup(self):
@@ -166,9 +402,11 @@ class HabitTracker:
                 if not all(k in habit for k in ['name', 'streak', 'last_date']):
                     print("⚠️  Skipping invalid habit.")
                     continue
+                self.backfill_done(habit)
                 existing = self.find_habit(habit['name'])
                 if existing:
                     existing.update(habit)
+                    self.tracked.pop(id(existing), None)  # reload its days on next use
                 else:
                     self.habits.append(habit)
             
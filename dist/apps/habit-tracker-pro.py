@@ -31,7 +31,9 @@ import os
 import time
 import datetime
 import locale
+from array import array
 from collections import deque
+from itertools import accumulate
 
 locale.setlocale(locale.LC_ALL, '')
 
@@ -85,39 +87,209 @@ def normalized_history_list(history_dict):
 def history_dict_from_list(items):
     return {date_to_str(d): bool(v) for d, v in items}
 
-def calc_current_and_longest_streak(history_dict, upto=None):
-    """Return (current_streak, longest_streak). History dict maps date_str->bool."""
-    if upto is None:
-        upto = today_date()
-    items = normalized_history_list(history_dict)
-    if not items:
-        return 0, 0
-    # Build a set of dates completed
-    completed = set(d for d, v in items if v)
-    # Find longest consecutive runs in the available dates, but we must consider day gaps as misses.
-    # We'll iterate from earliest to upto and check each date.
-    earliest = items
-    d = earliest
-    longest = 0
-    current_run = 0
-    # We'll progress day by day until upto
-    while d <= upto:
-        if d in completed:
-            current_run += 1
-            longest = max(longest, current_run)
-        else:
-            current_run = 0
-        d += datetime.timedelta(days=1)
-    # Calculate current streak ending at 'upto'
-    cur = 0
-    d = upto
-    while True:
-        if d in completed:
-            cur += 1
-            d -= datetime.timedelta(days=1)
-        else:
-            break
-    return cur, longest
+class HabitAnalytics:
+    """Per-habit day statuses with run lengths and running met counts.
+
+    Each habit keeps one status byte per calendar day (MISSING, MISSED,
+    PARTIAL, MET), the length of the met run ending on each day, and a prefix
+    count of met days. set() only rewrites the days after the changed one up
+    to the end of its run, so a check-in for the latest day is O(1), and
+    streak(), best() and met_count() over any window are O(1) lookups. Each
+    habit remembers the target signature its statuses were computed with,
+    so an edited target can be detected and rebuilt.
+    """
+
+    MISSING, MISSED, PARTIAL, MET = 0, 1, 2, 3
+    _TO_TEXT = bytes.maketrans(bytes(range(4)), b"0123")
+    _FROM_TEXT = bytes.maketrans(b"0123", bytes(range(4)))
+
+    def __init__(self):
+        self.origin = None    # date ordinal of day index 0
+        self.size = 0         # days covered by every series
+        self.last_day = None  # ordinal of the latest day anything was recorded for
+        self.status = {}      # habit id -> bytearray of statuses
+        self.runs = {}        # habit id -> array of met-run lengths ending on each day
+        self.met = {}         # habit id -> prefix counts of met days (size + 1 entries)
+        self.sigs = {}        # habit id -> target signature the statuses were computed with
+        self._best = {}
+        self._stale = set()   # habits whose runs/met arrays need a recount
+
+    @staticmethod
+    def _ord(day):
+        if isinstance(day, str):
+            day = datetime.date.fromisoformat(day)
+        return day if isinstance(day, int) else day.toordinal()
+
+    def _cover(self, lo, hi):
+        """Grow every series to span ordinals lo..hi."""
+        if self.origin is None:
+            self.origin = lo
+        if lo < self.origin:
+            pad = self.origin - lo
+            for hid in self.status:
+                self.status[hid][:0] = bytes(pad)
+                self._stale.add(hid)
+            self.origin, self.size = lo, self.size + pad
+        if hi - self.origin + 1 > self.size:
+            grow = hi - self.origin + 1 - self.size
+            for hid in self.status:
+                self.status[hid].extend(bytes(grow))
+                self.runs[hid].extend([0] * grow)
+                self.met[hid].extend([self.met[hid][-1]] * grow)
+            self.size += grow
+
+    def _series(self, hid):
+        if hid not in self.status:
+            self.status[hid] = bytearray(self.size)
+            self.runs[hid] = array("I", bytes(4 * self.size))
+            self.met[hid] = array("I", bytes(4 * (self.size + 1)))
+        return self.status[hid]
+
+    def _recount(self, hid):
+        status = self.status[hid]
+        runs = array("I", bytes(4 * len(status)))
+        run = 0
+        for i, s in enumerate(status):
+            run = run + 1 if s == self.MET else 0
+            runs[i] = run
+        self.runs[hid] = runs
+        self.met[hid] = array("I", accumulate((s == self.MET for s in status), initial=0))
+        self._best.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _ready(self, hid):
+        if hid in self._stale:
+            self._recount(hid)
+
+    def set(self, hid, day, status):
+        """Record one habit's status for one day; returns whether anything changed."""
+        d = self._ord(day)
+        self._cover(d, d)
+        series = self._series(hid)
+        i = d - self.origin
+        old = series[i]
+        if old == status:
+            return False
+        series[i] = status
+        if (old == self.MET) != (status == self.MET) and hid not in self._stale:
+            met, step = self.met[hid], 1 if status == self.MET else -1
+            for j in range(i + 1, len(met)):
+                met[j] += step
+            runs, prev = self.runs[hid], self.runs[hid][i - 1] if i else 0
+            for j in range(i, self.size):
+                run = prev + 1 if series[j] == self.MET else 0
+                if j > i and runs[j] == run:
+                    break  # the rest of the run is unaffected
+                runs[j] = prev = run
+            self._best.pop(hid, None)
+        return True
+
+    def record(self, day, statuses):
+        """Statuses of one day's entry ({habit id: status}); marks the day as recorded."""
+        d = self._ord(day)
+        for hid, status in statuses.items():
+            self.set(hid, d, status)
+        if self.last_day is None or d > self.last_day:
+            self.last_day = d
+
+    def rebuild(self, hid, days, sig=None):
+        """Replace a habit's statuses with `days` ({day: status}) in one pass."""
+        days = {self._ord(d): s for d, s in days.items()}
+        if days:
+            self._cover(min(days), max(days))
+        self._series(hid)
+        series = self.status[hid] = bytearray(self.size)
+        for d, s in days.items():
+            series[d - self.origin] = s
+        self._stale.add(hid)
+        self.sigs[hid] = sig
+
+    def drop(self, hid):
+        for table in (self.status, self.runs, self.met, self.sigs, self._best):
+            table.pop(hid, None)
+        self._stale.discard(hid)
+
+    def _day_index(self, hid, day):
+        if hid not in self.status or self.origin is None or day is None:
+            return None
+        i = self._ord(day) - self.origin
+        return i if 0 <= i < self.size else None
+
+    def status_on(self, hid, day):
+        i = self._day_index(hid, day)
+        return self.MISSING if i is None else self.status[hid][i]
+
+    def streak(self, hid, day):
+        """Length of the met run ending on `day` (0 if it was not met)."""
+        i = self._day_index(hid, day)
+        if i is None:
+            return 0
+        self._ready(hid)
+        return self.runs[hid][i]
+
+    def best(self, hid, until=None):
+        """Longest met run, counting only days up to `until` if given."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        if until is not None:
+            i = self._ord(until) - self.origin
+            if i < 0:
+                return 0
+            if i < self.size - 1:
+                return max(self.runs[hid][:i + 1], default=0)
+        if hid not in self._best:
+            self._best[hid] = max(self.runs[hid], default=0)
+        return self._best[hid]
+
+    def met_count(self, hid, start, end):
+        """Met days in [start, end]."""
+        if hid not in self.status or self.origin is None:
+            return 0
+        self._ready(hid)
+        lo = max(self._ord(start) - self.origin, 0)
+        hi = min(self._ord(end) - self.origin, self.size - 1)
+        if hi < lo:
+            return 0
+        met = self.met[hid]
+        return met[hi + 1] - met[lo]
+
+    def rate(self, hid, start, end):
+        """Percentage of the days in [start, end] that were met."""
+        days = self._ord(end) - self._ord(start) + 1
+        return self.met_count(hid, start, end) * 100.0 / days if days > 0 else 0.0
+
+    def to_chunks(self):
+        """One {"habit", "year", "status"} record per habit and calendar year, statuses as "0123" text."""
+        chunks = []
+        if self.origin is None:
+            return chunks
+        first = datetime.date.fromordinal(self.origin).year
+        last = datetime.date.fromordinal(self.origin + max(self.size - 1, 0)).year
+        for hid, series in self.status.items():
+            for year in range(first, last + 1):
+                lo = datetime.date(year, 1, 1).toordinal() - self.origin
+                hi = datetime.date(year, 12, 31).toordinal() - self.origin + 1
+                part = bytes(max(0, -lo)) + bytes(series[max(lo, 0):max(hi, 0)])
+                part += bytes(hi - lo - len(part))
+                if part.strip(b"\0"):
+                    chunks.append({"habit": hid, "year": year, "status": part.translate(self._TO_TEXT).decode()})
+        return chunks
+
+    def from_chunks(self, chunks, sigs=None, last_day=None):
+        self.__init__()
+        chunks = list(chunks)
+        if chunks:
+            years = [c["year"] for c in chunks]
+            self._cover(datetime.date(min(years), 1, 1).toordinal(), datetime.date(max(years), 12, 31).toordinal())
+        for c in chunks:
+            series = self._series(c["habit"])
+            lo = datetime.date(c["year"], 1, 1).toordinal() - self.origin
+            data = c["status"].encode().translate(self._FROM_TEXT)
+            series[lo:lo + len(data)] = data
+            self._stale.add(c["habit"])
+        self.sigs.update(sigs or {})
+        self.last_day = self._ord(last_day) if last_day else None
 
 def ensure_date_keys(history_dict, upto=None):
     # Ensure that history has entries for all dates up to 'upto' if needed (we use sparse dict,
@@ -156,6 +328,10 @@ class HabitTrackerApp:
         self.message = ""
         self.undo_stack = deque(maxlen=UNDO_LIMIT)
         self.redo_stack = deque(maxlen=UNDO_LIMIT)
+        # Streaks come from one HabitAnalytics keyed by id() of each habit's history dict,
+        # which survives renames and the shallow copies the undo actions keep
+        self.analytics = HabitAnalytics()
+        self.tracked = {}  # id -> history dict; holding it keeps the id from being reused
         self.last_action_time = time.time()
         self.init_curses()
         self.bindings_help = [
@@ -341,6 +517,29 @@ class HabitTrackerApp:
         elif self.selected >= self.offset + content_h:
             self.offset = self.selected - content_h + 1
 
+    def streak_key(self, habit):
+        """`habit`'s key in self.analytics, loading its history the first time it is asked for."""
+        hist = habit['history']
+        hid = id(hist)
+        if hid not in self.tracked:
+            self.tracked[hid] = hist
+            self.analytics.rebuild(hid, {d: HabitAnalytics.MET if v else HabitAnalytics.MISSED
+                                         for d, v in normalized_history_list(hist)})
+        return hid
+
+    def set_day(self, habit, date, value):
+        """Set (None: clear) one day of `habit`'s history and refresh its current streak."""
+        hid = self.streak_key(habit)
+        key = date_to_str(date)
+        if value is None:
+            habit['history'].pop(key, None)
+            status = HabitAnalytics.MISSING
+        else:
+            habit['history'][key] = value
+            status = HabitAnalytics.MET if value else HabitAnalytics.MISSED
+        self.analytics.set(hid, date, status)
+        habit['streak'] = self.analytics.streak(hid, today_date())
+
     def add_action(self, action):
         self.undo_stack.append(action)
         self.redo_stack.clear()
@@ -370,10 +569,7 @@ class HabitTrackerApp:
             idx = p['idx']
             date = p['date']
             new_val = p['new']
-            habit = self.db["habits"][idx]
-            habit['history'][date_to_str(date)] = new_val
-            cur, long = calc_current_and_longest_streak(habit['history'])
-            habit['streak'] = cur
+            self.set_day(self.db["habits"][idx], date, new_val)
         elif k == 'add':
             self.db["habits"].append(p['habit'])
         elif k == 'delete':
@@ -390,15 +586,7 @@ class HabitTrackerApp:
             idx = p['idx']
             date = p['date']
             old_val = p['old']
-            habit = self.db["habits"][idx]
-            if old_val is None:
-                # remove key
-                if date_to_str(date) in habit['history']:
-                    del habit['history'][date_to_str(date)]
-            else:
-                habit['history'][date_to_str(date)] = old_val
-            cur, long = calc_current_and_longest_streak(habit['history'])
-            habit['streak'] = cur
+            self.set_day(self.db["habits"][idx], date, old_val)
         elif k == 'add':
             # remove last added habit (we assume it was appended)
             # payload contains habit index maybe
@@ -474,14 +662,7 @@ class HabitTrackerApp:
         key = date_to_str(date)
         old = habit['history'].get(key, None)
         new = not bool(old) if old is not None else True
-        # If old is None and new True, then we set True
-        if new is None:
-            if key in habit['history']:
-                del habit['history'][key]
-        else:
-            habit['history'][key] = new
-        cur, long = calc_current_and_longest_streak(habit['history'])
-        habit['streak'] = cur
+        self.set_day(habit, date, new)
         self.add_action(Action('toggle', {'idx': idx, 'date': date, 'old': old, 'new': new}))
         self.message = f'{habit["name"]}: {"Complete" if new else "Missed"} on {key}'
 
@@ -648,7 +829,8 @@ class HabitTrackerApp:
             # Build slice of history between start and upto
             hist = habit.get('history', {})
             # For streaks we compute up to 'upto'
-            cur, long = calc_current_and_longest_streak(hist, upto=upto)
+            hid = self.streak_key(habit)
+            cur, long = self.analytics.streak(hid, upto), self.analytics.best(hid, until=upto)
             attr = curses.A_NORMAL
             # Color coding: green if current>0, yellow if long streak, red if missed today
             val_today = hist.get(date_to_str(upto), None)
@@ -1,20 +1,35 @@
 # Auto-generated via Perplexity on 2025-12-24T01:26:32.796663Z
 #!/usr/bin/env python3
 import argparse
+import io
 import json
 import os
 import re
+import sqlite3
 import subprocess
 import sys
+import time
 import urllib.request
 import urllib.error
 import webbrowser
+import zlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import Counter
 from datetime import datetime
 from difflib import SequenceMatcher
 from urllib.parse import quote
 
 DATA_FILE = 'literature_gaps.json'
+CACHE_FILE = 'literature_cache.sqlite'
+CACHE_TTL = 24 * 3600                # seconds a response is used without asking the server again
+CACHE_MAX_BYTES = 64 * 1024 * 1024   # least recently used responses and keyword lists are evicted past this
+HTTP_TIMEOUT = 5
+WORKERS = 8
+# overridable so the app can be pointed at a local stub server
+ARXIV_API = os.environ.get('LITGAP_ARXIV_API', 'http://export.arxiv.org/api/query')
+CROSSREF_API = os.environ.get('LITGAP_CROSSREF_API', 'https://api.crossref.org/works')
+USER_AGENT = 'literature-gap-finder/2 (urllib)'
 DEMO_DATA = {
     "searches": [
         {
@@ -72,6 +87,231 @@ def save_data(data):
     except IOError as e:
         print(f"Error saving data: {e}")
 
+class HttpCache:
+    """GET responses and per-paper keyword lists in a sqlite3 file.
+
+    A response younger than its TTL (the server's max-age, else CACHE_TTL)
+    is served without a request. An older one is revalidated with its ETag
+    or Last-Modified; a 304 just renews it. Bodies are stored compressed;
+    bodies and keyword lists share max_bytes, and the least recently used
+    of either are evicted once the total passes it. Only the thread that opened the cache may use it: fetch
+    workers do the network I/O and hand the results back.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # a lost entry is just fetched again
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, modified TEXT,"
+            " expires REAL NOT NULL, used REAL NOT NULL, size INTEGER NOT NULL, body BLOB NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS responses_by_use ON responses (used);"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(keywords)")}
+        if columns and 'used' not in columns:
+            self.db.execute("DROP TABLE keywords")  # written before keyword lists counted toward max_bytes
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS keywords (paper TEXT PRIMARY KEY, used REAL NOT NULL,"
+            " size INTEGER NOT NULL, words TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS keywords_by_use ON keywords (used);"
+        )
+
+    def close(self):
+        self._evict()  # keyword lists added since the last store
+        self.db.close()
+
+    def lookup(self, url):
+        """(body, fresh, validators): body is None if uncached; validators are conditional-request headers."""
+        row = self.db.execute("SELECT etag, modified, expires, body FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None, False, {}
+        etag, modified, expires, body = row
+        self.db.execute("UPDATE responses SET used = ? WHERE url = ?", (time.time(), url))
+        validators = {}
+        if etag:
+            validators['If-None-Match'] = etag
+        if modified:
+            validators['If-Modified-Since'] = modified
+        return zlib.decompress(body), expires > time.time(), validators
+
+    def _expires(self, headers):
+        match = re.search(r'max-age=(\d+)', headers.get('Cache-Control', '') or '')
+        return time.time() + (int(match.group(1)) if match else self.ttl)
+
+    def store(self, url, headers, body):
+        if 'no-store' in (headers.get('Cache-Control', '') or ''):
+            return
+        packed = zlib.compress(body)
+        if len(packed) > self.max_bytes:
+            return
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (url, etag, modified, expires, used, size, body) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, headers.get('ETag'), headers.get('Last-Modified'), self._expires(headers), time.time(),
+             len(packed), packed),
+        )
+        self._evict()
+
+    def forget(self, url):
+        self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def renew(self, url, headers):
+        """The server answered 304 Not Modified."""
+        self.db.execute("UPDATE responses SET expires = ?, used = ? WHERE url = ?",
+                        (self._expires(headers), time.time(), url))
+
+    def _evict(self):
+        total = self.db.execute("SELECT (SELECT COALESCE(SUM(size), 0) FROM responses)"
+                                " + (SELECT COALESCE(SUM(size), 0) FROM keywords)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = {'responses': [], 'keywords': []}
+        for table, key, size, _ in self.db.execute(
+                "SELECT 'responses', url, size, used FROM responses"
+                " UNION ALL SELECT 'keywords', paper, size, used FROM keywords ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            doomed[table].append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE url = ?", doomed['responses'])
+        self.db.executemany("DELETE FROM keywords WHERE paper = ?", doomed['keywords'])
+
+    def keywords(self, paper):
+        row = self.db.execute("SELECT words FROM keywords WHERE paper = ?", (paper,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE keywords SET used = ? WHERE paper = ?", (time.time(), paper))
+        return json.loads(row[0])
+
+    def put_keywords(self, paper, words):
+        blob = json.dumps(words)
+        self.db.execute("INSERT OR REPLACE INTO keywords (paper, used, size, words) VALUES (?, ?, ?, ?)",
+                        (paper, time.time(), len(paper) + len(blob), blob))
+
+def open_cache(enabled=True, **options):
+    if not enabled:
+        return None
+    try:
+        return HttpCache(**options)
+    except sqlite3.Error as e:
+        print(f"Warning: Response cache unavailable ({e}), fetching everything")
+        return None
+
+def http_get(url, headers=None, timeout=HTTP_TIMEOUT):
+    """(status, headers, body); a 304 comes back as a status rather than an HTTPError."""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, **(headers or {})})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, e.headers, b''
+        raise
+
+def arxiv_url(query, max_results):
+    return f"{ARXIV_API}?search_query=all:{quote(query)}&start=0&max_results={max_results}&sortBy=relevance&sortOrder=descending"
+
+def crossref_url(query, max_results):
+    return f"{CROSSREF_API}?query={quote(query)}&rows={max_results}"
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def parse_arxiv(body, max_results=5):
+    """Papers from an arXiv Atom feed, read entry by entry."""
+    papers, entry = [], {}
+    for event, elem in ET.iterparse(io.BytesIO(body), events=('start', 'end')):
+        tag = _local(elem.tag)
+        if event == 'start':
+            if tag == 'entry':
+                entry = {}
+            continue
+        if tag in ('title', 'summary', 'id'):
+            entry.setdefault(tag, ' '.join((elem.text or '').split()))
+        elif tag == 'entry':
+            if entry.get('title') and entry.get('summary') and entry.get('id'):
+                arxiv_id = entry['id'].split('/abs/')[-1]
+                papers.append({"id": f"arxiv:{arxiv_id}", "title": entry['title'], "abstract": entry['summary'],
+                               "url": f"https://arxiv.org/abs/{arxiv_id}"})
+                if len(papers) >= max_results:
+                    break
+            elem.clear()
+    return papers
+
+def parse_crossref(body, max_results=3):
+    """Papers from a Crossref /works response (the stdlib has no incremental JSON reader; json's is C)."""
+    papers = []
+    for item in json.loads(body).get('message', {}).get('items', [])[:max_results]:
+        titles = item.get('title') or []
+        if not titles:
+            continue
+        abstract = ' '.join(re.sub(r'<[^>]+>', ' ', item.get('abstract', '')).split())
+        doi = item.get('DOI', '')
+        papers.append({"id": f"doi:{doi.lower()}" if doi else "", "title": ' '.join(titles[0].split()),
+                       "abstract": abstract or "No abstract available", "url": f"https://doi.org/{doi}" if doi else ""})
+    return papers
+
+def source_name(url):
+    return 'arXiv' if url.startswith(ARXIV_API) else 'CrossRef' if url.startswith(CROSSREF_API) else url
+
+SOURCES = {
+    'arXiv': (arxiv_url, parse_arxiv, 5),
+    'CrossRef': (crossref_url, parse_crossref, 3),
+}
+
+def fetch_bodies(urls, cache=None, workers=WORKERS, timeout=HTTP_TIMEOUT):
+    """{url: body or None}: fresh cache hits directly, the rest fetched by a pool of `workers` threads.
+
+    A stale entry is revalidated, and served as is if the server cannot be reached.
+    """
+    bodies, pending = {}, {}
+    for url in dict.fromkeys(urls):
+        body, fresh, validators = cache.lookup(url) if cache else (None, False, {})
+        if fresh:
+            bodies[url] = body
+        else:
+            pending[url] = (body, validators)
+    if not pending:
+        return bodies
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+        futures = {pool.submit(http_get, url, validators, timeout): url for url, (_, validators) in pending.items()}
+        for future in as_completed(futures):
+            url = futures[future]
+            stale = pending[url][0]
+            try:
+                status, headers, body = future.result()
+            except Exception as e:
+                print(f"Warning: Could not fetch from {source_name(url)}: {e}" + (" (using cached copy)" if stale else ""))
+                bodies[url] = stale
+                continue
+            if status == 304 and stale is not None:
+                cache.renew(url, headers)
+                bodies[url] = stale
+            else:
+                if cache:
+                    cache.store(url, headers, body)
+                bodies[url] = body
+    return bodies
+
+def fetch_papers(queries, cache=None, workers=WORKERS):
+    """{query: papers from every source}, all requests in flight at once."""
+    plan = [(query, name, make_url(query, limit)) for query in queries
+            for name, (make_url, _, limit) in SOURCES.items()]
+    bodies = fetch_bodies([url for _, _, url in plan], cache, workers)
+    results = {query: [] for query in queries}
+    for query, name, url in plan:
+        if bodies.get(url) is None:
+            continue
+        _, parse, limit = SOURCES[name]
+        try:
+            results[query].extend(parse(bodies[url], limit))
+        except (ET.ParseError, ValueError, AttributeError) as e:
+            print(f"Warning: Could not parse {name} response for {query!r}: {e}")
+            if cache:
+                cache.forget(url)  # ask again next time rather than keep serving it
+    return results
+
 def extract_keywords(text, limit=15):
     text = text.lower()
     words = re.findall(r'\b[a-z]{4,}\b', text)
@@ -80,53 +320,23 @@ def extract_keywords(text, limit=15):
     counter = Counter(words)
     return [word for word, _ in counter.most_common(limit)]
 
-def fetch_arxiv(query, max_results=5):
-    try:
-        search_url = f"http://export.arxiv.org/api/query?search_query=all:{quote(query)}&start=0&max_results={max_results}&sortBy=relevance&sortOrder=descending"
-        with urllib.request.urlopen(search_url, timeout=5) as response:
-            content = response.read().decode('utf-8')
-        
-        papers = []
-        entries = re.findall(r'<entry>(.*?)</entry>', content, re.DOTALL)
-        for entry in entries[:max_results]:
-            title_match = re.search(r'<title>(.*?)</title>', entry)
-            summary_match = re.search(r'<summary>(.*?)</summary>', entry)
-            id_match = re.search(r'<id>(.*?)</id>', entry)
-            
-            if title_match and summary_match and id_match:
-                title = title_match.group(1).strip()
-                abstract = summary_match.group(1).strip()
-                arxiv_id = id_match.group(1).strip().split('/abs/')[-1]
-                url = f"https://arxiv.org/abs/{arxiv_id}"
-                papers.append({"title": title, "abstract": abstract, "url": url})
-        
-        return papers
-    except (urllib.error.URLError, urllib.error.HTTPError, Exception) as e:
-        print(f"Warning: Could not fetch from arXiv: {e}")
-        return []
+KEYWORD_MEMO = {}
 
-def fetch_crossref(query, max_results=3):
-    try:
-        search_url = f"https://api.crossref.org/works?query={quote(query)}&rows={max_results}"
-        with urllib.request.urlopen(search_url, timeout=5) as response:
-            content = response.read().decode('utf-8')
-        
-        papers = []
-        items = re.findall(r'"title":\s*\[(.*?)\]', content)
-        abstracts = re.findall(r'"abstract":\s*"(.*?)"', content)
-        dois = re.findall(r'"DOI":\s*"(.*?)"', content)
-        
-        for i, title in enumerate(items[:max_results]):
-            title = title.strip('"').replace('\\"', '"')
-            abstract = abstracts[i] if i < len(abstracts) else "No abstract available"
-            doi = dois[i] if i < len(dois) else ""
-            url = f"https://doi.org/{doi}" if doi else ""
-            papers.append({"title": title, "abstract": abstract, "url": url})
-        
-        return papers
-    except Exception as e:
-        print(f"Warning: Could not fetch from CrossRef: {e}")
-        return []
+def paper_id(paper):
+    return paper.get('id') or paper.get('url') or paper.get('title', '')
+
+def paper_keywords(paper, cache=None):
+    """extract_keywords of a paper's title and abstract, memoised per paper ID (and kept in the cache)."""
+    pid = paper_id(paper)
+    words = KEYWORD_MEMO.get(pid)
+    if words is None and cache is not None:
+        words = cache.keywords(pid)
+    if words is None:
+        words = extract_keywords(f"{paper.get('title', '')} {paper.get('abstract', '')}")
+        if cache is not None:
+            cache.put_keywords(pid, words)
+    KEYWORD_MEMO[pid] = words
+    return words
 
 def compute_gap_scores(all_keywords, paper_keywords_list):
     gap_scores = {}
@@ -150,7 +360,7 @@ def compute_gap_scores(all_keywords, paper_keywords_list):
     gaps.sort(key=lambda x: x['score'], reverse=True)
     return gaps[:8]
 
-def identify_gaps(papers):
+def identify_gaps(papers, cache=None):
     if not papers:
         return []
     
@@ -158,10 +368,7 @@ def identify_gaps(papers):
     paper_keywords_list = []
     
     for paper in papers:
-        abstract = paper.get('abstract', '')
-        title = paper.get('title', '')
-        combined_text = f"{title} {abstract}"
-        keywords = extract_keywords(combined_text)
+        keywords = paper_keywords(paper, cache)
         paper_keywords_list.append(keywords)
         all_keywords.extend(keywords)
     
@@ -212,7 +419,7 @@ def open_papers_in_browser(papers):
             except Exception as e:
                 print(f"Could not open {paper['url']}: {e}")
 
-def interactive_mode():
+def interactive_mode(cache=None):
     data = load_data()
     
     while True:
@@ -235,11 +442,11 @@ def interactive_mode():
         elif user_input.lower().startswith('search '):
             query = user_input[7:].strip()
             if query:
-                perform_search(query, data)
+                perform_search(query, data, cache)
         elif user_input.lower().startswith('doi '):
             doi = user_input[4:].strip()
             if doi:
-                perform_search(doi, data)
+                perform_search(doi, data, cache)
         elif user_input.lower() == 'history':
             show_history(data)
         elif user_input.lower() == 'open':
@@ -251,29 +458,28 @@ def interactive_mode():
         else:
             print("Unknown command. Try again.")
 
-def perform_search(query, data):
+def record_search(data, query, papers, gaps):
+    data['searches'].append({
+        "query": query,
+        "timestamp": datetime.utcnow().isoformat(),
+        "papers": papers,
+        "gaps": gaps
+    })
+
+def perform_search(query, data, cache=None):
     print(f"\nSearching for: {query}")
     print("Fetching papers...")
     
-    arxiv_papers = fetch_arxiv(query, max_results=5)
-    crossref_papers = fetch_crossref(query, max_results=3)
-    
-    papers = arxiv_papers + crossref_papers
+    # every source at once, through the response cache
+    papers = fetch_papers([query], cache)[query]
     
     if not papers:
         print("No papers found. Check your query or network connection.")
         return
     
-    gaps = identify_gaps(papers)
-    
-    search_entry = {
-        "query": query,
-        "timestamp": datetime.utcnow().isoformat(),
-        "papers": papers,
-        "gaps": gaps
-    }
+    gaps = identify_gaps(papers, cache)
     
-    data['searches'].append(search_entry)
+    record_search(data, query, papers, gaps)
     save_data(data)
     
     display_papers(papers)
@@ -287,6 +493,31 @@ def perform_search(query, data):
     except EOFError:
         pass
 
+def search_topics(queries, data, cache=None, workers=WORKERS):
+    """Search every query in one parallel fetch; one history entry per query, saved once."""
+    queries = list(dict.fromkeys(queries))
+    start = time.perf_counter()
+    results = fetch_papers(queries, cache, workers)
+    print(f"Fetched {len(queries)} topics from {len(SOURCES)} sources in {time.perf_counter() - start:.1f}s")
+    
+    for query in queries:
+        papers = results[query]
+        if not papers:
+            print(f"\n{query}: no papers found")
+            continue
+        gaps = identify_gaps(papers, cache)
+        record_search(data, query, papers, gaps)
+        print(f"\n{query}: {len(papers)} papers, {len(gaps)} gaps")
+        for gap in gaps[:3]:
+            print(f"   {gap['score']:.2f}  {gap['gap']}")
+    save_data(data)
+    return results
+
+def read_topics(path):
+    """One query per line; blank lines and # comments are skipped."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
 def show_history(data):
     if not data['searches']:
         print("No search history.")
@@ -311,6 +542,7 @@ Examples:
   python app.py --doi "10.1234/abc"
   python app.py --demo
   python app.py --interactive
+  python app.py --topics topics.txt --workers 8
         """
     )
     
@@ -319,6 +551,9 @@ Examples:
     parser.add_argument('--demo', action='store_true', help='Run demo with sample data')
     parser.add_argument('--interactive', '-i', action='store_true', help='Interactive mode')
     parser.add_argument('--history', action='store_true', help='Show search history')
+    parser.add_argument('--topics', metavar='FILE', help='Search every query in FILE (one per line) in parallel')
+    parser.add_argument('--workers', type=int, default=WORKERS, help=f'Concurrent requests (default {WORKERS})')
+    parser.add_argument('--no-cache', action='store_true', help=f'Do not read or write the {CACHE_FILE} response cache')
     
     args = parser.parse_args()
     
@@ -331,14 +566,25 @@ Examples:
     elif args.history:
         data = load_data()
         show_history(data)
-    elif args.interactive:
-        interactive_mode()
-    elif args.title or args.doi:
-        query = args.title or args.doi
-        data = load_data()
-        perform_search(query, data)
     else:
-        interactive_mode()
+        cache = open_cache(not args.no_cache)
+        try:
+            if args.topics:
+                try:
+                    queries = read_topics(args.topics)
+                except OSError as e:
+                    print(f"Error reading topics: {e}")
+                    sys.exit(1)
+                search_topics(queries, load_data(), cache, args.workers)
+            elif (args.title or args.doi) and not args.interactive:
+                query = args.title or args.doi
+                data = load_data()
+                perform_search(query, data, cache)
+            else:
+                interactive_mode(cache)
+        finally:
+            if cache:
+                cache.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -9,6 +9,7 @@ Features:
 - Settings & high scores persisted atomically to JSON in XDG-config or ~/.config
 - Keyboard-first accessibility; arrow and alternative keys supported
 - --report prints last-played summary; --demo runs automated short runs; --no-curses forces fallback
+- --profile runs the demo and reports frame time p50/p99, dropped ticks and bytes written per frame
 - Single entrypoint main() guarded by if __name__ == "__main__"
 
 Dependencies: Python 3.8+ standard library only.
@@ -25,6 +26,7 @@ import shutil
 import pathlib
 import datetime
 import threading
+import select
 
 # Optional imports handled at runtime
 try:
@@ -122,8 +124,46 @@ def beep(enabled=True):
     sys.stdout.write("\a")
     sys.stdout.flush()
 
+# --- Frame-time instrumentation (--profile) ---
+class FrameStats:
+    """Per-frame compose+send time and bytes sent, plus scheduler ticks, collected by Term."""
+    def __init__(self):
+        self.times = []
+        self.sizes = []
+        self.ticks = 0
+        self.dropped = 0
+
+    def frame(self, seconds, sent):
+        self.times.append(seconds)
+        self.sizes.append(sent)
+
+    def tick(self, dropped=0):
+        self.ticks += 1
+        self.dropped += dropped
+
+    def report(self, mode):
+        if not self.times:
+            return [f"Profile ({mode}): no frames drawn"]
+        times = sorted(self.times)
+        pct = lambda p: times[min(len(times) - 1, int(p * len(times)))] * 1000
+        total = sum(self.sizes)
+        return [
+            f"Profile ({mode}): {len(times)} frames",
+            f"  frame time   p50 {pct(0.50):.3f} ms   p99 {pct(0.99):.3f} ms   max {times[-1] * 1000:.3f} ms",
+            f"  bytes/frame  mean {total / len(times):.0f}   max {max(self.sizes)}   total {total}",
+            f"  ticks        {self.ticks}   dropped {self.dropped}",
+        ]
+
 # --- Terminal abstraction layer ---
 class Term:
+    """Screen access for curses and the plain-terminal fallback.
+
+    Drawing is double-buffered: clear() starts composing a frame of cells,
+    draw_text() writes into it and refresh() sends only the runs of cells
+    that differ from the frame already on screen, through curses or as
+    ANSI cursor moves. Nothing is erased or redrawn in full unless the
+    screen size changed or the fallback terminal scrolled under a prompt.
+    """
     def __init__(self, use_curses=True, force_no_curses=False):
         self.use_curses = use_curses and HAS_CURSES and not force_no_curses
         self.lock = threading.Lock()
@@ -133,6 +173,11 @@ class Term:
         self.color = True if HAS_CURSES else False
         self._std_mode = not self.use_curses
         self._running = False
+        self.out = sys.stdout
+        self.stats = None    # FrameStats while profiling
+        self._back = None    # frame being composed: (rows of chars, rows of attrs)
+        self._front = None   # frame on screen; None forces a full redraw
+        self._frame_start = 0.0
         if self.use_curses:
             # will initialize later in context
             pass
@@ -149,6 +194,8 @@ class Term:
                 self.width, self.height = s.columns, s.lines
             except Exception:
                 self.width, self.height = 80, 24
+            if os.name == "nt":
+                os.system("")  # lets the Windows console interpret ANSI cursor moves
 
     # Curses-specific helpers (wrapped at runtime)
     def init_curses(self, stdscr):
@@ -170,54 +217,115 @@ class Term:
 
     def get_size(self):
         if self.screen:
-            h, w = self.screen.getmaxyx()
-            return w, h
+            self.height, self.width = self.screen.getmaxyx()
         return self.width, self.height
 
+    def _blank(self):
+        return [[" "] * self.width for _ in range(self.height)], [[0] * self.width for _ in range(self.height)]
+
     def clear(self):
-        if self.use_curses and self.screen:
-            self.screen.erase()
-        else:
-            os.system("cls" if os.name == "nt" else "clear")
+        """Start composing a new, blank frame."""
+        self.get_size()  # once per frame; draw_text uses the cached size
+        self._frame_start = time.perf_counter()
+        self._back = self._blank()
 
     def draw_text(self, y, x, text, attr=None):
-        if self.use_curses and self.screen:
-            try:
-                if attr:
-                    self.screen.addstr(y, x, text[:max(0, self.screen.getmaxyx()[1]-x)], attr)
-                else:
-                    self.screen.addstr(y, x, text)
-            except Exception:
-                pass
-        else:
-            # fallback: print with offsets (inefficient)
-            print((" " * x) + text)
+        if self._back is None:
+            # drawing without clear(): start from what is on screen
+            self._frame_start = time.perf_counter()
+            front = self._front if self._front is not None else self._blank()
+            self._back = [row[:] for row in front[0]], [row[:] for row in front[1]]
+        rows, attrs = self._back
+        if not 0 <= y < len(rows):
+            return
+        if x < 0:
+            text, x = text[-x:], 0
+        text = text[:max(0, len(rows[y]) - x)]
+        rows[y][x:x + len(text)] = text
+        if attr:
+            attrs[y][x:x + len(text)] = [attr] * len(text)
+
+    RUN_GAP = 8  # unchanged cells worth resending to save a cursor move (about 8 bytes)
+
+    @classmethod
+    def _changed_runs(cls, frame, shown):
+        """(y, x, text, attr) for each run of same-attr cells of `frame` that differ from `shown`."""
+        gap = cls.RUN_GAP
+        runs = []
+        for y, (row, arow, old, oarow) in enumerate(zip(frame[0], frame[1], shown[0], shown[1])):
+            if row == old and arow == oarow:
+                continue
+            x, w = 0, len(row)
+            while x < w:
+                if row[x] == old[x] and arow[x] == oarow[x]:
+                    x += 1
+                    continue
+                start, a = x, arow[x]
+                end = x = x + 1  # end: one past the last changed cell of the run
+                while x < w and arow[x] == a and x - end < gap:
+                    if row[x] != old[x] or arow[x] != oarow[x]:
+                        end = x + 1
+                    x += 1
+                runs.append((y, start, "".join(row[start:end]), a))
+                x = end
+        return runs
 
     def refresh(self):
+        """Send the composed frame: only the cells that changed since the last one."""
+        frame = self._back
+        if frame is None:
+            if self.screen:
+                try:
+                    self.screen.refresh()
+                except Exception:
+                    pass
+            return
+        shown = self._front
+        full = shown is None or len(shown[0]) != len(frame[0]) or len(shown[0][0]) != len(frame[0][0])
+        runs = self._changed_runs(frame, self._blank() if full else shown)
         if self.use_curses and self.screen:
+            if full:
+                self.screen.erase()
+            for y, x, text, attr in runs:
+                try:
+                    if attr:
+                        self.screen.addstr(y, x, text, attr)
+                    else:
+                        self.screen.addstr(y, x, text)
+                except Exception:
+                    pass  # the bottom-right cell cannot be written
             try:
                 self.screen.refresh()
             except Exception:
                 pass
+            sent = sum(len(text.encode("utf-8")) for _, _, text, _ in runs)  # handed to curses
+        else:
+            parts = ["\x1b[H\x1b[2J"] if full else []
+            for y, x, text, attr in runs:
+                parts.append(f"\x1b[{y + 1};{x + 1}H\x1b[7m{text}\x1b[0m" if attr else f"\x1b[{y + 1};{x + 1}H{text}")
+            parts.append(f"\x1b[{len(frame[0])};1H")  # park the cursor on the last row for prompts
+            payload = "".join(parts).encode("utf-8")
+            try:
+                self.out.buffer.write(payload)
+            except AttributeError:
+                self.out.write(payload.decode("utf-8"))
+            self.out.flush()
+            sent = len(payload)
+        self._front, self._back = frame, None
+        if self.stats is not None:
+            self.stats.frame(time.perf_counter() - self._frame_start, sent)
 
     def getkey(self, timeout=None):
         # return normalized key strings
         if self.use_curses and self.screen:
             if timeout is not None:
-                self.screen.nodelay(True)
-                start = time.time()
-                while True:
-                    try:
-                        ch = self.screen.get_wch()
-                    except Exception:
-                        ch = -1
-                    if ch != -1:
-                        break
-                    if (time.time() - start) * 1000 >= timeout:
-                        ch = None
-                        break
-                    time.sleep(0.01)
-                self.screen.nodelay(False)
+                # block in curses until a key or the timeout, rather than polling
+                self.screen.timeout(max(0, int(timeout)))
+                try:
+                    ch = self.screen.get_wch()
+                except Exception:
+                    ch = None
+                self.screen.timeout(-1)
             else:
                 try:
                     ch = self.screen.get_wch()
@@ -252,19 +360,42 @@ class Term:
                     if timeout is not None and time.time() > end:
                         return None
                     time.sleep(0.01)
+            elif timeout is not None:
+                # line-buffered stdin: wait for a line until the timeout
+                end = time.perf_counter() + timeout / 1000.0
+                try:
+                    ready = select.select([sys.stdin], [], [], timeout / 1000.0)[0]
+                except (OSError, ValueError):
+                    ready = []
+                line = sys.stdin.readline() if ready else None
+                if not line:
+                    # timed out, or stdin is closed (it then selects as ready at once): wait out the rest
+                    time.sleep(max(0.0, end - time.perf_counter()))
+                    return None
+                self._front = None  # the typed line scrolled the screen
+                return line.rstrip("\n")
             else:
                 # use input() as last resort (blocking)
+                self._front = None
                 try:
                     return input()
                 except KeyboardInterrupt:
                     return "\x03"
 
+    def tick(self, dropped=0):
+        """The game loop ran a tick, after missing `dropped` whole ticks."""
+        if self.stats is not None:
+            self.stats.tick(dropped)
+
     def stop(self):
         if self.use_curses and self.screen:
             try:
                 curses.curs_set(1)
             except Exception:
                 pass
+        elif self._front is not None:
+            self.out.write("\n")  # leave the cursor below the last frame
+            self.out.flush()
 
 # --- Small helpers ---
 def clamp(n, a, b):
@@ -362,6 +493,8 @@ def prompt_confirm(term: Term, message: str, timeout=None) -> bool:
 # --- Games implementations ---
 
 # Reaction Tap
+AUTOPLAY_PAUSE = 0.05  # seconds an autoplay run (--demo, --profile) holds each scripted screen or move
+
 def reaction_tap(term: Term, cfg: dict, autoplay=False) -> dict:
     settings = cfg.get("settings", {})
     beep_on = settings.get("beep", True)
@@ -376,13 +509,13 @@ def reaction_tap(term: Term, cfg: dict, autoplay=False) -> dict:
     for i, l in enumerate(instructions):
         term.draw_text(2 + i, max(0, (w - len(l))//2), l)
     term.refresh()
-    time.sleep(0.8)
+    time.sleep(AUTOPLAY_PAUSE if autoplay else 0.8)
     # countdown
     for s in ("3", "2", "1"):
         term.clear()
         term.draw_text(h//2, max(0, (w - len(s))//2), s)
         term.refresh()
-        time.sleep(0.6)
+        time.sleep(AUTOPLAY_PAUSE if autoplay else 0.6)
     # random delay then GO!
     delay = random.uniform(0.8, 3.0)
     term.clear()
@@ -420,13 +553,16 @@ def reaction_tap(term: Term, cfg: dict, autoplay=False) -> dict:
         return result
 
 # Grid Dodge
+AUTOPLAY_TICKS = 50  # an autoplay run stops here if the autopilot has not been hit
+AUTOPLAY_TICK_MS = 20  # tick of an autoplay run, whatever the tick_ms setting
+
 class GridDodge:
     def __init__(self, term: Term, cfg: dict, autoplay=False):
         self.term = term
         self.cfg = cfg
         self.settings = cfg.get("settings", {})
         gs = self.settings.get("grid_size", [8,6])
-        self.width = gs
+        self.width = gs[0]
         self.height = gs[1]
         # grid clamp to terminal
         tw, th = term.get_size()
@@ -438,7 +574,8 @@ class GridDodge:
         self.player_x = self.width // 2
         self.player_y = self.height - 1
         self.hazards = []  # list of (x,y)
-        self.tick_ms = max(50, int(self.settings.get("tick_ms", 200)))
+        self.occupied = set()  # the same cells, for collision and autopilot lookups
+        self.tick_ms = AUTOPLAY_TICK_MS if autoplay else max(50, int(self.settings.get("tick_ms", 200)))
         diff = self.settings.get("difficulty", "normal")
         if diff == "easy":
             self.spawn_rate = 0.15
@@ -464,10 +601,19 @@ class GridDodge:
         # maybe spawn new hazard at top
         if random.random() < self.spawn_rate:
             self.hazards.append((random.randrange(0, self.width), 0))
+        self.occupied = set(self.hazards)
         # check collision
-        for x,y in self.hazards:
-            if x == self.player_x and y == self.player_y:
-                self.running = False
+        if (self.player_x, self.player_y) in self.occupied:
+            self.running = False
+
+    def autopilot(self):
+        """Step aside from a hazard about to land on the player, otherwise wander a little."""
+        row = self.player_y - 1
+        safe = [x for x in (self.player_x - 1, self.player_x + 1)
+                if 0 <= x < self.width and (x, row) not in self.occupied]
+        if (self.player_x, row) in self.occupied or (safe and random.random() < 0.3):
+            if safe:
+                self.player_x = random.choice(safe)
 
     def move_left(self):
         self.player_x = max(0, self.player_x - 1)
@@ -485,18 +631,12 @@ class GridDodge:
         t.draw_text(0, 2, f"Grid Dodge — Score: {self.score}")
         t.draw_text(1, 2, "Move with ←/→ or a/d. Survive as long as you can. Esc to quit.")
         # draw grid
-        for y in range(self.height):
-            line = ""
-            for x in range(self.width):
-                ch = "."
-                for hx, hy in self.hazards:
-                    if hx == x and hy == y:
-                        ch = "*"
-                        break
-                if x == self.player_x and y == self.player_y:
-                    ch = "@"
-                line += ch
-            t.draw_text(base_y + y, base_x, line)
+        rows = [["."] * self.width for _ in range(self.height)]
+        for x, y in self.hazards:
+            rows[y][x] = "*"
+        rows[self.player_y][self.player_x] = "@"
+        for y, row in enumerate(rows):
+            t.draw_text(base_y + y, base_x, "".join(row))
         t.refresh()
 
     def run(self):
@@ -510,18 +650,28 @@ class GridDodge:
         if not self.autoplay:
             self.term.getkey()
         else:
-            time.sleep(0.5)
+            time.sleep(AUTOPLAY_PAUSE)
         start = time.time()
-        # loop
-        last_tick = 0
+        # loop: tick on a fixed schedule and sleep in getkey until the next deadline
+        interval = self.tick_ms / 1000.0
+        next_tick = time.perf_counter()
+        ticks = 0
         while self.running:
-            now = time.time()
-            if (now - last_tick) * 1000 >= self.tick_ms:
+            now = time.perf_counter()
+            if now >= next_tick:
+                # a tick that is a whole interval late is dropped, not run in a burst
+                late = int((now - next_tick) / interval)
+                next_tick += (late + 1) * interval
+                self.term.tick(late)
+                if self.autoplay:
+                    self.autopilot()
                 self.step()
                 self.render()
-                last_tick = now
-            # input handling non-blocking
-            k = self.term.getkey(timeout=10)
+                ticks += 1
+                if self.autoplay and ticks >= AUTOPLAY_TICKS:
+                    break
+                continue
+            k = self.term.getkey(timeout=(next_tick - now) * 1000)
             if k:
                 if isinstance(k, str) and k in ("\x1b", "\x03"):
                     # quit
@@ -531,14 +681,6 @@ class GridDodge:
                     self.move_left()
                 if k in ("KEY_RIGHT", "l", "d", "D"):
                     self.move_right()
-            if self.autoplay:
-                # simple autopilot: move randomly to avoid hazards
-                if random.random() < 0.3:
-                    if random.random() < 0.5:
-                        self.move_left()
-                    else:
-                        self.move_right()
-            time.sleep(0.01)
         elapsed = time.time() - start
         result = {"game": "grid_dodge", "time": round(elapsed, 2), "score": self.score, "timestamp": now_iso(), "better_is_lower": False}
         record_score(self.cfg, "grid_dodge", result)
@@ -555,7 +697,7 @@ class MemoryPairs:
         self.cfg = cfg
         self.settings = cfg.get("settings", {})
         ms = self.settings.get("mem_size", [4,4])
-        self.cols = clamp(ms, 2, 8)
+        self.cols = clamp(ms[0], 2, 8)
         self.rows = clamp(ms[1], 2, 6)
         # clamp to terminal
         tw, th = term.get_size()
@@ -580,6 +722,25 @@ class MemoryPairs:
         self.moves = 0
         self.start_time = None
         self.autoplay = autoplay
+        self.seen = set()  # cards the autopilot has had turned over
+
+    def autopick(self, first_sel):
+        """Autoplay choice: a remembered match if there is one, otherwise a card not seen yet."""
+        open_cards = [i for i in range(self.total) if not self.matched[i] and i != first_sel]
+        if first_sel is None:
+            by_card = {}
+            for i in open_cards:
+                if i in self.seen:
+                    by_card.setdefault(self.cards[i], []).append(i)
+            known = [ids[0] for ids in by_card.values() if len(ids) == 2]
+            if known:
+                return known[0]
+        else:
+            partner = [i for i in open_cards if i in self.seen and self.cards[i] == self.cards[first_sel]]
+            if partner:
+                return partner[0]
+        unseen = [i for i in open_cards if i not in self.seen]
+        return random.choice(unseen or open_cards)
 
     def render(self):
         t = self.term
@@ -613,21 +774,18 @@ class MemoryPairs:
             if all(self.matched[:self.total]):
                 break
             if self.autoplay:
-                # pick random unrevealed
-                choices = [i for i in range(self.total) if not self.matched[i]]
-                if not choices:
-                    break
-                pick = random.choice(choices)
-                time.sleep(0.2)
+                pick = self.autopick(first_sel)
+                self.seen.add(pick)
+                time.sleep(AUTOPLAY_PAUSE)
                 if first_sel is None:
                     first_sel = pick
                     self.revealed[pick] = True
                     self.moves += 1
-                    time.sleep(0.2)
+                    time.sleep(AUTOPLAY_PAUSE)
                 else:
                     self.revealed[pick] = True
                     self.moves += 1
-                    time.sleep(0.2)
+                    time.sleep(AUTOPLAY_PAUSE)
                     # check
                     if self.cards[first_sel] == self.cards[pick]:
                         self.matched[first_sel] = True
@@ -861,6 +1019,15 @@ def curses_entry(stdscr, cfg):
     finally:
         term.stop()
 
+def curses_demo(stdscr, cfg, stats=None):
+    term = Term(use_curses=True)
+    term.init_curses(stdscr)
+    term.stats = stats
+    try:
+        return run_demo(term, cfg)
+    finally:
+        term.stop()
+
 # --- Fallback console interactive loop ---
 def fallback_interactive(cfg):
     term = Term(use_curses=False)
@@ -876,6 +1043,8 @@ def main():
     parser.add_argument("--no-curses", action="store_true", help="Force fallback non-curses mode.")
     parser.add_argument("--report", action="store_true", help="Print last-played game summary.")
     parser.add_argument("--demo", action="store_true", help="Run automated demo plays (no input).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the demo and report frame time p50/p99, dropped ticks and bytes written per frame.")
     args = parser.parse_args()
 
     cfg = load_config()
@@ -884,14 +1053,29 @@ def main():
         if args.report:
             rc = print_report(cfg)
             sys.exit(rc)
-        if args.demo:
+        if args.demo or args.profile:
             # run demo in fallback or curses depending on availability
-            term = Term(use_curses=HAS_CURSES, force_no_curses=args.no_curses)
-            term.start()
-            results = run_demo(term, cfg)
+            stats = FrameStats() if args.profile else None
+            results, mode = None, "curses"
+            if HAS_CURSES and not args.no_curses and sys.stdout.isatty():
+                try:
+                    results = wrapper(lambda stdscr: curses_demo(stdscr, cfg, stats))
+                except curses.error:
+                    results = None  # no usable terminal description: fall back
+            if results is None:
+                mode = "ANSI fallback"
+                term = Term(use_curses=False)
+                term.start()
+                term.stats = stats
+                try:
+                    results = run_demo(term, cfg)
+                finally:
+                    term.stop()
             # print concise demo summary
             for r in results:
                 print(json.dumps(r))
+            if stats is not None:
+                print("\n".join(stats.report(mode)))
             save_config(cfg)
             sys.exit(0)
         # Interactive mode
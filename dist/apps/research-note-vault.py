@@ -2,18 +2,490 @@
 #!/usr/bin/env python3
 import json
 import os
+import re
 import sys
 import datetime
+from bisect import bisect_left, insort
 from collections import defaultdict, deque
 import hashlib
 import urllib.parse
 import webbrowser
-import threading
 import time
 import signal
 
 HOME = os.path.expanduser("~")
 NOTES_FILE = os.path.join(HOME, "research_notes.json")
+INDEX_FILE = os.path.join(HOME, "research_notes.index.json")
+MAX_UNDO = 50
+HISTORY_BUDGET = 512 * 1024  # bytes of undo/redo deltas kept in memory
+COALESCE_S = 2.0  # field edits of one note within this window undo as one step
+
+class UndoHistory:
+    """Undo/redo as inverse deltas instead of whole-state snapshots.
+
+    A step holds only what one command changed: [key, before, after] triples,
+    None meaning "absent". undo() writes each `before` back and redo() each
+    `after` through an apply(key, old, new) callback, so both cost O(size of
+    the change). Steps are stored serialized; the oldest are dropped once the
+    stacks exceed `budget_bytes` (or `max_steps`). Steps sharing a `group`
+    recorded within `coalesce_s` seconds merge into one. With `path`, every
+    step/undo/redo is appended to a JSON-lines file and replayed on start.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024, max_steps=None, coalesce_s=2.0, path=None):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.path = path
+        self.undo_stack = deque()  # serialized steps, oldest first
+        self.redo_stack = []       # serialized steps, next to redo last
+        self.size = 0
+        self._log_bytes = 0
+        if path:
+            self._replay()
+
+    def record(self, label, changes, group=None):
+        """Push one step; returns False if nothing actually changed."""
+        changes = [[key, before, after] for key, before, after in changes if before != after]
+        if not changes:
+            return False
+        now = time.time()
+        top = json.loads(self.undo_stack[-1]) if group is not None and self.undo_stack and not self.redo_stack else None
+        if top is not None and top.get("group") == group and now - top["t"] <= self.coalesce_s:
+            latest = {json.dumps(c[0]): c for c in top["changes"]}
+            for key, before, after in changes:
+                prev = latest.get(json.dumps(key))
+                if prev is not None and prev[2] == before:
+                    prev[2] = after
+                else:
+                    top["changes"].append([key, before, after])
+                    latest[json.dumps(key)] = top["changes"][-1]
+            top["t"] = now
+            self.size -= len(self.undo_stack.pop())
+            self._push(top, "amend")
+        else:
+            self.size -= sum(len(s) for s in self.redo_stack)
+            self.redo_stack.clear()
+            self._push({"label": label, "group": group, "t": now, "changes": changes}, "do")
+        self._trim()
+        return True
+
+    def undo(self, apply):
+        """Revert the latest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        text = self.undo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in reversed(step["changes"]):
+            apply(key, after, before)
+        self.redo_stack.append(text)
+        self._log('{"undo":1}')
+        return step["label"]
+
+    def redo(self, apply):
+        if not self.redo_stack:
+            return None
+        text = self.redo_stack.pop()
+        step = json.loads(text)
+        for key, before, after in step["changes"]:
+            apply(key, before, after)
+        self.undo_stack.append(text)
+        self._log('{"redo":1}')
+        return step["label"]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+        if self.path:
+            self._compact()
+
+    def _push(self, step, event):
+        text = json.dumps(step, ensure_ascii=False, separators=(",", ":"))
+        self.undo_stack.append(text)
+        self.size += len(text)
+        self._log('{"%s":%s}' % (event, text))
+
+    def _trim(self):
+        while self.undo_stack and (self.size > self.budget_bytes or
+                                   self.max_steps and len(self.undo_stack) > self.max_steps):
+            self.size -= len(self.undo_stack.popleft())
+
+    def _log(self, line):
+        if not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._log_bytes += len(line) + 1
+        if self._log_bytes > 4 * self.budget_bytes + 65536:
+            self._compact()
+
+    def _replay(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._log_bytes += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted append
+                if "do" in event or "amend" in event:
+                    if "amend" in event and self.undo_stack:
+                        self.undo_stack.pop()
+                    else:
+                        self.redo_stack.clear()
+                    self.undo_stack.append(json.dumps(event.get("do") or event["amend"],
+                                                      ensure_ascii=False, separators=(",", ":")))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+        self.size = sum(map(len, self.undo_stack)) + sum(map(len, self.redo_stack))
+        self._trim()
+
+    def _compact(self):
+        # Chronological order is the undo stack, then the redo stack top-down; undo back to here
+        steps = list(self.undo_stack) + self.redo_stack[::-1]
+        lines = ['{"do":%s}\n' % s for s in steps] + ['{"undo":1}\n'] * len(self.redo_stack)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+        self._log_bytes = sum(map(len, lines))
+
+def list_applier(items):
+    """apply() for UndoHistory steps keyed by list position."""
+    def apply(index, old, new):
+        if old is None:
+            items.insert(index, new)
+        elif new is None:
+            del items[index]
+        else:
+            items[index] = new
+    return apply
+
+class ChangeJournal:
+    """A JSON snapshot plus an append-only journal of the changes made since it was written.
+
+    append() costs O(size of the change); the snapshot is only rewritten by
+    compact(). The journal's first line names the snapshot it applies to (a
+    hash of its bytes), so a crash between writing a new snapshot and
+    removing the old journal cannot replay changes twice.
+    """
+
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.base = None
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def read_snapshot(self):
+        """Snapshot text, or None if there is none yet."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.base = self._digest(b"")
+            return None
+        self.base = self._digest(data)
+        return data.decode("utf-8", errors="replace")
+
+    def replay(self, apply):
+        """Re-apply journaled [key, before, after] changes on top of the snapshot just read."""
+        try:
+            f = open(self.journal_path, encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get("base") != self.base:
+                return 0  # written against an older snapshot that compact() already replaced
+            for line in f:
+                try:
+                    changes = json.loads(line)
+                except ValueError:
+                    break  # torn tail from an interrupted append
+                for key, before, after in changes:
+                    apply(key, before, after)
+                    applied += 1
+        return applied
+
+    def append(self, changes):
+        changes = [list(c) for c in changes]
+        if not changes:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            if f.tell() == 0:
+                f.write(json.dumps({"base": self.base}) + "\n")
+            f.write(json.dumps(changes, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def needs_compaction(self):
+        try:
+            journal = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        try:
+            snapshot = os.path.getsize(self.path)
+        except OSError:
+            snapshot = 0
+        return journal > max(self.COMPACT_MIN_BYTES, snapshot)
+
+    def compact(self, text):
+        """Write `text` as the new snapshot and start an empty journal."""
+        data = text.encode("utf-8")
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self.base = self._digest(data)
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+
+class SearchIndex:
+    """Inverted index from word tokens to the ids of the records containing them.
+
+    A query word matches every token it is a prefix of ("lea" finds
+    "learning", but "arn" does not), so results narrow as you type;
+    "field:word" also requires the match to be in that field.
+    Words are intersected smallest first, and a word whose prefix spans far
+    more ids than are still in the running is checked against those few
+    records instead. Exact values (a DOI, a hash, a tag) live in `keys` for
+    O(1) lookup. Several records may share an id. Results come back in the
+    order of the caller's list, which undo and inserts can rearrange.
+
+    save()/load() keep the postings next to the data file, stamped with the
+    snapshot they were built from, so startup does not re-tokenise; each
+    posting list is only decoded the first time a query touches it.
+    """
+
+    TOKEN = re.compile(r"\w+")
+    VERSION = 1
+
+    def __init__(self, fields, keys=None, key=lambda r: r["id"]):
+        self.fields = fields          # name -> fn(record) giving text or a list of strings
+        self.key_fields = keys or {}  # name -> fn(record) giving exact values
+        self.key = key
+        self.clear()
+
+    def clear(self):
+        self.records = {}   # id -> records with that id, in first-indexed order
+        self.pos = None     # id -> position in the caller's list; rebuilt after an add or remove
+        self.postings = {}  # token -> set of ids (fresh from load(): encoded positions in _ids)
+        self.vocab = []     # sorted tokens, for prefix ranges
+        self.keys = {name: {} for name in self.key_fields}  # name -> value -> set of ids
+        self._ids = []
+
+    def text(self, record, fields=None):
+        parts = []
+        for name in fields or self.fields:
+            value = self.fields[name](record)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(map(str, value))
+            parts.append(str(value or ""))
+        return " ".join(parts).lower()
+
+    def tokens(self, record, fields=None):
+        return set(self.TOKEN.findall(self.text(record, fields)))
+
+    def _ids_of(self, token):
+        ids = self.postings.get(token)
+        if isinstance(ids, str):
+            ids = self.postings[token] = {self._ids[int(i)] for i in ids.split()}
+        return ids
+
+    def _count(self, token):
+        ids = self.postings[token]
+        return ids.count(" ") + 1 if isinstance(ids, str) else len(ids)
+
+    def _add_record(self, rid, record):
+        recs = self.records.get(rid)
+        if recs is None:
+            recs = self.records[rid] = []
+        recs.append(record)
+        for name, get in self.key_fields.items():
+            for value in get(record):
+                if value:
+                    self.keys[name].setdefault(value, set()).add(rid)
+
+    def add(self, record):
+        rid = self.key(record)
+        self._add_record(rid, record)
+        for tok in self.tokens(record):
+            ids = self._ids_of(tok)
+            if ids is None:
+                ids = self.postings[tok] = set()
+                insort(self.vocab, tok)
+            ids.add(rid)
+
+    def remove(self, record, keep_slot=False):
+        rid = self.key(record)
+        recs = self.records.get(rid)
+        if not recs:
+            return
+        if record in recs:
+            recs.remove(record)
+            gone = self.tokens(record)
+        else:  # edited in place since it was indexed: the id is unique, drop what we have
+            gone = self.tokens(record).union(*(self.tokens(r) for r in recs))
+            recs.clear()
+        gone -= set().union(*(self.tokens(r) for r in recs))
+        for tok in gone:
+            ids = self._ids_of(tok)
+            if ids is None:
+                continue
+            ids.discard(rid)
+            if not ids:
+                del self.postings[tok]
+                del self.vocab[bisect_left(self.vocab, tok)]
+        for name, get in self.key_fields.items():
+            kept = {v for r in recs for v in get(r)}
+            for value in get(record):
+                ids = self.keys[name].get(value)
+                if ids is not None and value not in kept:
+                    ids.discard(rid)
+                    if not ids:
+                        del self.keys[name][value]
+        if not recs and not keep_slot:
+            del self.records[rid]
+
+    def change(self, old, new):
+        """Keep the index in step with one [before, after] change (None meaning absent)."""
+        if old is None or new is None or self.key(old) != self.key(new):
+            self.pos = None  # something was inserted or removed: list positions moved
+        if old is not None:
+            # an edit keeps the record's place in the result order
+            self.remove(old, keep_slot=new is not None and self.key(new) == self.key(old))
+        if new is not None:
+            self.add(new)
+
+    def build(self, records):
+        self.clear()
+        postings = self.postings
+        for record in records:
+            rid = self.key(record)
+            self._add_record(rid, record)
+            for tok in self.tokens(record):
+                ids = postings.get(tok)
+                if ids is None:
+                    postings[tok] = {rid}
+                else:
+                    ids.add(rid)
+        self.vocab = sorted(postings)  # one sort instead of an insort per new token
+
+    def _span(self, prefix):
+        return bisect_left(self.vocab, prefix), bisect_left(self.vocab, prefix + "\U0010ffff")
+
+    def lookup(self, name, value):
+        return self.keys[name].get(value, set())
+
+    def search(self, query, exact=()):
+        """Ids matching every word of `query` and every (name, value) in `exact`; None if there are none."""
+        clauses = []  # (estimated ids, field or None, prefix or None, ids or None)
+        for name, value in exact:
+            ids = self.lookup(name, value)
+            clauses.append((len(ids), None, None, ids))
+        for word in (query or "").lower().split():
+            field, sep, rest = word.partition(":")
+            field = field if sep and field in self.fields else None
+            for tok in self.TOKEN.findall(rest if field else word):
+                lo, hi = self._span(tok)
+                cost = sum(self._count(t) for t in self.vocab[lo:hi]) if hi - lo <= 256 else len(self.records)
+                clauses.append((cost, field, tok, None))
+        if not clauses:
+            return None
+        hits, check = None, []
+        for cost, field, prefix, ids in sorted(clauses, key=lambda c: c[0]):
+            if prefix is not None and (field or hits is not None and cost > 64 * len(hits)):
+                check.append((field, prefix))  # verified against the surviving records below
+                if hits is not None:
+                    continue
+            if ids is None:
+                lo, hi = self._span(prefix)
+                ids = set().union(*(self._ids_of(t) for t in self.vocab[lo:hi]))
+            hits = set(ids) if hits is None else hits & ids
+            if not hits:
+                return hits
+        for field, prefix in check:
+            fields = [field] if field else None
+            hits = {rid for rid in hits
+                    if any(t.startswith(prefix) for r in self.records[rid] for t in self.tokens(r, fields))}
+        return hits
+
+    def ordered(self, ids, items):
+        """`ids` in the order their records stand in `items`, the list this index was built from."""
+        if self.pos is None or len(self.pos) != len(self.records):
+            self.pos = {}
+            for i, record in enumerate(items):
+                self.pos.setdefault(self.key(record), i)
+        if len(ids) * 8 < len(self.pos):
+            return sorted(ids, key=self.pos.__getitem__)
+        return [rid for rid in self.pos if rid in ids]
+
+    def matching(self, query, items, exact=()):
+        """Records of `items` matching the query, in list order (all of them for an empty query)."""
+        hits = self.search(query, exact)
+        if hits is None:
+            return list(items)
+        return [r for rid in self.ordered(hits, items) for r in self.records[rid]]
+
+    def _schema(self):
+        return [self.VERSION, sorted(self.fields)]
+
+    def save(self, path, stamp):
+        ids = self._ids
+        if len(ids) > 2 * len(self.records) + 1024:  # mostly deleted ids: re-encode from scratch
+            for tok in self.vocab:
+                self._ids_of(tok)
+            ids = []
+        pos = {rid: i for i, rid in enumerate(ids)}
+        for rid in self.records:
+            if rid not in pos:
+                pos[rid] = len(ids)
+                ids.append(rid)
+        postings = {}
+        for tok in self.vocab:
+            p = self.postings[tok]
+            postings[tok] = p if isinstance(p, str) else " ".join([str(pos[rid]) for rid in p])
+        data = {"schema": self._schema(), "stamp": stamp, "ids": ids, "postings": postings}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._ids = ids
+
+    def load(self, path, stamp, records):
+        """Index `records` from the saved postings if they were built from snapshot `stamp`.
+
+        Returns False (leaving the index empty) if there is no usable saved index.
+        """
+        self.clear()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("stamp") != stamp or data.get("schema") != self._schema():
+            return False
+        for record in records:
+            self._add_record(self.key(record), record)
+        self._ids = data["ids"]
+        self.postings = data["postings"]
+        self.vocab = list(self.postings)
+        return True
 
 class NoteVault:
     def __init__(self):
@@ -22,11 +494,14 @@ class NoteVault:
         self.selected = 0
         self.search_filter = ""
         self.tag_filters = set()
-        self.undo_stack = deque(maxlen=50)
-        self.redo_stack = deque(maxlen=50)
+        self.history = UndoHistory(budget_bytes=HISTORY_BUDGET, max_steps=MAX_UNDO, coalesce_s=COALESCE_S)
+        self.journal = ChangeJournal(NOTES_FILE)
+        self.index = SearchIndex(
+            {'title': lambda n: n['title'], 'content': lambda n: n['content'], 'tags': lambda n: n['tags']},
+            keys={'tag': lambda n: [t.strip() for t in n['tags'].split(',')],
+                  'hash': lambda n: [self.get_note_hash(n)]})
         self.edit_history = defaultdict(list)
         self.edit_pos = defaultdict(int)
-        self.auto_save_thread = None
         self.running = True
         self.load_notes()
         if len(sys.argv) > 1 and sys.argv[1].startswith("--load="):
@@ -38,66 +513,76 @@ class NoteVault:
         self.save_notes()
         sys.exit(0)
 
-    def get_note_path(self):
-        return NOTES_FILE + ".tmp" if os.path.exists(NOTES_FILE + ".tmp") else NOTES_FILE
-
     def load_notes(self):
-        path = self.get_note_path()
         try:
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                    self.notes = data.get('notes', [])
-                    self.note_id_counter = data.get('counter', 0)
-                    self.selected = min(self.selected, len(self.notes) - 1)
+            text = self.journal.read_snapshot()
+            if text is not None:
+                data = json.loads(text)
+                self.notes = data.get('notes', [])
+                self.note_id_counter = data.get('counter', 0)
+            if not self.index.load(INDEX_FILE, self.journal.base, self.notes):
+                self.index.build(self.notes)
+            self.journal.replay(self._indexing(list_applier(self.notes)))
+            self.note_id_counter = max([self.note_id_counter] + [n['id'] + 1 for n in self.notes])
+            self.selected = min(self.selected, len(self.notes) - 1)
         except:
             self.notes = []
+            self.index.clear()
 
     def save_notes(self):
+        """Fold the journal into research_notes.json (on exit, or once the journal grows)."""
         try:
-            path = NOTES_FILE + ".tmp"
-            with open(path, 'w') as f:
-                json.dump({
-                    'notes': self.notes,
-                    'counter': self.note_id_counter
-                }, f, indent=2)
-            if os.path.exists(path):
-                os.replace(path, NOTES_FILE)
+            self.journal.compact(json.dumps({
+                'notes': self.notes,
+                'counter': self.note_id_counter
+            }, indent=2))
+            self.index.save(INDEX_FILE, self.journal.base)
         except Exception as e:
             print(f"Save failed: {e}")
 
-    def start_auto_save(self):
-        def autosave():
-            while self.running:
-                time.sleep(30)
-                if self.running:
-                    self.save_notes()
-        self.auto_save_thread = threading.Thread(target=autosave, daemon=True)
-        self.auto_save_thread.start()
+    def persist(self, changes):
+        """Append just these [index, before, after] changes to the journal."""
+        try:
+            self.journal.append(changes)
+        except Exception as e:
+            print(f"Save failed: {e}")
+            return
+        # Compacting here, on the thread that changes the notes, means the snapshot never
+        # holds a change whose journal line is still to be written (it would replay twice)
+        if self.journal.needs_compaction():
+            self.save_notes()
+
+    def commit(self, label, changes, group=None):
+        self.history.record(label, changes, group)
+        for idx, old, new in changes:
+            # index the live note (edits change it in place), not the copy kept for undo
+            self.index.change(old, self.notes[idx] if new is not None else None)
+        self.persist(changes)
+
+    def _indexing(self, apply):
+        def fn(index, old, new):
+            apply(index, old, new)
+            self.index.change(old, new)
+        return fn
 
     def get_filtered_notes(self):
-        filtered = self.notes[:]
-        if self.search_filter:
-            filtered = [n for n in filtered if (
-                self.search_filter.lower() in n['title'].lower() or
-                self.search_filter.lower() in n['content'].lower() or
-                self.search_filter.lower() in n['tags'].lower()
-            )]
+        # Search words match word prefixes in title/content/tags; tag filters select any of the tags
+        hits = self.index.search(self.search_filter)
         if self.tag_filters:
-            filtered = [n for n in filtered if any(t.strip() in n['tags'] for t in self.tag_filters)]
-        return filtered
+            tagged = set().union(*(self.index.lookup('tag', t.strip()) for t in self.tag_filters))
+            hits = tagged if hits is None else hits & tagged
+        if hits is None:
+            return self.notes[:]
+        return [n for nid in self.index.ordered(hits, self.notes) for n in self.index.records[nid]]
 
     def get_all_tags(self):
-        tags = set()
-        for note in self.notes:
-            tags.update(t.strip() for t in note['tags'].split(',') if t.strip())
-        return sorted(tags)
+        return sorted(self.index.keys['tag'])
 
     def get_stats(self):
         filtered = self.get_filtered_notes()
         all_tags = self.get_all_tags()
-        undo_len = len(self.undo_stack)
-        redo_len = len(self.redo_stack)
+        undo_len = len(self.history.undo_stack)
+        redo_len = len(self.history.redo_stack)
         return f"{len(filtered)} notes | {len(all_tags)} tags | '{self.search_filter}' | U:{undo_len}/R:{redo_len}"
 
     def add_note(self, title="", content="", tags=""):
@@ -110,80 +595,51 @@ class NoteVault:
         }
         self.notes.append(note)
         self.note_id_counter += 1
-        self.undo_stack.append(('add', note['id']))
-        self.redo_stack.clear()
+        self.commit('add', [(len(self.notes) - 1, None, note)])
         self.selected = len(self.notes) - 1
 
     def delete_note(self, idx):
-        note_id = self.notes[idx]['id']
-        self.undo_stack.append(('delete', note_id, self.notes[idx]))
-        self.redo_stack.clear()
-        del self.notes[idx]
+        note = self.notes.pop(idx)
+        self.commit('delete', [(idx, note, None)])
         if self.selected >= len(self.notes):
             self.selected = max(0, len(self.notes) - 1)
 
     def edit_note(self, idx, field, old_value, new_value):
-        note_id = self.notes[idx]['id']
-        self.undo_stack.append(('edit', note_id, field, old_value))
-        self.redo_stack.clear()
-        self.notes[idx][field] = new_value
+        note = self.notes[idx]
+        before = dict(note, **{field: old_value})
+        note[field] = new_value
+        # title/content/tags are saved one field at a time; coalescing makes them one undo step
+        self.commit('edit', [(idx, before, dict(note))], group=f"edit:{note['id']}")
+
+    def _applying(self, applied):
+        # apply() that also collects what it did, so undo/redo journal only their delta
+        apply = self._indexing(list_applier(self.notes))
+        def fn(index, old, new):
+            apply(index, old, new)
+            applied.append([index, old, new])
+        return fn
 
     def undo(self):
-        if not self.undo_stack:
-            return
-        action = self.undo_stack.pop()
-        self.redo_stack.append(action)
-        typ, *args = action
-        if typ == 'add':
-            for i, note in enumerate(self.notes):
-                if note['id'] == args[0]:
-                    del self.notes[i]
-                    break
-        elif typ == 'delete':
-            note_id, note = args[0], args[1]
-            self.notes.append(note)
-            self.notes.sort(key=lambda x: x['id'])
-        elif typ == 'edit':
-            note_id, field, old_value = args[0], args[1], args[2]
-            for note in self.notes:
-                if note['id'] == note_id:
-                    note[field] = old_value
-                    break
+        applied = []
+        if self.history.undo(self._applying(applied)) is not None:
+            self.persist(applied)
+            self.selected = min(self.selected, max(0, len(self.notes) - 1))
 
     def redo(self):
-        if not self.redo_stack:
-            return
-        action = self.redo_stack.pop()
-        self.undo_stack.append(action)
-        typ, *args = action
-        if typ == 'add':
-            note_id = args[0]
-            note = next((n for n in self.notes if n['id'] == note_id), None)
-            if note:
-                self.notes.append(note)
-                self.notes.sort(key=lambda x: x['id'])
-        elif typ == 'delete':
-            note_id, note = args[0], args[1]
-            for i, n in enumerate(self.notes):
-                if n['id'] == note_id:
-                    del self.notes[i]
-                    break
-        elif typ == 'edit':
-            note_id, field, new_value = args[0], args[1], args[2]
-            for note in self.notes:
-                if note['id'] == note_id:
-                    note[field] = new_value
-                    break
+        applied = []
+        if self.history.redo(self._applying(applied)) is not None:
+            self.persist(applied)
+            self.selected = min(self.selected, max(0, len(self.notes) - 1))
 
     def get_note_hash(self, note):
         data = f"{note['title']}{note['tags']}"
         return hashlib.sha256(data.encode()).hexdigest()[:8]
 
     def load_by_hash(self, hash_val):
-        for i, note in enumerate(self.notes):
-            if self.get_note_hash(note) == hash_val:
-                self.selected = i
-                return True
+        for nid in self.index.ordered(self.index.lookup('hash', hash_val), self.notes):
+            note = self.index.records[nid][0]
+            self.selected = next(i for i, n in enumerate(self.notes) if n is note)
+            return True
         return False
 
     def share_note(self, idx):
@@ -241,7 +697,6 @@ class NoteVault:
                 print(prompt + line)
 
     def run(self):
-        self.start_auto_save()
         os.system('clear')
         while self.running:
             filtered = self.get_filtered_notes()
@@ -266,9 +721,10 @@ class NoteVault:
                 break
             elif char == 's':
                 os.system('clear')
-                self.search_filter = self.simple_editor("Search: ")
+                self.search_filter = self.simple_editor("Search (word starts, e.g. 'lea' finds 'learning'): ")
             elif char == 'd' and filtered:
-                self.delete_note(self.selected)
+                note = filtered[self.selected]
+                self.delete_note(next(i for i, n in enumerate(self.notes) if n is note))
             elif char == 'u':
                 self.undo()
             elif char == 'r':
@@ -283,9 +739,10 @@ class NoteVault:
                     new_title = self.simple_editor("Title: ", note['title'], 'title')
                     new_content = self.simple_editor("Content: ", note['content'], 'content')
                     new_tags = self.simple_editor("Tags: ", note['tags'], 'tags')
-                    self.edit_note(filtered.index(note), 'title', note['title'], new_title)
-                    self.edit_note(filtered.index(note), 'content', note['content'], new_content)
-                    self.edit_note(filtered.index(note), 'tags', note['tags'], new_tags)
+                    idx = next(i for i, n in enumerate(self.notes) if n is note)
+                    self.edit_note(idx, 'title', note['title'], new_title)
+                    self.edit_note(idx, 'content', note['content'], new_content)
+                    self.edit_note(idx, 'tags', note['tags'], new_tags)
             elif char == '\x1b':  # ESC sequence
                 seq = sys.stdin.read(3)
                 if seq == '[A':  # Up
@@ -4,10 +4,10 @@ import argparse
 import datetime as dt
 import json
 import os
+import sqlite3
 import sys
 import textwrap
-import tempfile
-import shutil
+from contextlib import contextmanager
 from pathlib import Path
 
 # Optional readline for REPL history
@@ -16,7 +16,13 @@ try:
 except Exception:  # pragma: no cover
     readline = None
 
-APP_FILENAME = ".study_sessions.json"
+APP_FILENAME = ".study_sessions.json"  # legacy JSON store, imported once into STORE_FILENAME
+STORE_FILENAME = ".study_sessions.sqlite3"
+DEFAULT_CONFIG = {
+    "time_format": "24h",
+    "default_print_width": 80,
+    "default_daily_goal_minutes": 300,
+}
 
 
 def get_data_path() -> Path:
@@ -24,74 +30,204 @@ def get_data_path() -> Path:
     return home / APP_FILENAME
 
 
-def load_data() -> dict:
-    path = get_data_path()
-    if not path.exists():
-        data = {
-            "sessions": [],
-            "config": {
-                "time_format": "24h",
-                "default_print_width": 80,
-                "default_daily_goal_minutes": 300,
-            },
-        }
-        save_data(data)
-        return data
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception:
-        # backup
-        backup = path.with_suffix(path.suffix + ".bak")
+class EntryStore:
+    """Records kept as rows of a sqlite3 database instead of one big JSON document.
+
+    Commands load only the date range they need, and save() writes only the
+    rows that were added, changed or removed since they were loaded, so adding
+    one entry costs the same with 10 or 100k entries on file. Writes go through
+    one WAL transaction per save: a crash leaves either the old or the new state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS records (scope TEXT NOT NULL, key TEXT NOT NULL, day TEXT NOT NULL,"
+            " body TEXT NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS records_by_day ON records (scope, day);"
+            "CREATE INDEX IF NOT EXISTS records_by_int_key ON records (scope, CAST(key AS INTEGER));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._loaded = {}  # scope -> {key: body as last read or written}
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
         try:
-            shutil.copy2(path, backup)
-        except Exception:
-            pass
-        print(f"Data file corrupted. Backup saved to {backup}. Starting fresh.", file=sys.stderr)
-        data = {
-            "sessions": [],
-            "config": {
-                "time_format": "24h",
-                "default_print_width": 80,
-                "default_daily_goal_minutes": 300,
-            },
-        }
-        save_data(data)
-        return data
-    if "sessions" not in data or "config" not in data:
-        data.setdefault("sessions", [])
-        data.setdefault(
-            "config",
-            {
-                "time_format": "24h",
-                "default_print_width": 80,
-                "default_daily_goal_minutes": 300,
-            },
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True, ensure_ascii=False)),
+        )
+
+    def _track(self, scope, rows, replace=False):
+        if replace:
+            self._loaded[scope] = {}
+        seen = self._loaded.setdefault(scope, {})
+        rows = rows.fetchall()
+        seen.update(rows)
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for _, body in rows) + "]")
+
+    @staticmethod
+    def _range(columns, scope, since, until):
+        sql, params = f"SELECT {columns} FROM records WHERE scope = ?", [scope]
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(str(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(str(until))
+        return sql + " ORDER BY day, rowid", params
+
+    def load(self, scope, since=None, until=None):
+        """Records of `scope` whose day lies in [since, until]; either bound may be None.
+
+        The result (plus anything fetch()ed later) is what the next save() diffs against.
+        """
+        sql, params = self._range("key, body", scope, since, until)
+        return self._track(scope, self.db.execute(sql, params), replace=True)
+
+    def read(self, scope, since=None, until=None):
+        """load() for commands that never save: sqlite joins the bodies, so one row and one json.loads."""
+        sql, params = self._range("body", scope, since, until)
+        # the outer query has no ORDER BY or join, so sqlite keeps the subquery's order
+        row = self.db.execute(f"SELECT '[' || COALESCE(group_concat(body, ','), '') || ']' FROM ({sql})", params)
+        return json.loads(row.fetchone()[0])
+
+    def fetch(self, scope, key):
+        rows = self.db.execute("SELECT key, body FROM records WHERE scope = ? AND key = ?", (scope, str(key)))
+        found = self._track(scope, rows)
+        return found[0] if found else None
+
+    def count(self, scope):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def max_key(self, scope):
+        row = self.db.execute("SELECT MAX(CAST(key AS INTEGER)) FROM records WHERE scope = ?", (scope,)).fetchone()
+        return row[0] or 0
+
+    def save(self, scope, records, key, day):
+        """Write records that are new or changed since load()/fetch(); delete loaded ones that are gone."""
+        seen = self._loaded.get(scope, {})
+        live, upserts = {}, []
+        for rec in records:
+            k = str(key(rec))
+            body = json.dumps(rec, sort_keys=True, ensure_ascii=False)
+            live[k] = body
+            if seen.get(k) != body:
+                upserts.append((scope, k, str(day(rec) or ""), body))
+        deletes = [(scope, k) for k in seen if k not in live]
+        self.db.executemany(
+            "INSERT INTO records (scope, key, day, body) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(scope, key) DO UPDATE SET day = excluded.day, body = excluded.body",
+            upserts,
         )
-    return data
+        self.db.executemany("DELETE FROM records WHERE scope = ? AND key = ?", deletes)
+        self._loaded[scope] = live
+        return len(upserts) + len(deletes)
+
+    def forget(self, scope):
+        """Nothing of `scope` was loaded: the next save() only adds or updates."""
+        self._loaded.pop(scope, None)
+
+    def drop(self, scope):
+        self.db.execute("DELETE FROM records WHERE scope = ?", (scope,))
+        self.forget(scope)
+
+    def migrate(self, legacy_path, importer):
+        """One-time import of the old JSON file, which is left in place as a backup."""
+        legacy_path = Path(legacy_path)
+        if self.get_meta("migrated_from") is not None:
+            return False
+        with self.transaction():
+            if self.get_meta("migrated_from") is not None:  # another process got there first
+                return False
+            if legacy_path.exists():
+                try:
+                    with legacy_path.open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except ValueError:
+                    print(f"Could not read {legacy_path}; starting with an empty store.", file=sys.stderr)
+                else:
+                    importer(self, raw)
+            self.set_meta("migrated_from", str(legacy_path))
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # fold the bulk import into the main file
+        self._loaded.clear()
+        return True
+
+
+_store = None
+
+
+def get_store() -> EntryStore:
+    global _store
+    if _store is None:
+        _store = EntryStore(get_data_path().with_name(STORE_FILENAME))
+        _store.migrate(get_data_path(), import_legacy)
+    return _store
+
+
+def session_key(s: dict):
+    return s["id"]
+
+
+def session_day(s: dict):
+    return s.get("date")
+
+
+def import_legacy(store: EntryStore, raw) -> None:
+    if not isinstance(raw, dict):
+        return
+    store.save("sessions", raw.get("sessions", []), key=session_key, day=session_day)
+    store.set_meta("config", raw.get("config") or dict(DEFAULT_CONFIG))
+
+
+def load_data(date_from=None, date_to=None, sessions: bool = True) -> dict:
+    """Config plus the sessions dated within [date_from, date_to]; sessions=False skips them."""
+    store = get_store()
+    config = store.get_meta("config")
+    if config is None:
+        config = dict(DEFAULT_CONFIG)
+        with store.transaction():
+            store.set_meta("config", config)
+    if not sessions:
+        store.forget("sessions")
+    return {
+        "sessions": store.load("sessions", date_from, date_to) if sessions else [],
+        "config": config,
+    }
 
 
 def save_data(data: dict) -> None:
-    path = get_data_path()
-    tmp_fd, tmp_name = tempfile.mkstemp(prefix="study_", suffix=".tmp", dir=str(path.parent))
+    store = get_store()
     try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        shutil.move(tmp_name, path)
-    except Exception as e:
+        with store.transaction():
+            store.save("sessions", data.get("sessions", []), key=session_key, day=session_day)
+            store.set_meta("config", data.get("config", {}))
+    except sqlite3.Error as e:
         print(f"Error writing data file: {e}", file=sys.stderr)
-        try:
-            os.unlink(tmp_name)
-        except Exception:
-            pass
         sys.exit(1)
 
 
 def next_session_id(data: dict) -> int:
     sessions = data.get("sessions", [])
-    if not sessions:
-        return 1
-    return max(s.get("id", 0) for s in sessions) + 1
+    loaded = max((s.get("id", 0) for s in sessions), default=0)
+    return max(loaded, get_store().max_key("sessions")) + 1
 
 
 def parse_date(s: str, allow_keywords: bool = False) -> dt.date:
@@ -171,7 +307,11 @@ def get_session_by_id(data: dict, sid: int):
     for s in data.get("sessions", []):
         if s.get("id") == sid:
             return s
-    return None
+    # edit/delete do not load the whole history; pull in just this session
+    s = get_store().fetch("sessions", sid)
+    if s is not None:
+        data.setdefault("sessions", []).append(s)
+    return s
 
 
 def list_sessions_filtered(
@@ -220,7 +360,7 @@ def print_sessions_table(sessions: list, config: dict) -> None:
     for s in sessions:
         total_minutes += s["duration_minutes"]
         row = []
-        row.append(str(s["id"]).rjust(col_widths))
+        row.append(str(s["id"]).rjust(col_widths[0]))
         row.append(s["date"].ljust(col_widths[1]))
         time_range = f"{format_time(s['start_time'], config)}-{format_time(s['end_time'], config)}"
         row.append(trunc(time_range, col_widths[2]).ljust(col_widths[2]))
@@ -944,8 +1084,32 @@ def build_arg_parser():
     return p
 
 
+def session_window(args) -> dict:
+    """load_data() arguments covering only the sessions a command reads."""
+    command = getattr(args, "command", None)
+    try:
+        if command in ("add", "edit", "delete", "config"):
+            return {"sessions": False}
+        if command in ("list", "subject", "print"):
+            day = getattr(args, "date", None) if command == "list" else getattr(args, "day", None)
+            date_from = date_to = parse_date(day, allow_keywords=True) if day else None
+            if args.date_from:
+                date_from = parse_date(args.date_from)
+            if args.date_to:
+                date_to = parse_date(args.date_to)
+            return {"date_from": date_from, "date_to": date_to}
+        if command == "summary":
+            start, end = date_range_for_period(args)
+            return {"date_from": start, "date_to": end}
+        if command == "today":
+            today = dt.date.today()
+            return {"date_from": today, "date_to": today}
+    except ValueError:
+        pass  # let the command itself report the bad date
+    return {}
+
+
 def repl():
-    data = load_data()
     parser = build_arg_parser()
     commands_help = {
         "add": "Add a study session",
@@ -1006,7 +1170,7 @@ def repl():
             print("Unknown command; type 'help' for options.")
             continue
         # re-load for each command to keep in sync, then save through functions
-        data = load_data()
+        data = load_data(**session_window(args))
         try:
             args.func(args, data)
         except TypeError:
@@ -1025,7 +1189,7 @@ def main(argv=None):
     if not hasattr(args, "func"):
         parser.print_help()
         sys.exit(1)
-    data = load_data()
+    data = load_data(**session_window(args))
     args.func(args, data)
 
 
@@ -5,11 +5,10 @@ import json
 import os
 import sys
 import time
+import heapq
 import random
-from datetime import datetime, timedelta
-
-# Allowed stdlib: json, sqlite3, random, datetime, argparse (sqlite3 unused but allowed)
-import sqlite3  # noqa: F401  # kept for requirement consistency
+import sqlite3
+from datetime import datetime, timedelta, timezone
 
 APP_NAME = "vocab_srs"
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), f".{APP_NAME}_config.json")
@@ -48,6 +47,10 @@ def deck_path(study_dir, name):
     return os.path.join(study_dir, f"{name}.json")
 
 
+def index_path(study_dir, name):
+    return os.path.join(study_dir, f"{name}.idx")
+
+
 def now_iso():
     return datetime.utcnow().isoformat(timespec="seconds") + "Z"
 
@@ -61,6 +64,14 @@ def parse_iso(dt_str):
         return None
 
 
+def iso_epoch(dt_str):
+    """Epoch seconds of a UTC ISO timestamp, or None if it does not parse."""
+    dt = parse_iso(dt_str) if dt_str else None
+    if dt is None:
+        return None
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
 def colored(text, color_code, theme):
     if theme == "none":
         return text
@@ -159,6 +170,219 @@ def save_deck(path, deck):
             json.dump(deck, f, indent=2, ensure_ascii=False)
     except Exception as e:
         print(f"Error saving deck: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+class DueIndex:
+    """Cards of one deck in a sqlite3 file next to the deck's JSON, indexed by due time.
+
+    Each card is a row keyed by its position in the deck, holding its due
+    time in epoch seconds (None if unknown), a per-app weight and review
+    count, and the card itself. A review rewrites one row; the next N due
+    cards come off the due index and due counts are range counts, so
+    neither parses nor sorts the whole deck. The index is the deck of
+    record: once a row has changed it is "ahead" of the JSON file, which
+    is only written when asked for (a sync command writes the deck out
+    and calls saved()), so a command costs the rows it touches rather
+    than a rewrite of the whole deck.
+    """
+
+    def __init__(self, path, keys):
+        self.path = path
+        self.keys = keys  # card -> (due epoch or None, weight or None, review count)
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS cards (pos INTEGER PRIMARY KEY, due REAL, weight REAL,"
+            " reviews INTEGER NOT NULL, body TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS cards_by_due ON cards (due, pos);"
+            "CREATE INDEX IF NOT EXISTS cards_by_weight ON cards (COALESCE(weight, 0) DESC, pos);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+
+    def close(self):
+        self.db.close()
+
+    def _get(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set(self, key, value):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+
+    @property
+    def sig(self):
+        """Size and mtime of the JSON file the index was built from."""
+        return self._get("sig")
+
+    @property
+    def ahead(self):
+        return self._get("ahead", False)
+
+    @property
+    def header(self):
+        """Deck fields other than the cards."""
+        return self._get("header", {})
+
+    @header.setter
+    def header(self, value):
+        self._set("header", value)
+        self._set("ahead", True)
+
+    def _row(self, card):
+        return (*self.keys(card), json.dumps(card, ensure_ascii=False))
+
+    def rebuild(self, cards, header, sig):
+        """Replace everything with `cards` as read from a JSON file with signature `sig`."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute("DELETE FROM cards")
+            self.db.executemany(
+                "INSERT INTO cards (pos, due, weight, reviews, body) VALUES (?, ?, ?, ?, ?)",
+                ((pos, *self._row(card)) for pos, card in enumerate(cards)),
+            )
+            self._set("header", header)
+            self._set("sig", sig)
+            self._set("ahead", False)
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def saved(self, sig):
+        """Record that the JSON file, now with signature `sig`, holds the current deck again."""
+        self._set("sig", sig)
+        self._set("ahead", False)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def card(self, pos):
+        row = self.db.execute("SELECT body FROM cards WHERE pos = ?", (pos,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cards(self, by_due=False):
+        """The whole deck, in order (or earliest due first, cards without a due time leading)."""
+        rows = self.db.execute("SELECT body FROM cards ORDER BY " + ("due, pos" if by_due else "pos")).fetchall()
+        # one json.loads over the joined bodies is much cheaper than one per row
+        return json.loads("[" + ",".join(body for body, in rows) + "]")
+
+    def put(self, pos, card):
+        self.db.execute(
+            "UPDATE cards SET due = ?, weight = ?, reviews = ?, body = ? WHERE pos = ?", (*self._row(card), pos)
+        )
+        self._set("ahead", True)
+
+    def append(self, card):
+        pos = self.db.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM cards").fetchone()[0]
+        self.db.execute("INSERT INTO cards (pos, due, weight, reviews, body) VALUES (?, ?, ?, ?, ?)",
+                        (pos, *self._row(card)))
+        self._set("ahead", True)
+        return pos
+
+    def remove(self, pos):
+        self.db.execute("DELETE FROM cards WHERE pos = ?", (pos,))
+        self._set("ahead", True)
+
+    def overdue(self, now):
+        """(pos, due, weight) of the cards due at or before `now`, earliest first."""
+        return self.db.execute(
+            "SELECT pos, due, weight FROM cards WHERE due <= ? ORDER BY due, pos", (now,)
+        )
+
+    def upcoming(self, now):
+        """(pos, due, weight) of the cards not due yet (or with no due time), heaviest first."""
+        return self.db.execute(
+            "SELECT pos, due, weight FROM cards WHERE due IS NULL OR due > ?"
+            " ORDER BY COALESCE(weight, 0) DESC, pos", (now,)
+        )
+
+    def due_positions(self, now):
+        return [pos for pos, in self.db.execute(
+            "SELECT pos FROM cards WHERE due IS NULL OR due <= ? ORDER BY pos", (now,))]
+
+    def count_due(self, before, min_weight=None):
+        """Cards due before `before` (or with no due time), optionally only those weighing at least `min_weight`."""
+        sql, params = "SELECT COUNT(*) FROM cards WHERE (due IS NULL OR due < ?)", [before]
+        if min_weight is not None:
+            sql += " AND COALESCE(weight, 0) >= ?"
+            params.append(min_weight)
+        return self.db.execute(sql, params).fetchone()[0]
+
+    def summary(self, min_weight=0, min_reviews=0):
+        """(cards, cards with a weight, mean weight or None, cards with weight >= min_weight and reviews >= min_reviews)."""
+        total, weighed, mean, strong = self.db.execute(
+            "SELECT COUNT(*), COUNT(weight), AVG(weight), SUM(weight >= ? AND reviews >= ?) FROM cards",
+            (min_weight, min_reviews),
+        ).fetchone()
+        return total, weighed, mean, strong or 0
+
+
+def card_keys(card):
+    return iso_epoch(card.get("due_at")), card.get("avg_confidence"), card.get("review_count", 0)
+
+
+def file_sig(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def drop_index(study_dir, name):
+    """Forget a deck's index, e.g. because its JSON file was replaced."""
+    base = index_path(study_dir, name)
+    for path in (base, base + "-wal", base + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def open_deck(study_dir, name):
+    """The deck's DueIndex, rebuilt from its JSON file if the file changed since it was indexed.
+
+    The index holds the deck between commands and the JSON file is only
+    written by sync-deck, so a JSON file edited by hand replaces reviews
+    made since the last sync. Returns None (after printing why) if the
+    deck does not exist or cannot be read.
+    """
+    path = deck_path(study_dir, name)
+    if not os.path.exists(path):
+        print(f"Deck file not found: {path}", file=sys.stderr)
+        return None
+    index = DueIndex(index_path(study_dir, name), card_keys)
+    sig = file_sig(path)
+    if index.sig != sig:
+        if index.ahead:
+            print(f"Warning: {path} was changed outside the app; changes since the last sync-deck are dropped.",
+                  file=sys.stderr)
+        deck = load_deck(path)
+        if deck is None:
+            index.close()
+            return None
+        cards = deck.pop("cards")
+        index.rebuild(cards, deck, sig)
+    return index
+
+
+def deck_snapshot(index):
+    """The whole deck as stored in a JSON file."""
+    deck = index.header
+    deck["cards"] = index.cards()
+    return deck
+
+
+def sync_deck(study_dir, name, index):
+    """Write the deck to its JSON file if the index is ahead of it. False if that failed."""
+    if not index.ahead:
+        return True
+    path = deck_path(study_dir, name)
+    if not save_deck(path, deck_snapshot(index)):
+        return False
+    index.saved(file_sig(path))
+    return True
 
 
 def list_decks_cmd(args, config, theme):
@@ -171,11 +395,11 @@ def list_decks_cmd(args, config, theme):
     print("Available decks:")
     for f in sorted(files):
         deck_name = f[:-5]
-        path = os.path.join(study_dir, f)
-        deck = load_deck(path)
-        if deck is None:
+        index = open_deck(study_dir, deck_name)
+        if index is None:
             continue
-        count = len(deck["cards"])
+        count = len(index)
+        index.close()
         print(f" - {deck_name} ({count} cards)")
 
 
@@ -189,15 +413,15 @@ def add_deck_cmd(args, config, theme):
         return
     deck = init_deck(name)
     save_deck(path, deck)
+    drop_index(study_dir, name)
     print(f"Deck '{name}' created at {path}")
 
 
 def add_card_cmd(args, config, theme):
     study_dir = config["study_dir"]
     ensure_study_dir(study_dir)
-    path = deck_path(study_dir, args.deck)
-    deck = load_deck(path)
-    if deck is None:
+    index = open_deck(study_dir, args.deck)
+    if index is None:
         return
     q = args.question
     a = args.answer
@@ -227,6 +451,7 @@ def add_card_cmd(args, config, theme):
         a = "\n".join(lines).strip()
     if not q or not a:
         print("Question and answer cannot be empty.", file=sys.stderr)
+        index.close()
         return
     card = {
         "question": q,
@@ -234,10 +459,11 @@ def add_card_cmd(args, config, theme):
     }
     if not validate_card(card):
         print("Internal error: card validation failed.", file=sys.stderr)
+        index.close()
         return
-    deck["cards"].append(card)
-    save_deck(path, deck)
-    print(f"Added card to deck '{deck['name']}' (total {len(deck['cards'])}).")
+    index.append(card)
+    print(f"Added card to deck '{index.header['name']}' (total {len(index)}).")
+    index.close()
 
 
 def delete_deck_cmd(args, config, theme):
@@ -254,6 +480,7 @@ def delete_deck_cmd(args, config, theme):
             return
     try:
         os.remove(path)
+        drop_index(study_dir, args.deck)
         print(f"Deck '{args.deck}' deleted.")
     except Exception as e:
         print(f"Error deleting deck: {e}", file=sys.stderr)
@@ -262,10 +489,11 @@ def delete_deck_cmd(args, config, theme):
 def export_deck_cmd(args, config, theme):
     study_dir = config["study_dir"]
     ensure_study_dir(study_dir)
-    path = deck_path(study_dir, args.deck)
-    deck = load_deck(path)
-    if deck is None:
+    index = open_deck(study_dir, args.deck)
+    if index is None:
         return
+    deck = deck_snapshot(index)
+    index.close()
     out = args.output or f"{deck['name']}_export.json"
     try:
         with open(out, "w", encoding="utf-8") as f:
@@ -301,16 +529,32 @@ def import_deck_cmd(args, config, theme):
         print(f"Deck '{name}' already exists. Use --force to overwrite.", file=sys.stderr)
         return
     save_deck(path, data)
+    drop_index(study_dir, name)
     print(f"Imported deck as '{name}' with {len(data['cards'])} cards.")
 
 
+def sync_deck_cmd(args, config, theme):
+    study_dir = config["study_dir"]
+    ensure_study_dir(study_dir)
+    names = [args.deck] if args.deck else sorted(f[:-5] for f in os.listdir(study_dir) if f.endswith(".json"))
+    for name in names:
+        index = open_deck(study_dir, name)
+        if index is None:
+            continue
+        ahead = index.ahead
+        if sync_deck(study_dir, name, index):
+            print(f"Deck '{name}' {'written to' if ahead else 'already up to date in'} {deck_path(study_dir, name)}")
+        index.close()
+
+
 def print_deck_cmd(args, config, theme):
     study_dir = config["study_dir"]
     ensure_study_dir(study_dir)
-    path = deck_path(study_dir, args.deck)
-    deck = load_deck(path)
-    if deck is None:
+    index = open_deck(study_dir, args.deck)
+    if index is None:
         return
+    deck = deck_snapshot(index)
+    index.close()
     print(f"# Deck: {deck['name']}")
     print()
     for idx, card in enumerate(deck["cards"], 1):
@@ -357,15 +601,11 @@ def sm2_update(card, quality):
     card["due_at"] = next_due.isoformat(timespec="seconds") + "Z"
 
 
-def card_priority(card):
-    """Lower score means higher priority."""
-    due_at = parse_iso(card.get("due_at") or now_iso())
-    if due_at is None:
-        due_at = datetime.utcnow()
-    days_overdue = (datetime.utcnow() - due_at).total_seconds() / 86400.0
+def card_priority(due, avg_conf, now):
+    """Lower score means higher priority. `due` and `now` are epoch seconds."""
+    days_overdue = (now - due) / 86400.0 if due is not None else 0
     if days_overdue < 0:
         days_overdue = 0
-    avg_conf = card.get("avg_confidence")
     if avg_conf is None:
         avg_conf = 0
     # score: base on -days_overdue (more overdue => lower score), and (5-avg_conf)
@@ -373,37 +613,64 @@ def card_priority(card):
     return score
 
 
-def choose_cards_for_study(deck, limit):
-    cards = deck["cards"]
-    if not cards:
+def choose_cards_for_study(index, limit):
+    """Positions of the `limit` cards with the lowest card_priority (all cards if no limit), best first.
+
+    Ties keep deck order. Overdue cards are read in due order until no later
+    one can beat the worst pick kept so far; cards not due yet all score by
+    confidence alone, so only the first `limit` of those are read.
+    """
+    now = time.time()
+    total = len(index)
+    if limit is None or limit <= 0 or limit > total:
+        limit = total
+    if not limit:
         return []
-    sorted_cards = sorted(cards, key=card_priority)
-    if limit is None or limit <= 0 or limit > len(sorted_cards):
-        return sorted_cards
-    return sorted_cards[:limit]
+    worst_first = []  # (-score, -pos): the root is the worst pick kept
+
+    def offer(pos, score):
+        item = (-score, -pos)
+        if len(worst_first) < limit:
+            heapq.heappush(worst_first, item)
+        elif item > worst_first[0]:
+            heapq.heapreplace(worst_first, item)
+
+    for pos, due, avg_conf in index.overdue(now):
+        # the score is at least -days_overdue, which only grows from here
+        if len(worst_first) == limit and (due - now) / 86400.0 > -worst_first[0][0]:
+            break
+        offer(pos, card_priority(due, avg_conf, now))
+    for n, (pos, due, avg_conf) in enumerate(index.upcoming(now)):
+        if n == limit:
+            break
+        offer(pos, card_priority(due, avg_conf, now))
+    return [-pos for _, pos in sorted(worst_first, reverse=True)]
 
 
 def study_cmd(args, config, theme):
     study_dir = config["study_dir"]
     ensure_study_dir(study_dir)
-    path = deck_path(study_dir, args.deck)
-    deck = load_deck(path)
-    if deck is None:
+    index = open_deck(study_dir, args.deck)
+    if index is None:
         return
-    if not deck["cards"]:
+    if not len(index):
         print("Deck has no cards.")
+        index.close()
         return
 
     session_start = time.time()
-    to_study = choose_cards_for_study(deck, args.limit)
+    to_study = choose_cards_for_study(index, args.limit)
     if not to_study:
         print("No cards to study.")
+        index.close()
         return
 
+    deck = index.header
     print(colored(f"Studying deck '{deck['name']}' ({len(to_study)} cards)...", "36", theme))
     print("Controls: [Enter]=reveal, [1-5]=rate, [n]=next, [s]=skip, [q]=quit")
 
-    for idx, card in enumerate(to_study, 1):
+    for idx, pos in enumerate(to_study, 1):
+        card = index.card(pos)
         print()
         print(colored(f"Card {idx}/{len(to_study)}", "33", theme))
         print(colored("Q:", "32", theme))
@@ -427,7 +694,8 @@ def study_cmd(args, config, theme):
                 deck["total_time_seconds"] = deck.get("total_time_seconds", 0) + int(
                     time.time() - session_start
                 )
-                save_deck(path, deck)
+                index.header = deck
+                index.close()
                 return
             if cmd.lower() == "s":
                 break
@@ -453,6 +721,7 @@ def study_cmd(args, config, theme):
                     sum(e["confidence"] for e in ch) / len(ch), 2
                 )
                 card["last_reviewed_at"] = now_iso()
+                index.put(pos, card)
                 print(f"Recorded confidence {quality}.")
                 break
             if not revealed and cmd == "":
@@ -462,35 +731,24 @@ def study_cmd(args, config, theme):
     deck["last_reviewed_at"] = now_iso()
     deck["review_sessions"] = deck.get("review_sessions", 0) + 1
     deck["total_time_seconds"] = deck.get("total_time_seconds", 0) + int(time.time() - session_start)
-    save_deck(path, deck)
+    index.header = deck
+    index.close()
     print("Session complete.")
 
 
 def stats_cmd(args, config, theme):
     study_dir = config["study_dir"]
     ensure_study_dir(study_dir)
-    path = deck_path(study_dir, args.deck)
-    deck = load_deck(path)
-    if deck is None:
+    index = open_deck(study_dir, args.deck)
+    if index is None:
         return
-    cards = deck["cards"]
-    total = len(cards)
-    mastered = 0
-    confs = []
-    streak = 0
-
-    for c in cards:
-        avg = c.get("avg_confidence")
-        if avg is not None:
-            confs.append(avg)
-        if avg is not None and avg >= 4.0 and c.get("review_count", 0) >= 3:
-            mastered += 1
-        # simple streak: count cards due today or earlier with avg_conf >=3.5
-        due_at = parse_iso(c.get("due_at") or now_iso())
-        if due_at and due_at <= datetime.utcnow() and (avg or 0) >= 3.5:
-            streak += 1
-
-    avg_conf = round(sum(confs) / len(confs), 2) if confs else None
+    deck = index.header
+    total, rated, mean_conf, mastered = index.summary(min_weight=4.0, min_reviews=3)
+    # simple streak: count cards due today or earlier with avg_conf >=3.5
+    streak = index.count_due(time.time(), min_weight=3.5)
+    index.close()
+
+    avg_conf = round(mean_conf, 2) if rated else None
     total_time = int(deck.get("total_time_seconds", 0))
     sessions = deck.get("review_sessions", 0)
     last_reviewed = deck.get("last_reviewed_at")
@@ -555,6 +813,9 @@ def main():
     p_print = sub.add_parser("print-deck", help="Print deck as text")
     p_print.add_argument("deck", help="Deck name")
 
+    p_sync = sub.add_parser("sync-deck", help="Write reviews and new cards back to the deck's JSON file")
+    p_sync.add_argument("deck", nargs="?", help="Deck name (default: every deck)")
+
     args = parser.parse_args()
     theme = apply_theme(config, args.theme)
 
@@ -576,6 +837,8 @@ def main():
         stats_cmd(args, config, theme)
     elif args.command == "print-deck":
         print_deck_cmd(args, config, theme)
+    elif args.command == "sync-deck":
+        sync_deck_cmd(args, config, theme)
     else:
         parser.print_help()
 